@@ -0,0 +1,37 @@
+import logging
+import os
+import sys
+
+# ally logs its progress messages ("Transaction ... confirmed in round ...")
+# to the `ally` logger and leaves where they go to the application; the
+# scripts and allyctl send them to stdout with `configure_logging`.
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+
+class _StdoutHandler(logging.StreamHandler):
+    # whatever sys.stdout is at the time, as print would
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def configure_logging() -> None:
+    """Print ally's progress messages to stdout, for the command line entry points.
+
+    $ALLY_LOG_LEVEL sets how much (WARNING silences them, DEBUG adds
+    `ally.metrics` events as JSON lines); with $ALLY_LOG_STDOUT=0 they go to
+    the root logger's handlers instead. Calling it again changes nothing.
+    """
+    logger = logging.getLogger(__name__)
+    logger.setLevel(os.environ.get("ALLY_LOG_LEVEL", "INFO").upper())
+    if os.environ.get("ALLY_LOG_STDOUT", "1") == "0":
+        return
+    if not any(isinstance(h, _StdoutHandler) for h in logger.handlers):
+        handler = _StdoutHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    logger.propagate = False
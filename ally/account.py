@@ -1,4 +1,65 @@
-from algosdk import account, mnemonic
+import base64
+from typing import List, Optional
+
+from algosdk import account, constants, encoding, error, mnemonic
+from algosdk.future import transaction
+from nacl.signing import SigningKey
+
+
+class Signer:
+    """Signs transactions with a key decoded once.
+
+    `Transaction.sign` decodes the base64 private key, rebuilds the Ed25519
+    signing key and derives the address twice on every call; a Signer does
+    that at construction and keeps the signing key, public key and address.
+    """
+
+    __slots__ = ("private_key", "public_key", "address", "_signing_key")
+
+    def __init__(self, private_key: str) -> None:
+        key = base64.b64decode(private_key)
+        self.private_key = private_key
+        self.public_key = key[constants.key_len_bytes:]
+        self.address = encoding.encode_address(self.public_key)
+        self._signing_key = SigningKey(key[:constants.key_len_bytes])
+
+    def __reduce__(self):
+        return Signer, (self.private_key,)
+
+    def raw_sign(self, txn: transaction.Transaction) -> bytes:
+        """The signature of ``txn``, as `Transaction.raw_sign`."""
+        return self.sign_bytes(constants.txid_prefix + base64.b64decode(encoding.msgpack_encode(txn)))
+
+    def sign_bytes(self, data: bytes) -> bytes:
+        """The Ed25519 signature of ``data``, domain prefix included."""
+        return self._signing_key.sign(data).signature
+
+    def sign(self, txn: transaction.Transaction) -> transaction.SignedTransaction:
+        """Sign ``txn``, as `Transaction.sign`: rekeyed senders get this signer as auth address."""
+        return self.signed(txn, self.raw_sign(txn))
+
+    def signed(self, txn: transaction.Transaction, signature: bytes) -> transaction.SignedTransaction:
+        """``txn`` with a signature this signer made, see `ally.signing`."""
+        sig = base64.b64encode(signature).decode()
+        return transaction.SignedTransaction(txn, sig, None if txn.sender == self.address else self.address)
+
+    def sign_transactions(self, txns: List[transaction.Transaction]) -> List[transaction.SignedTransaction]:
+        return [self.sign(txn) for txn in txns]
+
+    def sign_multisig(self, mtx: transaction.MultisigTransaction) -> None:
+        """Add this signer's signature to ``mtx``, as `MultisigTransaction.sign`."""
+        mtx.multisig.validate()
+        for subsig in mtx.multisig.subsigs:
+            if subsig.public_key == self.public_key:
+                subsig.signature = self.raw_sign(mtx.transaction)
+                return
+        raise error.InvalidSecretKeyError
+
+
+def sign_transactions(txns: List[transaction.Transaction],
+                      signers: List[Signer]) -> List[transaction.SignedTransaction]:
+    """Sign each transaction with the signer at the same position."""
+    return [signer.sign(txn) for txn, signer in zip(txns, signers)]
 
 
 class Account:
@@ -7,6 +68,7 @@ class Account:
     def __init__(self, private_key: str) -> None:
         self.sk = private_key
         self.adr = account.address_from_private_key(private_key)
+        self._signer: Optional[Signer] = None
 
     def get_address(self) -> str:
         return self.adr
@@ -17,6 +79,12 @@ class Account:
     def get_mnemonic(self) -> str:
         return mnemonic.from_private_key(self.sk)
 
+    def get_signer(self) -> Signer:
+        """The account's `Signer`, created on first use."""
+        if self._signer is None:
+            self._signer = Signer(self.sk)
+        return self._signer
+
     @classmethod
     def from_mnemonic(cls, m: str) -> "Account":
         return cls(mnemonic.to_private_key(m))
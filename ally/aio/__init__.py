@@ -0,0 +1,2 @@
+"""Asyncio API mirroring `ally.utils` and `ally.operations`."""
+from .client import AsyncAlgodClient
@@ -0,0 +1,133 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional
+from urllib import parse
+
+import aiohttp
+from algosdk import constants, encoding, error
+from algosdk.future import transaction
+
+DEFAULT_POOL_SIZE = 100
+DEFAULT_TIMEOUT = 30.0
+
+
+class AsyncAlgodClient:
+    """Non-blocking algod v2 client for the endpoints `ally` uses.
+
+    Requests share one `aiohttp.ClientSession`, so TCP/TLS connections are
+    pooled (up to ``pool_size`` of them) and kept alive between calls. The
+    session is created on first use inside the running event loop; call
+    `close` (or use the client as an async context manager) when done.
+    """
+
+    def __init__(self, algod_token: str, algod_address: str, headers: Optional[Dict[str, str]] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT) -> None:
+        self.algod_token = algod_token
+        self.algod_address = algod_address.rstrip("/")
+        self.headers = headers
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncAlgodClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def algod_request(self, method: str, requrl: str, params: Optional[Dict[str, Any]] = None,
+                            data: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None,
+                            response_format: str = "json") -> Any:
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+
+        if requrl not in constants.unversioned_paths:
+            requrl = "/v2" + requrl
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+
+        async with self._get_session().request(
+                method, self.algod_address + requrl, data=data, headers=header) as resp:
+            body = await resp.read()
+            if resp.status >= 400:
+                message = body.decode("utf-8")
+                try:
+                    message = json.loads(message)["message"]
+                except Exception:
+                    pass
+                raise error.AlgodHTTPError(message, resp.status)
+            if response_format != "json":
+                return body
+            try:
+                return json.loads(body) if body else None
+            except Exception as e:
+                raise error.AlgodResponseError(
+                    "Failed to parse JSON response from algod") from e
+
+    async def health(self) -> None:
+        return await self.algod_request("GET", "/health")
+
+    async def status(self) -> Dict[str, Any]:
+        return await self.algod_request("GET", "/status")
+
+    async def status_after_block(self, round: int) -> Dict[str, Any]:
+        return await self.algod_request("GET", "/status/wait-for-block-after/" + str(round))
+
+    async def suggested_params(self) -> transaction.SuggestedParams:
+        res = await self.algod_request("GET", "/transactions/params")
+        return transaction.SuggestedParams(
+            res["fee"],
+            res["last-round"],
+            res["last-round"] + 1000,
+            res["genesis-hash"],
+            res["genesis-id"],
+            False,
+            res["consensus-version"],
+            res["min-fee"],
+        )
+
+    async def send_raw_transaction(self, txn: bytes) -> str:
+        """Send msgpack encoded signed transactions (raw bytes, not base64)."""
+        res = await self.algod_request(
+            "POST", "/transactions", data=txn, headers={"Content-Type": "application/x-binary"})
+        return res["txId"]
+
+    async def send_transaction(self, txn) -> str:
+        return await self.send_raw_transaction(base64.b64decode(encoding.msgpack_encode(txn)))
+
+    async def send_transactions(self, txns: List[Any]) -> str:
+        return await self.send_raw_transaction(
+            b"".join(base64.b64decode(encoding.msgpack_encode(txn)) for txn in txns))
+
+    async def pending_transaction_info(self, tx_id: str) -> Dict[str, Any]:
+        return await self.algod_request(
+            "GET", "/transactions/pending/" + tx_id, params={"format": "json"})
+
+    async def account_info(self, address: str) -> Dict[str, Any]:
+        return await self.algod_request("GET", "/accounts/" + address)
+
+    async def application_info(self, app_id: int) -> Dict[str, Any]:
+        return await self.algod_request("GET", "/applications/" + str(app_id))
+
+    async def compile(self, source: str) -> Dict[str, Any]:
+        return await self.algod_request(
+            "POST", "/teal/compile", data=source.encode("utf-8"),
+            headers={"Content-Type": "application/x-binary"})
@@ -0,0 +1,132 @@
+import asyncio
+import functools
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .. import operations as ops
+from ..account import Account
+from ..compile_cache import CompileCache, get_default_cache, program_key, source_fingerprint
+from ..metrics import timed
+from ..operations import (
+    bootstrap_pool_txn, destroy_pool_txn, mint_walgo_group,
+    redeem_walgo_group, set_governor_txn, set_mint_price_txn, toggle_redeem_txn, update_pool_txn,
+)
+from .client import AsyncAlgodClient
+from .utils import compile_program, is_opted_in_asset, suggested_params, wait_for_transaction
+
+
+async def get_contracts(client: AsyncAlgodClient, cache: Optional[CompileCache] = ops._DEFAULT_CACHE,
+                        prebuilt: bool = True) -> Tuple[bytes, bytes]:
+    """The approval and clear programs of the pool, see `ally.operations.get_contracts`.
+
+    Codegen, assembly and the compile cache's file IO run in the loop's
+    default executor; the algod and verify backends compile through ``client``.
+    """
+    loop = asyncio.get_running_loop()
+    backend = os.environ.get("ALLY_COMPILE_BACKEND", "local")
+    if backend == "local":
+        return await loop.run_in_executor(None, functools.partial(ops.get_contracts, None, cache, prebuilt))
+
+    if cache is ops._DEFAULT_CACHE:
+        cache = get_default_cache()
+    if backend == "verify":
+        # checking the assembler against algod is the point, never cached
+        cache = None
+    teal: Dict[str, str] = {}
+
+    async def compile_cached(name: str) -> bytes:
+        if cache is not None:
+            fingerprint = await loop.run_in_executor(
+                None, source_fingerprint, ops.CONTRACT_SOURCES, name, ops.TEAL_VERSION, backend)
+            program = await loop.run_in_executor(None, cache.get_by_source, fingerprint)
+            if program is not None:
+                return program
+        if not teal:
+            teal.update(await loop.run_in_executor(None, ops.contract_teal))
+        program = await compile_program(client, teal[name], backend)
+        if cache is not None:
+            key = program_key(teal[name], ops.TEAL_VERSION, backend)
+            await loop.run_in_executor(None, cache.put, key, program)
+            await loop.run_in_executor(None, cache.put_source, fingerprint, key)
+        return program
+
+    return await compile_cached("approval"), await compile_cached("clear")
+
+
+@timed
+async def bootstrap_pool(client: AsyncAlgodClient, governors: List[Account], multisig_threshold: int, app_id: int):
+    """Initialize a pool configuration, see `ally.operations.bootstrap_pool`."""
+    sp = await suggested_params(client)
+    mtx = bootstrap_pool_txn(sp, governors, multisig_threshold, app_id)
+    tx_id = await client.send_transaction(mtx)
+    return await wait_for_transaction(client, tx_id, sp.last)
+
+
+@timed
+async def set_governor(client: AsyncAlgodClient, sender: Account, app_id: int, governors: List[Account],
+                       version: int, threshold: int):
+    """Initialize governor configuration, see `ally.operations.set_governor`."""
+    sp = await suggested_params(client)
+    signed_txn = set_governor_txn(sp, sender, app_id, governors, version, threshold)
+    tx_id = await client.send_transaction(signed_txn)
+    return await wait_for_transaction(client, tx_id, sp.last)
+
+
+@timed
+async def destroy_pool(client: AsyncAlgodClient, governors: List[Account], multisig_threshold: int, app_id: int):
+    """Destroy pool, see `ally.operations.destroy_pool`."""
+    sp = await suggested_params(client)
+    mtx = destroy_pool_txn(sp, governors, multisig_threshold, app_id)
+    tx_id = await client.send_transaction(mtx)
+    return await wait_for_transaction(client, tx_id, sp.last)
+
+
+@timed
+async def update_pool(client: AsyncAlgodClient, governors: List[Account], multisig_threshold: int, app_id: int):
+    """Update pool, see `ally.operations.update_pool`."""
+    sp = await suggested_params(client)
+    approval, clear = await get_contracts(client)
+    mtx = update_pool_txn(sp, governors, multisig_threshold, app_id, approval, clear)
+    tx_id = await client.send_transaction(mtx)
+    return await wait_for_transaction(client, tx_id, sp.last)
+
+
+@timed
+async def mint_walgo(client: AsyncAlgodClient, sender: Account, app_id: int, asset_id: int, amount: int):
+    """Mint walgo, see `ally.operations.mint_walgo`."""
+    sp = await suggested_params(client)
+
+    opt_in = not await is_opted_in_asset(client, asset_id, sender.get_address())
+    group, txids = mint_walgo_group(sp, sender, app_id, asset_id, amount, opt_in)
+
+    await client.send_raw_transaction(group)
+    return await wait_for_transaction(client, txids[-2], sp.last)
+
+
+@timed
+async def redeem_walgo(client: AsyncAlgodClient, sender: Account, app_id: int, asset_id: int, amount: int):
+    """Redeem walgo, see `ally.operations.redeem_walgo`."""
+    sp = await suggested_params(client)
+    group, txids = redeem_walgo_group(sp, sender, app_id, asset_id, amount)
+    await client.send_raw_transaction(group)
+    return await wait_for_transaction(client, txids[0], sp.last)
+
+
+@timed
+async def toggle_redeem(client: AsyncAlgodClient, governors: List[Account], app_id: int, version: int,
+                        multisig_threshold: int):
+    """Toggle redeem, see `ally.operations.toggle_redeem`."""
+    sp = await suggested_params(client)
+    mtx = toggle_redeem_txn(sp, governors, app_id, multisig_threshold)
+    tx_id = await client.send_transaction(mtx)
+    return await wait_for_transaction(client, tx_id, sp.last)
+
+
+@timed
+async def set_mint_price(mint_price: int, client: AsyncAlgodClient, governors: List[Account], app_id: int,
+                         version: int, multisig_threshold: int):
+    """Set mint price, see `ally.operations.set_mint_price`."""
+    sp = await suggested_params(client)
+    mtx = set_mint_price_txn(sp, mint_price, governors, app_id, multisig_threshold)
+    tx_id = await client.send_transaction(mtx)
+    return await wait_for_transaction(client, tx_id, sp.last)
@@ -0,0 +1,237 @@
+import asyncio
+import copy
+import logging
+import os
+from base64 import b64decode
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Union
+
+from algosdk.error import AlgodHTTPError
+from algosdk.future import transaction
+
+from ..account import Account
+from ..confirmation import DEFAULT_BATCH_SIZE, TransactionExpiredError, TransactionRejectedError
+from ..metrics import get_metrics, instrument
+from ..params import DEFAULT_TTL
+from ..rounds import add_round_listener, observe_round
+from ..utils import COMPILE_BACKENDS, PendingTxnResponse, decode_state
+from .client import AsyncAlgodClient
+
+logger = logging.getLogger(__name__)
+
+
+def get_algod_client(url, token, **kwargs) -> AsyncAlgodClient:
+    headers = {
+        'X-API-Key': token
+    }
+    client = AsyncAlgodClient(token, url, headers, **kwargs)
+    metrics = get_metrics()
+    return client if metrics is None else instrument(client, metrics)
+
+
+class AsyncSuggestedParamsProvider:
+    """Asyncio counterpart of `ally.params.SuggestedParamsProvider`."""
+
+    def __init__(self, client: AsyncAlgodClient, ttl: float = DEFAULT_TTL) -> None:
+        self._client = weakref.ref(client)
+        self.ttl = ttl
+        self.round = 0
+        self._params: Optional[transaction.SuggestedParams] = None
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        add_round_listener(client, self.observe_round)
+
+    @property
+    def client(self) -> AsyncAlgodClient:
+        client = self._client()
+        if client is None:
+            raise Exception("the client of this params provider is gone")
+        return client
+
+    async def get(self) -> transaction.SuggestedParams:
+        async with self._lock:
+            if self._params is None or time.monotonic() - self._fetched_at > self.ttl:
+                self._params = await self.client.suggested_params()
+                self._fetched_at = time.monotonic()
+                self.round = max(self.round, self._params.first)
+            return copy.copy(self._params)
+
+    def observe_round(self, round: int) -> None:
+        if round > self.round:
+            self.round = round
+            self._params = None
+
+
+class AsyncConfirmationTracker:
+    """Asyncio counterpart of `ally.confirmation.ConfirmationTracker`.
+
+    One task waits for each block on behalf of every tracked transaction and
+    fetches their pending info concurrently, ``batch_size`` at a time. As in
+    the thread based tracker, the client is held weakly but for the running task.
+    """
+
+    def __init__(self, client: AsyncAlgodClient, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self._client = weakref.ref(client)
+        self.batch_size = batch_size
+        self.round: Optional[int] = None
+        self._tracked: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> AsyncAlgodClient:
+        client = self._client()
+        if client is None:
+            raise Exception("the client of this confirmation tracker is gone")
+        return client
+
+    def track(self, tx_id: str, last_valid: Optional[int] = None) -> "asyncio.Future[PendingTxnResponse]":
+        entry = self._tracked.get(tx_id)
+        if entry is None:
+            entry = self._tracked[tx_id] = (asyncio.get_running_loop().create_future(), last_valid)
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        return entry[0]
+
+    async def _run(self) -> None:
+        try:
+            client = self.client
+            status = await client.status()
+            self._new_round(status["last-round"])
+            while True:
+                await self._sweep()
+                if not self._tracked:
+                    return
+                status = await client.status_after_block(self.round)
+                self._new_round(status["last-round"])
+        except BaseException as e:
+            for future, _ in self._tracked.values():
+                if not future.done():
+                    future.set_exception(e)
+            self._tracked = {}
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            self._task = None
+
+    def _new_round(self, round: int) -> None:
+        self.round = round
+        observe_round(self.client, round)
+
+    async def _fetch(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.client.pending_transaction_info(tx_id)
+        except AlgodHTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+
+    async def _sweep(self) -> None:
+        outstanding = list(self._tracked.items())
+        for start in range(0, len(outstanding), self.batch_size):
+            batch = outstanding[start:start + self.batch_size]
+            infos = await asyncio.gather(*(self._fetch(tx_id) for tx_id, _ in batch))
+            for (tx_id, (future, last_valid)), info in zip(batch, infos):
+                if info is not None and info.get("confirmed-round"):
+                    future.set_result(PendingTxnResponse(info))
+                elif info is not None and info.get("pool-error"):
+                    future.set_exception(TransactionRejectedError(tx_id, info["pool-error"]))
+                elif last_valid is not None and self.round > last_valid:
+                    future.set_exception(TransactionExpiredError(tx_id, last_valid, self.round))
+                else:
+                    continue
+                del self._tracked[tx_id]
+
+
+_providers: "weakref.WeakKeyDictionary[AsyncAlgodClient, AsyncSuggestedParamsProvider]" = weakref.WeakKeyDictionary()
+_trackers: "weakref.WeakKeyDictionary[AsyncAlgodClient, AsyncConfirmationTracker]" = weakref.WeakKeyDictionary()
+
+
+async def suggested_params(client: AsyncAlgodClient) -> transaction.SuggestedParams:
+    provider = _providers.get(client)
+    if provider is None:
+        provider = _providers[client] = AsyncSuggestedParamsProvider(client)
+    return await provider.get()
+
+
+def get_tracker(client: AsyncAlgodClient) -> AsyncConfirmationTracker:
+    tracker = _trackers.get(client)
+    if tracker is None:
+        tracker = _trackers[client] = AsyncConfirmationTracker(client)
+    return tracker
+
+
+async def wait_for_transaction(
+        client: AsyncAlgodClient, tx_id: str, last_valid: Optional[int] = None
+) -> PendingTxnResponse:
+    pending_txn = await get_tracker(client).track(tx_id, last_valid)
+    logger.info("Transaction %s confirmed in round %s.", tx_id, pending_txn.confirmed_round)
+    return pending_txn
+
+
+async def compile_program(client: AsyncAlgodClient, teal: str, backend: Optional[str] = None) -> bytes:
+    """Asyncio counterpart of `ally.utils.compile_program`.
+
+    Local assembly runs in the loop's default executor, algod compiles
+    through ``client``.
+    """
+    backend = backend or os.environ.get("ALLY_COMPILE_BACKEND", "local")
+    if backend not in COMPILE_BACKENDS:
+        raise Exception(f"Unknown compile backend: {backend}")
+
+    if backend == "algod":
+        return b64decode((await client.compile(teal))["result"])
+
+    from ..teal import assemble
+
+    program = await asyncio.get_running_loop().run_in_executor(None, assemble, teal)
+    if backend == "verify":
+        expected = b64decode((await client.compile(teal))["result"])
+        if program != expected:
+            raise Exception(
+                "Local assembler output differs from algod: {} != {}".format(
+                    program.hex(), expected.hex()))
+    return program
+
+
+async def get_app_global_state(
+        client: AsyncAlgodClient, app_id: int
+) -> Dict[bytes, Union[int, bytes]]:
+    app_info = await client.application_info(app_id)
+    return decode_state(app_info["params"]["global-state"])
+
+
+async def get_app_local_state(
+        client: AsyncAlgodClient, app_id: int, sender: Account
+) -> Dict[bytes, Union[int, bytes]]:
+    account_info = await client.account_info(sender.get_address())
+    for local_state in account_info["apps-local-state"]:
+        if local_state["id"] == app_id:
+            if "key-value" not in local_state:
+                return {}
+
+            return decode_state(local_state["key-value"])
+    return {}
+
+
+async def get_balances(client: AsyncAlgodClient, account: str) -> Dict[int, int]:
+    balances: Dict[int, int] = dict()
+
+    account_info = await client.account_info(account)
+
+    # set key 0 to Algo balance
+    balances[0] = account_info["amount"]
+
+    assets: List[Dict[str, Any]] = account_info.get("assets", [])
+    for assetHolding in assets:
+        balances[assetHolding["asset-id"]] = assetHolding["amount"]
+
+    return balances
+
+
+async def is_opted_in_asset(client: AsyncAlgodClient, asset_id: int, addr: str):
+    account_info = await client.account_info(addr)
+    for a in account_info.get('assets', []):
+        if a['asset-id'] == asset_id:
+            return True
+    return False
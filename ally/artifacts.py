@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Optional
+
+from .compile_cache import sources_digest
+
+# approval/clear programs built from the contract at release time, so deploys
+# and updates don't need PyTeal; see `ally.operations.build_prebuilt`
+PREBUILT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "contracts", "build")
+MANIFEST = "manifest.json"
+
+
+def _read_manifest(path: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(path, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_prebuilt(name: str, sources: Iterable[str], teal_version: int,
+                  path: Optional[str] = None) -> Optional[bytes]:
+    """The prebuilt bytecode of program ``name``, if it was built from ``sources`` as they are now.
+
+    Args:
+        name: Program name, "approval" or "clear".
+        sources: Contract source files the program is generated from.
+        teal_version: TEAL version the program must target.
+        path: Artifact directory, defaults to the one shipped with the package.
+    Returns:
+        The bytecode, or None when there is no artifact or it is stale.
+    """
+    path = path or PREBUILT_DIR
+    entry = _read_manifest(path).get(name)
+    if entry is None or entry["teal_version"] != teal_version or entry["sources"] != sources_digest(sources):
+        return None
+    try:
+        with open(os.path.join(path, entry["program"]), "rb") as f:
+            program = f.read()
+    except OSError:
+        return None
+    if hashlib.sha256(program).hexdigest() != entry["sha256"]:
+        return None
+    return program
+
+
+def write_prebuilt(teal: Dict[str, str], programs: Dict[str, bytes], sources: Iterable[str],
+                   teal_version: int, pyteal: str, path: Optional[str] = None) -> Dict[str, Any]:
+    """Store programs with their TEAL and a manifest tying them to ``sources``.
+
+    Returns:
+        The manifest written.
+    """
+    path = path or PREBUILT_DIR
+    os.makedirs(path, exist_ok=True)
+    digest = sources_digest(sources)
+    manifest = {}
+    for name, program in sorted(programs.items()):
+        with open(os.path.join(path, f"{name}.bin"), "wb") as f:
+            f.write(program)
+        with open(os.path.join(path, f"{name}.teal"), "w") as f:
+            f.write(teal[name])
+        manifest[name] = {
+            "program": f"{name}.bin",
+            "sha256": hashlib.sha256(program).hexdigest(),
+            "sources": digest,
+            "teal_version": teal_version,
+            "pyteal": pyteal,
+        }
+    with open(os.path.join(path, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return manifest
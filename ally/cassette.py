@@ -0,0 +1,224 @@
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib import parse
+
+from algosdk import constants, error
+from algosdk.kmd import KMDClient
+from algosdk.v2client.algod import AlgodClient
+
+# "record" captures traffic to the cassette file, "replay" serves it back
+CASSETTE_MODES = ("record", "replay")
+
+# Signed groups differ between runs when multisig quorums are picked at random
+# (see `ally.operations.sign_multisig`), so sends are matched on the url only.
+# The txids they return don't depend on signatures.
+_UNKEYED_BODIES = {("POST", "/v2/transactions")}
+
+
+class CassetteError(Exception):
+    """A replayed client made a request the cassette has no response for."""
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return {"b64": base64.b64encode(bytes(value)).decode("ascii")}
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict) and set(value) == {"b64"}:
+        return base64.b64decode(value["b64"])
+    return value
+
+
+def _body_key(method: str, url: str, body: Any) -> str:
+    if body is None or (method, url.split("?")[0]) in _UNKEYED_BODIES:
+        return ""
+    if not isinstance(body, (bytes, bytearray)):
+        body = json.dumps(body, sort_keys=True).encode()
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+class Cassette:
+    """Recorded algod and KMD requests with their responses.
+
+    Stored as gzipped JSON lines, one interaction per line in the order they
+    completed. On replay, requests are matched on client, method, url and
+    (except for transaction sends) a digest of the body; repeats of the same
+    request get the recorded responses in order, so concurrent callers see
+    the same sequence of answers as when recording. Polling a GET more often
+    than when recording keeps getting its last recorded answer.
+    """
+
+    def __init__(self, interactions: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.interactions: List[Dict[str, Any]] = interactions or []
+        self._lock = threading.Lock()
+        self._queues: Optional[Dict[Tuple[str, str, str, str], Deque[Dict[str, Any]]]] = None
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return cls([json.loads(line) for line in f if line.strip()])
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            interactions = list(self.interactions)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            for interaction in interactions:
+                f.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+
+    def add(self, client: str, method: str, url: str, body: Any, status: int, response: Any,
+            elapsed: float) -> None:
+        interaction = {
+            "client": client,
+            "method": method,
+            "url": url,
+            "body": _encode(body),
+            "key": _body_key(method, url, body),
+            "status": status,
+            "response": _encode(response),
+            "elapsed": round(elapsed, 6),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+            self._queues = None
+
+    def take(self, client: str, method: str, url: str, body: Any) -> Dict[str, Any]:
+        """Pop the next recorded interaction matching a request."""
+        with self._lock:
+            if self._queues is None:
+                self._queues = defaultdict(deque)
+                for i in self.interactions:
+                    self._queues[(i["client"], i["method"], i["url"], i["key"])].append(i)
+            queue = self._queues.get((client, method, url, _body_key(method, url, body)))
+            if not queue:
+                raise CassetteError(f"No recorded {client} response for {method} {url}")
+            if method == "GET" and len(queue) == 1:
+                return queue[0]
+            return queue.popleft()
+
+    def rewind(self) -> None:
+        with self._lock:
+            self._queues = None
+
+
+def _url(requrl: str, params: Optional[Dict[str, Any]], prefix: str) -> str:
+    # the url as the SDK sends it
+    if requrl not in constants.unversioned_paths:
+        requrl = prefix + requrl
+    if params:
+        requrl += "?" + parse.urlencode(params)
+    return requrl
+
+
+def record(client, cassette: Cassette):
+    """Record every request ``client`` makes into ``cassette``.
+
+    Works on any `AlgodClient` (including `ally.transport.PooledAlgodClient`)
+    or `KMDClient`, by wrapping its request method in place.
+
+    Returns:
+        ``client``, for chaining.
+    """
+    if isinstance(client, KMDClient):
+        send = client.kmd_request
+
+        def kmd_request(method, requrl, params=None, data=None):
+            start = time.monotonic()
+            url = _url(requrl, params, "/v1")
+            try:
+                response = send(method, requrl, params, data)
+            except error.KMDHTTPError as e:
+                cassette.add("kmd", method, url, data, 400, str(e), time.monotonic() - start)
+                raise
+            cassette.add("kmd", method, url, data, 200, response, time.monotonic() - start)
+            return response
+
+        client.kmd_request = kmd_request
+        return client
+
+    send = client.algod_request
+
+    def algod_request(method, requrl, params=None, data=None, headers=None, response_format="json"):
+        start = time.monotonic()
+        url = _url(requrl, params, "/v2")
+        try:
+            response = send(method, requrl, params, data, headers, response_format)
+        except error.AlgodHTTPError as e:
+            cassette.add("algod", method, url, data, e.code or 500, str(e), time.monotonic() - start)
+            raise
+        cassette.add("algod", method, url, data, 200, response, time.monotonic() - start)
+        return response
+
+    client.algod_request = algod_request
+    return client
+
+
+class ReplayAlgodClient(AlgodClient):
+    """`AlgodClient` answering from a `Cassette` instead of the network.
+
+    Block waits return as soon as their recorded response is found, or after
+    their recorded duration with ``realtime``, so flows replay in
+    microseconds or with production timing.
+    """
+
+    def __init__(self, cassette: Cassette, realtime: bool = False) -> None:
+        super().__init__("", "http://replay")
+        self.cassette = cassette
+        self.realtime = realtime
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format="json"):
+        interaction = self.cassette.take("algod", method, _url(requrl, params, "/v2"), data)
+        if self.realtime:
+            time.sleep(interaction["elapsed"])
+        if interaction["status"] >= 400:
+            raise error.AlgodHTTPError(interaction["response"], interaction["status"])
+        return _decode(interaction["response"])
+
+
+class ReplayKMDClient(KMDClient):
+    """`KMDClient` answering from a `Cassette`, see `ReplayAlgodClient`."""
+
+    def __init__(self, cassette: Cassette, realtime: bool = False) -> None:
+        super().__init__("", "http://replay")
+        self.cassette = cassette
+        self.realtime = realtime
+
+    def kmd_request(self, method, requrl, params=None, data=None):
+        interaction = self.cassette.take("kmd", method, _url(requrl, params, "/v1"), data)
+        if self.realtime:
+            time.sleep(interaction["elapsed"])
+        if interaction["status"] >= 400:
+            raise error.KMDHTTPError(interaction["response"])
+        return _decode(interaction["response"])
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: str, mode: str) -> Cassette:
+    """The process wide cassette for ``path``.
+
+    In record mode it starts empty and is written to ``path`` at exit, in
+    replay mode it is loaded from ``path``.
+    """
+    if mode not in CASSETTE_MODES:
+        raise Exception(f"Unknown cassette mode: {mode}")
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            if mode == "replay":
+                cassette = Cassette.load(path)
+            else:
+                cassette = Cassette()
+                atexit.register(cassette.save, path)
+            _cassettes[path] = cassette
+        return cassette
@@ -0,0 +1,118 @@
+"""Command line front end of the ally daemon (`ally.daemon`).
+
+    python allyctl.py serve                  # start the daemon, reading .env once
+    python allyctl.py mint 1000000           # forwarded to the daemon
+    python allyctl.py mint-price --set 1010000
+    python allyctl.py stop
+
+Only the standard library is imported here, so a command costs the
+interpreter start and one round trip over the daemon's Unix socket; the
+algod client, decoded keys and pool state stay warm in the daemon.
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Any, Dict, List, Optional
+
+DEFAULT_SOCKET = os.path.join(os.path.expanduser("~"), ".cache", "ally", "ally.sock")
+
+
+def socket_path(path: Optional[str] = None) -> str:
+    """``path``, else $ALLY_SOCKET, else ~/.cache/ally/ally.sock."""
+    return path or os.environ.get("ALLY_SOCKET") or DEFAULT_SOCKET
+
+
+def call(command: str, path: Optional[str] = None, timeout: Optional[float] = None, **args: Any) -> Any:
+    """Run ``command`` in the daemon listening on ``path``.
+
+    Args:
+        command: Command name, see `ally.daemon.COMMANDS`.
+        path: Socket path, see `socket_path`.
+        timeout: Seconds to wait for the reply, None waits as long as the command runs.
+        args: The command's arguments.
+    Returns:
+        The command's result.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path(path))
+        sock.sendall(json.dumps({"command": command, "args": args}).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise Exception(f"{command}: the daemon closed the connection")
+    reply = json.loads(line)
+    if not reply["ok"]:
+        raise Exception(f"{command}: {reply['type']}: {reply['error']}")
+    return reply["result"]
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="allyctl.py", description="Run pool operations through the ally daemon.")
+    parser.add_argument("--socket", help="daemon socket, defaults to $ALLY_SOCKET or " + DEFAULT_SOCKET)
+    parser.add_argument("--json", action="store_true", help="print results as one JSON line")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    serve = commands.add_parser("serve", help="start the daemon in the foreground")
+    serve.add_argument("--env", default=".env", help="dotenv file with the node, keys and pool ids")
+
+    commands.add_parser("ping", help="check the daemon is up")
+    commands.add_parser("stats", help="commands served and their mean time")
+    commands.add_parser("reload", help="reread the environment, dropping decoded keys and cached state")
+    commands.add_parser("stop", help="stop the daemon")
+
+    commands.add_parser("deploy", help="create, fund and bootstrap a pool")
+    for name in ("mint", "redeem"):
+        command = commands.add_parser(name, help=f"{name} walgo for the minter")
+        command.add_argument("amount", nargs="?", type=int, default=1_000_000)
+    set_governor = commands.add_parser("set-governor", help="set the governors multisig")
+    set_governor.add_argument("--version", type=int, default=1)
+    set_governor.add_argument("--threshold", type=int, default=2)
+    commands.add_parser("toggle-redeem", help="enable or disable redeeming")
+    commands.add_parser("update", help="update the pool's programs")
+    commands.add_parser("destroy", help="delete the pool")
+    mint_price = commands.add_parser("mint-price", help="get or set the mint price")
+    mint_price.add_argument("--set", dest="value", type=int, help="new mint price")
+    mint_price.add_argument("--force", action="store_true", help="allow shifts over 2.5%%")
+    commands.add_parser("state", help="the pool's global state")
+    return parser
+
+
+def main(argv: List[str]) -> int:
+    args = vars(parser().parse_args(argv))
+    path = socket_path(args.pop("socket"))
+    as_json = args.pop("json")
+    command = args.pop("command").replace("-", "_")
+
+    if command == "serve":
+        from .daemon import serve
+
+        serve(path, args["env"])
+        return 0
+
+    try:
+        result = call(command, path, **args)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"no daemon at {path}, start it with `python allyctl.py serve`", file=sys.stderr)
+        return 2
+    except Exception as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    if as_json:
+        print(json.dumps(result))
+    elif isinstance(result, dict):
+        for key, value in result.items():
+            print(f"{key}: {json.dumps(value) if isinstance(value, (dict, list)) else value}")
+    else:
+        print(result)
+    return 0
+
+
+if __name__ == "__main__":
+    from . import configure_logging
+
+    configure_logging()
+    sys.exit(main(sys.argv[1:]))
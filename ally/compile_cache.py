@@ -0,0 +1,179 @@
+import hashlib
+import os
+from typing import Iterable, List, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ally", "teal")
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+def pyteal_version() -> str:
+    # importlib.metadata is slow to import, and only needed on a cache lookup
+    try:
+        from importlib.metadata import version
+    except ImportError:  # pragma: no cover - python < 3.8
+        return "unknown"
+    try:
+        return version("pyteal")
+    except Exception:
+        return "unknown"
+
+
+def program_key(teal: str, teal_version: int, backend: str = "local") -> str:
+    """Content address of a TEAL program: sha256 over the backend, version and source."""
+    h = hashlib.sha256()
+    h.update(b"%s\x00teal-v%d\x00" % (backend.encode("utf-8"), teal_version))
+    h.update(teal.encode("utf-8"))
+    return h.hexdigest()
+
+
+def sources_digest(paths: Iterable[str]) -> str:
+    """sha256 over the sha256 of each file in ``paths``, in sorted order."""
+    h = hashlib.sha256()
+    for path in sorted(paths):
+        with open(path, "rb") as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+
+def source_fingerprint(paths: Iterable[str], name: str, teal_version: int, backend: str = "local") -> str:
+    """Fingerprint of the PyTeal sources a program is generated from.
+
+    Lets a cache hit skip codegen entirely: as long as the contract modules,
+    the PyTeal release, the target TEAL version and the compile backend are
+    unchanged, the generated TEAL (and so its bytecode) is unchanged too.
+    """
+    h = hashlib.sha256()
+    h.update(b"%s\x00%s\x00teal-v%d\x00pyteal-%s\x00" % (
+        name.encode("utf-8"), backend.encode("utf-8"), teal_version, pyteal_version().encode("utf-8")))
+    h.update(sources_digest(paths).encode("ascii"))
+    return h.hexdigest()
+
+
+class CompileCache:
+    """Persistent store of compiled TEAL bytecode.
+
+    Programs are stored under ``programs/<program_key>.bin``. Aliases from a
+    source fingerprint to a program key live under ``sources/``, so a lookup by
+    fingerprint avoids running PyTeal, and a lookup by program key avoids the
+    algod compile round trip. Least recently used programs are evicted once the
+    cache holds more than ``max_entries`` programs or ``max_bytes`` bytes.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.path = path or os.environ.get("ALLY_CACHE_DIR") or DEFAULT_CACHE_DIR
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._programs = os.path.join(self.path, "programs")
+        self._sources = os.path.join(self.path, "sources")
+
+    def _program_path(self, key: str) -> str:
+        return os.path.join(self._programs, key + ".bin")
+
+    def _source_path(self, fingerprint: str) -> str:
+        return os.path.join(self._sources, fingerprint)
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._program_path(key)
+        try:
+            with open(path, "rb") as f:
+                program = f.read()
+        except OSError:
+            return None
+        # bump mtime so eviction is least-recently-used rather than oldest
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return program
+
+    def put(self, key: str, program: bytes) -> None:
+        os.makedirs(self._programs, exist_ok=True)
+        path = self._program_path(key)
+        tmp = "{}.{}.tmp".format(path, os.getpid())
+        with open(tmp, "wb") as f:
+            f.write(program)
+        os.replace(tmp, path)
+        self.evict()
+
+    def get_by_source(self, fingerprint: str) -> Optional[bytes]:
+        try:
+            with open(self._source_path(fingerprint), "r") as f:
+                key = f.read().strip()
+        except OSError:
+            return None
+        return self.get(key)
+
+    def put_source(self, fingerprint: str, key: str) -> None:
+        os.makedirs(self._sources, exist_ok=True)
+        path = self._source_path(fingerprint)
+        tmp = "{}.{}.tmp".format(path, os.getpid())
+        with open(tmp, "w") as f:
+            f.write(key)
+        os.replace(tmp, path)
+
+    def invalidate(self, key: str) -> bool:
+        try:
+            os.remove(self._program_path(key))
+            return True
+        except OSError:
+            return False
+
+    def clear(self) -> int:
+        removed = 0
+        for directory in (self._programs, self._sources):
+            for name in self._list(directory):
+                try:
+                    os.remove(os.path.join(directory, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def keys(self) -> List[str]:
+        return [name[:-4] for name in self._list(self._programs) if name.endswith(".bin")]
+
+    def evict(self) -> List[str]:
+        entries = []
+        for name in self._list(self._programs):
+            if not name.endswith(".bin"):
+                continue
+            try:
+                st = os.stat(os.path.join(self._programs, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, name))
+
+        entries.sort(reverse=True)
+        total = 0
+        evicted = []
+        for i, (_, size, name) in enumerate(entries):
+            total += size
+            if i >= self.max_entries or total > self.max_bytes:
+                try:
+                    os.remove(os.path.join(self._programs, name))
+                    evicted.append(name[:-4])
+                except OSError:
+                    pass
+        return evicted
+
+    @staticmethod
+    def _list(directory: str) -> List[str]:
+        try:
+            return os.listdir(directory)
+        except OSError:
+            return []
+
+
+_default_cache: Optional[CompileCache] = None
+
+
+def get_default_cache() -> Optional[CompileCache]:
+    """The process wide cache, or None if disabled with ALLY_COMPILE_CACHE=0."""
+    global _default_cache
+    if os.environ.get("ALLY_COMPILE_CACHE", "1") == "0":
+        return None
+    if _default_cache is None:
+        _default_cache = CompileCache()
+    return _default_cache
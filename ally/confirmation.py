@@ -0,0 +1,180 @@
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.algod import AlgodClient
+
+from .rounds import observe_round
+from .utils import PendingTxnResponse
+
+DEFAULT_BATCH_SIZE = 16
+
+ConfirmationCallback = Callable[[Future], None]
+
+
+class TransactionRejectedError(Exception):
+    """The node dropped the transaction from its pool (see ``pool_error``)."""
+
+    def __init__(self, tx_id: str, pool_error: str) -> None:
+        super().__init__(f"Transaction {tx_id} rejected: {pool_error}")
+        self.tx_id = tx_id
+        self.pool_error = pool_error
+
+
+class TransactionExpiredError(Exception):
+    """The transaction was not confirmed by its last valid round."""
+
+    def __init__(self, tx_id: str, last_valid: int, round: int) -> None:
+        super().__init__(
+            f"Transaction {tx_id} not confirmed by its last valid round {last_valid} (now {round})")
+        self.tx_id = tx_id
+        self.last_valid = last_valid
+        self.round = round
+
+
+class _Tracked:
+    __slots__ = ("tx_id", "last_valid", "future")
+
+    def __init__(self, tx_id: str, last_valid: Optional[int]) -> None:
+        self.tx_id = tx_id
+        self.last_valid = last_valid
+        self.future: Future = Future()
+
+
+class ConfirmationTracker:
+    """Waits for many transactions with a single block-wait loop.
+
+    Transactions are registered with `track`, which returns a future resolving
+    to a `PendingTxnResponse` once the transaction is confirmed. A background
+    thread waits for each new block once for all of them, then fetches pending
+    info for every outstanding transaction in batches of ``batch_size``
+    concurrent requests. Transactions that the node rejects, or that are still
+    unconfirmed after their last valid round, fail their future right away.
+    The thread, and the pool of fetching threads, exit when nothing is left to
+    track. The client is held weakly, as trackers are kept per client in
+    `_trackers`; the background thread holds it while it runs.
+    """
+
+    def __init__(self, client: AlgodClient, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self._client = weakref.ref(client)
+        self.batch_size = batch_size
+        self.round: Optional[int] = None
+        self._tracked: Dict[str, _Tracked] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def client(self) -> AlgodClient:
+        client = self._client()
+        if client is None:
+            raise Exception("the client of this confirmation tracker is gone")
+        return client
+
+    def track(self, tx_id: str, last_valid: Optional[int] = None,
+              callback: Optional[ConfirmationCallback] = None) -> Future:
+        """Register a transaction to wait for.
+
+        Args:
+            tx_id: Transaction ID.
+            last_valid: Last valid round of the transaction, enables failing early.
+            callback: Called with the future once it is resolved.
+        Returns:
+            A future for the transaction's `PendingTxnResponse`.
+        """
+        with self._lock:
+            tracked = self._tracked.get(tx_id)
+            if tracked is None:
+                tracked = self._tracked[tx_id] = _Tracked(tx_id, last_valid)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="ally-confirmations", daemon=True)
+                self._thread.start()
+        if callback is not None:
+            tracked.future.add_done_callback(callback)
+        return tracked.future
+
+    def pending(self) -> List[str]:
+        with self._lock:
+            return list(self._tracked)
+
+    def _run(self) -> None:
+        executor = ThreadPoolExecutor(max_workers=self.batch_size, thread_name_prefix="ally-pending")
+        try:
+            client = self.client
+            status = client.status()
+            self._new_round(status["last-round"])
+            while True:
+                self._sweep(executor)
+                with self._lock:
+                    if not self._tracked:
+                        self._thread = None
+                        return
+                status = client.status_after_block(self.round)
+                self._new_round(status["last-round"])
+        except BaseException as e:
+            # fail everything still waiting rather than leaving callers hanging
+            with self._lock:
+                tracked, self._tracked = list(self._tracked.values()), {}
+                self._thread = None
+            for t in tracked:
+                if not t.future.done():
+                    t.future.set_exception(e)
+        finally:
+            executor.shutdown()
+
+    def _new_round(self, round: int) -> None:
+        self.round = round
+        observe_round(self.client, round)
+
+    def _fetch(self, tx_id: str):
+        try:
+            return self.client.pending_transaction_info(tx_id)
+        except AlgodHTTPError as e:
+            # not known to this node (yet), treat as still pending
+            if e.code == 404:
+                return None
+            raise
+
+    def _sweep(self, executor: ThreadPoolExecutor) -> None:
+        with self._lock:
+            outstanding = list(self._tracked.values())
+
+        for start in range(0, len(outstanding), self.batch_size):
+            batch = outstanding[start:start + self.batch_size]
+            infos = executor.map(self._fetch, [t.tx_id for t in batch])
+            for t, info in zip(batch, infos):
+                self._resolve(t, info)
+
+    def _resolve(self, t: _Tracked, info: Optional[dict]) -> None:
+        result = None
+        error: Optional[Exception] = None
+        if info is not None and info.get("confirmed-round"):
+            result = PendingTxnResponse(info)
+        elif info is not None and info.get("pool-error"):
+            error = TransactionRejectedError(t.tx_id, info["pool-error"])
+        elif t.last_valid is not None and self.round > t.last_valid:
+            error = TransactionExpiredError(t.tx_id, t.last_valid, self.round)
+        else:
+            return
+
+        with self._lock:
+            self._tracked.pop(t.tx_id, None)
+        if error is not None:
+            t.future.set_exception(error)
+        else:
+            t.future.set_result(result)
+
+
+_trackers: "weakref.WeakKeyDictionary[AlgodClient, ConfirmationTracker]" = weakref.WeakKeyDictionary()
+_trackers_lock = threading.Lock()
+
+
+def get_tracker(client: AlgodClient) -> ConfirmationTracker:
+    """The confirmation tracker shared by everything using ``client``."""
+    with _trackers_lock:
+        tracker = _trackers.get(client)
+        if tracker is None:
+            tracker = _trackers[client] = ConfirmationTracker(client)
+        return tracker
@@ -0,0 +1,4 @@
+# Kept apart from the PyTeal modules so clients can read them without importing PyTeal
+
+# Most (app call, payment/axfer) pairs a group of 16 transactions can hold
+max_batch_pairs = 8
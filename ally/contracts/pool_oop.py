@@ -2,6 +2,7 @@ import os
 
 from pyteal import *
 
+
 total_supply = 0xFFFFFFFFFFFFFFFF
 
 
@@ -172,77 +173,83 @@ class AllyPool:
             Approve(),
         )
 
+    def mint_pair(self, pool_token):
+        # The app call and the payment right after it, wherever the pair
+        # sits in the group, so a mint can be composed with other txns
+        payment = Gtxn[Txn.group_index() + Int(1)]
+        return And(
+            Txn.group_index() + Int(1) < Global.group_size(),
+            Txn.assets[0] == pool_token,
+            payment.type_enum() == TxnType.Payment,
+            payment.receiver() == Global.current_application_address(),
+            payment.amount() > Int(1_000),
+            payment.sender() == Txn.sender(),
+        )
+
+    def redeem_pair(self, pool_token):
+        # The app call and the asset transfer right after it
+        axfer = Gtxn[Txn.group_index() + Int(1)]
+        return And(
+            Txn.group_index() + Int(1) < Global.group_size(),
+            Txn.assets[0] == pool_token,
+            axfer.type_enum() == TxnType.AssetTransfer,
+            axfer.asset_receiver() == Global.current_application_address(),
+            axfer.xfer_asset() == pool_token,
+            axfer.sender() == Txn.sender(),
+        )
+
     def on_mint(self):
         pool_token = App.globalGet(self.Vars.pool_token_key)
-        pool_bal = AssetHolding.balance(
-            Global.current_application_address(), pool_token)
+        payment = Gtxn[Txn.group_index() + Int(1)]
         return Seq(
-            # Init MaybeValues
-            pool_bal,
-            Assert(
-                And(
-                    Global.group_size() == Int(2),  # App call, Payment to mint
-                    Gtxn[0].type_enum() == TxnType.ApplicationCall,
-                    Gtxn[0].assets[0] == pool_token,
-                    Gtxn[1].type_enum() == TxnType.Payment,
-                    Gtxn[1].receiver() == Global.current_application_address(),
-                    Gtxn[1].amount() > Int(1_000),
-                    Gtxn[1].sender() == Gtxn[0].sender(),
-                )
-            ),
+            Assert(self.mint_pair(pool_token)),
             self.axfer(
-                Gtxn[0].sender(),
+                Txn.sender(),
                 pool_token,
-                self.mint_tokens(Gtxn[1].amount() - Int(1_000))
+                self.mint_tokens(payment.amount() - Int(1_000))
             ),
             Approve(),
         )
 
     def on_redeem(self):
         pool_token = App.globalGet(self.Vars.pool_token_key)
-        pool_bal = AssetHolding.balance(
-            Global.current_application_address(), pool_token)
+        axfer = Gtxn[Txn.group_index() + Int(1)]
         return Seq(
             Assert(App.globalGet(self.Vars.allow_redeem_key)),
-            Assert(
-                And(
-                    Global.group_size() == Int(2),
-                    Gtxn[0].type_enum() == TxnType.ApplicationCall,
-                    Gtxn[0].assets[0] == pool_token,
-                    Gtxn[1].type_enum() == TxnType.AssetTransfer,
-                    Gtxn[1].asset_receiver() == Global.current_application_address(),
-                    Gtxn[1].xfer_asset() == pool_token,
-                    Gtxn[0].sender() == Gtxn[1].sender(),
-                )
-            ),
-            pool_bal,
-            self.pay(Gtxn[1].sender(), self.algos_to_redeem(Gtxn[1].asset_amount())),
+            Assert(self.redeem_pair(pool_token)),
+            self.pay(Txn.sender(), self.algos_to_redeem(axfer.asset_amount())),
             Approve(),
         )
 
+    def routes(self):
+        # Checked in order, so the user methods, which are called far more
+        # often than the admin ones, come first and cost the fewest compares
+        return [
+            # Users
+            ("mint", self.on_mint()),
+            ("redeem", self.on_redeem()),
+            # Admin
+            ("bootstrap", self.on_bootstrap()),
+            ("set_governor", self.on_set_governor()),
+            ("set_mint_price", self.on_set_mint_price()),
+            ("set_redeem_price", self.on_set_redeem_price()),
+            ("toggle_redeem", self.on_toggle_redeem()),
+            ("join", self.on_join()),
+            ("vote", self.on_vote()),
+        ]
+
     def on_call(self):
         on_call_method = Txn.application_args[0]
         return Cond(
-            # Admin
-            [on_call_method == Bytes("bootstrap"), self.on_bootstrap()],
-            [on_call_method == Bytes("set_governor"), self.on_set_governor()],
-            [on_call_method == Bytes("set_mint_price"),
-             self.on_set_mint_price()],
-            [on_call_method == Bytes("set_redeem_price"),
-             self.on_set_redeem_price()],
-            [on_call_method == Bytes("toggle_redeem"),
-             self.on_toggle_redeem()],
-            [on_call_method == Bytes("join"), self.on_join()],
-            [on_call_method == Bytes("vote"), self.on_vote()],
-            # Users
-            [on_call_method == Bytes("mint"), self.on_mint()],
-            [on_call_method == Bytes("redeem"), self.on_redeem()],
+            *[[on_call_method == Bytes(name), handler] for name, handler in self.routes()]
         )
 
     def approval_program(self):
         governor = App.globalGet(self.Vars.gov_key)
         program = Cond(
             [Txn.application_id() == Int(0), self.on_create()],
+            # Method calls before the rarely used completions
+            [Txn.on_completion() == OnComplete.NoOp, self.on_call()],
             [
                 Txn.on_completion() == OnComplete.DeleteApplication,
                 Return(Txn.sender() == governor)
@@ -253,7 +260,6 @@ class AllyPool:
             ],
             [Txn.on_completion() == OnComplete.CloseOut, Approve()],
             [Txn.on_completion() == OnComplete.OptIn, Reject()],
-            [Txn.on_completion() == OnComplete.NoOp, self.on_call()],
         )
         return program
 
@@ -0,0 +1,337 @@
+"""Long running process serving the pool operations over a Unix socket.
+
+Each top level script reparses .env, rederives every key from its mnemonic
+and opens new clients before doing one operation. The daemon does that once:
+a `Session` holds the algod client (with its connection pool, suggested
+params and state caches), the decoded accounts and a mirror of the pool's
+global state, and `Daemon` runs the commands in `COMMANDS` against it for
+`ally.cli` clients. Requests and replies are single JSON lines:
+
+    {"command": "mint", "args": {"amount": 1000000}}
+    {"ok": true, "result": {...}}
+    {"ok": false, "type": "AlgodHTTPError", "error": "..."}
+
+Commands run one at a time, as the scripts would, except ping, stats and stop.
+"""
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+
+from . import operations as ops
+from .account import Account
+from .params import suggested_params
+from .state import AppStateMirror
+from .utils import PendingTxnResponse, get_algod_client, get_balances, wait_for_transaction
+
+logger = logging.getLogger(__name__)
+
+# how old the pool state mirror may get before reads refetch it; writes made
+# through the daemon keep it current regardless
+STATE_MAX_AGE = 5.0
+# mint price changes beyond this many percent need force=True
+ALLOWED_SHIFT = 2.5
+
+
+class Session:
+    """Clients, accounts and pool state shared by every command.
+
+    Args:
+        env: The scripts' environment (ALGOD_URL, ALGOD_API_KEY, *_MNEMONIC,
+            MULTISIG_THRESHOLD, APP_ID, WALGO_ID), defaults to os.environ.
+    """
+
+    def __init__(self, env: Optional[Mapping[str, str]] = None) -> None:
+        self.env = dict(os.environ if env is None else env)
+        self.client = get_algod_client(self.env.get("ALGOD_URL"), self.env.get("ALGOD_API_KEY"))
+        self.app_id: Optional[int] = int(self.env["APP_ID"]) if self.env.get("APP_ID") else None
+        self.walgo_id: Optional[int] = int(self.env["WALGO_ID"]) if self.env.get("WALGO_ID") else None
+        self._accounts: Dict[str, Account] = {}
+        self._mirror: Optional[AppStateMirror] = None
+        self._synced_at = 0.0
+
+    def account(self, name: str) -> Account:
+        """The account of $``name``_MNEMONIC, decoded on first use."""
+        account = self._accounts.get(name)
+        if account is None:
+            words = self.env.get(f"{name}_MNEMONIC")
+            if not words:
+                raise Exception(f"{name}_MNEMONIC is not set")
+            account = self._accounts[name] = Account.from_mnemonic(words)
+        return account
+
+    def governors(self) -> List[Account]:
+        return [self.account(f"GOVERNOR{i}") for i in (1, 2, 3)]
+
+    def threshold(self) -> int:
+        if not self.env.get("MULTISIG_THRESHOLD"):
+            raise Exception("MULTISIG_THRESHOLD is not set")
+        return int(self.env["MULTISIG_THRESHOLD"])
+
+    def pool(self) -> int:
+        if self.app_id is None:
+            raise Exception("APP_ID is not set, deploy a pool first")
+        return self.app_id
+
+    def mirror(self, max_age: Optional[float] = STATE_MAX_AGE) -> AppStateMirror:
+        """The pool's global state, refetched when older than ``max_age`` seconds."""
+        app_id = self.pool()
+        if self._mirror is None or self._mirror.app_id != app_id:
+            self._mirror = AppStateMirror(self.client, app_id, max_age=None)
+            self._synced_at = time.monotonic()
+        elif max_age is not None and time.monotonic() - self._synced_at > max_age:
+            self._mirror.refresh()
+            self._synced_at = time.monotonic()
+        return self._mirror
+
+    def walgo(self) -> int:
+        if self.walgo_id is None:
+            self.walgo_id = self.mirror(None).state[b"p"]
+        return self.walgo_id
+
+    def confirmed(self, response: PendingTxnResponse) -> Dict[str, Any]:
+        """Apply a confirmation to the state mirror and describe it."""
+        if self._mirror is not None and self._mirror.apply(response):
+            self._synced_at = time.monotonic()
+        return {"confirmed_round": response.confirmed_round}
+
+
+def _jsonable(state: Mapping[bytes, Any]) -> Dict[str, Any]:
+    out = {}
+    for key, value in state.items():
+        try:
+            name = key.decode()
+        except UnicodeDecodeError:
+            name = key.hex()
+        out[name] = value.hex() if isinstance(value, bytes) else value
+    return out
+
+
+def _balances(session: Session, address: str) -> Dict[str, int]:
+    return {str(asset_id): amount for asset_id, amount in get_balances(session.client, address).items()}
+
+
+COMMANDS: Dict[str, Callable[..., Any]] = {}
+
+
+def command(fn: Callable[..., Any]) -> Callable[..., Any]:
+    COMMANDS[fn.__name__] = fn
+    return fn
+
+
+def _fund(session: Session, receiver: str, amount: int) -> None:
+    if get_balances(session.client, receiver)[0] >= amount:
+        return
+    funder = session.account("FUNDER")
+    txn = transaction.PaymentTxn(funder.get_address(), suggested_params(session.client), receiver, amount)
+    session.client.send_transaction(funder.get_signer().sign(txn))
+    wait_for_transaction(session.client, txn.get_txid())
+
+
+@command
+def deploy(session: Session) -> Dict[str, Any]:
+    """Create, fund and bootstrap a pool, as deploy.py does, and use it from then on."""
+    governors, threshold = session.governors(), session.threshold()
+
+    _fund(session, ops.governors_multisig(governors, threshold).address(), ops.MULTISIG_FUNDING)
+    app_id = ops.create_pool(session.client, governors, threshold)
+    _fund(session, get_application_address(app_id), ops.APP_FUNDING)
+
+    session.app_id, session.walgo_id = app_id, None
+    mirror = session.mirror()
+    session.confirmed(ops.bootstrap_pool(session.client, governors, threshold, app_id))
+    return {
+        "app_id": app_id,
+        "app_address": get_application_address(app_id),
+        "walgo_id": session.walgo(),
+        "global_state": _jsonable(mirror.state),
+    }
+
+
+@command
+def mint(session: Session, amount: int = 1_000_000) -> Dict[str, Any]:
+    minter = session.account("MINTER")
+    result = session.confirmed(ops.mint_walgo(session.client, minter, session.pool(), session.walgo(), amount))
+    result["balances"] = _balances(session, minter.get_address())
+    return result
+
+
+@command
+def redeem(session: Session, amount: int = 1_000_000) -> Dict[str, Any]:
+    minter = session.account("MINTER")
+    result = session.confirmed(ops.redeem_walgo(session.client, minter, session.pool(), session.walgo(), amount))
+    result["balances"] = _balances(session, minter.get_address())
+    return result
+
+
+@command
+def set_governor(session: Session, version: int = 1, threshold: int = 2) -> Dict[str, Any]:
+    return session.confirmed(ops.set_governor(
+        session.client, session.account("CREATOR"), session.pool(), session.governors(), version, threshold,
+    ))
+
+
+@command
+def toggle_redeem(session: Session) -> Dict[str, Any]:
+    return session.confirmed(ops.toggle_redeem(session.client, session.governors(), session.pool(), 1, session.threshold()))
+
+
+@command
+def update(session: Session) -> Dict[str, Any]:
+    return session.confirmed(ops.update_pool(session.client, session.governors(), session.threshold(), session.pool()))
+
+
+@command
+def destroy(session: Session) -> Dict[str, Any]:
+    result = session.confirmed(ops.destroy_pool(session.client, session.governors(), session.threshold(), session.pool()))
+    session.app_id, session.walgo_id, session._mirror = None, None, None
+    return result
+
+
+@command
+def mint_price(session: Session, value: Optional[int] = None, force: bool = False) -> Dict[str, Any]:
+    """The mint price, or set it to ``value`` when within 2.5% of it (or ``force``), as mint_price.py does."""
+    mirror = session.mirror()
+    current = mirror.state[b"mp"]
+    if value is None or value == current:
+        return {"mint_price": current, "changed": False}
+
+    shift = value / current
+    if not force and not 1 - ALLOWED_SHIFT / 100 <= shift <= 1 + ALLOWED_SHIFT / 100:
+        raise Exception(f"the shift when setting the mint value should not be greater than {ALLOWED_SHIFT}%, "
+                        "pass force to set it anyway")
+    result = session.confirmed(ops.set_mint_price(
+        value, session.client, session.governors(), session.pool(), 1, session.threshold(),
+    ))
+    result.update(mint_price=mirror.state[b"mp"], changed=True)
+    return result
+
+
+@command
+def state(session: Session) -> Dict[str, Any]:
+    mirror = session.mirror()
+    return {"app_id": mirror.app_id, "round": mirror.round, "global_state": _jsonable(mirror.state)}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            reply = self.server.dispatch(line)
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+            self.wfile.flush()
+
+
+class Daemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves `COMMANDS` on the Unix socket ``path``.
+
+    Args:
+        path: Socket path. It is created readable by the current user only,
+            since whoever can connect can sign with the session's keys.
+        session: Builds the `Session`, called again on ``reload``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, session: Callable[[], Session]) -> None:
+        self.make_session = session
+        self.session = session()
+        self.started = time.time()
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        # separate from _lock, so stats answer while a command runs
+        self._stats_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+        _remove_stale(path)
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(umask)
+
+    def run(self, name: str, args: Dict[str, Any]) -> Any:
+        if name == "ping":
+            return {"pid": os.getpid(), "uptime_s": round(time.time() - self.started, 3), "commands": sorted(COMMANDS)}
+        if name == "stats":
+            with self._stats_lock:
+                snapshot = {command: dict(s) for command, s in self.stats.items()}
+            return {command: {"calls": int(s["calls"]), "errors": int(s["errors"]),
+                              "mean_ms": round(s["seconds"] * 1000 / s["calls"], 3)}
+                    for command, s in snapshot.items()}
+        if name == "stop":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"stopping": True}
+        with self._lock:
+            if name == "reload":
+                self.session = self.make_session()
+                return {"app_id": self.session.app_id}
+            if name not in COMMANDS:
+                raise Exception(f"unknown command {name!r}")
+            return COMMANDS[name](self.session, **args)
+
+    def dispatch(self, line: bytes) -> Dict[str, Any]:
+        start = time.perf_counter()
+        name = None
+        try:
+            request = json.loads(line)
+            name = request["command"]
+            reply = {"ok": True, "result": self.run(name, request.get("args") or {})}
+        except Exception as e:
+            logger.warning("%s failed: %s: %s", name, type(e).__name__, e)
+            reply = {"ok": False, "type": type(e).__name__, "error": str(e)}
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            stats = self.stats.setdefault(str(name), {"calls": 0, "errors": 0, "seconds": 0.0})
+            stats["calls"] += 1
+            stats["errors"] += not reply["ok"]
+            stats["seconds"] += elapsed
+        return reply
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def _remove_stale(path: str) -> None:
+    # a socket file nobody listens on is left over from a daemon that died;
+    # anything else at the path is not ours to remove
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise Exception(f"{path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)
+            return
+    raise Exception(f"a daemon is already listening on {path}")
+
+
+def serve(path: str, env_file: str = ".env") -> None:
+    """Run a daemon on ``path`` with the environment of ``env_file`` until stopped."""
+    import dotenv
+
+    def session() -> Session:
+        dotenv.load_dotenv(env_file, override=True)
+        return Session()
+
+    with Daemon(path, session) as daemon:
+        logger.info("ally daemon listening on %s", path)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
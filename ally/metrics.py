@@ -0,0 +1,393 @@
+import atexit
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from algosdk import error
+from algosdk.kmd import KMDClient
+
+logger = logging.getLogger(__name__)
+
+# seconds, the default buckets of the Prometheus clients
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROUND_BUCKETS = (0, 1, 2, 3, 4, 5, 10, 20, 50)
+
+# txids, addresses and numeric ids in a path, so one endpoint is one series
+_PATH_ID = re.compile(r"/(?:[A-Z2-7]{52}|[A-Z2-7]{58}|\d+)(?=/|$)")
+
+
+def endpoint(requrl: str) -> str:
+    """``requrl`` with its query and any ids in it replaced by ``{id}``."""
+    return _PATH_ID.sub("/{id}", requrl.split("?")[0])
+
+
+class Histogram:
+    """Counts of observations at or below each bucket's upper bound, with their sum."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Iterable[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, count) pairs as Prometheus exposes them, +Inf last."""
+        total, out = 0, []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            out.append(("+Inf" if bound == float("inf") else _number(bound), total))
+        return out
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(**labels: Any) -> str:
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+class Metrics:
+    """Latency, error and traffic figures of node requests and operations.
+
+    Requests are keyed on (client, method, endpoint), where client is
+    "algod" or "kmd"; operations on the `ally.operations` (or
+    `ally.aio.operations`) function name.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests: Dict[Tuple[str, str, str], Histogram] = {}
+            self.request_errors: Counter = Counter()
+            self.bytes_sent: Counter = Counter()
+            self.bytes_received: Counter = Counter()
+            self.operations: Dict[str, Histogram] = {}
+            self.operation_errors: Counter = Counter()
+            self.rounds_waited: Dict[str, Histogram] = {}
+
+    def observe_request(self, client: str, method: str, requrl: str, seconds: float, sent: int,
+                        received: int, code: Optional[str] = None) -> None:
+        key = (client, method, endpoint(requrl))
+        with self._lock:
+            histogram = self.requests.get(key)
+            if histogram is None:
+                histogram = self.requests[key] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+            self.bytes_sent[key] += sent
+            self.bytes_received[key] += received
+            if code is not None:
+                self.request_errors[key + (code,)] += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({
+                "event": "request", "client": client, "method": method, "endpoint": key[2],
+                "seconds": round(seconds, 6), "sent": sent, "received": received, "error": code,
+            }))
+
+    def observe_operation(self, name: str, seconds: float, rounds: Optional[int] = None,
+                          error: Optional[str] = None) -> None:
+        with self._lock:
+            histogram = self.operations.get(name)
+            if histogram is None:
+                histogram = self.operations[name] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+            if rounds is not None:
+                waited = self.rounds_waited.get(name)
+                if waited is None:
+                    waited = self.rounds_waited[name] = Histogram(ROUND_BUCKETS)
+                waited.observe(rounds)
+            if error is not None:
+                self.operation_errors[(name, error)] += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({
+                "event": "operation", "operation": name, "seconds": round(seconds, 6),
+                "rounds_waited": rounds, "error": error,
+            }))
+
+    def summary(self) -> Dict[str, Any]:
+        """Calls, errors, mean latency and bytes per endpoint and operation, slowest total first."""
+        with self._lock:
+            requests = {
+                f"{client} {method} {path}": {
+                    "calls": h.count,
+                    "errors": sum(n for k, n in self.request_errors.items() if k[:3] == (client, method, path)),
+                    "total_s": round(h.sum, 6),
+                    "mean_ms": round(h.sum / h.count * 1000, 3),
+                    "bytes_sent": self.bytes_sent[(client, method, path)],
+                    "bytes_received": self.bytes_received[(client, method, path)],
+                }
+                for (client, method, path), h in sorted(self.requests.items(), key=lambda kv: -kv[1].sum)
+            }
+            operations = {
+                name: {
+                    "calls": h.count,
+                    "errors": sum(n for k, n in self.operation_errors.items() if k[0] == name),
+                    "mean_ms": round(h.sum / h.count * 1000, 3),
+                    "mean_rounds_waited": (round(self.rounds_waited[name].sum / self.rounds_waited[name].count, 2)
+                                           if name in self.rounds_waited else None),
+                }
+                for name, h in sorted(self.operations.items(), key=lambda kv: -kv[1].sum)
+            }
+        return {"requests": requests, "operations": operations}
+
+    def prometheus(self) -> str:
+        """Every figure in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def histogram(name: str, help: str, series: Dict[Any, Histogram], labels: Callable[[Any], Dict]) -> None:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, h in sorted(series.items()):
+                for le, count in h.cumulative():
+                    lines.append(f"{name}_bucket{_labels(**labels(key), le=le)} {count}")
+                lines.append(f"{name}_sum{_labels(**labels(key))} {_number(h.sum)}")
+                lines.append(f"{name}_count{_labels(**labels(key))} {h.count}")
+
+        def counter(name: str, help: str, series: Counter, labels: Callable[[Any], Dict]) -> None:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_labels(**labels(key))} {value}")
+
+        def request(key):
+            return dict(client=key[0], method=key[1], endpoint=key[2])
+
+        with self._lock:
+            histogram("ally_node_request_duration_seconds", "Latency of algod and KMD requests.",
+                      self.requests, request)
+            counter("ally_node_request_errors_total", "Failed algod and KMD requests by status code.",
+                    self.request_errors, lambda k: dict(request(k), code=k[3]))
+            counter("ally_node_request_bytes_sent_total", "Request body bytes sent to algod and KMD.",
+                    self.bytes_sent, request)
+            counter("ally_node_response_bytes_received_total", "Response body bytes received from algod and KMD.",
+                    self.bytes_received, request)
+            histogram("ally_operation_duration_seconds", "Latency of ally operations.",
+                      self.operations, lambda k: dict(operation=k))
+            counter("ally_operation_errors_total", "Failed ally operations by exception type.",
+                    self.operation_errors, lambda k: dict(operation=k[0], error=k[1]))
+            histogram("ally_operation_rounds_waited", "Rounds from an operation's first valid round to its "
+                      "confirmation.", self.rounds_waited, lambda k: dict(operation=k))
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        with open(path, "w") as f:
+            f.write(self.prometheus())
+
+
+def _size(value: Any) -> int:
+    # response bodies come back parsed, so JSON ones are measured re-encoded
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode())
+    return len(json.dumps(value, separators=(",", ":")))
+
+
+def _error_code(e: BaseException) -> str:
+    if isinstance(e, error.AlgodHTTPError) and e.code:
+        return str(e.code)
+    if isinstance(e, error.KMDHTTPError):
+        return "kmd"
+    return type(e).__name__
+
+
+def instrument(client, metrics: Optional["Metrics"] = None):
+    """Record the latency, errors and bytes of every request ``client`` makes.
+
+    Works on any `AlgodClient` (including `ally.transport.PooledAlgodClient`
+    and the replaying ones in `ally.cassette`), `KMDClient` or
+    `ally.aio.AsyncAlgodClient`, by wrapping its request method in place.
+    Pooled clients report the raw response size, the others the size of the
+    response re-encoded as compact JSON.
+
+    Args:
+        client: The client to instrument.
+        metrics: Where to record, by default the process wide `Metrics`
+            (which this enables).
+    Returns:
+        ``client``, for chaining.
+    """
+    metrics = metrics or enable_metrics()
+    if isinstance(client, KMDClient):
+        send = client.kmd_request
+
+        def kmd_request(method, requrl, params=None, data=None):
+            sent = _size(data)
+            start = time.perf_counter()
+            try:
+                response = send(method, requrl, params, data)
+            except Exception as e:
+                metrics.observe_request("kmd", method, requrl, time.perf_counter() - start, sent, _size(str(e)),
+                                        _error_code(e))
+                raise
+            metrics.observe_request("kmd", method, requrl, time.perf_counter() - start, sent, _size(response))
+            return response
+
+        client.kmd_request = kmd_request
+        return client
+
+    send = client.algod_request
+    received = threading.local()
+    pool = getattr(client, "pool", None)
+    if pool is not None:
+        pool_request = pool.request
+
+        def request(method, path, body=None, headers=None):
+            status, data = pool_request(method, path, body, headers)
+            received.size = len(data)
+            return status, data
+
+        pool.request = request
+
+    def response_size(response: Any) -> int:
+        size = getattr(received, "size", None)
+        received.size = None
+        return _size(response) if size is None else size
+
+    if inspect.iscoroutinefunction(send):
+        async def async_algod_request(method, requrl, params=None, data=None, headers=None,
+                                      response_format="json"):
+            sent = _size(data)
+            start = time.perf_counter()
+            try:
+                response = await send(method, requrl, params, data, headers, response_format)
+            except Exception as e:
+                metrics.observe_request("algod", method, requrl, time.perf_counter() - start, sent,
+                                        _size(str(e)), _error_code(e))
+                raise
+            metrics.observe_request("algod", method, requrl, time.perf_counter() - start, sent, _size(response))
+            return response
+
+        client.algod_request = async_algod_request
+        return client
+
+    def algod_request(method, requrl, params=None, data=None, headers=None, response_format="json"):
+        sent = _size(data)
+        received.size = None
+        start = time.perf_counter()
+        try:
+            response = send(method, requrl, params, data, headers, response_format)
+        except Exception as e:
+            metrics.observe_request("algod", method, requrl, time.perf_counter() - start, sent,
+                                    response_size(str(e)), _error_code(e))
+            raise
+        metrics.observe_request("algod", method, requrl, time.perf_counter() - start, sent,
+                                response_size(response))
+        return response
+
+    client.algod_request = algod_request
+    return client
+
+
+def rounds_waited(result: Any) -> Optional[int]:
+    """Rounds from the first valid round of an operation's transactions to their confirmation.
+
+    ``first valid`` is the node's last round when the params were fetched,
+    so this is how many blocks the operation waited for. Batches report
+    their slowest group.
+    """
+    if isinstance(result, list):
+        waited = [rounds_waited(r) for r in result]
+        waited = [w for w in waited if w is not None]
+        return max(waited) if waited else None
+    confirmed = getattr(result, "confirmed_round", None)
+    txn = getattr(result, "txn", None)
+    if confirmed is None or not txn:
+        return None
+    first = txn.get("txn", {}).get("fv")
+    return None if first is None else confirmed - first
+
+
+def timed(fn: Callable) -> Callable:
+    """Record each call of operation ``fn`` in the process wide `Metrics`, when enabled."""
+    name = fn.__module__.replace("ally.", "", 1) + "." + fn.__name__
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            metrics = get_metrics()
+            if metrics is None:
+                return await fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                metrics.observe_operation(name, time.perf_counter() - start, error=type(e).__name__)
+                raise
+            metrics.observe_operation(name, time.perf_counter() - start, rounds_waited(result))
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        metrics = get_metrics()
+        if metrics is None:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            metrics.observe_operation(name, time.perf_counter() - start, error=type(e).__name__)
+            raise
+        metrics.observe_operation(name, time.perf_counter() - start, rounds_waited(result))
+        return result
+
+    return wrapper
+
+
+_metrics: Optional[Metrics] = None
+_metrics_checked = False
+_metrics_lock = threading.Lock()
+
+
+def enable_metrics(path: Optional[str] = None) -> Metrics:
+    """Turn on the process wide `Metrics`, written to ``path`` in Prometheus format at exit if given."""
+    global _metrics, _metrics_checked
+    with _metrics_lock:
+        _metrics_checked = True
+        if _metrics is None:
+            _metrics = Metrics()
+        if path:
+            atexit.register(_metrics.write_prometheus, path)
+        return _metrics
+
+
+def disable_metrics() -> None:
+    global _metrics, _metrics_checked
+    with _metrics_lock:
+        _metrics, _metrics_checked = None, True
+
+
+def get_metrics() -> Optional[Metrics]:
+    """The process wide `Metrics`, None unless enabled.
+
+    Enabled by `enable_metrics`, or by setting $ALLY_METRICS; with
+    $ALLY_METRICS_FILE the figures are also written to that file at exit.
+    """
+    if not _metrics_checked:
+        if os.environ.get("ALLY_METRICS"):
+            return enable_metrics(os.environ.get("ALLY_METRICS_FILE"))
+        disable_metrics()
+    return _metrics
@@ -1,75 +1,467 @@
+import base64
+import logging
+import os
 import random
-from base64 import b64decode
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from algosdk.v2client.algod import AlgodClient
 from algosdk.future import transaction
 from algosdk.logic import get_application_address
 from algosdk import encoding
-from pyteal import compileTeal, Mode
 
-from .utils import get_balances, is_opted_in_asset, wait_for_transaction
-from .account import Account
-from .contracts.pool import AllyPool
+from .utils import PendingTxnResponse, compile_program, get_balances, is_opted_in_asset, wait_for_transaction
+from .account import Account, Signer, sign_transactions
+from .params import suggested_params
+from .signing import sign_parallel
+from .templates import get_template
+from .confirmation import get_tracker
+from .metrics import timed
+from .artifacts import load_prebuilt, write_prebuilt
+from .compile_cache import CompileCache, get_default_cache, program_key, pyteal_version, source_fingerprint
+from .contracts.constants import max_batch_pairs
+
+TEAL_VERSION = 5
+# Most requests one packed mint/redeem group can hold
+MAX_BATCH_PAIRS = max_batch_pairs
+# what deploying a pool needs up front: the governors multisig pays the app's
+# min balance and the create and bootstrap fees, the app account holds its own
+# min balance and the asset's
+MULTISIG_FUNDING = 2_714_000
+APP_FUNDING = 202_000
+# the modules the programs are generated from, named without importing them (and PyTeal)
+CONTRACT_SOURCES = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "contracts", name)
+    for name in ("pool_oop.py", "constants.py")
+]
+
+logger = logging.getLogger(__name__)
+
+# get_contracts' cache when none is passed: the per-user one, None meaning no cache
+_DEFAULT_CACHE: Any = object()
 
 
 def fullyCompileContract(client: AlgodClient, teal: str) -> bytes:
-    response = client.compile(teal)
-    return b64decode(response["result"])
+    return compile_program(client, teal)
 
 
-def get_contracts(client: AlgodClient) -> Tuple[bytes, bytes]:
+def compile_cached(client: AlgodClient, name: str, build: Callable[[], str],
+                   cache: Optional[CompileCache]) -> bytes:
+    """Compile a program, going through the on-disk cache when one is given.
+
+    Entries are kept per $ALLY_COMPILE_BACKEND, and the "verify" backend
+    always compiles, since checking the assembler against algod is its point.
+
+    Args:
+        client: An algod client, only used on a cache miss with the algod backend.
+        name: Program name, part of the source fingerprint.
+        build: Returns the TEAL source, only called on a fingerprint miss.
+        cache: Compile cache, or None to always compile.
+    Returns:
+        The program bytecode.
+    """
+    backend = os.environ.get("ALLY_COMPILE_BACKEND", "local")
+    if cache is None or backend == "verify":
+        return fullyCompileContract(client, build())
+
+    fingerprint = source_fingerprint(CONTRACT_SOURCES, name, TEAL_VERSION, backend)
+    program = cache.get_by_source(fingerprint)
+    if program is not None:
+        return program
+
+    teal = build()
+    key = program_key(teal, TEAL_VERSION, backend)
+    program = cache.get(key)
+    if program is None:
+        program = fullyCompileContract(client, teal)
+        cache.put(key, program)
+    cache.put_source(fingerprint, key)
+    return program
+
+
+def contract_teal() -> Dict[str, str]:
+    """Generate the approval and clear TEAL of the pool with PyTeal."""
+    from pyteal import Mode, compileTeal
+
+    from .contracts.pool_oop import AllyPool
+
     pool = AllyPool()
-    approval_program = fullyCompileContract(
-        client, compileTeal(pool.approval_program(), mode=Mode.Application, version=5)
-    )
-    clear_state_program = fullyCompileContract(
-        client, compileTeal(pool.clear_program(), mode=Mode.Application, version=5)
-    )
+    return {
+        "approval": compileTeal(pool.approval_program(), mode=Mode.Application, version=TEAL_VERSION),
+        "clear": compileTeal(pool.clear_program(), mode=Mode.Application, version=TEAL_VERSION),
+    }
+
+
+def get_contracts(client: AlgodClient, cache: Optional[CompileCache] = _DEFAULT_CACHE,
+                  prebuilt: bool = True) -> Tuple[bytes, bytes]:
+    """The approval and clear programs of the pool.
+
+    Taken from the prebuilt artifacts shipped with the package while the
+    contract sources match them and the local assembler is in use (unless
+    ``prebuilt`` is False or $ALLY_PREBUILT=0), otherwise from the compile
+    cache, otherwise generated and compiled.
+
+    Args:
+        client: An algod client, only used when compiling with algod.
+        cache: Compile cache, defaults to the per-user one; None always compiles.
+        prebuilt: Whether the prebuilt artifacts may be used.
+    Returns:
+        The approval and clear program bytecode.
+    """
+    if (prebuilt and os.environ.get("ALLY_PREBUILT", "1") != "0"
+            and os.environ.get("ALLY_COMPILE_BACKEND", "local") == "local"):
+        approval = load_prebuilt("approval", CONTRACT_SOURCES, TEAL_VERSION)
+        clear = load_prebuilt("clear", CONTRACT_SOURCES, TEAL_VERSION)
+        if approval is not None and clear is not None:
+            return approval, clear
+
+    if cache is _DEFAULT_CACHE:
+        cache = get_default_cache()
+    teal: Dict[str, str] = {}
+
+    def build(name: str) -> Callable[[], str]:
+        def generate() -> str:
+            if not teal:
+                teal.update(contract_teal())
+            return teal[name]
+        return generate
+
+    approval_program = compile_cached(client, "approval", build("approval"), cache)
+    clear_state_program = compile_cached(client, "clear", build("clear"), cache)
 
     return approval_program, clear_state_program
 
 
-def create_pool(client: AlgodClient, governors: List[Account], multisig_threshold: int):
-    """Create a pool.
+def build_prebuilt(path: Optional[str] = None) -> Dict[str, Any]:
+    """Regenerate the prebuilt approval and clear artifacts from the current contract.
+
+    Returns:
+        The artifact manifest.
+    """
+    teal = contract_teal()
+    programs = {name: compile_program(None, source, "local") for name, source in teal.items()}
+    return write_prebuilt(teal, programs, CONTRACT_SOURCES, TEAL_VERSION, pyteal_version(), path)
+
+
+def governors_multisig(governors: List[Account], multisig_threshold: int, version: int = 1) -> transaction.Multisig:
+    return transaction.Multisig(
+        version, multisig_threshold,
+        [governor.get_address() for governor in governors]
+    )
+
+
+def sign_multisig(txn: transaction.Transaction, governors: List[Account],
+                  multisig_threshold: int) -> transaction.MultisigTransaction:
+    """Sign a transaction from the governors multisig with a random quorum.
 
     Args:
-        client: An algod client.
+        txn: Transaction sent by the governors multisig.
         governors: governor accounts list.
         multisig_threshold: multi signature threshold.
     Returns:
-        The ID of the newly created pool.
+        The signed multisig transaction.
     """
-    approval, clear = get_contracts(client)
+    mtx = transaction.MultisigTransaction(txn, governors_multisig(governors, multisig_threshold))
+
+    idxs = random.sample(range(0, len(governors)), multisig_threshold)
+    for idx in idxs:
+        governors[idx].get_signer().sign_multisig(mtx)
+
+    return mtx
+
+
+def create_pool_txn(sp: transaction.SuggestedParams, governors: List[Account], multisig_threshold: int,
+                    approval: bytes, clear: bytes) -> transaction.MultisigTransaction:
     global_schema = transaction.StateSchema(num_uints=32, num_byte_slices=32)
     local_schema = transaction.StateSchema(num_uints=0, num_byte_slices=0)
-    
-    msig = transaction.Multisig(
-        1, multisig_threshold, 
-        [governor.get_address() for governor in governors]
-    )
+    msig = governors_multisig(governors, multisig_threshold)
 
     txn = transaction.ApplicationCreateTxn(
         sender=msig.address(),
-        sp=client.suggested_params(),
+        sp=sp,
         on_complete=transaction.OnComplete.NoOpOC,
         approval_program=approval,
         clear_program=clear,
         global_schema=global_schema,
         local_schema=local_schema,
     )
-    mtx = transaction.MultisigTransaction(txn, msig)
-    
-    idxs = random.sample(range(0, len(governors)), multisig_threshold)
-    for idx in idxs:
-        mtx.sign(governors[idx].get_private_key())
-    
+    return sign_multisig(txn, governors, multisig_threshold)
+
+
+def bootstrap_pool_txn(sp: transaction.SuggestedParams, governors: List[Account], multisig_threshold: int,
+                       app_id: int) -> transaction.MultisigTransaction:
+    msig = governors_multisig(governors, multisig_threshold)
+    txn = transaction.ApplicationCallTxn(
+        sender=msig.address(),
+        sp=sp,
+        index=app_id,
+        on_complete=transaction.OnComplete.NoOpOC,
+        app_args=[b"bootstrap"],
+    )
+    return sign_multisig(txn, governors, multisig_threshold)
+
+
+def set_governor_txn(sp: transaction.SuggestedParams, sender: Account, app_id: int, governors: List[Account],
+                     version: int, threshold: int) -> transaction.SignedTransaction:
+    msig = governors_multisig(governors, threshold, version)
+    txn = transaction.ApplicationCallTxn(
+        sender=sender.get_address(),
+        sp=sp,
+        index=app_id,
+        app_args=[b"set_governor"],
+        accounts=[msig.address()],
+        on_complete=transaction.OnComplete.NoOpOC
+    )
+    return sender.get_signer().sign(txn)
+
+
+def destroy_pool_txn(sp: transaction.SuggestedParams, governors: List[Account], multisig_threshold: int,
+                     app_id: int) -> transaction.MultisigTransaction:
+    msig = governors_multisig(governors, multisig_threshold)
+    txn = transaction.ApplicationDeleteTxn(
+        sender=msig.address(),
+        sp=sp,
+        index=app_id
+    )
+    return sign_multisig(txn, governors, multisig_threshold)
+
+
+def update_pool_txn(sp: transaction.SuggestedParams, governors: List[Account], multisig_threshold: int,
+                    app_id: int, approval: bytes, clear: bytes) -> transaction.MultisigTransaction:
+    msig = governors_multisig(governors, multisig_threshold)
+    txn = transaction.ApplicationUpdateTxn(
+        sender=msig.address(),
+        sp=sp,
+        index=app_id,
+        approval_program=approval,
+        clear_program=clear
+    )
+    return sign_multisig(txn, governors, multisig_threshold)
+
+
+def opt_in_txn(sp: transaction.SuggestedParams, sender: Account, asset_id: int) -> transaction.SignedTransaction:
+    txn = transaction.AssetOptInTxn(
+        sender=sender.get_address(),
+        sp=sp,
+        index=asset_id
+    )
+    return sender.get_signer().sign(txn)
+
+
+def mint_walgo_pair(sp: transaction.SuggestedParams, sender: Account, app_id: int, asset_id: int,
+                    amount: int) -> List[transaction.Transaction]:
+    """Build the unsigned (app call, payment) pair of a mint.
+
+    The contract checks the pair relative to the app call, so it can be
+    placed anywhere in a larger group (up to 16 transactions) as long as
+    the payment directly follows the call.
+    """
+    return [
+        transaction.ApplicationCallTxn(
+            sender=sender.get_address(),
+            sp=sp,
+            index=app_id,
+            on_complete=transaction.OnComplete.NoOpOC,
+            app_args=[b"mint"],
+            foreign_assets=[asset_id]
+        ),
+        transaction.PaymentTxn(
+            sender=sender.get_address(),
+            sp=sp,
+            receiver=get_application_address(app_id),
+            amt=amount + 1_000
+        ),
+    ]
+
+
+def redeem_walgo_pair(sp: transaction.SuggestedParams, sender: Account, app_id: int, asset_id: int,
+                      amount: int) -> List[transaction.Transaction]:
+    """Build the unsigned (app call, asset transfer) pair of a redeem, see `mint_walgo_pair`."""
+    return [
+        transaction.ApplicationCallTxn(
+            sender=sender.get_address(),
+            sp=sp,
+            index=app_id,
+            on_complete=transaction.OnComplete.NoOpOC,
+            app_args=[b"redeem"],
+            foreign_assets=[asset_id]
+        ),
+        transaction.AssetTransferTxn(
+            sender=sender.get_address(),
+            sp=sp,
+            receiver=get_application_address(app_id),
+            amt=amount,
+            index=asset_id
+        ),
+    ]
+
+
+def mint_walgo_txns(sp: transaction.SuggestedParams, sender: Account, app_id: int, asset_id: int,
+                    amount: int, opt_in: bool = False) -> List[transaction.SignedTransaction]:
+    """Build and sign the (app call, payment) mint group.
+
+    With ``opt_in`` the group starts with the sender's opt-in to the asset,
+    so a first time minter needs a single group.
+    """
+    txns = mint_walgo_pair(sp, sender, app_id, asset_id, amount)
+    if opt_in:
+        txns.insert(0, transaction.AssetOptInTxn(
+            sender=sender.get_address(),
+            sp=sp,
+            index=asset_id
+        ))
+
+    transaction.assign_group_id(txns)
+
+    return sender.get_signer().sign_transactions(txns)
+
+
+def redeem_walgo_txns(sp: transaction.SuggestedParams, sender: Account, app_id: int, asset_id: int,
+                      amount: int) -> List[transaction.SignedTransaction]:
+    """Build and sign the (app call, asset transfer) redeem group."""
+    txns = redeem_walgo_pair(sp, sender, app_id, asset_id, amount)
+
+    transaction.assign_group_id(txns)
+
+    return sender.get_signer().sign_transactions(txns)
+
+
+def mint_walgo_group(sp: transaction.SuggestedParams, sender: Account, app_id: int, asset_id: int,
+                     amount: int, opt_in: bool = False) -> Tuple[bytes, List[str]]:
+    """The mint group of `mint_walgo_txns`, signed and encoded from a template (see `ally.templates`).
+
+    Returns:
+        The group's wire encoding, and its txids.
+    """
+    template = get_template("mint", sp, app_id, asset_id, opt_in)
+    return template.sign(sender.get_signer(), amount, sp.first, sp.last)
+
+
+def redeem_walgo_group(sp: transaction.SuggestedParams, sender: Account, app_id: int, asset_id: int,
+                       amount: int) -> Tuple[bytes, List[str]]:
+    """The redeem group of `redeem_walgo_txns`, signed and encoded from a template."""
+    return get_template("redeem", sp, app_id, asset_id).sign(sender.get_signer(), amount, sp.first, sp.last)
+
+
+def pack_requests(requests: List[Tuple[Account, int]],
+                  max_pairs: int = MAX_BATCH_PAIRS) -> List[List[Tuple[Account, int]]]:
+    """Pack (sender, amount) requests into batch groups.
+
+    Requests keep their order. A group holds at most ``max_pairs`` requests
+    and at most one per sender, since two requests by the same sender for
+    the same amount would otherwise be identical transactions.
+    """
+    groups: List[List[Tuple[Account, int]]] = []
+    senders: List[set] = []
+    for request in requests:
+        address = request[0].get_address()
+        for group, seen in zip(groups, senders):
+            if len(group) < max_pairs and address not in seen:
+                group.append(request)
+                seen.add(address)
+                break
+        else:
+            groups.append([request])
+            senders.append({address})
+    return groups
+
+
+def _batch_signers(requests: List[Tuple[Account, int]]) -> List[Signer]:
+    return [sender.get_signer() for sender, _ in requests for _ in range(2)]
+
+
+def mint_walgo_batch_group(sp: transaction.SuggestedParams, requests: List[Tuple[Account, int]], app_id: int,
+                           asset_id: int) -> List[transaction.Transaction]:
+    """Build one unsigned group of packed mint (app call, payment) pairs, its group id assigned."""
+    if len(requests) > MAX_BATCH_PAIRS:
+        raise Exception(f"A batch holds at most {MAX_BATCH_PAIRS} requests")
+    txns: List[transaction.Transaction] = []
+    for sender, amount in requests:
+        txns += mint_walgo_pair(sp, sender, app_id, asset_id, amount)
+    return transaction.assign_group_id(txns)
+
+
+def redeem_walgo_batch_group(sp: transaction.SuggestedParams, requests: List[Tuple[Account, int]], app_id: int,
+                             asset_id: int) -> List[transaction.Transaction]:
+    """Build one unsigned group of packed redeem (app call, asset transfer) pairs, its group id assigned."""
+    if len(requests) > MAX_BATCH_PAIRS:
+        raise Exception(f"A batch holds at most {MAX_BATCH_PAIRS} requests")
+    txns: List[transaction.Transaction] = []
+    for sender, amount in requests:
+        txns += redeem_walgo_pair(sp, sender, app_id, asset_id, amount)
+    return transaction.assign_group_id(txns)
+
+
+def mint_walgo_batch_txns(sp: transaction.SuggestedParams, requests: List[Tuple[Account, int]], app_id: int,
+                          asset_id: int) -> List[transaction.SignedTransaction]:
+    """Build and sign one group of packed mint (app call, payment) pairs."""
+    return sign_transactions(mint_walgo_batch_group(sp, requests, app_id, asset_id), _batch_signers(requests))
+
+
+def redeem_walgo_batch_txns(sp: transaction.SuggestedParams, requests: List[Tuple[Account, int]], app_id: int,
+                            asset_id: int) -> List[transaction.SignedTransaction]:
+    """Build and sign one group of packed redeem (app call, asset transfer) pairs."""
+    return sign_transactions(redeem_walgo_batch_group(sp, requests, app_id, asset_id), _batch_signers(requests))
+
+
+def _sign_groups(groups: List[List[transaction.Transaction]],
+                 signers: List[List[Signer]]) -> List[List[transaction.SignedTransaction]]:
+    # one `sign_parallel` call for every group, so large batches use the signing pool
+    signed = sign_parallel([txn for group in groups for txn in group], [s for group in signers for s in group])
+    out, start = [], 0
+    for group in groups:
+        out.append(signed[start:start + len(group)])
+        start += len(group)
+    return out
+
+
+def toggle_redeem_txn(sp: transaction.SuggestedParams, governors: List[Account], app_id: int,
+                      multisig_threshold: int) -> transaction.MultisigTransaction:
+    msig = governors_multisig(governors, multisig_threshold)
+    txn = transaction.ApplicationCallTxn(
+        sender=msig.address(),
+        sp=sp,
+        index=app_id,
+        app_args=["toggle_redeem"],
+        on_complete=transaction.OnComplete.NoOpOC
+    )
+    return sign_multisig(txn, governors, multisig_threshold)
+
+
+def set_mint_price_txn(sp: transaction.SuggestedParams, mint_price: int, governors: List[Account], app_id: int,
+                       multisig_threshold: int) -> transaction.MultisigTransaction:
+    msig = governors_multisig(governors, multisig_threshold)
+    txn = transaction.ApplicationCallTxn(
+        sender=msig.address(),
+        sp=sp,
+        index=app_id,
+        app_args=["set_mint_price", mint_price.to_bytes(8, 'big')],
+        on_complete=transaction.OnComplete.NoOpOC
+    )
+    return sign_multisig(txn, governors, multisig_threshold)
+
+
+@timed
+def create_pool(client: AlgodClient, governors: List[Account], multisig_threshold: int):
+    """Create a pool.
+
+    Args:
+        client: An algod client.
+        governors: governor accounts list.
+        multisig_threshold: multi signature threshold.
+    Returns:
+        The ID of the newly created pool.
+    """
+    sp = suggested_params(client)
+    approval, clear = get_contracts(client)
+    mtx = create_pool_txn(sp, governors, multisig_threshold, approval, clear)
+
     tx_id = client.send_raw_transaction(encoding.msgpack_encode(mtx))
 
-    response = wait_for_transaction(client, tx_id)
+    response = wait_for_transaction(client, tx_id, sp.last)
     assert response.application_index is not None and response.application_index > 0
     return response.application_index
 
 
+@timed
 def bootstrap_pool(client: AlgodClient, governors: List[Account], multisig_threshold: int, app_id: int):
     """Initialize a pool configuration.
 
@@ -78,31 +470,19 @@ def bootstrap_pool(client: AlgodClient, governors: List[Account], multisig_thres
         governors: governor accounts list.
         multisig_threshold: multi signature threshold.
         app_id: application ID.
+    Returns:
+        The confirmed transaction's pending info.
     """
-    msig = transaction.Multisig(
-        1, multisig_threshold, 
-        [governor.get_address() for governor in governors]
-    )
-    print(f"Sender: {msig.address()}")
+    sp = suggested_params(client)
+    mtx = bootstrap_pool_txn(sp, governors, multisig_threshold, app_id)
+    logger.info("Sender: %s", mtx.multisig.address())
 
-    txn = transaction.ApplicationCallTxn(
-        sender=msig.address(),
-        sp=client.suggested_params(),
-        index=app_id,
-        on_complete=transaction.OnComplete.NoOpOC,
-        app_args=[b"bootstrap"],
-    )
-    mtx = transaction.MultisigTransaction(txn, msig)
-    
-    signers = random.choices(governors, k=multisig_threshold)
-    for signer in signers:
-        mtx.sign(signer.get_private_key())
-    
     tx_id = client.send_raw_transaction(encoding.msgpack_encode(mtx))
-    
-    wait_for_transaction(client, tx_id)
-    
-    
+
+    return wait_for_transaction(client, tx_id, sp.last)
+
+
+@timed
 def set_governor(client: AlgodClient, sender: Account, app_id: int, governors: List[Account], version: int, threshold: int):
     """Initialize governor configuration.
 
@@ -113,28 +493,20 @@ def set_governor(client: AlgodClient, sender: Account, app_id: int, governors: L
         governors: governor accounts list.
         version: Version.
         threshold: threshold.
+    Returns:
+        The confirmed transaction's pending info.
     """
-    msig = transaction.Multisig(
-        version, threshold, [governor.get_address() for governor in governors]
-    )
+    sp = suggested_params(client)
+    signed_txn = set_governor_txn(sp, sender, app_id, governors, version, threshold)
 
-    print('multisig address: ', msig.address())
-
-    txn = transaction.ApplicationCallTxn(
-        sender=sender.get_address(),
-        sp=client.suggested_params(),
-        index=app_id,
-        app_args=[b"set_governor"],
-        accounts=[msig.address()],
-        on_complete=transaction.OnComplete.NoOpOC
-    )
-    signed_txn = txn.sign(sender.get_private_key())
+    logger.info("multisig address: %s", governors_multisig(governors, threshold, version).address())
 
     client.send_transaction(signed_txn)
 
-    wait_for_transaction(client, signed_txn.get_txid())
-    
-    
+    return wait_for_transaction(client, signed_txn.get_txid(), sp.last)
+
+
+@timed
 def destroy_pool(client: AlgodClient, governors: List[Account], multisig_threshold: int, app_id: int):
     """Destroy pool.
 
@@ -143,29 +515,19 @@ def destroy_pool(client: AlgodClient, governors: List[Account], multisig_thresho
         governors: governor accounts list.
         multisig_threshold: multi signature threshold.
         app_id: Application ID.
+    Returns:
+        The confirmed transaction's pending info.
     """
-    msig = transaction.Multisig(
-        1, multisig_threshold, 
-        [governor.get_address() for governor in governors]
-    )
-    print(f"Sender: {msig.address()}")
-    
-    txn = transaction.ApplicationDeleteTxn(
-        sender=msig.address(),
-        sp=client.suggested_params(),
-        index=app_id
-    )
-    mtx = transaction.MultisigTransaction(txn, msig)
-    
-    idxs = random.sample(range(0, len(governors)), multisig_threshold)
-    for idx in idxs:
-        mtx.sign(governors[idx].get_private_key())
-    
+    sp = suggested_params(client)
+    mtx = destroy_pool_txn(sp, governors, multisig_threshold, app_id)
+    logger.info("Sender: %s", mtx.multisig.address())
+
     tx_id = client.send_raw_transaction(encoding.msgpack_encode(mtx))
-    
-    wait_for_transaction(client, tx_id)
-    
 
+    return wait_for_transaction(client, tx_id, sp.last)
+
+
+@timed
 def update_pool(client: AlgodClient, governors: List[Account], multisig_threshold: int, app_id: int):
     """Update pool.
 
@@ -174,31 +536,20 @@ def update_pool(client: AlgodClient, governors: List[Account], multisig_threshol
         governors: governor accounts list.
         multisig_threshold: multi signature threshold.
         app_id: Application ID.
+    Returns:
+        The confirmed transaction's pending info.
     """
+    sp = suggested_params(client)
     approval, clear = get_contracts(client)
-    msig = transaction.Multisig(
-        1, multisig_threshold, 
-        [governor.get_address() for governor in governors]
-    )
-    print(f"Sender: {msig.address()}")
-    txn = transaction.ApplicationUpdateTxn(
-        sender=msig.address(),
-        sp=client.suggested_params(),
-        index=app_id,
-        approval_program=approval,
-        clear_program=clear
-    )
-    mtx = transaction.MultisigTransaction(txn, msig)
-    
-    idxs = random.sample(range(0, len(governors)), multisig_threshold)
-    for idx in idxs:
-        mtx.sign(governors[idx].get_private_key())
-    
+    mtx = update_pool_txn(sp, governors, multisig_threshold, app_id, approval, clear)
+    logger.info("Sender: %s", mtx.multisig.address())
+
     tx_id = client.send_raw_transaction(encoding.msgpack_encode(mtx))
-    
-    wait_for_transaction(client, tx_id)
-    
-    
+
+    return wait_for_transaction(client, tx_id, sp.last)
+
+
+@timed
 def mint_walgo(client: AlgodClient, sender: Account, app_id: int, asset_id: int, amount: int):
     """Mint walgo.
 
@@ -208,44 +559,21 @@ def mint_walgo(client: AlgodClient, sender: Account, app_id: int, asset_id: int,
         app_id: Application ID.
         asset_id: Asset ID.
         amount: Number of walgo.
+    Returns:
+        The confirmed transaction's pending info.
     """
+    sp = suggested_params(client)
 
-    if not is_opted_in_asset(client, asset_id, sender.get_address()):
-        txn = transaction.AssetOptInTxn(
-            sender=sender.get_address(),
-            sp=client.suggested_params(),
-            index=asset_id
-        )
-        signed_txn = txn.sign(sender.get_private_key())
-        client.send_transaction(signed_txn)
-        
-        wait_for_transaction(client, txn.get_txid())
-        
-    call_txn = transaction.ApplicationCallTxn(
-        sender=sender.get_address(),
-        sp=client.suggested_params(),
-        index=app_id,
-        on_complete=transaction.OnComplete.NoOpOC,
-        app_args=[b"mint"],
-        foreign_assets=[asset_id]
-    )
-    payment_txn = transaction.PaymentTxn(
-        sender=sender.get_address(),
-        sp=client.suggested_params(),
-        receiver=get_application_address(app_id),
-        amt=amount + 1_000
-    )
-    
-    transaction.assign_group_id([call_txn, payment_txn])
-    
-    signed_call_txn = call_txn.sign(sender.get_private_key())
-    signed_payment_txn = payment_txn.sign(sender.get_private_key())
-    
-    tx_id = client.send_transactions([signed_call_txn, signed_payment_txn])
-    
-    wait_for_transaction(client, tx_id)
-    
-    
+    opt_in = not is_opted_in_asset(client, asset_id, sender.get_address())
+    group, txids = mint_walgo_group(sp, sender, app_id, asset_id, amount, opt_in)
+
+    client.send_raw_transaction(base64.b64encode(group))
+
+    # the app call, whose pending info carries the mint's inner transaction
+    return wait_for_transaction(client, txids[-2], sp.last)
+
+
+@timed
 def redeem_walgo(client: AlgodClient, sender: Account, app_id: int, asset_id: int, amount: int):
     """Redeem walgo.
 
@@ -255,34 +583,74 @@ def redeem_walgo(client: AlgodClient, sender: Account, app_id: int, asset_id: in
         app_id: Application ID.
         asset_id: Asset ID.
         amount: Number of walgo.
+    Returns:
+        The confirmed transaction's pending info.
     """
+    sp = suggested_params(client)
 
-    call_txn = transaction.ApplicationCallTxn(
-        sender=sender.get_address(),
-        sp=client.suggested_params(),
-        index=app_id,
-        on_complete=transaction.OnComplete.NoOpOC,
-        app_args=[b"redeem"],
-        foreign_assets=[asset_id]
-    )
-    axfer_txn = transaction.AssetTransferTxn(
-        sender=sender.get_address(),
-        sp=client.suggested_params(),
-        receiver=get_application_address(app_id),
-        amt=amount,
-        index=asset_id
-    )
-    
-    transaction.assign_group_id([call_txn, axfer_txn])
-    
-    signed_call_txn = call_txn.sign(sender.get_private_key())
-    signed_axfer_txn = axfer_txn.sign(sender.get_private_key())
-    
-    tx_id = client.send_transactions([signed_call_txn, signed_axfer_txn])
-    
-    wait_for_transaction(client, tx_id)
+    group, txids = redeem_walgo_group(sp, sender, app_id, asset_id, amount)
+    client.send_raw_transaction(base64.b64encode(group))
+
+    return wait_for_transaction(client, txids[0], sp.last)
+
+
+def _send_batches(client: AlgodClient, sp: transaction.SuggestedParams,
+                  groups: List[List[transaction.SignedTransaction]]) -> List[PendingTxnResponse]:
+    tracker = get_tracker(client)
+    futures = [tracker.track(client.send_transactions(group), sp.last) for group in groups]
+    return [future.result() for future in futures]
+
+
+@timed
+def mint_walgo_batch(client: AlgodClient, requests: List[Tuple[Account, int]], app_id: int, asset_id: int):
+    """Mint walgo for many senders, packing their mint pairs into shared groups.
+
+    Args:
+        client: An algod client.
+        requests: (sender, amount) pairs.
+        app_id: Application ID.
+        asset_id: Asset ID.
+    Returns:
+        The pending info of each group's first transaction, in group order.
+    """
+    sp = suggested_params(client)
+
+    senders = {sender.get_address(): sender for sender, _ in requests}
+    opt_ins = [
+        [opt_in_txn(sp, sender, asset_id)] for address, sender in senders.items()
+        if not is_opted_in_asset(client, asset_id, address)
+    ]
+    _send_batches(client, sp, opt_ins)
+
+    groups = pack_requests(requests)
+    return _send_batches(client, sp, _sign_groups(
+        [mint_walgo_batch_group(sp, group, app_id, asset_id) for group in groups],
+        [_batch_signers(group) for group in groups],
+    ))
+
+
+@timed
+def redeem_walgo_batch(client: AlgodClient, requests: List[Tuple[Account, int]], app_id: int, asset_id: int):
+    """Redeem walgo for many senders, packing their redeem pairs into shared groups.
+
+    Args:
+        client: An algod client.
+        requests: (sender, amount) pairs.
+        app_id: Application ID.
+        asset_id: Asset ID.
+    Returns:
+        The pending info of each group's first transaction, in group order.
+    """
+    sp = suggested_params(client)
+
+    groups = pack_requests(requests)
+    return _send_batches(client, sp, _sign_groups(
+        [redeem_walgo_batch_group(sp, group, app_id, asset_id) for group in groups],
+        [_batch_signers(group) for group in groups],
+    ))
 
 
+@timed
 def toggle_redeem(client: AlgodClient, governors: List[Account], app_id: int, version: int, multisig_threshold: int):
     """Toggle redeem.
 
@@ -292,33 +660,20 @@ def toggle_redeem(client: AlgodClient, governors: List[Account], app_id: int, ve
         app_id: Application ID.
         version: Version.
         multisig_threshold: multi signature threshold.
+    Returns:
+        The confirmed transaction's pending info.
     """
-    msig = transaction.Multisig(
-        1, multisig_threshold,
-        [governor.get_address() for governor in governors]
-    )
+    sp = suggested_params(client)
+    mtx = toggle_redeem_txn(sp, governors, app_id, multisig_threshold)
 
-    txn = transaction.ApplicationCallTxn(
-        sender=msig.address(),
-        sp=client.suggested_params(),
-        index=app_id,
-        app_args=["toggle_redeem"],
-        on_complete=transaction.OnComplete.NoOpOC
-    )
-
-    mtx = transaction.MultisigTransaction(txn, msig)
-
-    print(f"Sender: {msig.address()}")
-
-    idxs = random.sample(range(0, len(governors)), multisig_threshold)
-    for idx in idxs:
-        mtx.sign(governors[idx].get_private_key())
+    logger.info("Sender: %s", mtx.multisig.address())
 
     tx_id = client.send_raw_transaction(encoding.msgpack_encode(mtx))
 
-    wait_for_transaction(client, tx_id)
-    
+    return wait_for_transaction(client, tx_id, sp.last)
+
 
+@timed
 def set_mint_price(mint_price: int, client: AlgodClient, governors: List[Account], app_id: int, version: int, multisig_threshold: int):
     """Set mint price.
 
@@ -329,29 +684,14 @@ def set_mint_price(mint_price: int, client: AlgodClient, governors: List[Account
         app_id: Application ID.
         version: Version.
         multisig_threshold: multi signature threshold.
-    """    
-    msig = transaction.Multisig(
-        1, multisig_threshold,
-        [governor.get_address() for governor in governors]
-    )
-
-    txn = transaction.ApplicationCallTxn(
-        sender=msig.address(),
-        sp=client.suggested_params(),
-        index=app_id,
-        app_args=["set_mint_price", mint_price.to_bytes(8, 'big')],
-        on_complete=transaction.OnComplete.NoOpOC
-    )
-
-    mtx = transaction.MultisigTransaction(txn, msig)
-
-    print(f"Sender: {msig.address()}")
+    Returns:
+        The confirmed transaction's pending info.
+    """
+    sp = suggested_params(client)
+    mtx = set_mint_price_txn(sp, mint_price, governors, app_id, multisig_threshold)
 
-    idxs = random.sample(range(0, len(governors)), multisig_threshold)
-    for idx in idxs:
-        mtx.sign(governors[idx].get_private_key())
+    logger.info("Sender: %s", mtx.multisig.address())
 
     tx_id = client.send_raw_transaction(encoding.msgpack_encode(mtx))
 
-    wait_for_transaction(client, tx_id)
-
+    return wait_for_transaction(client, tx_id, sp.last)
@@ -0,0 +1,75 @@
+import copy
+import threading
+import time
+import weakref
+from typing import Optional
+
+from algosdk.v2client.algod import AlgodClient
+from algosdk.future import transaction
+
+from .rounds import add_round_listener
+
+DEFAULT_TTL = 5.0
+
+
+class SuggestedParamsProvider:
+    """Caches `suggested_params` for the current round.
+
+    The cached params are reused until they are ``ttl`` seconds old or a newer
+    round is observed (see `ally.rounds.observe_round`), whichever comes first.
+    Callers get a copy, so mutating fee fields on it doesn't leak into the cache.
+    The client is held weakly, as providers are kept per client in `_providers`.
+    """
+
+    def __init__(self, client: AlgodClient, ttl: float = DEFAULT_TTL) -> None:
+        self._client = weakref.ref(client)
+        self.ttl = ttl
+        self.round = 0
+        self.fetches = 0
+        self._params: Optional[transaction.SuggestedParams] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        add_round_listener(client, self.observe_round)
+
+    @property
+    def client(self) -> AlgodClient:
+        client = self._client()
+        if client is None:
+            raise Exception("the client of this params provider is gone")
+        return client
+
+    def get(self) -> transaction.SuggestedParams:
+        with self._lock:
+            if self._params is None or time.monotonic() - self._fetched_at > self.ttl:
+                self._params = self.client.suggested_params()
+                self._fetched_at = time.monotonic()
+                self.round = max(self.round, self._params.first)
+                self.fetches += 1
+            return copy.copy(self._params)
+
+    def observe_round(self, round: int) -> None:
+        with self._lock:
+            if round > self.round:
+                self.round = round
+                self._params = None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._params = None
+
+
+_providers: "weakref.WeakKeyDictionary[AlgodClient, SuggestedParamsProvider]" = weakref.WeakKeyDictionary()
+_providers_lock = threading.Lock()
+
+
+def get_params_provider(client: AlgodClient) -> SuggestedParamsProvider:
+    with _providers_lock:
+        provider = _providers.get(client)
+        if provider is None:
+            provider = _providers[client] = SuggestedParamsProvider(client)
+        return provider
+
+
+def suggested_params(client: AlgodClient) -> transaction.SuggestedParams:
+    """Suggested params for ``client``, shared by every operation in the process."""
+    return get_params_provider(client).get()
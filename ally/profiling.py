@@ -0,0 +1,292 @@
+import base64
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from algosdk import account, encoding
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+from algosdk.v2client import models
+from pyteal import Mode, compileTeal
+
+from .account import Account
+from .contracts.pool_oop import AllyPool
+from .teal import assemble_program
+from .teal.analyzer import dispatch_routes
+from .teal.ledger import AccountState, AppState, AssetState, Ledger
+
+# per app call, pooled across the group
+APP_CALL_BUDGET = 700
+MAX_PROGRAM_BYTES = 2048
+MAX_STACK_DEPTH = 1000
+
+ASSET_ID = 1001
+APP_ID = 1000
+
+DryrunBackend = Callable[[models.DryrunRequest], dict]
+
+ROUTES = [
+    "mint", "redeem",
+    "bootstrap", "set_governor", "set_mint_price", "toggle_redeem", "join",
+]
+
+
+class ProgramMap:
+    """Maps program counters back to TEAL lines, labels and routes.
+
+    PyTeal 0.9 emits no source map, so the closest we get to the PyTeal
+    source is the label a line sits under (a `Cond` branch or a subroutine)
+    and, for dispatch branches, the method or on completion that jumps there.
+    """
+
+    def __init__(self, teal: str) -> None:
+        self.teal = teal
+        self.lines = teal.splitlines()
+        self.program = assemble_program(teal)
+        self.block: Dict[int, str] = {}
+
+        label = "main"
+        for n, line in enumerate(self.lines, 1):
+            text = line.split("//")[0].strip()
+            if text.endswith(":"):
+                label = text[:-1]
+            self.block[n] = label
+        self.routes = dispatch_routes(teal)
+
+    @property
+    def bytecode(self) -> bytes:
+        return self.program.bytecode
+
+    def line_of(self, pc: int) -> Optional[int]:
+        return self.program.pc_to_line.get(pc)
+
+    def describe(self, line: int) -> Dict[str, object]:
+        block = self.block.get(line, "main")
+        return {
+            "line": line,
+            "teal": self.lines[line - 1].strip(),
+            "block": block,
+            "route": self.routes.get(block, block),
+        }
+
+
+def _global_state(governor: str, pool_token: Optional[int]) -> List[models.TealKeyValue]:
+    def uint(key: bytes, value: int):
+        return models.TealKeyValue(key=base64.b64encode(key).decode(), value=models.TealValue(type=2, uint=value))
+
+    def raw(key: bytes, value: bytes):
+        return models.TealKeyValue(
+            key=base64.b64encode(key).decode(),
+            value=models.TealValue(type=1, bytes=base64.b64encode(value).decode()))
+
+    state = [
+        raw(b"gov", encoding.decode_address(governor)),
+        uint(b"mp", 1_000_000_000),
+        uint(b"rp", 1_000_000_000),
+        uint(b"co", 0),
+        uint(b"ar", 1),
+    ]
+    if pool_token is not None:
+        state.append(uint(b"p", pool_token))
+    return state
+
+
+def _call(sp, sender: Account, args: List[bytes], **kwargs) -> transaction.ApplicationCallTxn:
+    return transaction.ApplicationCallTxn(
+        sender=sender.get_address(), sp=sp, index=APP_ID,
+        on_complete=transaction.OnComplete.NoOpOC, app_args=args, **kwargs)
+
+
+def scenario(route: str, governor: Account, user: Account) -> List[transaction.Transaction]:
+    """A representative group calling ``route``."""
+    sp = transaction.SuggestedParams(1000, 1, 1001, base64.b64encode(bytes(32)).decode(), flat_fee=True)
+    app_address = get_application_address(APP_ID)
+
+    if route == "mint":
+        return [
+            _call(sp, user, [route.encode()], foreign_assets=[ASSET_ID]),
+            transaction.PaymentTxn(user.get_address(), sp, app_address, 1_001_000),
+        ]
+    if route == "redeem":
+        return [
+            _call(sp, user, [route.encode()], foreign_assets=[ASSET_ID]),
+            transaction.AssetTransferTxn(user.get_address(), sp, app_address, 1_000_000, ASSET_ID),
+        ]
+    if route == "set_governor":
+        return [_call(sp, governor, [b"set_governor"], accounts=[user.get_address()])]
+    if route == "set_mint_price":
+        return [_call(sp, governor, [b"set_mint_price", (990_000_000).to_bytes(8, "big")])]
+    if route == "join":
+        return [_call(sp, governor, [b"join", b"af/gov1:j{\"com\":1000000}"], accounts=[user.get_address()])]
+    return [_call(sp, governor, [route.encode()])]
+
+
+def dryrun_request(route: str, approval: bytes, clear: bytes) -> models.DryrunRequest:
+    governor = Account(account.generate_account()[0])
+    user = Account(account.generate_account()[0])
+    app_address = get_application_address(APP_ID)
+
+    txns = scenario(route, governor, user)
+    if len(txns) > 1:
+        transaction.assign_group_id(txns)
+    signed = [txn.sign(governor.get_private_key() if txn.sender == governor.get_address()
+                       else user.get_private_key()) for txn in txns]
+
+    app = models.Application(id=APP_ID, params=models.ApplicationParams(
+        creator=governor.get_address(),
+        approval_program=approval,
+        clear_state_program=clear,
+        global_state_schema=models.ApplicationStateSchema(num_uint=6, num_byte_slice=1),
+        local_state_schema=models.ApplicationStateSchema(num_uint=0, num_byte_slice=0),
+        global_state=_global_state(governor.get_address(), None if route == "bootstrap" else ASSET_ID),
+    ))
+
+    def acct(address: str, algos: int, walgo: int, **kwargs) -> models.Account:
+        return models.Account(
+            address=address, amount=algos, amount_without_pending_rewards=algos, status="Offline",
+            assets=[models.AssetHolding(amount=walgo, asset_id=ASSET_ID, creator=app_address, is_frozen=False)],
+            **kwargs)
+
+    pool_token = models.Asset(index=ASSET_ID, params=models.AssetParams(
+        creator=app_address, total=0xFFFFFFFFFFFFFFFF, decimals=6, name="wALGO", unit_name="wALGO"))
+    accounts = [
+        acct(app_address, 100_000_000, 10_000_000_000, created_assets=[pool_token]),
+        acct(user.get_address(), 100_000_000, 10_000_000),
+        acct(governor.get_address(), 100_000_000, 0),
+    ]
+    return models.DryrunRequest(txns=signed, apps=[app], accounts=accounts, round=1, latest_timestamp=1)
+
+
+def algod_backend(client) -> DryrunBackend:
+    """Runs dryrun requests against algod's /v2/teal/dryrun."""
+    return client.dryrun
+
+
+def _b64(value: Optional[str]) -> bytes:
+    return base64.b64decode(value) if value else b""
+
+
+def _addr(address: Optional[str]) -> bytes:
+    return encoding.decode_address(address) if address else bytes(32)
+
+
+def ledger_from_request(drr: models.DryrunRequest) -> Ledger:
+    """A `Ledger` holding the apps, accounts and assets of a dryrun request."""
+    ids = [app.id for app in drr.apps or []]
+    ledger = Ledger(round=drr.round or 1, timestamp=drr.latest_timestamp or 0)
+
+    for app in drr.apps or []:
+        params = app.params
+        state = {}
+        for kv in params.global_state or []:
+            value = kv.value
+            state[base64.b64decode(kv.key)] = _b64(value.bytes) if value.type == 1 else value.uint or 0
+        gs, ls = params.global_state_schema, params.local_state_schema
+        ledger.apps[app.id] = AppState(
+            _addr(params.creator), params.approval_program, params.clear_state_program,
+            (gs.num_uint or 0, gs.num_byte_slice or 0) if gs else (0, 0),
+            (ls.num_uint or 0, ls.num_byte_slice or 0) if ls else (0, 0),
+            global_state=state)
+
+    for acct in drr.accounts or []:
+        state = AccountState(acct.amount or 0)
+        for holding in acct.assets or []:
+            state.assets[holding.asset_id] = [holding.amount or 0, bool(holding.is_frozen)]
+        for asset in acct.created_assets or []:
+            p = asset.params
+            ledger.assets[asset.index] = AssetState(
+                _addr(p.creator), p.total or 0, p.decimals or 0, int(bool(p.default_frozen)),
+                (p.unit_name or "").encode(), (p.name or "").encode(), (p.url or "").encode(),
+                _b64(p.metadata_hash), _addr(p.manager), _addr(p.reserve), _addr(p.freeze), _addr(p.clawback))
+            state.created_assets.add(asset.index)
+            ids.append(asset.index)
+        ledger.accounts[_addr(acct.address)] = state
+
+    ledger.next_id = max(ids, default=0) + 1
+    return ledger
+
+
+def local_backend() -> DryrunBackend:
+    """Runs dryrun requests in process with the local AVM, no algod needed."""
+    return lambda drr: ledger_from_request(drr).dryrun(drr.txns)
+
+
+def _txn_cost(result: dict) -> int:
+    for key in ("budget-consumed", "cost"):
+        if result.get(key) is not None:
+            return result[key]
+    return len(result.get("app-call-trace") or [])
+
+
+def route_report(program: ProgramMap, response: dict, app_calls: int, hot_lines: int = 10) -> Dict[str, object]:
+    """Summarize the dryrun ``response`` of one route's group."""
+    cost = 0
+    depth = 0
+    hits: Counter = Counter()
+    messages: List[str] = []
+    passed = True
+    for result in response.get("txns") or []:
+        trace = result.get("app-call-trace")
+        if trace is None:
+            continue
+        cost += _txn_cost(result)
+        msgs = result.get("app-call-messages") or []
+        messages += msgs
+        passed = passed and "PASS" in msgs
+        for step in trace:
+            depth = max(depth, len(step.get("stack") or []))
+            line = program.line_of(step["pc"])
+            if line is not None:
+                hits[line] += 1
+    if response.get("error"):
+        passed = False
+        messages.append(response["error"])
+
+    budget = APP_CALL_BUDGET * app_calls
+    return {
+        "passed": passed,
+        "messages": messages,
+        "cost": cost,
+        "budget": budget,
+        "budget_headroom": budget - cost,
+        "max_stack_depth": depth,
+        "stack_headroom": MAX_STACK_DEPTH - depth,
+        "hot_lines": [dict(program.describe(line), hits=n) for line, n in hits.most_common(hot_lines)],
+    }
+
+
+def profile(run: DryrunBackend, routes: Optional[List[str]] = None, pool: Optional[AllyPool] = None,
+            hot_lines: int = 10) -> Dict[str, object]:
+    """Profile the approval program of ``pool``, route by route.
+
+    Args:
+        run: Executes a dryrun request, e.g. `algod_backend(client)`.
+        routes: Methods to profile, defaults to every user and admin route.
+        pool: Contract to profile, defaults to `AllyPool()`.
+        hot_lines: Number of most executed lines reported per route.
+    Returns:
+        A JSON serializable report of program size and per route cost.
+    """
+    pool = pool or AllyPool()
+    approval = ProgramMap(compileTeal(pool.approval_program(), mode=Mode.Application, version=5))
+    clear = assemble_program(compileTeal(pool.clear_program(), mode=Mode.Application, version=5))
+
+    report: Dict[str, object] = {
+        "program": {
+            "approval_bytes": len(approval.bytecode),
+            "clear_bytes": len(clear.bytecode),
+            "max_bytes": MAX_PROGRAM_BYTES,
+            "bytes_headroom": MAX_PROGRAM_BYTES - len(approval.bytecode),
+        },
+        "routes": {},
+    }
+    for route in routes or ROUTES:
+        drr = dryrun_request(route, approval.bytecode, clear.bytecode)
+        app_calls = sum(1 for stxn in drr.txns if stxn.transaction.type == "appl")
+        report["routes"][route] = route_report(approval, run(drr), app_calls, hot_lines)
+    return report
+
+
+def profile_summary(report: Dict[str, object]) -> List[Tuple[str, int, int, int]]:
+    """(route, cost, budget headroom, max stack depth) rows of a report."""
+    return [(route, r["cost"], r["budget_headroom"], r["max_stack_depth"])
+            for route, r in report["routes"].items()]
@@ -0,0 +1,53 @@
+import weakref
+from typing import Callable, List, Optional
+
+RoundListener = Callable[[int], None]
+
+# per client callbacks, called whenever a newer round is seen for that client.
+# Bound methods are held weakly: their owners (params providers, state caches)
+# hang off the client themselves, and a strong reference here would keep the
+# client, a weak key, alive forever.
+_listeners: "weakref.WeakKeyDictionary[object, List[Callable[[], Optional[RoundListener]]]]" = \
+    weakref.WeakKeyDictionary()
+# newest round reported per client
+_last_rounds: "weakref.WeakKeyDictionary[object, int]" = weakref.WeakKeyDictionary()
+
+
+def _ref(listener: RoundListener) -> Callable[[], Optional[RoundListener]]:
+    if hasattr(listener, "__self__"):
+        return weakref.WeakMethod(listener)
+    return lambda: listener
+
+
+def add_round_listener(client, listener: RoundListener) -> None:
+    _listeners.setdefault(client, []).append(_ref(listener))
+
+
+def remove_round_listener(client, listener: RoundListener) -> None:
+    listeners = _listeners.get(client, [])
+    for ref in list(listeners):
+        if ref() == listener:
+            listeners.remove(ref)
+
+
+def last_round(client) -> int:
+    """The newest round reported for ``client`` so far, 0 if none."""
+    return _last_rounds.get(client, 0)
+
+
+def observe_round(client, round: int) -> None:
+    """Report that ``client``'s node has reached ``round``.
+
+    Called wherever a round number comes back from algod (status,
+    status_after_block), so round scoped caches can drop stale entries
+    without polling for it themselves.
+    """
+    if round > _last_rounds.get(client, 0):
+        _last_rounds[client] = round
+    listeners = _listeners.get(client, [])
+    for ref in list(listeners):
+        listener = ref()
+        if listener is None:
+            listeners.remove(ref)
+        else:
+            listener(round)
@@ -0,0 +1,110 @@
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from algosdk.future import transaction
+
+from .account import Signer, sign_transactions
+
+# batches smaller than this are signed in process: below it, starting the
+# chunks and shipping them to the workers costs about what it saves
+MIN_PARALLEL = 512
+MIN_CHUNK = 64
+# signers a worker keeps decoded between chunks
+MAX_WORKER_SIGNERS = 4096
+
+
+def default_workers() -> int:
+    """$ALLY_SIGN_WORKERS, else the number of CPUs."""
+    return int(os.environ.get("ALLY_SIGN_WORKERS") or os.cpu_count() or 1)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_signing_pool(workers: int) -> ProcessPoolExecutor:
+    """The process wide signing pool, restarted when ``workers`` changes.
+
+    Workers are spawned rather than forked, so a process with node client,
+    tracker or server threads can use the pool safely.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_signing_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+_worker_signers: Dict[str, Signer] = {}
+
+
+def _sign_chunk(keys: List[str], txns: List[transaction.Transaction], which: List[int]) -> List[bytes]:
+    # runs in a worker: encode and sign txns[i] with keys[which[i]]
+    if len(_worker_signers) > MAX_WORKER_SIGNERS:
+        _worker_signers.clear()
+    signers = []
+    for key in keys:
+        signer = _worker_signers.get(key)
+        if signer is None:
+            signer = _worker_signers[key] = Signer(key)
+        signers.append(signer)
+    return [signers[i].raw_sign(txn) for txn, i in zip(txns, which)]
+
+
+def sign_parallel(txns: List[transaction.Transaction], signers: List[Signer], workers: Optional[int] = None,
+                  chunk_size: Optional[int] = None,
+                  min_parallel: int = MIN_PARALLEL) -> List[transaction.SignedTransaction]:
+    """Sign a large batch of transactions across a pool of processes.
+
+    Workers get the transactions in chunks, msgpack encode and sign them and
+    send back only the signatures, which are attached to the caller's own
+    transaction objects: the result is in ``txns`` order and every txid (and
+    group id, assigned beforehand) is exactly as built. Small batches, or a
+    single worker, are signed in process with `sign_transactions`.
+
+    Args:
+        txns: Transactions, with their group ids already assigned.
+        signers: The signer of each transaction.
+        workers: Worker processes, defaults to `default_workers`.
+        chunk_size: Transactions per task, defaults to a quarter of each worker's share.
+        min_parallel: Smallest batch sent to the pool.
+    Returns:
+        The signed transactions, in order.
+    """
+    if len(txns) != len(signers):
+        raise Exception(f"{len(txns)} transactions but {len(signers)} signers")
+    workers = workers or default_workers()
+    if workers <= 1 or len(txns) < max(min_parallel, 2):
+        return sign_transactions(txns, signers)
+
+    chunk_size = chunk_size or max(MIN_CHUNK, math.ceil(len(txns) / (workers * 4)))
+    pool = get_signing_pool(workers)
+    futures = []
+    for start in range(0, len(txns), chunk_size):
+        # each distinct key goes once per chunk
+        keys: Dict[str, int] = {}
+        which = [keys.setdefault(s.private_key, len(keys)) for s in signers[start:start + chunk_size]]
+        futures.append(pool.submit(_sign_chunk, list(keys), txns[start:start + chunk_size], which))
+
+    signed = []
+    for start, future in zip(range(0, len(txns), chunk_size), futures):
+        for txn, signer, signature in zip(txns[start:start + chunk_size], signers[start:start + chunk_size],
+                                          future.result()):
+            signed.append(signer.signed(txn, signature))
+    return signed
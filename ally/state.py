@@ -0,0 +1,220 @@
+import copy
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from algosdk.v2client.algod import AlgodClient
+
+from .params import DEFAULT_TTL
+from .rounds import add_round_listener, last_round, observe_round
+
+
+class StateCache:
+    """Read-through cache for `account_info` and `application_info`.
+
+    Entries are keyed by address or app id and belong to the round they were
+    read in: they are dropped as soon as a newer round is observed (see
+    `ally.rounds.observe_round`), or after ``ttl`` seconds if no round
+    information arrives in the meantime. Concurrent reads of the same key
+    started in the same round are merged into a single in-flight request. A
+    read that a newer round overtakes is returned to its callers but not cached.
+
+    Every caller gets its own copy of the response, so mutating it doesn't
+    change what later reads see. The client is held weakly, as caches are kept
+    per client in `_caches`.
+    """
+
+    def __init__(self, client: AlgodClient, ttl: float = DEFAULT_TTL) -> None:
+        self._client = weakref.ref(client)
+        self.ttl = ttl
+        self.round = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Hashable, Tuple[int, float, Any]] = {}
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        add_round_listener(client, self.observe_round)
+
+    @property
+    def client(self) -> AlgodClient:
+        client = self._client()
+        if client is None:
+            raise Exception("the client of this state cache is gone")
+        return client
+
+    def account_info(self, address: str) -> Dict[str, Any]:
+        return self._get(("account", address), lambda: self.client.account_info(address))
+
+    def application_info(self, app_id: int) -> Dict[str, Any]:
+        return self._get(("app", app_id), lambda: self.client.application_info(app_id))
+
+    def _get(self, key: Hashable, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                round, fetched_at, value = entry
+                if round >= self.round and time.monotonic() - fetched_at <= self.ttl:
+                    self.hits += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+
+            # only reads started in the current round are shared
+            started = self.round
+            future = self._inflight.get((key, started))
+            leader = future is None
+            if leader:
+                future = self._inflight[(key, started)] = Future()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[(key, started)]
+            future.set_exception(e)
+            raise
+
+        # account_info reports the round it was read at, which is free round info;
+        # other reads belong to the round they started in
+        round = value.get("round", started)
+        if round > self.round:
+            observe_round(self.client, round)
+        with self._lock:
+            del self._inflight[(key, started)]
+            # a read overtaken by a newer round is returned, but not cached
+            if round >= self.round:
+                self._entries[key] = (round, time.monotonic(), value)
+        future.set_result(value)
+        return copy.deepcopy(value)
+
+    def observe_round(self, round: int) -> None:
+        with self._lock:
+            if round > self.round:
+                self.round = round
+                self._entries.clear()
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+_caches: "weakref.WeakKeyDictionary[AlgodClient, StateCache]" = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def get_state_cache(client: AlgodClient) -> StateCache:
+    with _caches_lock:
+        cache = _caches.get(client)
+        if cache is None:
+            cache = _caches[client] = StateCache(client)
+        return cache
+
+
+# how old the mirror's last full read may get before reads of `state` refetch it
+DEFAULT_MAX_AGE = 5.0
+
+
+class AppStateMirror:
+    """Local copy of an app's global state kept current from confirmations.
+
+    Starts from one `application_info` snapshot, then applies the
+    ``global-state-delta`` of each confirmed transaction passed to `apply`.
+    The mirror is only exact for the writes passed to `apply`: it can't see
+    transactions sent by anyone else, so reading `state` refetches it once the
+    last full read is more than ``max_age`` seconds old (None never expires
+    it, for callers that track age themselves). It also refetches on a delta
+    older than one already applied, a delta it can't decode, or (with
+    ``max_lag``) a delta more than ``max_lag`` rounds after the last sync.
+
+    A snapshot costs a single request. Its round is not known exactly, so
+    `snapshot_round` is the newest round observed for the client beforehand
+    (see `ally.rounds.last_round`): deltas at or before it are skipped, later
+    ones are applied even if the snapshot already includes them.
+    """
+
+    def __init__(
+        self,
+        client: AlgodClient,
+        app_id: int,
+        max_lag: Optional[int] = None,
+        max_age: Optional[float] = DEFAULT_MAX_AGE,
+    ) -> None:
+        self.client = client
+        self.app_id = app_id
+        self.max_lag = max_lag
+        self.max_age = max_age
+        self._state: Dict[bytes, Any] = {}
+        self._synced_at = 0.0
+        self.snapshot_round = 0
+        self.round = 0
+        self.refetches = 0
+        self.refresh()
+
+    @property
+    def state(self) -> Dict[bytes, Any]:
+        if self.max_age is not None and time.monotonic() - self._synced_at > self.max_age:
+            self.refresh()
+        return self._state
+
+    def refresh(self, round: int = 0) -> None:
+        """Refetch the whole state.
+
+        Args:
+            round: A round the snapshot is known to include, if any.
+        """
+        from .utils import decode_state
+
+        # the snapshot includes at least every transaction up to this round
+        round = max(round, last_round(self.client))
+        app_info = self.client.application_info(self.app_id)
+        self._state = decode_state(app_info["params"].get("global-state", []))
+        self._synced_at = time.monotonic()
+        self.snapshot_round = self.round = max(self.round, round)
+        self.refetches += 1
+
+    def _targets(self, response) -> bool:
+        txn = response.txn.get("txn", response.txn)
+        app_id = txn.get("apid") or response.application_index
+        return app_id == self.app_id
+
+    def apply(self, response) -> bool:
+        """Apply a confirmed transaction's delta.
+
+        Args:
+            response: `PendingTxnResponse` of a confirmed transaction.
+        Returns:
+            True if the mirror changed (by the delta or a refetch).
+        """
+        from .utils import decode_state_delta
+
+        round = response.confirmed_round
+        if not round or round <= self.snapshot_round or not self._targets(response):
+            return False
+
+        if round < self.round or (self.max_lag is not None and round - self.round > self.max_lag):
+            self.refresh(round)
+            return True
+
+        try:
+            changes = decode_state_delta(response.global_state_delta or [])
+        except Exception:
+            self.refresh(round)
+            return True
+
+        for key, value in changes.items():
+            if value is None:
+                self._state.pop(key, None)
+            else:
+                self._state[key] = value
+        self.round = round
+        return True
@@ -0,0 +1,3 @@
+from .assembler import AssemblerError, Program, assemble, assemble_program
+from .avm import LedgerError, LogicError
+from .ledger import Ledger
@@ -0,0 +1,280 @@
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .assembler import _tokenize, assemble_program
+from .opcodes import op_cost
+
+BRANCHES = {"b", "bnz", "bz"}
+TERMINATORS = {"return", "err", "retsub"}
+# opcodes that read scratch space with a slot only known at run time
+DYNAMIC_LOADS = {"loads", "gload", "gloads", "gloadss"}
+
+
+class AnalyzerError(Exception):
+    pass
+
+
+class _Unbounded(Exception):
+    """Raised when a path loops back on itself, so no static bound exists."""
+
+
+class Instruction(NamedTuple):
+    line: int
+    op: str
+    args: List[str]
+
+
+class Block(NamedTuple):
+    start: int
+    end: int
+    # successor block starts, not counting subroutine calls
+    succs: Tuple[int, ...]
+
+
+def parse(teal: str) -> Tuple[int, List[Instruction], Dict[str, int]]:
+    """Split a TEAL source into its version, instructions and label positions."""
+    version = 1
+    instructions: List[Instruction] = []
+    labels: Dict[str, int] = {}
+    for lineno, text in enumerate(teal.splitlines(), start=1):
+        fields = _tokenize(text)
+        if not fields:
+            continue
+        if fields[0] == "#pragma":
+            if len(fields) > 2 and fields[1] == "version":
+                version = int(fields[2])
+            continue
+        if fields[0].endswith(":"):
+            labels[fields[0][:-1]] = len(instructions)
+            fields = fields[1:]
+            if not fields:
+                continue
+        instructions.append(Instruction(lineno, fields[0], fields[1:]))
+    return version, instructions, labels
+
+
+def dispatch_routes(teal: str) -> Dict[str, str]:
+    """Map the labels of a `Cond` router's branches to what they dispatch on.
+
+    A branch compiles to `<operand>; ==; bnz <label>`. Method names come from
+    `byte "name"` operands, on completions from named ints, and the create
+    branch from `txn ApplicationID; int 0`.
+    """
+    _, instructions, _ = parse(teal)
+    routes: Dict[str, str] = {}
+    for i in range(2, len(instructions)):
+        if instructions[i].op != "bnz" or instructions[i - 1].op != "==":
+            continue
+        target = instructions[i].args[0]
+        operand = instructions[i - 2]
+        if operand.op == "byte" and operand.args and operand.args[0].startswith('"'):
+            routes[target] = operand.args[0][1:-1]
+        elif operand.op == "int" and not operand.args[0][0].isdigit():
+            routes[target] = operand.args[0]
+        elif (operand.op == "int" and operand.args[0] == "0" and i >= 3
+              and instructions[i - 3].op == "txn" and instructions[i - 3].args == ["ApplicationID"]):
+            routes[target] = "create"
+    return routes
+
+
+class _Graph:
+    def __init__(self, teal: str) -> None:
+        self.version, self.instructions, self.labels = parse(teal)
+        n = len(self.instructions)
+        for label, target in self.labels.items():
+            if target > n:
+                raise AnalyzerError(f"label {label} is past the end of the program")
+
+        leaders = {0} | set(self.labels.values())
+        for i, instr in enumerate(self.instructions):
+            if instr.op in BRANCHES or instr.op in TERMINATORS:
+                leaders.add(i + 1)
+        starts = sorted(s for s in leaders if s < n)
+
+        self.blocks: Dict[int, Block] = {}
+        for start, end in zip(starts, starts[1:] + [n]):
+            last = self.instructions[end - 1]
+            if last.op == "b":
+                succs: Tuple[int, ...] = (self.target(last),)
+            elif last.op in ("bnz", "bz"):
+                succs = (self.target(last), end)
+            elif last.op in TERMINATORS:
+                succs = ()
+            else:
+                succs = (end,)
+            self.blocks[start] = Block(start, end, tuple(s for s in succs if s < n))
+
+        self.preds: Dict[int, List[int]] = {start: [] for start in self.blocks}
+        for block in self.blocks.values():
+            for succ in block.succs:
+                self.preds[succ].append(block.start)
+
+        self._tail: Dict[int, int] = {}
+        self._head: Dict[int, int] = {}
+        self._in_tail: Set[int] = set()
+        self._in_head: Set[int] = set()
+
+    def target(self, instr: Instruction) -> int:
+        label = instr.args[0]
+        if label not in self.labels:
+            raise AnalyzerError(f"line {instr.line}: unknown label {label}")
+        return self.labels[label]
+
+    def block_cost(self, start: int) -> int:
+        block = self.blocks[start]
+        cost = 0
+        for instr in self.instructions[block.start:block.end]:
+            cost += op_cost(instr.op, self.version)
+            if instr.op == "callsub":
+                cost += self.tail(self.target(instr))
+        return cost
+
+    def tail(self, start: int) -> int:
+        """Worst case cost from the start of a block to the end of its path."""
+        if start in self._tail:
+            return self._tail[start]
+        if start in self._in_tail:
+            raise _Unbounded()
+        self._in_tail.add(start)
+        try:
+            succs = self.blocks[start].succs
+            cost = self.block_cost(start) + max((self.tail(s) for s in succs), default=0)
+        finally:
+            self._in_tail.discard(start)
+        self._tail[start] = cost
+        return cost
+
+    def head(self, start: int) -> int:
+        """Worst case cost from the program entry to the start of a block."""
+        if start == 0:
+            return 0
+        if start in self._head:
+            return self._head[start]
+        if start in self._in_head:
+            raise _Unbounded()
+        self._in_head.add(start)
+        try:
+            preds = self.preds[start]
+            if not preds:
+                raise AnalyzerError(f"block at instruction {start} is unreachable from the entry")
+            cost = max(self.head(p) + self.block_cost(p) for p in preds)
+        finally:
+            self._in_head.discard(start)
+        self._head[start] = cost
+        return cost
+
+    def reachable(self, start: int) -> List[int]:
+        seen = {start}
+        stack = [start]
+        while stack:
+            for succ in self.blocks[stack.pop()].succs:
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append(succ)
+        return sorted(seen)
+
+
+def _bounded(f, *args) -> Optional[int]:
+    try:
+        return f(*args)
+    except _Unbounded:
+        return None
+
+
+def analyze(teal: str) -> Dict[str, object]:
+    """Static size and cost figures of a TEAL program.
+
+    Costs are upper bounds in opcode budget units: the worst case over every
+    path, and for each dispatch branch (see `dispatch_routes`) the worst path
+    through it. Subroutine calls count the subroutine's worst case. Programs
+    with loops or recursion get None where no static bound exists.
+
+    Returns:
+        A JSON serializable dict with ``version``, ``bytes``,
+        ``worst_case_cost``, ``branches`` (per route cost and subroutine
+        calls), ``subroutines`` (call sites and cost) and ``dead_stores``,
+        scratch slots that are written but never read.
+    """
+    program = assemble_program(teal)
+    graph = _Graph(teal)
+
+    # the assembler may prepend intcblock/bytecblock, each run once
+    entry_cost = _constant_blocks_cost(program.bytecode)
+
+    worst = _bounded(graph.tail, 0) if graph.blocks else 0
+
+    branches: Dict[str, Dict[str, object]] = {}
+    for label, route in dispatch_routes(teal).items():
+        start = graph.labels[label]
+        head = _bounded(graph.head, start)
+        tail = _bounded(graph.tail, start)
+        calls: Dict[str, int] = {}
+        for block in graph.reachable(start):
+            for instr in graph.instructions[block:graph.blocks[block].end]:
+                if instr.op == "callsub":
+                    calls[instr.args[0]] = calls.get(instr.args[0], 0) + 1
+        branches[route] = {
+            "label": label,
+            "cost": None if head is None or tail is None else entry_cost + head + tail,
+            "callsubs": dict(sorted(calls.items())),
+        }
+
+    subroutines: Dict[str, Dict[str, object]] = {}
+    for instr in graph.instructions:
+        if instr.op == "callsub":
+            sub = subroutines.setdefault(instr.args[0], {"call_sites": 0, "cost": None})
+            sub["call_sites"] += 1
+    for name, sub in subroutines.items():
+        sub["cost"] = _bounded(graph.tail, graph.labels[name])
+
+    return {
+        "version": program.version,
+        "bytes": len(program.bytecode),
+        "worst_case_cost": None if worst is None else entry_cost + worst,
+        "branches": branches,
+        "subroutines": dict(sorted(subroutines.items())),
+        "dead_stores": dead_stores(graph.instructions),
+    }
+
+
+def _constant_blocks_cost(bytecode: bytes) -> int:
+    # intcblock (0x20) and bytecblock (0x26) come first when the assembler
+    # hoists repeated constants, and each costs one to execute
+    cost = 0
+    pc = 1
+    while pc < len(bytecode) and bytecode[pc] in (0x20, 0x26) and cost < 2:
+        cost += 1
+        pc = _skip_constant_block(bytecode, pc)
+    return cost
+
+
+def _skip_constant_block(bytecode: bytes, pc: int) -> int:
+    def uvarint(pc: int) -> Tuple[int, int]:
+        value = shift = 0
+        while True:
+            b = bytecode[pc]
+            value |= (b & 0x7F) << shift
+            pc += 1
+            if b < 0x80:
+                return value, pc
+            shift += 7
+
+    is_bytes = bytecode[pc] == 0x26
+    count, pc = uvarint(pc + 1)
+    for _ in range(count):
+        value, pc = uvarint(pc)
+        if is_bytes:
+            pc += value
+    return pc
+
+
+def dead_stores(instructions: List[Instruction]) -> List[int]:
+    """Scratch slots stored to but never loaded.
+
+    Returns an empty list when the program loads slots chosen at run time,
+    since any store could then be read.
+    """
+    if any(instr.op in DYNAMIC_LOADS for instr in instructions):
+        return []
+    stored = {int(instr.args[0]) for instr in instructions if instr.op == "store"}
+    loaded = {int(instr.args[0]) for instr in instructions if instr.op == "load"}
+    return sorted(stored - loaded)
@@ -0,0 +1,396 @@
+"""Pure python TEAL assembler.
+
+Produces the same bytecode as algod's ``/v2/teal/compile`` for the TEAL
+versions the pool contracts target, including algod's constant block
+optimization: from v4 on, ``int``/``byte`` constants used more than once go
+into ``intcblock``/``bytecblock`` ordered by use count, and constants used a
+single time are inlined with ``pushint``/``pushbytes``.
+"""
+import base64
+import hashlib
+import re
+from typing import Dict, List, NamedTuple, Tuple, Union
+
+from algosdk import encoding
+
+from . import opcodes
+from .opcodes import OPS_BY_NAME, NAMED_INTS, FIELD_TABLES
+
+# first version that sorts constant blocks and inlines single use constants
+OPTIMIZE_CONSTANTS_VERSION = 4
+# first version that allows backwards branches
+BACK_BRANCH_VERSION = 4
+DEFAULT_VERSION = 1
+
+Constant = Union[int, bytes]
+
+
+class AssemblerError(Exception):
+    def __init__(self, line: int, message: str) -> None:
+        super().__init__(f"{line}: {message}")
+        self.line = line
+
+
+class _ConstRef(NamedTuple):
+    value: Constant
+    line: int
+
+
+class _LabelRef(NamedTuple):
+    opcode: int
+    label: str
+    line: int
+
+
+class Program(NamedTuple):
+    bytecode: bytes
+    version: int
+    # maps each instruction's pc to its 1-based source line
+    pc_to_line: Dict[int, int]
+
+
+def encode_uvarint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _tokenize(line: str) -> List[str]:
+    """Split a source line into fields, keeping quoted strings whole and
+    dropping `//` comments."""
+    fields = []
+    i, n = 0, len(line)
+    while i < n:
+        c = line[i]
+        if c.isspace():
+            i += 1
+            continue
+        if line.startswith("//", i):
+            break
+        start = i
+        if c == '"':
+            i += 1
+            while i < n and line[i] != '"':
+                i += 2 if line[i] == "\\" else 1
+            i += 1
+        else:
+            while i < n and not line[i].isspace():
+                if line[i] == '"':
+                    # e.g. base64("...") is one field
+                    i += 1
+                    while i < n and line[i] != '"':
+                        i += 2 if line[i] == "\\" else 1
+                i += 1
+        fields.append(line[start:i])
+    return fields
+
+
+def parse_uint(token: str) -> int:
+    if token in NAMED_INTS:
+        return NAMED_INTS[token]
+    value = int(token, 0) if not re.fullmatch(r"0[0-7]+", token) else int(token, 8)
+    if value < 0 or value >= 1 << 64:
+        raise ValueError(f"{token} is not a uint64")
+    return value
+
+
+def _parse_string_literal(token: str) -> bytes:
+    if len(token) < 2 or token[0] != '"' or token[-1] != '"':
+        raise ValueError(f"malformed string literal {token}")
+    body = token[1:-1]
+    out = bytearray()
+    i = 0
+    escapes = {"n": b"\n", "r": b"\r", "t": b"\t", "\\": b"\\", '"': b'"'}
+    while i < len(body):
+        c = body[i]
+        if c != "\\":
+            out += c.encode("utf-8")
+            i += 1
+            continue
+        if i + 1 >= len(body):
+            raise ValueError("non-terminated escape sequence")
+        e = body[i + 1]
+        if e in escapes:
+            out += escapes[e]
+            i += 2
+        elif e == "x" and i + 3 < len(body):
+            out.append(int(body[i + 2:i + 4], 16))
+            i += 4
+        else:
+            raise ValueError(f"invalid escape sequence \\{e}")
+    return bytes(out)
+
+
+def _b32decode(text: str) -> bytes:
+    return base64.b32decode(text + "=" * (-len(text) % 8))
+
+
+def parse_bytes(args: List[str]) -> Tuple[bytes, int]:
+    """Parse a byte constant, returning it and the number of fields consumed."""
+    if not args:
+        raise ValueError("byte constant expected")
+    arg = args[0]
+    for prefix, decode in (("base32(", _b32decode), ("b32(", _b32decode),
+                           ("base64(", base64.b64decode), ("b64(", base64.b64decode)):
+        if arg.startswith(prefix):
+            if not arg.endswith(")"):
+                raise ValueError(f"{prefix} arg missing close paren")
+            return decode(arg[len(prefix):-1]), 1
+    if arg in ("base32", "b32", "base64", "b64"):
+        if len(args) < 2:
+            raise ValueError(f"need literal after '{arg}'")
+        if arg in ("base32", "b32"):
+            return _b32decode(args[1]), 2
+        return base64.b64decode(args[1]), 2
+    if arg.startswith("0x"):
+        return bytes.fromhex(arg[2:]), 1
+    if arg.startswith('"'):
+        return _parse_string_literal(arg), 1
+    raise ValueError(f"byte arg did not parse: {arg}")
+
+
+class _Assembler:
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.version = DEFAULT_VERSION
+        # instruction stream: bytes, constant refs and branch refs
+        self.chunks: List[Tuple[int, Union[bytes, _ConstRef, _LabelRef]]] = []
+        self.labels: Dict[str, int] = {}
+        self.intc: List[int] = []
+        self.bytec: List[bytes] = []
+        self.has_intcblock = False
+        self.has_bytecblock = False
+
+    def emit(self, line: int, chunk: Union[bytes, _ConstRef, _LabelRef]) -> None:
+        self.chunks.append((line, chunk))
+
+    def assemble(self) -> Program:
+        lines = self.source.splitlines()
+        for lineno, text in enumerate(lines, start=1):
+            fields = _tokenize(text)
+            if not fields:
+                continue
+            if fields[0] == "#pragma":
+                self.pragma(lineno, fields)
+                continue
+            if fields[0].endswith(":"):
+                label = fields[0][:-1]
+                if label in self.labels:
+                    raise AssemblerError(lineno, f"duplicate label {label}")
+                self.labels[label] = len(self.chunks)
+                fields = fields[1:]
+                if not fields:
+                    continue
+            try:
+                self.instruction(lineno, fields[0], fields[1:])
+            except AssemblerError:
+                raise
+            except (ValueError, IndexError, KeyError) as e:
+                raise AssemblerError(lineno, f"{fields[0]}: {e}")
+        return self.link()
+
+    def pragma(self, line: int, fields: List[str]) -> None:
+        if len(fields) < 2:
+            raise AssemblerError(line, "empty pragma")
+        if fields[1] == "version":
+            if self.chunks:
+                raise AssemblerError(line, "#pragma version is only allowed before instructions")
+            self.version = int(fields[2])
+            if self.version > opcodes.MAX_TEAL_VERSION:
+                raise AssemblerError(line, f"unsupported version {self.version}")
+
+    def field(self, kind: str, name: str) -> int:
+        table = FIELD_TABLES[kind]
+        if name not in table:
+            raise ValueError(f"unknown field {name}")
+        return table.index(name)
+
+    def instruction(self, line: int, name: str, args: List[str]) -> None:
+        # pseudo-ops
+        if name == "int":
+            self.emit(line, _ConstRef(parse_uint(args[0]), line))
+            return
+        if name == "byte":
+            value, used = parse_bytes(args)
+            self.emit(line, _ConstRef(value, line))
+            return
+        if name == "addr":
+            self.emit(line, _ConstRef(encoding.decode_address(args[0]), line))
+            return
+        if name == "method":
+            signature = _parse_string_literal(args[0])
+            self.emit(line, _ConstRef(hashlib.new("sha512_256", signature).digest()[:4], line))
+            return
+
+        # `txn Accounts 1` style shorthands for the array forms
+        if name in ("txn", "gtxn", "gtxns", "itxn", "gitxn"):
+            nfield = 1 if name in ("txn", "gtxns", "itxn") else 2
+            if len(args) == nfield + 1:
+                name = {"txn": "txna", "gtxn": "gtxna", "gtxns": "gtxnsa",
+                        "itxn": "itxna", "gitxn": "gitxna"}[name]
+
+        spec = OPS_BY_NAME.get(name)
+        if spec is None:
+            raise AssemblerError(line, f"unknown opcode: {name}")
+        if spec.version > self.version:
+            raise AssemblerError(line, f"{name} opcode was introduced in TEAL v{spec.version}")
+        if len(args) != len(spec.immediates) and spec.immediates not in ((opcodes.INTS,), (opcodes.BYTESLIST,), (opcodes.BYTES,)):
+            raise AssemblerError(line, f"{name} expects {len(spec.immediates)} immediate arguments")
+
+        out = bytearray([spec.opcode])
+        for kind, arg in zip(spec.immediates, args):
+            if kind == opcodes.LABEL:
+                self.emit(line, _LabelRef(spec.opcode, arg, line))
+                return
+            if kind == opcodes.UINT8:
+                value = parse_uint(arg)
+                if value > 0xFF:
+                    raise ValueError(f"immediate {arg} does not fit in a byte")
+                out.append(value)
+            elif kind == opcodes.VARUINT:
+                out += encode_uvarint(parse_uint(arg))
+            elif kind == opcodes.BYTES:
+                value, used = parse_bytes(args)
+                out += encode_uvarint(len(value)) + value
+            elif kind == opcodes.INTS:
+                values = [parse_uint(a) for a in args]
+                out += encode_uvarint(len(values))
+                for v in values:
+                    out += encode_uvarint(v)
+                self.intc = values
+                self.has_intcblock = True
+            elif kind == opcodes.BYTESLIST:
+                values = []
+                rest = args
+                while rest:
+                    value, used = parse_bytes(rest)
+                    values.append(value)
+                    rest = rest[used:]
+                out += encode_uvarint(len(values))
+                for v in values:
+                    out += encode_uvarint(len(v)) + v
+                self.bytec = values
+                self.has_bytecblock = True
+            else:
+                out.append(self.field(kind, arg))
+        self.emit(line, bytes(out))
+
+    def constant_blocks(self) -> Tuple[List[int], List[bytes], Dict[Constant, bool]]:
+        """Decide the constant blocks, and which constants are inlined."""
+        refs = [c for _, c in self.chunks if isinstance(c, _ConstRef)]
+        inline: Dict[Constant, bool] = {}
+
+        def block(values: List[Constant], fixed: bool) -> List[Constant]:
+            if fixed:
+                return values
+            # first use order, then stable sort by use count
+            order: List[Constant] = []
+            counts: Dict[Constant, int] = {}
+            for v in values:
+                if v not in counts:
+                    order.append(v)
+                    counts[v] = 0
+                counts[v] += 1
+            if self.version < OPTIMIZE_CONSTANTS_VERSION:
+                return order
+            order.sort(key=lambda v: -counts[v])
+            for v in order:
+                inline[v] = counts[v] == 1
+            return [v for v in order if counts[v] > 1]
+
+        ints = [r.value for r in refs if isinstance(r.value, int)]
+        byts = [r.value for r in refs if isinstance(r.value, bytes)]
+        intc = block(ints, self.has_intcblock) if not self.has_intcblock else self.intc
+        bytec = block(byts, self.has_bytecblock) if not self.has_bytecblock else self.bytec
+        return intc, bytec, inline
+
+    def link(self) -> Program:
+        intc, bytec, inline = self.constant_blocks()
+        int_index = {v: i for i, v in enumerate(intc)}
+        byte_index = {v: i for i, v in enumerate(bytec)}
+
+        # render constant references; branches are fixed size
+        rendered: List[Tuple[int, Union[bytes, _LabelRef]]] = []
+        for line, chunk in self.chunks:
+            if isinstance(chunk, _ConstRef):
+                chunk = self.render_const(chunk, int_index, byte_index, inline)
+            rendered.append((line, chunk))
+
+        offsets = []
+        pc = 0
+        for _, chunk in rendered:
+            offsets.append(pc)
+            pc += len(chunk) if isinstance(chunk, bytes) else 3
+        end = pc
+
+        code = bytearray()
+        pc_to_line: Dict[int, int] = {}
+        for i, (line, chunk) in enumerate(rendered):
+            pc_to_line[offsets[i]] = line
+            if isinstance(chunk, bytes):
+                code += chunk
+                continue
+            if chunk.label not in self.labels:
+                raise AssemblerError(chunk.line, f"reference to undefined label {chunk.label}")
+            target_chunk = self.labels[chunk.label]
+            target = offsets[target_chunk] if target_chunk < len(offsets) else end
+            jump = target - (offsets[i] + 3)
+            if jump > 0x7FFF:
+                raise AssemblerError(chunk.line, f"label {chunk.label} is too far away")
+            if jump < 0 and self.version < BACK_BRANCH_VERSION:
+                raise AssemblerError(chunk.line, f"label {chunk.label} is before reference but only forward jumps are allowed before v4")
+            code.append(chunk.opcode)
+            code += (jump & 0xFFFF).to_bytes(2, "big")
+
+        prefix = bytearray(encode_uvarint(self.version))
+        if intc and not self.has_intcblock:
+            prefix.append(OPS_BY_NAME["intcblock"].opcode)
+            prefix += encode_uvarint(len(intc))
+            for v in intc:
+                prefix += encode_uvarint(v)
+        if bytec and not self.has_bytecblock:
+            prefix.append(OPS_BY_NAME["bytecblock"].opcode)
+            prefix += encode_uvarint(len(bytec))
+            for v in bytec:
+                prefix += encode_uvarint(len(v)) + v
+
+        shift = len(prefix)
+        return Program(
+            bytes(prefix + code),
+            self.version,
+            {pc + shift: line for pc, line in pc_to_line.items()},
+        )
+
+    def render_const(self, ref: _ConstRef, int_index: Dict[int, int],
+                     byte_index: Dict[bytes, int], inline: Dict[Constant, bool]) -> bytes:
+        value = ref.value
+        if isinstance(value, int):
+            if inline.get(value):
+                return bytes([OPS_BY_NAME["pushint"].opcode]) + encode_uvarint(value)
+            if value not in int_index:
+                raise AssemblerError(ref.line, f"int {value} used without {value} in intcblock")
+            i = int_index[value]
+            if i < 4:
+                return bytes([OPS_BY_NAME["intc_0"].opcode + i])
+            return bytes([OPS_BY_NAME["intc"].opcode, i])
+        if inline.get(value):
+            return bytes([OPS_BY_NAME["pushbytes"].opcode]) + encode_uvarint(len(value)) + value
+        if value not in byte_index:
+            raise AssemblerError(ref.line, f"byte {value!r} used without it in bytecblock")
+        i = byte_index[value]
+        if i < 4:
+            return bytes([OPS_BY_NAME["bytec_0"].opcode + i])
+        return bytes([OPS_BY_NAME["bytec"].opcode, i])
+
+
+def assemble_program(teal: str) -> Program:
+    """Assemble TEAL source, keeping the pc to source line map."""
+    return _Assembler(teal).assemble()
+
+
+def assemble(teal: str) -> bytes:
+    """Assemble TEAL source into program bytecode."""
+    return assemble_program(teal).bytecode
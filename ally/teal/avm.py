@@ -0,0 +1,1302 @@
+import base64
+import hashlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import opcodes
+from .opcodes import FIELD_TABLES, OPS_BY_CODE, TXN_ARRAY_FIELDS, op_cost
+
+MAX_UINT = 2 ** 64 - 1
+MAX_STACK_DEPTH = 1000
+MAX_BYTES_LENGTH = 4096
+MAX_LOGS = 32
+MAX_LOG_SIZE = 1024
+APP_CALL_BUDGET = 700
+MAX_INNER_TXNS = 16
+ZERO_ADDRESS = bytes(32)
+
+TYPE_ENUMS = {"pay": 1, "keyreg": 2, "acfg": 3, "axfer": 4, "afrz": 5, "appl": 6}
+TYPE_NAMES = {v: k for k, v in TYPE_ENUMS.items()}
+
+# Txn fields holding byte strings, everything else is a uint
+BYTES_FIELDS = {
+    "Sender", "Note", "Lease", "Receiver", "CloseRemainderTo", "VotePK", "SelectionPK", "Type",
+    "AssetSender", "AssetReceiver", "AssetCloseTo", "TxID", "ApplicationArgs", "Accounts",
+    "ApprovalProgram", "ClearStateProgram", "RekeyTo", "ConfigAssetUnitName", "ConfigAssetName",
+    "ConfigAssetURL", "ConfigAssetMetadataHash", "ConfigAssetManager", "ConfigAssetReserve",
+    "ConfigAssetFreeze", "ConfigAssetClawback", "FreezeAssetAccount", "Logs", "LastLog",
+    "StateProofPK",
+}
+ADDRESS_FIELDS = {
+    "Sender", "Receiver", "CloseRemainderTo", "AssetSender", "AssetReceiver", "AssetCloseTo",
+    "RekeyTo", "ConfigAssetManager", "ConfigAssetReserve", "ConfigAssetFreeze",
+    "ConfigAssetClawback", "FreezeAssetAccount",
+}
+# Fields an inner transaction can't set
+READ_ONLY_FIELDS = {
+    "FirstValid", "FirstValidTime", "LastValid", "Lease", "GroupIndex", "TxID", "NumAppArgs",
+    "NumAccounts", "NumAssets", "NumApplications", "Logs", "NumLogs", "CreatedAssetID",
+    "CreatedApplicationID", "LastLog",
+}
+
+Value = Any  # int or bytes
+
+
+class LedgerError(Exception):
+    """A transaction group was rejected."""
+
+
+class LogicError(LedgerError):
+    """A program failed or rejected the transaction."""
+
+    def __init__(self, message: str, pc: Optional[int] = None) -> None:
+        where = f" at pc {pc}" if pc is not None else ""
+        super().__init__(f"logic eval error: {message}{where}")
+        self.message = message
+        self.pc = pc
+
+
+def new_txn_fields() -> Dict[str, Value]:
+    """An empty transaction, every field at its zero value."""
+    txn: Dict[str, Value] = {}
+    for field in opcodes.TXN_FIELDS:
+        if field in TXN_ARRAY_FIELDS:
+            txn[field] = []
+        elif field in ADDRESS_FIELDS:
+            txn[field] = ZERO_ADDRESS
+        elif field in BYTES_FIELDS:
+            txn[field] = b""
+        else:
+            txn[field] = 0
+    txn["Lease"] = ZERO_ADDRESS
+    return txn
+
+
+def _uvarint(data: bytes, pc: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        if pc >= len(data):
+            raise LogicError("program ends inside a varuint", pc)
+        b = data[pc]
+        value |= (b & 0x7F) << shift
+        pc += 1
+        if b < 0x80:
+            return value, pc
+        shift += 7
+
+
+Instruction = Tuple[str, tuple, int]
+
+_programs: Dict[bytes, Tuple[int, Dict[int, Instruction]]] = {}
+
+
+def decode_program(program: bytes) -> Tuple[int, Dict[int, Instruction]]:
+    """Decode bytecode into ``(version, {pc: (name, immediates, next_pc)})``."""
+    cached = _programs.get(program)
+    if cached is not None:
+        return cached
+
+    version, pc = _uvarint(program, 0)
+    instructions: Dict[int, Instruction] = {}
+    while pc < len(program):
+        start = pc
+        spec = OPS_BY_CODE.get(program[pc])
+        if spec is None or spec.version > version:
+            raise LogicError(f"invalid opcode 0x{program[pc]:02x}", pc)
+        pc += 1
+        immediates: List[Any] = []
+        for kind in spec.immediates:
+            if kind == opcodes.UINT8:
+                immediates.append(program[pc])
+                pc += 1
+            elif kind == opcodes.VARUINT:
+                value, pc = _uvarint(program, pc)
+                immediates.append(value)
+            elif kind == opcodes.LABEL:
+                offset = int.from_bytes(program[pc:pc + 2], "big", signed=True)
+                pc += 2
+                immediates.append(pc + offset)
+            elif kind == opcodes.BYTES:
+                length, pc = _uvarint(program, pc)
+                immediates.append(program[pc:pc + length])
+                pc += length
+            elif kind == opcodes.INTS:
+                count, pc = _uvarint(program, pc)
+                values = []
+                for _ in range(count):
+                    value, pc = _uvarint(program, pc)
+                    values.append(value)
+                immediates.append(values)
+            elif kind == opcodes.BYTESLIST:
+                count, pc = _uvarint(program, pc)
+                values = []
+                for _ in range(count):
+                    length, pc = _uvarint(program, pc)
+                    values.append(program[pc:pc + length])
+                    pc += length
+                immediates.append(values)
+            else:
+                table = FIELD_TABLES[kind]
+                if program[pc] >= len(table):
+                    raise LogicError(f"invalid {kind} {program[pc]}", start)
+                immediates.append(table[program[pc]])
+                pc += 1
+        if pc > len(program):
+            raise LogicError("program ends inside an instruction", start)
+        instructions[start] = (spec.name, tuple(immediates), pc)
+
+    _programs[program] = (version, instructions)
+    return version, instructions
+
+
+class Budget:
+    """Opcode budget pooled across the app calls of a group."""
+
+    __slots__ = ("limit", "used")
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.used = 0
+
+    def spend(self, cost: int, pc: int) -> None:
+        self.used += cost
+        if self.used > self.limit:
+            raise LogicError(f"dynamic cost budget exceeded ({self.used} > {self.limit})", pc)
+
+
+def teal_value(value: Value) -> Dict[str, Any]:
+    """A stack value as algod's TealValue JSON (type 1 bytes, 2 uint)."""
+    if isinstance(value, bytes):
+        return {"type": 1, "bytes": base64.b64encode(value).decode("ascii"), "uint": 0}
+    return {"type": 2, "bytes": "", "uint": value}
+
+
+class Evaluator:
+    """Runs one application program against a `Ledger`.
+
+    Ledger state is changed in place as the program runs; the ledger rolls
+    the group back if anything fails.
+    """
+
+    def __init__(self, ledger, group: List[Dict[str, Value]], index: int, app_id: int,
+                 budget: Budget, trace: Optional[List[dict]] = None) -> None:
+        self.ledger = ledger
+        self.group = group
+        self.index = index
+        self.txn = group[index]
+        self.app_id = app_id
+        self.budget = budget
+        self.trace = trace
+        self.stack: List[Value] = []
+        self.scratch: List[Value] = [0] * 256
+        self.callstack: List[int] = []
+        self.intc: List[int] = []
+        self.bytec: List[bytes] = []
+        self.logs: List[bytes] = []
+        self.inner: List[Dict[str, Value]] = []
+        self.inner_results: List[Any] = []
+        self.last_inner_group: List[Dict[str, Value]] = []
+        self.pending_inner: Optional[List[Dict[str, Value]]] = None
+        self.version = 0
+        self.pc = 0
+        self.next_pc = 0
+
+    # stack helpers
+
+    def push(self, value: Value) -> None:
+        if len(self.stack) >= MAX_STACK_DEPTH:
+            raise LogicError("stack overflow", self.pc)
+        self.stack.append(value)
+
+    def pop(self) -> Value:
+        if not self.stack:
+            raise LogicError("stack underflow", self.pc)
+        return self.stack.pop()
+
+    def pop_uint(self) -> int:
+        value = self.pop()
+        if not isinstance(value, int):
+            raise LogicError("expected uint64, got bytes", self.pc)
+        return value
+
+    def pop_bytes(self) -> bytes:
+        value = self.pop()
+        if not isinstance(value, bytes):
+            raise LogicError("expected bytes, got uint64", self.pc)
+        return value
+
+    def push_uint(self, value: int) -> None:
+        if value < 0 or value > MAX_UINT:
+            raise LogicError("uint64 overflow" if value > 0 else "uint64 underflow", self.pc)
+        self.push(value)
+
+    def push_bytes(self, value: bytes) -> None:
+        if len(value) > MAX_BYTES_LENGTH:
+            raise LogicError("bytes value too long", self.pc)
+        self.push(value)
+
+    # running
+
+    def run(self, program: bytes) -> bool:
+        """Run ``program``, returning whether it approved."""
+        self.version, instructions = decode_program(program)
+        end = len(program)
+        self.pc = pc = 1 if self.version < 128 else 2
+        while pc < end:
+            instruction = instructions.get(pc)
+            if instruction is None:
+                raise LogicError("branch into the middle of an instruction", pc)
+            name, immediates, next_pc = instruction
+            self.pc = pc
+            self.next_pc = next_pc
+            if self.trace is not None:
+                self.trace.append({"pc": pc, "stack": [teal_value(v) for v in self.stack]})
+            self.budget.spend(op_cost(name, self.version), pc)
+            handler = HANDLERS.get(name)
+            if handler is None:
+                raise LogicError(f"{name} is not supported by the local evaluator", pc)
+            try:
+                jump = handler(self, *immediates)
+            except LogicError as e:
+                if e.pc is None:
+                    raise LogicError(e.message, pc)
+                raise
+            if jump is _RETURN:
+                break
+            pc = next_pc if jump is None else jump
+            if pc > end:
+                raise LogicError("branch past the end of the program", self.pc)
+        if self.pending_inner is not None:
+            raise LogicError("itxn_begin without itxn_submit", self.pc)
+        if len(self.stack) != 1:
+            raise LogicError(f"stack must have exactly one value at the end, has {len(self.stack)}", self.pc)
+        result = self.stack[0]
+        if not isinstance(result, int):
+            raise LogicError("program ended with bytes on the stack", self.pc)
+        return result != 0
+
+    # references
+
+    def txn_field(self, txn: Dict[str, Value], field: str, index: Optional[int] = None) -> Value:
+        if field in TXN_ARRAY_FIELDS:
+            values = txn[field]
+            if field == "Accounts":
+                values = [txn["Sender"]] + values
+            elif field == "Applications":
+                values = [txn["ApplicationID"]] + values
+            if index is None or index >= len(values):
+                raise LogicError(f"invalid {field} index {index}", self.pc)
+            return values[index]
+        if field == "NumAppArgs":
+            return len(txn["ApplicationArgs"])
+        if field == "NumAccounts":
+            return len(txn["Accounts"])
+        if field == "NumAssets":
+            return len(txn["Assets"])
+        if field == "NumApplications":
+            return len(txn["Applications"])
+        if field == "NumLogs":
+            return len(txn["Logs"])
+        if field == "LastLog":
+            return txn["Logs"][-1] if txn["Logs"] else b""
+        if field == "FirstValidTime":
+            raise LogicError("FirstValidTime is not available", self.pc)
+        return txn[field]
+
+    def global_field(self, field: str) -> Value:
+        ledger = self.ledger
+        if field == "MinTxnFee":
+            return ledger.min_fee
+        if field == "MinBalance":
+            return ledger.min_balance_base
+        if field == "MaxTxnLife":
+            return 1000
+        if field == "ZeroAddress":
+            return ZERO_ADDRESS
+        if field == "GroupSize":
+            return len(self.group)
+        if field == "LogicSigVersion":
+            return opcodes.MAX_TEAL_VERSION
+        if field == "Round":
+            return ledger.round
+        if field == "LatestTimestamp":
+            return ledger.timestamp
+        if field == "CurrentApplicationID":
+            return self.app_id
+        if field == "CreatorAddress":
+            return ledger.app(self.app_id).creator
+        if field == "CurrentApplicationAddress":
+            return ledger.app_address(self.app_id)
+        if field == "GroupID":
+            return self.txn.get("Group", ZERO_ADDRESS)
+        if field == "OpcodeBudget":
+            return self.budget.limit - self.budget.used
+        if field in ("CallerApplicationID",):
+            return 0
+        if field == "CallerApplicationAddress":
+            return ZERO_ADDRESS
+        raise LogicError(f"unknown global {field}", self.pc)
+
+    def account_ref(self, ref: Value) -> bytes:
+        accounts = [self.txn["Sender"]] + self.txn["Accounts"]
+        if isinstance(ref, int):
+            if ref >= len(accounts):
+                raise LogicError(f"invalid Accounts index {ref}", self.pc)
+            return accounts[ref]
+        if self.version < 4:
+            raise LogicError("account references by address need TEAL v4", self.pc)
+        apps = [self.app_id] + self.txn["Applications"]
+        if ref in accounts or ref in [self.ledger.app_address(a) for a in apps]:
+            return ref
+        raise LogicError("unavailable Account", self.pc)
+
+    def asset_ref(self, ref: int) -> int:
+        assets = self.txn["Assets"]
+        if self.version >= 4 and ref in assets:
+            return ref
+        if ref < len(assets):
+            return assets[ref]
+        raise LogicError(f"unavailable Asset {ref}", self.pc)
+
+    def app_ref(self, ref: int) -> int:
+        apps = self.txn["Applications"]
+        if ref == 0:
+            return self.app_id
+        if self.version >= 4 and (ref in apps or ref == self.app_id):
+            return ref
+        if ref <= len(apps):
+            return apps[ref - 1]
+        raise LogicError(f"unavailable App {ref}", self.pc)
+
+    # inner transactions
+
+    def new_inner(self) -> Dict[str, Value]:
+        txn = new_txn_fields()
+        txn["Sender"] = self.ledger.app_address(self.app_id)
+        txn["Fee"] = self.ledger.min_fee
+        txn["FirstValid"] = self.txn["FirstValid"]
+        txn["LastValid"] = self.txn["LastValid"]
+        return txn
+
+    def submit_inner(self) -> None:
+        group = self.pending_inner
+        self.pending_inner = None
+        if len(self.inner) + len(group) > MAX_INNER_TXNS:
+            raise LogicError(f"too many inner transactions (max {MAX_INNER_TXNS})", self.pc)
+        for txn in group:
+            if txn["TypeEnum"] == TYPE_ENUMS["appl"] and self.version < 6:
+                raise LogicError("inner app calls need TEAL v6", self.pc)
+        try:
+            results = self.ledger.apply_inner(group, self.app_id, self.budget)
+        except LogicError:
+            raise
+        except LedgerError as e:
+            raise LogicError(str(e), self.pc)
+        self.inner += group
+        self.inner_results += results
+        self.last_inner_group = group
+
+
+_RETURN = object()
+
+Handler = Callable[..., Optional[int]]
+
+
+def _binary_uint(f: Callable[[int, int], int]) -> Handler:
+    def op(ev: Evaluator) -> None:
+        b = ev.pop_uint()
+        a = ev.pop_uint()
+        ev.push_uint(f(a, b))
+    return op
+
+
+def _compare(f: Callable[[Any, Any], bool]) -> Handler:
+    def op(ev: Evaluator) -> None:
+        b = ev.pop_uint()
+        a = ev.pop_uint()
+        ev.push(1 if f(a, b) else 0)
+    return op
+
+
+def _equal(negate: bool) -> Handler:
+    def op(ev: Evaluator) -> None:
+        b = ev.pop()
+        a = ev.pop()
+        if type(a) is not type(b):
+            raise LogicError("cannot compare uint64 to bytes", ev.pc)
+        ev.push(1 if (a == b) != negate else 0)
+    return op
+
+
+def _div(a: int, b: int) -> int:
+    if b == 0:
+        raise LogicError("/ 0")
+    return a // b
+
+
+def _mod(a: int, b: int) -> int:
+    if b == 0:
+        raise LogicError("% 0")
+    return a % b
+
+
+def _shift(left: bool) -> Handler:
+    def op(ev: Evaluator) -> None:
+        b = ev.pop_uint()
+        a = ev.pop_uint()
+        if b > 63:
+            raise LogicError("shift arg > 63", ev.pc)
+        ev.push((a << b) & MAX_UINT if left else a >> b)
+    return op
+
+
+def _isqrt(n: int) -> int:
+    x = int(n ** 0.5)
+    while x * x > n:
+        x -= 1
+    while (x + 1) * (x + 1) <= n:
+        x += 1
+    return x
+
+
+def _bmath_args(ev: Evaluator) -> Tuple[int, int]:
+    b = ev.pop_bytes()
+    a = ev.pop_bytes()
+    if len(a) > 64 or len(b) > 64:
+        raise LogicError("byte math input longer than 64 bytes", ev.pc)
+    return int.from_bytes(a, "big"), int.from_bytes(b, "big")
+
+
+def _bmath(f: Callable[[int, int], int]) -> Handler:
+    def op(ev: Evaluator) -> None:
+        a, b = _bmath_args(ev)
+        value = f(a, b)
+        if value < 0:
+            raise LogicError("byte math would be negative", ev.pc)
+        ev.push(value.to_bytes((value.bit_length() + 7) // 8, "big"))
+    return op
+
+
+def _bcompare(f: Callable[[int, int], bool]) -> Handler:
+    def op(ev: Evaluator) -> None:
+        a, b = _bmath_args(ev)
+        ev.push(1 if f(a, b) else 0)
+    return op
+
+
+def _bbitwise(f: Callable[[int, int], int]) -> Handler:
+    def op(ev: Evaluator) -> None:
+        b = ev.pop_bytes()
+        a = ev.pop_bytes()
+        size = max(len(a), len(b))
+        a, b = a.rjust(size, b"\0"), b.rjust(size, b"\0")
+        ev.push(bytes(f(x, y) for x, y in zip(a, b)))
+    return op
+
+
+def _hash(f: Callable[[bytes], bytes]) -> Handler:
+    def op(ev: Evaluator) -> None:
+        ev.push(f(ev.pop_bytes()))
+    return op
+
+
+def _intc(i: Optional[int] = None) -> Handler:
+    def op(ev: Evaluator, index: Optional[int] = None) -> None:
+        index = i if i is not None else index
+        if index >= len(ev.intc):
+            raise LogicError(f"intc {index} beyond {len(ev.intc)} constants", ev.pc)
+        ev.push(ev.intc[index])
+    return op
+
+
+def _bytec(i: Optional[int] = None) -> Handler:
+    def op(ev: Evaluator, index: Optional[int] = None) -> None:
+        index = i if i is not None else index
+        if index >= len(ev.bytec):
+            raise LogicError(f"bytec {index} beyond {len(ev.bytec)} constants", ev.pc)
+        ev.push(ev.bytec[index])
+    return op
+
+
+def _intcblock(ev: Evaluator, values: List[int]) -> None:
+    ev.intc = values
+
+
+def _bytecblock(ev: Evaluator, values: List[bytes]) -> None:
+    ev.bytec = values
+
+
+def _mulw(ev: Evaluator) -> None:
+    b = ev.pop_uint()
+    a = ev.pop_uint()
+    product = a * b
+    ev.push(product >> 64)
+    ev.push(product & MAX_UINT)
+
+
+def _addw(ev: Evaluator) -> None:
+    b = ev.pop_uint()
+    a = ev.pop_uint()
+    total = a + b
+    ev.push(total >> 64)
+    ev.push(total & MAX_UINT)
+
+
+def _divmodw(ev: Evaluator) -> None:
+    d_lo = ev.pop_uint()
+    d_hi = ev.pop_uint()
+    n_lo = ev.pop_uint()
+    n_hi = ev.pop_uint()
+    divisor = (d_hi << 64) | d_lo
+    if divisor == 0:
+        raise LogicError("/ 0", ev.pc)
+    q, r = divmod((n_hi << 64) | n_lo, divisor)
+    ev.push(q >> 64)
+    ev.push(q & MAX_UINT)
+    ev.push(r >> 64)
+    ev.push(r & MAX_UINT)
+
+
+def _divw(ev: Evaluator) -> None:
+    c = ev.pop_uint()
+    b = ev.pop_uint()
+    a = ev.pop_uint()
+    if c == 0:
+        raise LogicError("/ 0", ev.pc)
+    ev.push_uint(((a << 64) | b) // c)
+
+
+def _exp(ev: Evaluator) -> None:
+    b = ev.pop_uint()
+    a = ev.pop_uint()
+    if a == 0 and b == 0:
+        raise LogicError("0^0 is undefined", ev.pc)
+    ev.push_uint(a ** b if a <= 1 or b < 64 else MAX_UINT + 1)
+
+
+def _expw(ev: Evaluator) -> None:
+    b = ev.pop_uint()
+    a = ev.pop_uint()
+    if a == 0 and b == 0:
+        raise LogicError("0^0 is undefined", ev.pc)
+    value = a ** b if a <= 1 or b < 128 else 1 << 128
+    if value >= 1 << 128:
+        raise LogicError("expw overflow", ev.pc)
+    ev.push(value >> 64)
+    ev.push(value & MAX_UINT)
+
+
+def _not(ev: Evaluator) -> None:
+    ev.push(1 if ev.pop_uint() == 0 else 0)
+
+
+def _len(ev: Evaluator) -> None:
+    ev.push(len(ev.pop_bytes()))
+
+
+def _itob(ev: Evaluator) -> None:
+    ev.push(ev.pop_uint().to_bytes(8, "big"))
+
+
+def _btoi(ev: Evaluator) -> None:
+    value = ev.pop_bytes()
+    if len(value) > 8:
+        raise LogicError(f"btoi arg too long, got {len(value)} bytes", ev.pc)
+    ev.push(int.from_bytes(value, "big"))
+
+
+def _bitnot(ev: Evaluator) -> None:
+    ev.push(ev.pop_uint() ^ MAX_UINT)
+
+
+def _bitlen(ev: Evaluator) -> None:
+    value = ev.pop()
+    ev.push(int.from_bytes(value, "big").bit_length() if isinstance(value, bytes) else value.bit_length())
+
+
+def _sqrt(ev: Evaluator) -> None:
+    ev.push(_isqrt(ev.pop_uint()))
+
+
+def _bsqrt(ev: Evaluator) -> None:
+    value = ev.pop_bytes()
+    if len(value) > 64:
+        raise LogicError("bsqrt input longer than 64 bytes", ev.pc)
+    root = _isqrt(int.from_bytes(value, "big"))
+    ev.push(root.to_bytes((root.bit_length() + 7) // 8, "big"))
+
+
+def _bdiv(a: int, b: int) -> int:
+    if b == 0:
+        raise LogicError("division by zero")
+    return a // b
+
+
+def _bmod(a: int, b: int) -> int:
+    if b == 0:
+        raise LogicError("modulo by zero")
+    return a % b
+
+
+def _binv(ev: Evaluator) -> None:
+    ev.push(bytes(0xFF ^ x for x in ev.pop_bytes()))
+
+
+def _bzero(ev: Evaluator) -> None:
+    n = ev.pop_uint()
+    if n > MAX_BYTES_LENGTH:
+        raise LogicError("bzero attempted to create a too large string", ev.pc)
+    ev.push(bytes(n))
+
+
+def _arg(ev: Evaluator, *_: Any) -> None:
+    raise LogicError("args are only available to logic signatures", ev.pc)
+
+
+def _txn(ev: Evaluator, field: str) -> None:
+    ev.push(ev.txn_field(ev.txn, field))
+
+
+def _txna(ev: Evaluator, field: str, index: int) -> None:
+    ev.push(ev.txn_field(ev.txn, field, index))
+
+
+def _txnas(ev: Evaluator, field: str) -> None:
+    ev.push(ev.txn_field(ev.txn, field, ev.pop_uint()))
+
+
+def _group_txn(ev: Evaluator, index: int) -> Dict[str, Value]:
+    if index >= len(ev.group):
+        raise LogicError(f"gtxn lookup TxnGroup[{index}] but it only has {len(ev.group)}", ev.pc)
+    return ev.group[index]
+
+
+def _gtxn(ev: Evaluator, index: int, field: str) -> None:
+    ev.push(ev.txn_field(_group_txn(ev, index), field))
+
+
+def _gtxna(ev: Evaluator, index: int, field: str, i: int) -> None:
+    ev.push(ev.txn_field(_group_txn(ev, index), field, i))
+
+
+def _gtxnas(ev: Evaluator, index: int, field: str) -> None:
+    i = ev.pop_uint()
+    ev.push(ev.txn_field(_group_txn(ev, index), field, i))
+
+
+def _gtxns(ev: Evaluator, field: str) -> None:
+    ev.push(ev.txn_field(_group_txn(ev, ev.pop_uint()), field))
+
+
+def _gtxnsa(ev: Evaluator, field: str, i: int) -> None:
+    ev.push(ev.txn_field(_group_txn(ev, ev.pop_uint()), field, i))
+
+
+def _gtxnsas(ev: Evaluator, field: str) -> None:
+    i = ev.pop_uint()
+    ev.push(ev.txn_field(_group_txn(ev, ev.pop_uint()), field, i))
+
+
+def _global(ev: Evaluator, field: str) -> None:
+    ev.push(ev.global_field(field))
+
+
+def _load(ev: Evaluator, slot: int) -> None:
+    ev.push(ev.scratch[slot])
+
+
+def _store(ev: Evaluator, slot: int) -> None:
+    ev.scratch[slot] = ev.pop()
+
+
+def _loads(ev: Evaluator) -> None:
+    slot = ev.pop_uint()
+    if slot > 255:
+        raise LogicError(f"invalid scratch slot {slot}", ev.pc)
+    ev.push(ev.scratch[slot])
+
+
+def _stores(ev: Evaluator) -> None:
+    value = ev.pop()
+    slot = ev.pop_uint()
+    if slot > 255:
+        raise LogicError(f"invalid scratch slot {slot}", ev.pc)
+    ev.scratch[slot] = value
+
+
+def _gaid(ev: Evaluator, index: int) -> None:
+    txn = _group_txn(ev, index)
+    ev.push(_created_id(ev, txn, index))
+
+
+def _gaids(ev: Evaluator) -> None:
+    index = ev.pop_uint()
+    ev.push(_created_id(ev, _group_txn(ev, index), index))
+
+
+def _created_id(ev: Evaluator, txn: Dict[str, Value], index: int) -> int:
+    if index >= ev.index:
+        raise LogicError("gaid can only look at earlier transactions", ev.pc)
+    created = txn.get("CreatedAssetID") or txn.get("CreatedApplicationID")
+    if not created:
+        raise LogicError(f"transaction {index} did not create an asset or app", ev.pc)
+    return created
+
+
+def _bnz(ev: Evaluator, target: int) -> Optional[int]:
+    return target if ev.pop_uint() != 0 else None
+
+
+def _bz(ev: Evaluator, target: int) -> Optional[int]:
+    return target if ev.pop_uint() == 0 else None
+
+
+def _b(ev: Evaluator, target: int) -> int:
+    return target
+
+
+def _return(ev: Evaluator) -> object:
+    value = ev.pop_uint()
+    ev.stack = [value]
+    return _RETURN
+
+
+def _err(ev: Evaluator) -> None:
+    raise LogicError("err opcode executed", ev.pc)
+
+
+def _assert(ev: Evaluator) -> None:
+    if ev.pop_uint() == 0:
+        raise LogicError("assert failed", ev.pc)
+
+
+def _pop(ev: Evaluator) -> None:
+    ev.pop()
+
+
+def _dup(ev: Evaluator) -> None:
+    value = ev.pop()
+    ev.push(value)
+    ev.push(value)
+
+
+def _dup2(ev: Evaluator) -> None:
+    b = ev.pop()
+    a = ev.pop()
+    for value in (a, b, a, b):
+        ev.push(value)
+
+
+def _dig(ev: Evaluator, n: int) -> None:
+    if n >= len(ev.stack):
+        raise LogicError(f"dig {n} with stack size {len(ev.stack)}", ev.pc)
+    ev.push(ev.stack[-1 - n])
+
+
+def _swap(ev: Evaluator) -> None:
+    b = ev.pop()
+    a = ev.pop()
+    ev.push(b)
+    ev.push(a)
+
+
+def _select(ev: Evaluator) -> None:
+    c = ev.pop_uint()
+    b = ev.pop()
+    a = ev.pop()
+    ev.push(b if c != 0 else a)
+
+
+def _cover(ev: Evaluator, n: int) -> None:
+    if n >= len(ev.stack):
+        raise LogicError(f"cover {n} with stack size {len(ev.stack)}", ev.pc)
+    value = ev.stack.pop()
+    ev.stack.insert(len(ev.stack) - n, value)
+
+
+def _uncover(ev: Evaluator, n: int) -> None:
+    if n >= len(ev.stack):
+        raise LogicError(f"uncover {n} with stack size {len(ev.stack)}", ev.pc)
+    ev.stack.append(ev.stack.pop(-1 - n))
+
+
+def _concat(ev: Evaluator) -> None:
+    b = ev.pop_bytes()
+    a = ev.pop_bytes()
+    ev.push_bytes(a + b)
+
+
+def _slice(ev: Evaluator, value: bytes, start: int, end: int) -> bytes:
+    if start > end or end > len(value):
+        raise LogicError(f"substring range {start}:{end} out of bounds for {len(value)} bytes", ev.pc)
+    return value[start:end]
+
+
+def _substring(ev: Evaluator, start: int, end: int) -> None:
+    ev.push(_slice(ev, ev.pop_bytes(), start, end))
+
+
+def _substring3(ev: Evaluator) -> None:
+    end = ev.pop_uint()
+    start = ev.pop_uint()
+    ev.push(_slice(ev, ev.pop_bytes(), start, end))
+
+
+def _extract(ev: Evaluator, start: int, length: int) -> None:
+    value = ev.pop_bytes()
+    ev.push(_slice(ev, value, start, len(value) if length == 0 else start + length))
+
+
+def _extract3(ev: Evaluator) -> None:
+    length = ev.pop_uint()
+    start = ev.pop_uint()
+    ev.push(_slice(ev, ev.pop_bytes(), start, start + length))
+
+
+def _extract_uint(size: int) -> Handler:
+    def op(ev: Evaluator) -> None:
+        start = ev.pop_uint()
+        ev.push(int.from_bytes(_slice(ev, ev.pop_bytes(), start, start + size), "big"))
+    return op
+
+
+def _getbit(ev: Evaluator) -> None:
+    i = ev.pop_uint()
+    target = ev.pop()
+    if isinstance(target, int):
+        if i > 63:
+            raise LogicError("getbit index beyond uint64", ev.pc)
+        ev.push((target >> i) & 1)
+    else:
+        if i >= len(target) * 8:
+            raise LogicError("getbit index beyond byteslice", ev.pc)
+        ev.push((target[i // 8] >> (7 - i % 8)) & 1)
+
+
+def _setbit(ev: Evaluator) -> None:
+    bit = ev.pop_uint()
+    i = ev.pop_uint()
+    target = ev.pop()
+    if bit > 1:
+        raise LogicError("setbit value > 1", ev.pc)
+    if isinstance(target, int):
+        if i > 63:
+            raise LogicError("setbit index beyond uint64", ev.pc)
+        ev.push(target | (1 << i) if bit else target & ~(1 << i))
+    else:
+        if i >= len(target) * 8:
+            raise LogicError("setbit index beyond byteslice", ev.pc)
+        data = bytearray(target)
+        mask = 1 << (7 - i % 8)
+        data[i // 8] = data[i // 8] | mask if bit else data[i // 8] & ~mask
+        ev.push(bytes(data))
+
+
+def _getbyte(ev: Evaluator) -> None:
+    i = ev.pop_uint()
+    target = ev.pop_bytes()
+    if i >= len(target):
+        raise LogicError("getbyte index beyond array length", ev.pc)
+    ev.push(target[i])
+
+
+def _setbyte(ev: Evaluator) -> None:
+    value = ev.pop_uint()
+    i = ev.pop_uint()
+    target = ev.pop_bytes()
+    if i >= len(target):
+        raise LogicError("setbyte index beyond array length", ev.pc)
+    if value > 255:
+        raise LogicError("setbyte value > 255", ev.pc)
+    data = bytearray(target)
+    data[i] = value
+    ev.push(bytes(data))
+
+
+def _balance(ev: Evaluator) -> None:
+    ev.push(ev.ledger.balance_of(ev.account_ref(ev.pop())))
+
+
+def _min_balance(ev: Evaluator) -> None:
+    ev.push(ev.ledger.min_balance_of(ev.account_ref(ev.pop())))
+
+
+def _app_opted_in(ev: Evaluator) -> None:
+    app_id = ev.app_ref(ev.pop_uint())
+    address = ev.account_ref(ev.pop())
+    ev.push(1 if ev.ledger.local_state(address, app_id) is not None else 0)
+
+
+def _local_state(ev: Evaluator, address: bytes, app_id: int, write: bool = False) -> Dict[bytes, Value]:
+    state = ev.ledger.local_state(address, app_id, write)
+    if state is None:
+        raise LogicError("account is not opted in to the app", ev.pc)
+    return state
+
+
+def _app_local_get(ev: Evaluator) -> None:
+    key = ev.pop_bytes()
+    address = ev.account_ref(ev.pop())
+    ev.push(_local_state(ev, address, ev.app_id).get(key, 0))
+
+
+def _app_local_get_ex(ev: Evaluator) -> None:
+    key = ev.pop_bytes()
+    app_id = ev.app_ref(ev.pop_uint())
+    address = ev.account_ref(ev.pop())
+    state = ev.ledger.local_state(address, app_id) or {}
+    ev.push(state.get(key, 0))
+    ev.push(1 if key in state else 0)
+
+
+def _app_global_get(ev: Evaluator) -> None:
+    key = ev.pop_bytes()
+    ev.push(ev.ledger.app(ev.app_id).global_state.get(key, 0))
+
+
+def _app_global_get_ex(ev: Evaluator) -> None:
+    key = ev.pop_bytes()
+    app_id = ev.app_ref(ev.pop_uint())
+    app = ev.ledger.find_app(app_id)
+    state = app.global_state if app is not None else {}
+    ev.push(state.get(key, 0))
+    ev.push(1 if key in state else 0)
+
+
+def _check_key_value(ev: Evaluator, key: bytes, value: Value) -> None:
+    if len(key) > 64:
+        raise LogicError("key too long", ev.pc)
+    if isinstance(value, bytes) and len(key) + len(value) > 128:
+        raise LogicError("key/value pair too long", ev.pc)
+
+
+def _app_local_put(ev: Evaluator) -> None:
+    value = ev.pop()
+    key = ev.pop_bytes()
+    address = ev.account_ref(ev.pop())
+    _check_key_value(ev, key, value)
+    _local_state(ev, address, ev.app_id, write=True)[key] = value
+
+
+def _app_global_put(ev: Evaluator) -> None:
+    value = ev.pop()
+    key = ev.pop_bytes()
+    _check_key_value(ev, key, value)
+    ev.ledger.app(ev.app_id, write=True).global_state[key] = value
+
+
+def _app_local_del(ev: Evaluator) -> None:
+    key = ev.pop_bytes()
+    address = ev.account_ref(ev.pop())
+    _local_state(ev, address, ev.app_id, write=True).pop(key, None)
+
+
+def _app_global_del(ev: Evaluator) -> None:
+    key = ev.pop_bytes()
+    ev.ledger.app(ev.app_id, write=True).global_state.pop(key, None)
+
+
+def _asset_holding_get(ev: Evaluator, field: str) -> None:
+    asset_id = ev.asset_ref(ev.pop_uint())
+    address = ev.account_ref(ev.pop())
+    holding = ev.ledger.holding(address, asset_id)
+    if holding is None:
+        ev.push(0)
+        ev.push(0)
+        return
+    ev.push(holding[0] if field == "AssetBalance" else int(holding[1]))
+    ev.push(1)
+
+
+def _asset_params_get(ev: Evaluator, field: str) -> None:
+    asset = ev.ledger.find_asset(ev.asset_ref(ev.pop_uint()))
+    if asset is None:
+        ev.push(0)
+        ev.push(0)
+        return
+    ev.push(asset.field(field))
+    ev.push(1)
+
+
+def _app_params_get(ev: Evaluator, field: str) -> None:
+    app_id = ev.app_ref(ev.pop_uint())
+    app = ev.ledger.find_app(app_id)
+    if app is None:
+        ev.push(0)
+        ev.push(0)
+        return
+    ev.push(app.field(field, ev.ledger.app_address(app_id)))
+    ev.push(1)
+
+
+def _acct_params_get(ev: Evaluator, field: str) -> None:
+    address = ev.account_ref(ev.pop())
+    account = ev.ledger.find_account(address)
+    if account is None:
+        ev.push(0 if field != "AcctAuthAddr" else ZERO_ADDRESS)
+        ev.push(0)
+        return
+    if field == "AcctBalance":
+        ev.push(account.balance)
+    elif field == "AcctMinBalance":
+        ev.push(ev.ledger.min_balance_of(address))
+    else:
+        ev.push(ZERO_ADDRESS)
+    ev.push(1)
+
+
+def _pushbytes(ev: Evaluator, value: bytes) -> None:
+    ev.push(value)
+
+
+def _pushint(ev: Evaluator, value: int) -> None:
+    ev.push(value)
+
+
+def _callsub(ev: Evaluator, target: int) -> int:
+    if len(ev.callstack) >= 1024:
+        raise LogicError("callsub stack overflow", ev.pc)
+    ev.callstack.append(ev.next_pc)
+    return target
+
+
+def _retsub(ev: Evaluator) -> int:
+    if not ev.callstack:
+        raise LogicError("retsub with empty callstack", ev.pc)
+    return ev.callstack.pop()
+
+
+def _log(ev: Evaluator) -> None:
+    value = ev.pop_bytes()
+    if len(ev.logs) >= MAX_LOGS:
+        raise LogicError("too many log calls", ev.pc)
+    if sum(len(l) for l in ev.logs) + len(value) > MAX_LOG_SIZE:
+        raise LogicError("program logs too large", ev.pc)
+    ev.logs.append(value)
+
+
+def _itxn_begin(ev: Evaluator) -> None:
+    if ev.pending_inner is not None:
+        raise LogicError("itxn_begin without itxn_submit", ev.pc)
+    ev.pending_inner = [ev.new_inner()]
+
+
+def _itxn_next(ev: Evaluator) -> None:
+    if ev.pending_inner is None:
+        raise LogicError("itxn_next without itxn_begin", ev.pc)
+    ev.pending_inner.append(ev.new_inner())
+
+
+def _itxn_field(ev: Evaluator, field: str) -> None:
+    if ev.pending_inner is None:
+        raise LogicError("itxn_field without itxn_begin", ev.pc)
+    if field in READ_ONLY_FIELDS:
+        raise LogicError(f"{field} cannot be set on an inner transaction", ev.pc)
+    value = ev.pop()
+    txn = ev.pending_inner[-1]
+    if (field in BYTES_FIELDS) != isinstance(value, bytes):
+        raise LogicError(f"wrong type for itxn_field {field}", ev.pc)
+    if field in ADDRESS_FIELDS and len(value) != 32:
+        raise LogicError(f"{field} must be a 32 byte address", ev.pc)
+    if field in TXN_ARRAY_FIELDS:
+        txn[field] = txn[field] + [value]
+    elif field == "TypeEnum":
+        if value not in TYPE_NAMES:
+            raise LogicError(f"unknown TypeEnum {value}", ev.pc)
+        txn["TypeEnum"] = value
+        txn["Type"] = TYPE_NAMES[value].encode()
+    elif field == "Type":
+        if value.decode("latin-1") not in TYPE_ENUMS:
+            raise LogicError(f"unknown Type {value!r}", ev.pc)
+        txn["Type"] = value
+        txn["TypeEnum"] = TYPE_ENUMS[value.decode()]
+    else:
+        txn[field] = value
+
+
+def _itxn_submit(ev: Evaluator) -> None:
+    if ev.pending_inner is None:
+        raise LogicError("itxn_submit without itxn_begin", ev.pc)
+    ev.submit_inner()
+
+
+def _last_inner(ev: Evaluator, index: Optional[int] = None) -> Dict[str, Value]:
+    group = ev.last_inner_group
+    if not group:
+        raise LogicError("no inner transaction available", ev.pc)
+    if index is None:
+        return group[-1]
+    if index >= len(group):
+        raise LogicError(f"gitxn {index} beyond the last inner group", ev.pc)
+    return group[index]
+
+
+def _itxn(ev: Evaluator, field: str) -> None:
+    ev.push(ev.txn_field(_last_inner(ev), field))
+
+
+def _itxna(ev: Evaluator, field: str, i: int) -> None:
+    ev.push(ev.txn_field(_last_inner(ev), field, i))
+
+
+def _itxnas(ev: Evaluator, field: str) -> None:
+    ev.push(ev.txn_field(_last_inner(ev), field, ev.pop_uint()))
+
+
+def _gitxn(ev: Evaluator, index: int, field: str) -> None:
+    ev.push(ev.txn_field(_last_inner(ev, index), field))
+
+
+def _gitxna(ev: Evaluator, index: int, field: str, i: int) -> None:
+    ev.push(ev.txn_field(_last_inner(ev, index), field, i))
+
+
+def _gitxnas(ev: Evaluator, index: int, field: str) -> None:
+    ev.push(ev.txn_field(_last_inner(ev, index), field, ev.pop_uint()))
+
+
+def _sha512_256(data: bytes) -> bytes:
+    return hashlib.new("sha512_256", data).digest()
+
+
+HANDLERS: Dict[str, Handler] = {
+    "err": _err,
+    "sha256": _hash(lambda data: hashlib.sha256(data).digest()),
+    "sha512_256": _hash(_sha512_256),
+    "+": _binary_uint(lambda a, b: a + b),
+    "-": _binary_uint(lambda a, b: a - b),
+    "/": _binary_uint(_div),
+    "*": _binary_uint(lambda a, b: a * b),
+    "<": _compare(lambda a, b: a < b),
+    ">": _compare(lambda a, b: a > b),
+    "<=": _compare(lambda a, b: a <= b),
+    ">=": _compare(lambda a, b: a >= b),
+    "&&": _compare(lambda a, b: a != 0 and b != 0),
+    "||": _compare(lambda a, b: a != 0 or b != 0),
+    "==": _equal(False),
+    "!=": _equal(True),
+    "!": _not,
+    "len": _len,
+    "itob": _itob,
+    "btoi": _btoi,
+    "%": _binary_uint(_mod),
+    "|": _binary_uint(lambda a, b: a | b),
+    "&": _binary_uint(lambda a, b: a & b),
+    "^": _binary_uint(lambda a, b: a ^ b),
+    "~": _bitnot,
+    "mulw": _mulw,
+    "addw": _addw,
+    "divmodw": _divmodw,
+    "intcblock": _intcblock,
+    "intc": _intc(),
+    "intc_0": _intc(0),
+    "intc_1": _intc(1),
+    "intc_2": _intc(2),
+    "intc_3": _intc(3),
+    "bytecblock": _bytecblock,
+    "bytec": _bytec(),
+    "bytec_0": _bytec(0),
+    "bytec_1": _bytec(1),
+    "bytec_2": _bytec(2),
+    "bytec_3": _bytec(3),
+    "arg": _arg,
+    "arg_0": _arg,
+    "arg_1": _arg,
+    "arg_2": _arg,
+    "arg_3": _arg,
+    "args": _arg,
+    "txn": _txn,
+    "global": _global,
+    "gtxn": _gtxn,
+    "load": _load,
+    "store": _store,
+    "txna": _txna,
+    "gtxna": _gtxna,
+    "gtxns": _gtxns,
+    "gtxnsa": _gtxnsa,
+    "gaid": _gaid,
+    "gaids": _gaids,
+    "loads": _loads,
+    "stores": _stores,
+    "bnz": _bnz,
+    "bz": _bz,
+    "b": _b,
+    "return": _return,
+    "assert": _assert,
+    "pop": _pop,
+    "dup": _dup,
+    "dup2": _dup2,
+    "dig": _dig,
+    "swap": _swap,
+    "select": _select,
+    "cover": _cover,
+    "uncover": _uncover,
+    "concat": _concat,
+    "substring": _substring,
+    "substring3": _substring3,
+    "getbit": _getbit,
+    "setbit": _setbit,
+    "getbyte": _getbyte,
+    "setbyte": _setbyte,
+    "extract": _extract,
+    "extract3": _extract3,
+    "extract_uint16": _extract_uint(2),
+    "extract_uint32": _extract_uint(4),
+    "extract_uint64": _extract_uint(8),
+    "balance": _balance,
+    "app_opted_in": _app_opted_in,
+    "app_local_get": _app_local_get,
+    "app_local_get_ex": _app_local_get_ex,
+    "app_global_get": _app_global_get,
+    "app_global_get_ex": _app_global_get_ex,
+    "app_local_put": _app_local_put,
+    "app_global_put": _app_global_put,
+    "app_local_del": _app_local_del,
+    "app_global_del": _app_global_del,
+    "asset_holding_get": _asset_holding_get,
+    "asset_params_get": _asset_params_get,
+    "app_params_get": _app_params_get,
+    "acct_params_get": _acct_params_get,
+    "min_balance": _min_balance,
+    "pushbytes": _pushbytes,
+    "pushint": _pushint,
+    "callsub": _callsub,
+    "retsub": _retsub,
+    "shl": _shift(True),
+    "shr": _shift(False),
+    "sqrt": _sqrt,
+    "bitlen": _bitlen,
+    "exp": _exp,
+    "expw": _expw,
+    "bsqrt": _bsqrt,
+    "divw": _divw,
+    "b+": _bmath(lambda a, b: a + b),
+    "b-": _bmath(lambda a, b: a - b),
+    "b/": _bmath(_bdiv),
+    "b*": _bmath(lambda a, b: a * b),
+    "b<": _bcompare(lambda a, b: a < b),
+    "b>": _bcompare(lambda a, b: a > b),
+    "b<=": _bcompare(lambda a, b: a <= b),
+    "b>=": _bcompare(lambda a, b: a >= b),
+    "b==": _bcompare(lambda a, b: a == b),
+    "b!=": _bcompare(lambda a, b: a != b),
+    "b%": _bmath(_bmod),
+    "b|": _bbitwise(lambda a, b: a | b),
+    "b&": _bbitwise(lambda a, b: a & b),
+    "b^": _bbitwise(lambda a, b: a ^ b),
+    "b~": _binv,
+    "bzero": _bzero,
+    "log": _log,
+    "itxn_begin": _itxn_begin,
+    "itxn_field": _itxn_field,
+    "itxn_submit": _itxn_submit,
+    "itxn": _itxn,
+    "itxna": _itxna,
+    "itxn_next": _itxn_next,
+    "gitxn": _gitxn,
+    "gitxna": _gitxna,
+    "txnas": _txnas,
+    "gtxnas": _gtxnas,
+    "gtxnsas": _gtxnsas,
+    "itxnas": _itxnas,
+    "gitxnas": _gitxnas,
+}
@@ -0,0 +1,941 @@
+import base64
+import hashlib
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from algosdk import account, constants, encoding
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+from nacl.exceptions import BadSignatureError
+from nacl.signing import VerifyKey
+
+from ..account import Account
+from .avm import (
+    APP_CALL_BUDGET, TYPE_ENUMS, ZERO_ADDRESS, Budget, Evaluator, LedgerError, LogicError, Value,
+    new_txn_fields, teal_value,
+)
+
+MAX_GROUP_SIZE = 16
+MIN_FEE = 1000
+MIN_BALANCE = 100_000
+# minimum balance per global/local state entry, on top of the per app base
+SCHEMA_UINT_COST = 28_500
+SCHEMA_BYTES_COST = 50_000
+APP_PAGE_COST = 100_000
+
+OC_NOOP, OC_OPT_IN, OC_CLOSE_OUT, OC_CLEAR_STATE, OC_UPDATE, OC_DELETE = range(6)
+
+Address = Union[str, bytes]
+
+
+def _address(address: Optional[Address]) -> bytes:
+    if not address:
+        return ZERO_ADDRESS
+    if isinstance(address, bytes):
+        return address
+    return encoding.decode_address(address)
+
+
+def _bytes(value: Any) -> bytes:
+    if value is None:
+        return b""
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return bytes(value)
+
+
+def _txid_bytes(tx_id: str) -> bytes:
+    return base64.b32decode(tx_id + "=" * (-len(tx_id) % 8))
+
+
+def txn_fields(txn, index: int = 0) -> Dict[str, Value]:
+    """The TEAL view of an SDK transaction, keyed by txn field name.
+
+    Decoded transactions leave zero values out as None, which read as 0 here.
+    """
+    f = new_txn_fields()
+    f["Sender"] = _address(txn.sender)
+    f["Fee"] = txn.fee or 0
+    f["FirstValid"] = txn.first_valid_round
+    f["LastValid"] = txn.last_valid_round
+    f["Note"] = _bytes(txn.note)
+    f["Lease"] = _bytes(txn.lease) or ZERO_ADDRESS
+    f["RekeyTo"] = _address(txn.rekey_to)
+    f["Type"] = txn.type.encode()
+    f["TypeEnum"] = TYPE_ENUMS[txn.type]
+    f["GroupIndex"] = index
+    f["TxID"] = _txid_bytes(txn.get_txid())
+    f["Group"] = txn.group or ZERO_ADDRESS
+
+    if txn.type == "pay":
+        f["Receiver"] = _address(txn.receiver)
+        f["Amount"] = txn.amt or 0
+        f["CloseRemainderTo"] = _address(txn.close_remainder_to)
+    elif txn.type == "axfer":
+        f["XferAsset"] = txn.index or 0
+        f["AssetAmount"] = txn.amount or 0
+        f["AssetReceiver"] = _address(txn.receiver)
+        f["AssetCloseTo"] = _address(txn.close_assets_to)
+        f["AssetSender"] = _address(txn.revocation_target)
+    elif txn.type == "acfg":
+        f["ConfigAsset"] = txn.index or 0
+        f["ConfigAssetTotal"] = txn.total or 0
+        f["ConfigAssetDecimals"] = txn.decimals or 0
+        f["ConfigAssetDefaultFrozen"] = int(bool(txn.default_frozen))
+        f["ConfigAssetUnitName"] = _bytes(txn.unit_name)
+        f["ConfigAssetName"] = _bytes(txn.asset_name)
+        f["ConfigAssetURL"] = _bytes(txn.url)
+        f["ConfigAssetMetadataHash"] = _bytes(txn.metadata_hash)
+        f["ConfigAssetManager"] = _address(txn.manager)
+        f["ConfigAssetReserve"] = _address(txn.reserve)
+        f["ConfigAssetFreeze"] = _address(txn.freeze)
+        f["ConfigAssetClawback"] = _address(txn.clawback)
+    elif txn.type == "afrz":
+        f["FreezeAsset"] = txn.index or 0
+        f["FreezeAssetAccount"] = _address(txn.target)
+        f["FreezeAssetFrozen"] = int(bool(txn.new_freeze_state))
+    elif txn.type == "appl":
+        f["ApplicationID"] = txn.index or 0
+        f["OnCompletion"] = int(txn.on_complete or 0)
+        f["ApplicationArgs"] = [_bytes(arg) for arg in txn.app_args or []]
+        f["Accounts"] = [_address(a) for a in txn.accounts or []]
+        f["Assets"] = list(txn.foreign_assets or [])
+        f["Applications"] = list(txn.foreign_apps or [])
+        f["ApprovalProgram"] = _bytes(txn.approval_program)
+        f["ClearStateProgram"] = _bytes(txn.clear_program)
+        if txn.global_schema is not None:
+            f["GlobalNumUint"] = txn.global_schema.num_uints or 0
+            f["GlobalNumByteSlice"] = txn.global_schema.num_byte_slices or 0
+        if txn.local_schema is not None:
+            f["LocalNumUint"] = txn.local_schema.num_uints or 0
+            f["LocalNumByteSlice"] = txn.local_schema.num_byte_slices or 0
+        f["ExtraProgramPages"] = txn.extra_pages or 0
+    return f
+
+
+# msgpack keys of txn fields as algod reports them, see `txn_json`
+_TXN_KEYS = [
+    ("Type", "type"), ("Sender", "snd"), ("Fee", "fee"), ("FirstValid", "fv"), ("LastValid", "lv"),
+    ("Note", "note"), ("RekeyTo", "rekey"), ("Receiver", "rcv"), ("Amount", "amt"),
+    ("CloseRemainderTo", "close"), ("XferAsset", "xaid"), ("AssetAmount", "aamt"),
+    ("AssetReceiver", "arcv"), ("AssetSender", "asnd"), ("AssetCloseTo", "aclose"),
+    ("ConfigAsset", "caid"), ("FreezeAsset", "faid"), ("FreezeAssetAccount", "fadd"),
+    ("FreezeAssetFrozen", "afrz"), ("ApplicationID", "apid"), ("OnCompletion", "apan"),
+    ("ApplicationArgs", "apaa"), ("Accounts", "apat"), ("Assets", "apas"), ("Applications", "apfa"),
+]
+_ASSET_PARAM_KEYS = [
+    ("ConfigAssetTotal", "t"), ("ConfigAssetDecimals", "dc"), ("ConfigAssetDefaultFrozen", "df"),
+    ("ConfigAssetUnitName", "un"), ("ConfigAssetName", "an"), ("ConfigAssetURL", "au"),
+    ("ConfigAssetMetadataHash", "am"), ("ConfigAssetManager", "m"), ("ConfigAssetReserve", "r"),
+    ("ConfigAssetFreeze", "f"), ("ConfigAssetClawback", "c"),
+]
+_ADDRESS_KEYS = {"snd", "rcv", "close", "arcv", "asnd", "aclose", "fadd", "rekey", "m", "r", "f", "c", "apat"}
+
+
+def _json_value(key: str, value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _json_value(k, v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_json_value(key, v) for v in value]
+    if isinstance(value, bytes):
+        if key in _ADDRESS_KEYS and len(value) == 32:
+            return encoding.encode_address(value)
+        return base64.b64encode(value).decode()
+    return value
+
+
+def txn_json(txn: Any) -> Dict[str, Any]:
+    """A (signed) SDK transaction, or the TEAL fields of one, as algod's JSON shows it.
+
+    Zero values are left out, like in the msgpack encoding.
+    """
+    if isinstance(txn, dict):
+        d: Dict[str, Any] = {}
+        for field, key in _TXN_KEYS:
+            if txn[field] and txn[field] != ZERO_ADDRESS:
+                d[key] = txn[field]
+        apar = {key: txn[field] for field, key in _ASSET_PARAM_KEYS
+                if txn[field] and txn[field] != ZERO_ADDRESS}
+        if apar:
+            d["apar"] = apar
+        d["type"] = txn["Type"].decode()
+        return _json_value("", {"txn": d})
+    if hasattr(txn, "transaction"):
+        return _json_value("", txn.dictify())
+    return _json_value("", {"txn": txn.dictify()})
+
+
+def _signed_by(public_key: bytes, message: bytes, signature: Optional[bytes]) -> bool:
+    if not signature:
+        return False
+    try:
+        VerifyKey(public_key).verify(message, signature)
+    except BadSignatureError:
+        return False
+    return True
+
+
+def verify_signature(stxn: Any) -> None:
+    """Check a signed SDK transaction's signature as algod does, raising `LedgerError`.
+
+    Single and multisig signatures are verified against the address that
+    authorizes the transaction: the auth address when one is given, else the
+    sender. The local ledger doesn't rekey, so that address must be the
+    sender's own.
+    """
+    txn = getattr(stxn, "transaction", None)
+    if txn is None:
+        raise LedgerError(f"txn {stxn.get_txid()} is not signed")
+    if isinstance(stxn, transaction.LogicSigTransaction):
+        raise LedgerError("logic signatures are not supported by the local ledger")
+
+    message = constants.txid_prefix + base64.b64decode(encoding.msgpack_encode(txn))
+    if isinstance(stxn, transaction.MultisigTransaction):
+        msig = stxn.multisig
+        authorizer = getattr(stxn, "auth_addr", None) or txn.sender
+        if msig.address() != authorizer:
+            raise LedgerError(f"txn {txn.get_txid()}: multisig {msig.address()} is not {authorizer}")
+        signed = [_signed_by(s.public_key, message, s.signature) for s in msig.subsigs]
+        if any(s.signature and not ok for s, ok in zip(msig.subsigs, signed)) or sum(signed) < msig.threshold:
+            raise LedgerError(f"txn {txn.get_txid()}: multisig signature didn't pass verification")
+    else:
+        authorizer = stxn.authorizing_address or txn.sender
+        signature = base64.b64decode(stxn.signature) if stxn.signature else None
+        if not _signed_by(encoding.decode_address(authorizer), message, signature):
+            raise LedgerError(f"txn {txn.get_txid()}: signature didn't pass verification")
+    if authorizer != txn.sender:
+        raise LedgerError(
+            f"txn {txn.get_txid()} should have been authorized by {txn.sender} but was authorized by {authorizer}")
+
+
+class AccountState:
+    __slots__ = ("balance", "assets", "local", "created_assets", "created_apps")
+
+    def __init__(self, balance: int = 0) -> None:
+        self.balance = balance
+        # asset id -> [amount, frozen]
+        self.assets: Dict[int, List[Any]] = {}
+        # app id -> local state
+        self.local: Dict[int, Dict[bytes, Value]] = {}
+        self.created_assets: Set[int] = set()
+        self.created_apps: Set[int] = set()
+
+    def copy(self) -> "AccountState":
+        other = AccountState(self.balance)
+        other.assets = {k: list(v) for k, v in self.assets.items()}
+        other.local = {k: dict(v) for k, v in self.local.items()}
+        other.created_assets = set(self.created_assets)
+        other.created_apps = set(self.created_apps)
+        return other
+
+    def is_empty(self) -> bool:
+        return not (self.balance or self.assets or self.local or self.created_assets or self.created_apps)
+
+
+class AssetState:
+    __slots__ = ("creator", "total", "decimals", "default_frozen", "unit_name", "name", "url",
+                 "metadata_hash", "manager", "reserve", "freeze", "clawback")
+
+    _FIELDS = {
+        "AssetTotal": "total", "AssetDecimals": "decimals", "AssetDefaultFrozen": "default_frozen",
+        "AssetUnitName": "unit_name", "AssetName": "name", "AssetURL": "url",
+        "AssetMetadataHash": "metadata_hash", "AssetManager": "manager", "AssetReserve": "reserve",
+        "AssetFreeze": "freeze", "AssetClawback": "clawback", "AssetCreator": "creator",
+    }
+
+    def __init__(self, creator: bytes, total: int = 0, decimals: int = 0, default_frozen: int = 0,
+                 unit_name: bytes = b"", name: bytes = b"", url: bytes = b"", metadata_hash: bytes = b"",
+                 manager: bytes = ZERO_ADDRESS, reserve: bytes = ZERO_ADDRESS, freeze: bytes = ZERO_ADDRESS,
+                 clawback: bytes = ZERO_ADDRESS) -> None:
+        self.creator = creator
+        self.total = total
+        self.decimals = decimals
+        self.default_frozen = default_frozen
+        self.unit_name = unit_name
+        self.name = name
+        self.url = url
+        self.metadata_hash = metadata_hash
+        self.manager = manager
+        self.reserve = reserve
+        self.freeze = freeze
+        self.clawback = clawback
+
+    def copy(self) -> "AssetState":
+        return AssetState(*(getattr(self, s) for s in self.__slots__))
+
+    def field(self, name: str) -> Value:
+        return getattr(self, self._FIELDS[name])
+
+
+class AppState:
+    __slots__ = ("creator", "approval", "clear", "global_state", "global_schema", "local_schema",
+                 "extra_pages")
+
+    def __init__(self, creator: bytes, approval: bytes, clear: bytes,
+                 global_schema: Tuple[int, int] = (0, 0), local_schema: Tuple[int, int] = (0, 0),
+                 extra_pages: int = 0, global_state: Optional[Dict[bytes, Value]] = None) -> None:
+        self.creator = creator
+        self.approval = approval
+        self.clear = clear
+        self.global_state: Dict[bytes, Value] = dict(global_state or {})
+        # (uints, byte slices)
+        self.global_schema = global_schema
+        self.local_schema = local_schema
+        self.extra_pages = extra_pages
+
+    def copy(self) -> "AppState":
+        return AppState(self.creator, self.approval, self.clear, self.global_schema,
+                        self.local_schema, self.extra_pages, self.global_state)
+
+    def field(self, name: str, address: bytes) -> Value:
+        return {
+            "AppApprovalProgram": self.approval,
+            "AppClearStateProgram": self.clear,
+            "AppGlobalNumUint": self.global_schema[0],
+            "AppGlobalNumByteSlice": self.global_schema[1],
+            "AppLocalNumUint": self.local_schema[0],
+            "AppLocalNumByteSlice": self.local_schema[1],
+            "AppExtraProgramPages": self.extra_pages,
+            "AppCreator": self.creator,
+            "AppAddress": address,
+        }[name]
+
+
+class TxnResult:
+    """What applying one transaction did, in the terms algod reports it."""
+
+    __slots__ = ("tx_id", "txn", "fields", "logs", "inner", "global_delta", "local_deltas",
+                 "created_asset", "created_app", "cost", "trace")
+
+    def __init__(self, tx_id: str, txn: Any, fields: Dict[str, Value]) -> None:
+        self.tx_id = tx_id
+        # the SDK transaction for top level transactions, None for inner ones
+        self.txn = txn
+        self.fields = fields
+        self.logs: List[bytes] = []
+        self.inner: List["TxnResult"] = []
+        self.global_delta: Dict[bytes, Optional[Value]] = {}
+        self.local_deltas: Dict[bytes, Dict[bytes, Optional[Value]]] = {}
+        self.created_asset: Optional[int] = None
+        self.created_app: Optional[int] = None
+        self.cost = 0
+        self.trace: Optional[List[dict]] = None
+
+    def pending_info(self, round: Optional[int] = None) -> Dict[str, Any]:
+        """The transaction's ``/v2/transactions/pending`` JSON, confirmed in ``round``."""
+        info: Dict[str, Any] = {
+            "pool-error": "",
+            "txn": txn_json(self.txn if self.txn is not None else self.fields),
+        }
+        if round is not None:
+            info["confirmed-round"] = round
+        if self.created_asset is not None:
+            info["asset-index"] = self.created_asset
+        if self.created_app is not None:
+            info["application-index"] = self.created_app
+        if self.global_delta:
+            info["global-state-delta"] = state_delta_json(self.global_delta)
+        if self.local_deltas:
+            info["local-state-delta"] = [
+                {"address": encoding.encode_address(address), "delta": state_delta_json(delta)}
+                for address, delta in self.local_deltas.items()
+            ]
+        if self.logs:
+            info["logs"] = [base64.b64encode(log).decode() for log in self.logs]
+        if self.inner:
+            info["inner-txns"] = [inner.pending_info(round) for inner in self.inner]
+        return info
+
+
+def _delta(before: Dict[bytes, Value], after: Dict[bytes, Value]) -> Dict[bytes, Optional[Value]]:
+    delta: Dict[bytes, Optional[Value]] = {k: v for k, v in after.items() if before.get(k, None) != v}
+    for key in before:
+        if key not in after:
+            delta[key] = None
+    return delta
+
+
+def _check_schema(state: Dict[bytes, Value], schema: Tuple[int, int], kind: str) -> None:
+    uints = sum(1 for v in state.values() if isinstance(v, int))
+    if uints > schema[0]:
+        raise LedgerError(f"store integer count {uints} exceeds {kind} schema integer count {schema[0]}")
+    slices = len(state) - uints
+    if slices > schema[1]:
+        raise LedgerError(f"store bytes count {slices} exceeds {kind} schema bytes count {schema[1]}")
+
+
+class Ledger:
+    """In-memory accounts, assets and apps that transaction groups run against.
+
+    `execute` applies a group atomically, running application programs with
+    the local `Evaluator`: either every transaction (and inner transaction)
+    is applied, or the ledger is left as it was and `LedgerError` (or
+    `LogicError` for program failures) is raised. Changes are journaled per
+    object touched, so rolling back costs nothing for the rest of the ledger.
+    """
+
+    min_fee = MIN_FEE
+    min_balance_base = MIN_BALANCE
+
+    def __init__(self, round: int = 1, timestamp: Optional[int] = None, first_id: int = 1) -> None:
+        self.round = round
+        self.timestamp = int(time.time()) if timestamp is None else timestamp
+        self.accounts: Dict[bytes, AccountState] = {}
+        self.assets: Dict[int, AssetState] = {}
+        self.apps: Dict[int, AppState] = {}
+        self.next_id = first_id
+        self._journal: List[Dict[Tuple[str, Any], Any]] = []
+        self._touched: Set[bytes] = set()
+        self._app_addresses: Dict[int, bytes] = {}
+
+    # journal
+
+    def _save(self, kind: str, key: Any) -> None:
+        if not self._journal:
+            return
+        frame = self._journal[-1]
+        if (kind, key) in frame:
+            return
+        if kind == "next_id":
+            frame[(kind, key)] = self.next_id
+            return
+        table = self._table(kind)
+        old = table.get(key)
+        frame[(kind, key)] = old.copy() if old is not None else None
+
+    def _table(self, kind: str) -> Dict[Any, Any]:
+        return {"account": self.accounts, "asset": self.assets, "app": self.apps}[kind]
+
+    def _begin(self) -> None:
+        self._journal.append({})
+
+    def _commit(self) -> None:
+        frame = self._journal.pop()
+        if self._journal:
+            parent = self._journal[-1]
+            for key, old in frame.items():
+                parent.setdefault(key, old)
+
+    def _rollback(self) -> None:
+        frame = self._journal.pop()
+        for (kind, key), old in frame.items():
+            if kind == "next_id":
+                self.next_id = old
+                continue
+            table = self._table(kind)
+            if old is None:
+                table.pop(key, None)
+            else:
+                table[key] = old
+
+    def _new_id(self) -> int:
+        self._save("next_id", None)
+        new_id = self.next_id
+        self.next_id += 1
+        return new_id
+
+    # state access, addresses are 32 raw bytes or base32 strings
+
+    def find_account(self, address: Address) -> Optional[AccountState]:
+        return self.accounts.get(_address(address))
+
+    def account(self, address: Address, write: bool = False) -> AccountState:
+        address = _address(address)
+        if write:
+            self._save("account", address)
+            self._touched.add(address)
+        state = self.accounts.get(address)
+        if state is None:
+            state = AccountState()
+            if write:
+                self.accounts[address] = state
+        return state
+
+    def find_app(self, app_id: int) -> Optional[AppState]:
+        return self.apps.get(app_id)
+
+    def app(self, app_id: int, write: bool = False) -> AppState:
+        if app_id not in self.apps:
+            raise LedgerError(f"application {app_id} does not exist")
+        if write:
+            self._save("app", app_id)
+        return self.apps[app_id]
+
+    def find_asset(self, asset_id: int) -> Optional[AssetState]:
+        return self.assets.get(asset_id)
+
+    def asset(self, asset_id: int, write: bool = False) -> AssetState:
+        if asset_id not in self.assets:
+            raise LedgerError(f"asset {asset_id} does not exist")
+        if write:
+            self._save("asset", asset_id)
+        return self.assets[asset_id]
+
+    def app_address(self, app_id: int) -> bytes:
+        address = self._app_addresses.get(app_id)
+        if address is None:
+            address = self._app_addresses[app_id] = encoding.decode_address(get_application_address(app_id))
+        return address
+
+    def balance_of(self, address: Address) -> int:
+        state = self.find_account(address)
+        return state.balance if state is not None else 0
+
+    def min_balance_of(self, address: Address) -> int:
+        state = self.find_account(address)
+        if state is None:
+            return 0
+        total = MIN_BALANCE + MIN_BALANCE * len(state.assets)
+        for app_id in state.created_apps:
+            app = self.apps[app_id]
+            total += APP_PAGE_COST * (1 + app.extra_pages)
+            total += SCHEMA_UINT_COST * app.global_schema[0] + SCHEMA_BYTES_COST * app.global_schema[1]
+        for app_id in state.local:
+            schema = self.apps[app_id].local_schema if app_id in self.apps else (0, 0)
+            total += MIN_BALANCE + SCHEMA_UINT_COST * schema[0] + SCHEMA_BYTES_COST * schema[1]
+        return total
+
+    def holding(self, address: Address, asset_id: int) -> Optional[List[Any]]:
+        state = self.find_account(address)
+        return state.assets.get(asset_id) if state is not None else None
+
+    def local_state(self, address: Address, app_id: int, write: bool = False) -> Optional[Dict[bytes, Value]]:
+        state = self.account(address, write) if write else self.find_account(address)
+        return state.local.get(app_id) if state is not None else None
+
+    # setup helpers
+
+    def fund(self, address: Address, amount: int) -> None:
+        self.account(address, write=True).balance += amount
+
+    def create_account(self, balance: int = 100_000_000) -> Account:
+        """A new funded account, for tests and simulations."""
+        new = Account(account.generate_account()[0])
+        self.fund(new.get_address(), balance)
+        return new
+
+    def balance(self, address: Address, asset_id: Optional[int] = None) -> int:
+        """Algo balance of ``address``, or its ``asset_id`` balance."""
+        if asset_id is None:
+            return self.balance_of(address)
+        holding = self.holding(address, asset_id)
+        return holding[0] if holding is not None else 0
+
+    def global_state(self, app_id: int) -> Dict[bytes, Value]:
+        return dict(self.app(app_id).global_state)
+
+    def account_info(self, address: Address) -> Dict[str, Any]:
+        """``address`` as ``/v2/accounts/{address}`` reports it."""
+        address = _address(address)
+        state = self.accounts.get(address) or AccountState()
+        uints = slices = 0
+        for app_id in state.local:
+            schema = self.apps[app_id].local_schema if app_id in self.apps else (0, 0)
+            uints, slices = uints + schema[0], slices + schema[1]
+        for app_id in state.created_apps:
+            uints += self.apps[app_id].global_schema[0]
+            slices += self.apps[app_id].global_schema[1]
+        return {
+            "address": encoding.encode_address(address),
+            "amount": state.balance,
+            "amount-without-pending-rewards": state.balance,
+            "min-balance": self.min_balance_of(address),
+            "pending-rewards": 0,
+            "rewards": 0,
+            "reward-base": 0,
+            "round": self.round,
+            "status": "Offline",
+            "assets": [
+                {"asset-id": asset_id, "amount": amount, "is-frozen": bool(frozen),
+                 "creator": encoding.encode_address(self.assets[asset_id].creator) if asset_id in self.assets else ""}
+                for asset_id, (amount, frozen) in sorted(state.assets.items())
+            ],
+            "created-assets": [self.asset_info(asset_id) for asset_id in sorted(state.created_assets)],
+            "apps-local-state": [
+                {"id": app_id, "schema": {"num-uint": 0, "num-byte-slice": 0},
+                 "key-value": state_json(local)}
+                for app_id, local in sorted(state.local.items())
+            ],
+            "created-apps": [self.application_info(app_id) for app_id in sorted(state.created_apps)],
+            "apps-total-schema": {"num-uint": uints, "num-byte-slice": slices},
+        }
+
+    def asset_info(self, asset_id: int) -> Dict[str, Any]:
+        """``asset_id`` as ``/v2/assets/{asset_id}`` reports it."""
+        asset = self.asset(asset_id)
+        params: Dict[str, Any] = {
+            "creator": encoding.encode_address(asset.creator),
+            "total": asset.total,
+            "decimals": asset.decimals,
+            "default-frozen": bool(asset.default_frozen),
+            "unit-name": asset.unit_name.decode(errors="replace"),
+            "name": asset.name.decode(errors="replace"),
+            "url": asset.url.decode(errors="replace"),
+        }
+        if asset.metadata_hash:
+            params["metadata-hash"] = base64.b64encode(asset.metadata_hash).decode()
+        for key in ("manager", "reserve", "freeze", "clawback"):
+            if getattr(asset, key) != ZERO_ADDRESS:
+                params[key] = encoding.encode_address(getattr(asset, key))
+        return {"index": asset_id, "params": params}
+
+    def application_info(self, app_id: int) -> Dict[str, Any]:
+        """``app_id`` as ``/v2/applications/{app_id}`` reports it."""
+        app = self.app(app_id)
+        return {"id": app_id, "params": {
+            "creator": encoding.encode_address(app.creator),
+            "approval-program": base64.b64encode(app.approval).decode(),
+            "clear-state-program": base64.b64encode(app.clear).decode(),
+            "global-state": state_json(app.global_state),
+            "global-state-schema": {"num-uint": app.global_schema[0], "num-byte-slice": app.global_schema[1]},
+            "local-state-schema": {"num-uint": app.local_schema[0], "num-byte-slice": app.local_schema[1]},
+            "extra-program-pages": app.extra_pages,
+        }}
+
+    def next_round(self, rounds: int = 1) -> int:
+        self.round += rounds
+        self.timestamp += 4 * rounds
+        return self.round
+
+    # transactions
+
+    def execute(self, txns: List[Any], trace: bool = False) -> List[TxnResult]:
+        """Apply a group of signed SDK transactions atomically.
+
+        Every signature is checked with `verify_signature`. The group is
+        validated for the next round, ``round + 1``, like algod does for
+        transactions it accepts.
+
+        Args:
+            txns: Signed transactions of one group.
+            trace: Record a dryrun style trace of every program run.
+        Returns:
+            One `TxnResult` per transaction.
+        """
+        for t in txns:
+            verify_signature(t)
+        return self._execute(txns, trace)
+
+    def _execute(self, txns: List[Any], trace: bool) -> List[TxnResult]:
+        txns = [getattr(t, "transaction", t) for t in txns]
+        if not txns or len(txns) > MAX_GROUP_SIZE:
+            raise LedgerError(f"group size {len(txns)} is not between 1 and {MAX_GROUP_SIZE}")
+        if len(txns) > 1:
+            groups = {t.group for t in txns}
+            if len(groups) != 1 or None in groups:
+                raise LedgerError("transactions are not one group")
+        next_round = self.round + 1
+        for t in txns:
+            if not t.first_valid_round <= next_round <= t.last_valid_round:
+                raise LedgerError(
+                    f"txn {t.get_txid()} is not valid in round {next_round} "
+                    f"({t.first_valid_round}-{t.last_valid_round})")
+        if sum(t.fee for t in txns) < MIN_FEE * len(txns):
+            raise LedgerError("fees too small for the group")
+
+        group = [txn_fields(t, i) for i, t in enumerate(txns)]
+        budget = Budget(APP_CALL_BUDGET * sum(1 for t in txns if t.type == "appl"))
+
+        self._begin()
+        try:
+            results = []
+            for i, t in enumerate(txns):
+                self._touched = set()
+                result = self._apply(group, i, budget, trace, txn=t)
+                self._check_min_balances()
+                results.append(result)
+        except BaseException:
+            self._rollback()
+            raise
+        self._commit()
+        return results
+
+    def apply_inner(self, group: List[Dict[str, Value]], app_id: int, budget: Budget) -> List[TxnResult]:
+        """Apply inner transactions submitted by ``app_id``."""
+        app_address = self.app_address(app_id)
+        results = []
+        for i, fields in enumerate(group):
+            if fields["Sender"] != app_address:
+                raise LedgerError("inner transaction sender is not the application account")
+            fields["GroupIndex"] = i
+            fields["TxID"] = hashlib.new("sha512_256", b"itxn" + repr(sorted(
+                (k, v) for k, v in fields.items() if not isinstance(v, list))).encode()).digest()
+            results.append(self._apply(group, i, budget, False))
+        return results
+
+    def _check_min_balances(self) -> None:
+        for address in self._touched:
+            state = self.accounts.get(address)
+            if state is None:
+                continue
+            if state.is_empty():
+                del self.accounts[address]
+                continue
+            minimum = self.min_balance_of(address)
+            if state.balance < minimum:
+                raise LedgerError(
+                    f"account {encoding.encode_address(address)} balance {state.balance} "
+                    f"below min {minimum}")
+
+    def _debit(self, address: bytes, amount: int) -> None:
+        state = self.account(address, write=True)
+        if state.balance < amount:
+            raise LedgerError(
+                f"overspend (account {encoding.encode_address(address)}, "
+                f"data {state.balance}, tried to spend {amount})")
+        state.balance -= amount
+
+    def _apply(self, group: List[Dict[str, Value]], i: int, budget: Budget, trace: bool,
+               txn: Any = None) -> TxnResult:
+        fields = group[i]
+        tx_id = txn.get_txid() if txn is not None else \
+            base64.b32encode(fields["TxID"]).decode().rstrip("=")
+        result = TxnResult(tx_id, txn, fields)
+
+        if fields["RekeyTo"] != ZERO_ADDRESS:
+            raise LedgerError("rekeying is not supported by the local ledger")
+
+        self._debit(fields["Sender"], fields["Fee"])
+        kind = fields["TypeEnum"]
+        if kind == TYPE_ENUMS["pay"]:
+            self._pay(fields)
+        elif kind == TYPE_ENUMS["axfer"]:
+            self._axfer(fields)
+        elif kind == TYPE_ENUMS["acfg"]:
+            self._acfg(fields, result)
+        elif kind == TYPE_ENUMS["afrz"]:
+            self._afrz(fields)
+        elif kind == TYPE_ENUMS["appl"]:
+            self._appl(group, i, budget, trace, result)
+        else:
+            raise LedgerError(f"{fields['Type'].decode()} transactions are not supported by the local ledger")
+        return result
+
+    def _pay(self, f: Dict[str, Value]) -> None:
+        sender = f["Sender"]
+        self._debit(sender, f["Amount"])
+        self.account(f["Receiver"], write=True).balance += f["Amount"]
+        if f["CloseRemainderTo"] != ZERO_ADDRESS:
+            state = self.account(sender, write=True)
+            if state.assets or state.local or state.created_apps:
+                raise LedgerError("cannot close an account that holds assets or apps")
+            self.account(f["CloseRemainderTo"], write=True).balance += state.balance
+            state.balance = 0
+
+    def _axfer(self, f: Dict[str, Value]) -> None:
+        asset_id = f["XferAsset"]
+        asset = self.asset(asset_id)
+        sender = f["Sender"]
+        source = sender
+        if f["AssetSender"] != ZERO_ADDRESS:
+            if sender != asset.clawback:
+                raise LedgerError("clawback by an account that is not the clawback address")
+            source = f["AssetSender"]
+        receiver = f["AssetReceiver"]
+        amount = f["AssetAmount"]
+
+        if amount == 0 and source == sender == receiver and self.holding(sender, asset_id) is None:
+            self.account(sender, write=True).assets[asset_id] = [0, bool(asset.default_frozen)]
+            return
+
+        src = self.account(source, write=True).assets.get(asset_id)
+        if src is None:
+            raise LedgerError(f"asset {asset_id} missing from {encoding.encode_address(source)}")
+        dst = self.account(receiver, write=True).assets.get(asset_id)
+        if dst is None:
+            raise LedgerError(f"receiver {encoding.encode_address(receiver)} is not opted in to asset {asset_id}")
+        if source != asset.clawback or f["AssetSender"] == ZERO_ADDRESS:
+            if src[1] or dst[1]:
+                raise LedgerError(f"asset {asset_id} frozen")
+        if src[0] < amount:
+            raise LedgerError(f"underflow on subtracting {amount} from sender amount {src[0]}")
+        src[0] -= amount
+        dst[0] += amount
+
+        if f["AssetCloseTo"] != ZERO_ADDRESS:
+            if source == asset.creator:
+                raise LedgerError("the asset creator cannot close out of the asset")
+            close = self.account(f["AssetCloseTo"], write=True).assets.get(asset_id)
+            if close is None:
+                raise LedgerError("close-to account is not opted in to the asset")
+            close[0] += src[0]
+            del self.account(source, write=True).assets[asset_id]
+
+    def _acfg(self, f: Dict[str, Value], result: TxnResult) -> None:
+        sender = f["Sender"]
+        if f["ConfigAsset"] == 0:
+            asset_id = self._new_id()
+            self._save("asset", asset_id)
+            self.assets[asset_id] = AssetState(
+                sender, f["ConfigAssetTotal"], f["ConfigAssetDecimals"], f["ConfigAssetDefaultFrozen"],
+                f["ConfigAssetUnitName"], f["ConfigAssetName"], f["ConfigAssetURL"],
+                f["ConfigAssetMetadataHash"], f["ConfigAssetManager"], f["ConfigAssetReserve"],
+                f["ConfigAssetFreeze"], f["ConfigAssetClawback"])
+            creator = self.account(sender, write=True)
+            creator.assets[asset_id] = [f["ConfigAssetTotal"], False]
+            creator.created_assets.add(asset_id)
+            f["CreatedAssetID"] = asset_id
+            result.created_asset = asset_id
+            return
+
+        asset_id = f["ConfigAsset"]
+        asset = self.asset(asset_id, write=True)
+        if asset.manager == ZERO_ADDRESS or sender != asset.manager:
+            raise LedgerError("only the manager can reconfigure or destroy an asset")
+        addresses = ("ConfigAssetManager", "ConfigAssetReserve", "ConfigAssetFreeze", "ConfigAssetClawback")
+        if all(f[a] == ZERO_ADDRESS for a in addresses):
+            creator = self.account(asset.creator, write=True)
+            if creator.assets.get(asset_id, [0])[0] != asset.total:
+                raise LedgerError("cannot destroy an asset while others hold it")
+            del creator.assets[asset_id]
+            creator.created_assets.discard(asset_id)
+            del self.assets[asset_id]
+            return
+        asset.manager, asset.reserve, asset.freeze, asset.clawback = (f[a] for a in addresses)
+
+    def _afrz(self, f: Dict[str, Value]) -> None:
+        asset = self.asset(f["FreezeAsset"])
+        if f["Sender"] != asset.freeze:
+            raise LedgerError("only the freeze address can freeze an asset")
+        holding = self.account(f["FreezeAssetAccount"], write=True).assets.get(f["FreezeAsset"])
+        if holding is None:
+            raise LedgerError("account is not opted in to the asset")
+        holding[1] = bool(f["FreezeAssetFrozen"])
+
+    def _run(self, group: List[Dict[str, Value]], i: int, app_id: int, program: bytes, budget: Budget,
+             result: TxnResult) -> bool:
+        evaluator = Evaluator(self, group, i, app_id, budget, result.trace)
+        before = budget.used
+        try:
+            return evaluator.run(program)
+        finally:
+            result.cost += budget.used - before
+            result.logs += evaluator.logs
+            result.inner += evaluator.inner_results
+
+    def _appl(self, group: List[Dict[str, Value]], i: int, budget: Budget, trace: bool,
+              result: TxnResult) -> None:
+        f = group[i]
+        sender = f["Sender"]
+        oc = f["OnCompletion"]
+        app_id = f["ApplicationID"]
+        if trace:
+            result.trace = []
+
+        if app_id == 0:
+            app_id = self._new_id()
+            self._save("app", app_id)
+            self.apps[app_id] = AppState(
+                sender, f["ApprovalProgram"], f["ClearStateProgram"],
+                (f["GlobalNumUint"], f["GlobalNumByteSlice"]), (f["LocalNumUint"], f["LocalNumByteSlice"]),
+                f["ExtraProgramPages"])
+            self.account(sender, write=True).created_apps.add(app_id)
+            f["CreatedApplicationID"] = app_id
+            result.created_app = app_id
+
+        app = self.app(app_id)
+        global_before = dict(app.global_state)
+        referenced = [sender] + f["Accounts"]
+        locals_before = {a: dict(self.local_state(a, app_id) or {}) for a in referenced}
+
+        if oc == OC_CLEAR_STATE:
+            if self.local_state(sender, app_id) is None:
+                raise LedgerError("account is not opted in to the app")
+            # a failing clear program only undoes its own changes
+            self._begin()
+            try:
+                approved = self._run(group, i, app_id, app.clear, budget, result)
+            except LogicError:
+                approved = False
+            if approved:
+                self._commit()
+            else:
+                self._rollback()
+            del self.account(sender, write=True).local[app_id]
+        else:
+            if oc == OC_OPT_IN:
+                if self.local_state(sender, app_id) is not None:
+                    raise LedgerError("account is already opted in to the app")
+                self.account(sender, write=True).local[app_id] = {}
+            if not self._run(group, i, app_id, app.approval, budget, result):
+                raise LogicError("transaction rejected by ApprovalProgram")
+            if oc == OC_CLOSE_OUT:
+                del self.account(sender, write=True).local[app_id]
+            elif oc == OC_UPDATE:
+                app = self.app(app_id, write=True)
+                app.approval = f["ApprovalProgram"]
+                app.clear = f["ClearStateProgram"]
+            elif oc == OC_DELETE:
+                self._save("app", app_id)
+                del self.apps[app_id]
+                self.account(app.creator, write=True).created_apps.discard(app_id)
+
+        f["Logs"] = list(result.logs)
+        if app_id in self.apps:
+            _check_schema(self.apps[app_id].global_state, self.apps[app_id].global_schema, "global")
+            result.global_delta = _delta(global_before, self.apps[app_id].global_state)
+            for address, before in locals_before.items():
+                after = self.local_state(address, app_id)
+                if after is not None:
+                    _check_schema(after, self.apps[app_id].local_schema, "local")
+                delta = _delta(before, after or {})
+                if delta:
+                    result.local_deltas[address] = delta
+
+    def dryrun(self, txns: List[Any]) -> dict:
+        """Run a group without committing it, reporting like algod's dryrun."""
+        self._begin()
+        try:
+            try:
+                # like algod's, dryruns don't need signatures
+                results = self._execute(txns, trace=True)
+                error = ""
+            except LedgerError as e:
+                results, error = None, str(e)
+        finally:
+            self._rollback()
+
+        report = []
+        for i, txn in enumerate(getattr(t, "transaction", t) for t in txns):
+            entry: Dict[str, Any] = {"disassembly": None, "logs": []}
+            if txn.type == "appl":
+                if results is not None:
+                    r = results[i]
+                    entry.update({
+                        "app-call-messages": ["ApprovalProgram", "PASS"],
+                        "app-call-trace": r.trace,
+                        "cost": r.cost,
+                        "logs": [base64.b64encode(log).decode() for log in r.logs],
+                        "global-delta": state_delta_json(r.global_delta),
+                    })
+                else:
+                    entry.update({"app-call-messages": ["ApprovalProgram", "REJECT", error],
+                                  "app-call-trace": [], "cost": 0})
+            report.append(entry)
+        return {"txns": report, "error": "" if results is not None else error}
+
+
+def state_json(state: Dict[bytes, Value]) -> List[dict]:
+    """App state in algod's TealKeyValue JSON form, see `ally.utils.decode_state`."""
+    return [{"key": base64.b64encode(key).decode(), "value": teal_value(value)}
+            for key, value in state.items()]
+
+
+def state_delta_json(delta: Dict[bytes, Optional[Value]]) -> List[dict]:
+    """A state delta in algod's EvalDeltaKeyValue JSON form."""
+    out = []
+    for key, value in delta.items():
+        if value is None:
+            entry = {"action": 3}
+        elif isinstance(value, bytes):
+            entry = {"action": 1, "bytes": base64.b64encode(value).decode()}
+        else:
+            entry = {"action": 2, "uint": value}
+        out.append({"key": base64.b64encode(key).decode(), "value": entry})
+    return out
+
+
+__all__ = [
+    "AccountState", "AppState", "AssetState", "Ledger", "LedgerError", "LogicError", "TxnResult",
+    "state_delta_json", "state_json", "teal_value", "txn_fields", "txn_json",
+]
@@ -0,0 +1,266 @@
+from typing import Dict, List, NamedTuple, Tuple
+
+# Immediate argument kinds
+UINT8 = "uint8"
+INT8 = "int8"
+VARUINT = "varuint"
+LABEL = "label"
+BYTES = "bytes"
+INTS = "ints"
+BYTESLIST = "byteslist"
+TXN_FIELD = "txn_field"
+GLOBAL_FIELD = "global_field"
+ASSET_HOLDING_FIELD = "asset_holding_field"
+ASSET_PARAMS_FIELD = "asset_params_field"
+APP_PARAMS_FIELD = "app_params_field"
+ACCT_PARAMS_FIELD = "acct_params_field"
+ECDSA_CURVE = "ecdsa_curve"
+
+
+class OpSpec(NamedTuple):
+    opcode: int
+    name: str
+    version: int
+    immediates: Tuple[str, ...] = ()
+
+
+def _spec(opcode: int, name: str, version: int = 1, *immediates: str) -> OpSpec:
+    return OpSpec(opcode, name, version, tuple(immediates))
+
+
+# Opcodes of TEAL v1 through v6, as in go-algorand data/transactions/logic/opcodes.go
+OPS: List[OpSpec] = [
+    _spec(0x00, "err"),
+    _spec(0x01, "sha256"),
+    _spec(0x02, "keccak256"),
+    _spec(0x03, "sha512_256"),
+    _spec(0x04, "ed25519verify"),
+    _spec(0x05, "ecdsa_verify", 5, ECDSA_CURVE),
+    _spec(0x06, "ecdsa_pk_decompress", 5, ECDSA_CURVE),
+    _spec(0x07, "ecdsa_pk_recover", 5, ECDSA_CURVE),
+    _spec(0x08, "+"),
+    _spec(0x09, "-"),
+    _spec(0x0a, "/"),
+    _spec(0x0b, "*"),
+    _spec(0x0c, "<"),
+    _spec(0x0d, ">"),
+    _spec(0x0e, "<="),
+    _spec(0x0f, ">="),
+    _spec(0x10, "&&"),
+    _spec(0x11, "||"),
+    _spec(0x12, "=="),
+    _spec(0x13, "!="),
+    _spec(0x14, "!"),
+    _spec(0x15, "len"),
+    _spec(0x16, "itob"),
+    _spec(0x17, "btoi"),
+    _spec(0x18, "%"),
+    _spec(0x19, "|"),
+    _spec(0x1a, "&"),
+    _spec(0x1b, "^"),
+    _spec(0x1c, "~"),
+    _spec(0x1d, "mulw"),
+    _spec(0x1e, "addw", 2),
+    _spec(0x1f, "divmodw", 4),
+    _spec(0x20, "intcblock", 1, INTS),
+    _spec(0x21, "intc", 1, UINT8),
+    _spec(0x22, "intc_0"),
+    _spec(0x23, "intc_1"),
+    _spec(0x24, "intc_2"),
+    _spec(0x25, "intc_3"),
+    _spec(0x26, "bytecblock", 1, BYTESLIST),
+    _spec(0x27, "bytec", 1, UINT8),
+    _spec(0x28, "bytec_0"),
+    _spec(0x29, "bytec_1"),
+    _spec(0x2a, "bytec_2"),
+    _spec(0x2b, "bytec_3"),
+    _spec(0x2c, "arg", 1, UINT8),
+    _spec(0x2d, "arg_0"),
+    _spec(0x2e, "arg_1"),
+    _spec(0x2f, "arg_2"),
+    _spec(0x30, "arg_3"),
+    _spec(0x31, "txn", 1, TXN_FIELD),
+    _spec(0x32, "global", 1, GLOBAL_FIELD),
+    _spec(0x33, "gtxn", 1, UINT8, TXN_FIELD),
+    _spec(0x34, "load", 1, UINT8),
+    _spec(0x35, "store", 1, UINT8),
+    _spec(0x36, "txna", 2, TXN_FIELD, UINT8),
+    _spec(0x37, "gtxna", 2, UINT8, TXN_FIELD, UINT8),
+    _spec(0x38, "gtxns", 3, TXN_FIELD),
+    _spec(0x39, "gtxnsa", 3, TXN_FIELD, UINT8),
+    _spec(0x3a, "gload", 4, UINT8, UINT8),
+    _spec(0x3b, "gloads", 4, UINT8),
+    _spec(0x3c, "gaid", 4, UINT8),
+    _spec(0x3d, "gaids", 4),
+    _spec(0x3e, "loads", 5),
+    _spec(0x3f, "stores", 5),
+    _spec(0x40, "bnz", 1, LABEL),
+    _spec(0x41, "bz", 2, LABEL),
+    _spec(0x42, "b", 2, LABEL),
+    _spec(0x43, "return", 2),
+    _spec(0x44, "assert", 3),
+    _spec(0x48, "pop"),
+    _spec(0x49, "dup"),
+    _spec(0x4a, "dup2", 2),
+    _spec(0x4b, "dig", 3, UINT8),
+    _spec(0x4c, "swap", 3),
+    _spec(0x4d, "select", 3),
+    _spec(0x4e, "cover", 5, UINT8),
+    _spec(0x4f, "uncover", 5, UINT8),
+    _spec(0x50, "concat", 2),
+    _spec(0x51, "substring", 2, UINT8, UINT8),
+    _spec(0x52, "substring3", 2),
+    _spec(0x53, "getbit", 3),
+    _spec(0x54, "setbit", 3),
+    _spec(0x55, "getbyte", 3),
+    _spec(0x56, "setbyte", 3),
+    _spec(0x57, "extract", 5, UINT8, UINT8),
+    _spec(0x58, "extract3", 5),
+    _spec(0x59, "extract_uint16", 5),
+    _spec(0x5a, "extract_uint32", 5),
+    _spec(0x5b, "extract_uint64", 5),
+    _spec(0x60, "balance", 2),
+    _spec(0x61, "app_opted_in", 2),
+    _spec(0x62, "app_local_get", 2),
+    _spec(0x63, "app_local_get_ex", 2),
+    _spec(0x64, "app_global_get", 2),
+    _spec(0x65, "app_global_get_ex", 2),
+    _spec(0x66, "app_local_put", 2),
+    _spec(0x67, "app_global_put", 2),
+    _spec(0x68, "app_local_del", 2),
+    _spec(0x69, "app_global_del", 2),
+    _spec(0x70, "asset_holding_get", 2, ASSET_HOLDING_FIELD),
+    _spec(0x71, "asset_params_get", 2, ASSET_PARAMS_FIELD),
+    _spec(0x72, "app_params_get", 5, APP_PARAMS_FIELD),
+    _spec(0x73, "acct_params_get", 6, ACCT_PARAMS_FIELD),
+    _spec(0x78, "min_balance", 3),
+    _spec(0x80, "pushbytes", 3, BYTES),
+    _spec(0x81, "pushint", 3, VARUINT),
+    _spec(0x88, "callsub", 4, LABEL),
+    _spec(0x89, "retsub", 4),
+    _spec(0x90, "shl", 4),
+    _spec(0x91, "shr", 4),
+    _spec(0x92, "sqrt", 4),
+    _spec(0x93, "bitlen", 4),
+    _spec(0x94, "exp", 4),
+    _spec(0x95, "expw", 4),
+    _spec(0x96, "bsqrt", 6),
+    _spec(0x97, "divw", 6),
+    _spec(0xa0, "b+", 4),
+    _spec(0xa1, "b-", 4),
+    _spec(0xa2, "b/", 4),
+    _spec(0xa3, "b*", 4),
+    _spec(0xa4, "b<", 4),
+    _spec(0xa5, "b>", 4),
+    _spec(0xa6, "b<=", 4),
+    _spec(0xa7, "b>=", 4),
+    _spec(0xa8, "b==", 4),
+    _spec(0xa9, "b!=", 4),
+    _spec(0xaa, "b%", 4),
+    _spec(0xab, "b|", 4),
+    _spec(0xac, "b&", 4),
+    _spec(0xad, "b^", 4),
+    _spec(0xae, "b~", 4),
+    _spec(0xaf, "bzero", 4),
+    _spec(0xb0, "log", 5),
+    _spec(0xb1, "itxn_begin", 5),
+    _spec(0xb2, "itxn_field", 5, TXN_FIELD),
+    _spec(0xb3, "itxn_submit", 5),
+    _spec(0xb4, "itxn", 5, TXN_FIELD),
+    _spec(0xb5, "itxna", 5, TXN_FIELD, UINT8),
+    _spec(0xb6, "itxn_next", 6),
+    _spec(0xb7, "gitxn", 6, UINT8, TXN_FIELD),
+    _spec(0xb8, "gitxna", 6, UINT8, TXN_FIELD, UINT8),
+    _spec(0xc0, "txnas", 5, TXN_FIELD),
+    _spec(0xc1, "gtxnas", 5, UINT8, TXN_FIELD),
+    _spec(0xc2, "gtxnsas", 5, TXN_FIELD),
+    _spec(0xc3, "args", 5),
+    _spec(0xc4, "gloadss", 6),
+    _spec(0xc5, "itxnas", 6, TXN_FIELD),
+    _spec(0xc6, "gitxnas", 6, UINT8, TXN_FIELD),
+]
+
+OPS_BY_NAME: Dict[str, OpSpec] = {op.name: op for op in OPS}
+OPS_BY_CODE: Dict[int, OpSpec] = {op.opcode: op for op in OPS}
+
+TXN_FIELDS: List[str] = [
+    "Sender", "Fee", "FirstValid", "FirstValidTime", "LastValid", "Note", "Lease",
+    "Receiver", "Amount", "CloseRemainderTo", "VotePK", "SelectionPK", "VoteFirst",
+    "VoteLast", "VoteKeyDilution", "Type", "TypeEnum", "XferAsset", "AssetAmount",
+    "AssetSender", "AssetReceiver", "AssetCloseTo", "GroupIndex", "TxID",
+    "ApplicationID", "OnCompletion", "ApplicationArgs", "NumAppArgs", "Accounts",
+    "NumAccounts", "ApprovalProgram", "ClearStateProgram", "RekeyTo", "ConfigAsset",
+    "ConfigAssetTotal", "ConfigAssetDecimals", "ConfigAssetDefaultFrozen",
+    "ConfigAssetUnitName", "ConfigAssetName", "ConfigAssetURL",
+    "ConfigAssetMetadataHash", "ConfigAssetManager", "ConfigAssetReserve",
+    "ConfigAssetFreeze", "ConfigAssetClawback", "FreezeAsset", "FreezeAssetAccount",
+    "FreezeAssetFrozen", "Assets", "NumAssets", "Applications", "NumApplications",
+    "GlobalNumUint", "GlobalNumByteSlice", "LocalNumUint", "LocalNumByteSlice",
+    "ExtraProgramPages", "Nonparticipation", "Logs", "NumLogs", "CreatedAssetID",
+    "CreatedApplicationID", "LastLog", "StateProofPK",
+]
+
+# Txn fields that are arrays and take an index immediate (txna and friends)
+TXN_ARRAY_FIELDS = {"ApplicationArgs", "Accounts", "Assets", "Applications", "Logs"}
+
+GLOBAL_FIELDS: List[str] = [
+    "MinTxnFee", "MinBalance", "MaxTxnLife", "ZeroAddress", "GroupSize",
+    "LogicSigVersion", "Round", "LatestTimestamp", "CurrentApplicationID",
+    "CreatorAddress", "CurrentApplicationAddress", "GroupID", "OpcodeBudget",
+    "CallerApplicationID", "CallerApplicationAddress",
+]
+
+ASSET_HOLDING_FIELDS: List[str] = ["AssetBalance", "AssetFrozen"]
+
+ASSET_PARAMS_FIELDS: List[str] = [
+    "AssetTotal", "AssetDecimals", "AssetDefaultFrozen", "AssetUnitName",
+    "AssetName", "AssetURL", "AssetMetadataHash", "AssetManager", "AssetReserve",
+    "AssetFreeze", "AssetClawback", "AssetCreator",
+]
+
+APP_PARAMS_FIELDS: List[str] = [
+    "AppApprovalProgram", "AppClearStateProgram", "AppGlobalNumUint",
+    "AppGlobalNumByteSlice", "AppLocalNumUint", "AppLocalNumByteSlice",
+    "AppExtraProgramPages", "AppCreator", "AppAddress",
+]
+
+ACCT_PARAMS_FIELDS: List[str] = ["AcctBalance", "AcctMinBalance", "AcctAuthAddr"]
+
+ECDSA_CURVES: List[str] = ["Secp256k1"]
+
+FIELD_TABLES: Dict[str, List[str]] = {
+    TXN_FIELD: TXN_FIELDS,
+    GLOBAL_FIELD: GLOBAL_FIELDS,
+    ASSET_HOLDING_FIELD: ASSET_HOLDING_FIELDS,
+    ASSET_PARAMS_FIELD: ASSET_PARAMS_FIELDS,
+    APP_PARAMS_FIELD: APP_PARAMS_FIELDS,
+    ACCT_PARAMS_FIELD: ACCT_PARAMS_FIELDS,
+    ECDSA_CURVE: ECDSA_CURVES,
+}
+
+# Named integer constants accepted by the `int` pseudo-op
+NAMED_INTS: Dict[str, int] = {
+    "unknown": 0, "pay": 1, "keyreg": 2, "acfg": 3, "axfer": 4, "afrz": 5, "appl": 6,
+    "NoOp": 0, "OptIn": 1, "CloseOut": 2, "ClearState": 3,
+    "UpdateApplication": 4, "DeleteApplication": 5,
+}
+
+# Opcodes costing more than 1, as of TEAL v2 (v1 only had cheaper hashes)
+OP_COSTS: Dict[str, int] = {
+    "sha256": 35, "keccak256": 130, "sha512_256": 45, "ed25519verify": 1900,
+    "ecdsa_verify": 1700, "ecdsa_pk_decompress": 650, "ecdsa_pk_recover": 2000,
+    "divmodw": 20, "expw": 10, "sqrt": 4, "bsqrt": 40,
+    "b+": 10, "b-": 10, "b/": 20, "b*": 20, "b%": 20,
+    "b|": 6, "b&": 6, "b^": 6, "b~": 4,
+}
+V1_OP_COSTS: Dict[str, int] = {"sha256": 7, "keccak256": 26, "sha512_256": 9, "ed25519verify": 1900}
+
+
+def op_cost(name: str, version: int) -> int:
+    """Opcode budget ``name`` takes in a program of TEAL ``version``."""
+    if version == 1:
+        return V1_OP_COSTS.get(name, 1)
+    return OP_COSTS.get(name, 1)
+
+
+MAX_TEAL_VERSION = 6
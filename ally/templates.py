@@ -0,0 +1,161 @@
+import base64
+import functools
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import msgpack
+from algosdk import constants, encoding
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+
+from .account import Signer
+
+_SIG_PREFIX = b"\x82" + msgpack.packb("sig") + msgpack.packb(b"\x00" * 64, use_bin_type=True)[:2]
+_TXN_KEY = msgpack.packb("txn")
+# fixmap(1) {"txlist": [...]}, the array header follows
+_TXLIST = b"\x81" + msgpack.packb("txlist")
+# a signed transaction is its encoding plus the "sig" and "txn" keys and the signature
+_SIGNED_OVERHEAD = len(_SIG_PREFIX) + 64 + len(_TXN_KEY)
+
+# the fields filled per request, the rest being fixed in the template
+_VARIABLE = ("fee", "fv", "grp", "lv", "snd")
+
+
+def _pack(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True)
+
+
+class TxnTemplate:
+    """One transaction with every field but the sender, amount, fee and validity encoded once.
+
+    Args:
+        fields: The transaction's fields as `Transaction.dictify` names them,
+            the variable ones left out.
+        amount_field: Field filled with the request's amount ("amt", "aamt"), if any.
+        amount_offset: Added to the request's amount (the mint payment's fee share).
+        sender_fields: Fields filled with the sender's address too (an opt-in's "arcv").
+        fee: The suggested params' fee, per byte unless ``flat_fee``.
+        flat_fee: Whether ``fee`` is the fee itself.
+    """
+
+    __slots__ = ("_order", "_fixed", "amount_field", "amount_offset", "sender_fields", "fee", "flat_fee")
+
+    def __init__(self, fields: Dict[str, Any], amount_field: Optional[str] = None, amount_offset: int = 0,
+                 sender_fields: Sequence[str] = (), fee: int = 0, flat_fee: bool = False) -> None:
+        # zero values are left out of the canonical encoding, as by `encoding.msgpack_encode`
+        self._fixed = {key: _pack(key) + _pack(value) for key, value in fields.items() if value}
+        self.amount_field = amount_field
+        self.amount_offset = amount_offset
+        self.sender_fields = tuple(sender_fields)
+        self.fee = fee
+        self.flat_fee = flat_fee
+        variable = set(_VARIABLE) | set(self.sender_fields) | ({amount_field} if amount_field else set())
+        self._order = tuple(sorted(set(self._fixed) | variable))
+
+    def _encode(self, values: Dict[str, Any]) -> bytes:
+        parts = []
+        for key in self._order:
+            part = self._fixed.get(key)
+            if part is None:
+                value = values.get(key)
+                if not value:
+                    continue
+                part = _pack(key) + _pack(value)
+            parts.append(part)
+        return bytes([0x80 | len(parts)]) + b"".join(parts)
+
+    def encode(self, sender: bytes, amount: int, first: int, last: int,
+               group: Optional[bytes] = None) -> bytes:
+        """Canonical msgpack of the transaction, the fee computed as the SDK does."""
+        values = {"snd": sender, "fv": first, "lv": last, "grp": group}
+        for key in self.sender_fields:
+            values[key] = sender
+        if self.amount_field:
+            values[self.amount_field] = amount + self.amount_offset
+        if self.flat_fee:
+            values["fee"] = self.fee
+        elif self.fee:
+            # the SDK sizes the signed transaction before it has a group id
+            values["fee"], values["grp"] = self.fee, None
+            values["fee"] = max(self.fee * (len(self._encode(values)) + _SIGNED_OVERHEAD), constants.min_txn_fee)
+            values["grp"] = group
+        else:
+            values["fee"] = constants.min_txn_fee
+        return self._encode(values)
+
+
+class GroupTemplate:
+    """A group of `TxnTemplate`, all sent and signed by one account.
+
+    `sign` fills in the sender, amount and validity window, computes the
+    group id and signs, without building SDK transaction objects: the result
+    is the group's wire encoding, byte for byte what `mint_walgo_txns` and
+    `redeem_walgo_txns` produce and `send_transactions` sends.
+    """
+
+    __slots__ = ("txns",)
+
+    def __init__(self, txns: List[TxnTemplate]) -> None:
+        self.txns = txns
+
+    def sign(self, signer: Signer, amount: int, first: int, last: int) -> Tuple[bytes, List[str]]:
+        """The signed group, ready for `AlgodClient.send_raw_transaction` once base64 encoded.
+
+        Args:
+            signer: Signer of the sender.
+            amount: Amount of the request.
+            first: First valid round.
+            last: Last valid round.
+        Returns:
+            The concatenated signed transactions, and their txids.
+        """
+        sender = signer.public_key
+        txids = [
+            encoding.checksum(constants.txid_prefix + txn.encode(sender, amount, first, last))
+            for txn in self.txns
+        ]
+        group = encoding.checksum(constants.tgid_prefix + _TXLIST + _pack(txids))
+
+        signed, ids = [], []
+        for txn in self.txns:
+            to_sign = constants.txid_prefix + txn.encode(sender, amount, first, last, group)
+            signature = signer.sign_bytes(to_sign)
+            signed.append(_SIG_PREFIX + signature + _TXN_KEY + to_sign[len(constants.txid_prefix):])
+            ids.append(base64.b32encode(encoding.checksum(to_sign)).decode().rstrip("="))
+        return b"".join(signed), ids
+
+
+@functools.lru_cache(maxsize=64)
+def _template(kind: str, app_id: int, asset_id: int, gen: str, gh: str, fee: int, flat_fee: bool) -> GroupTemplate:
+    method, _, opt_in = kind.partition("+")
+    app = encoding.decode_address(get_application_address(app_id))
+
+    def txn(fields: Dict[str, Any], **kwargs: Any) -> TxnTemplate:
+        fields.update(gen=gen, gh=base64.b64decode(gh))
+        return TxnTemplate(fields, fee=fee, flat_fee=flat_fee, **kwargs)
+
+    call = txn({"type": "appl", "apid": app_id, "apaa": [method.encode()], "apas": [asset_id]})
+    if method == "mint":
+        txns = [call, txn({"type": "pay", "rcv": app}, amount_field="amt", amount_offset=1_000)]
+    else:
+        txns = [call, txn({"type": "axfer", "arcv": app, "xaid": asset_id}, amount_field="aamt")]
+    if opt_in:
+        txns.insert(0, txn({"type": "axfer", "xaid": asset_id}, sender_fields=("arcv",)))
+    return GroupTemplate(txns)
+
+
+def get_template(method: str, sp: transaction.SuggestedParams, app_id: int, asset_id: int,
+                 opt_in: bool = False) -> GroupTemplate:
+    """The template of a mint or redeem group, built once per pool and network params.
+
+    Args:
+        method: "mint" or "redeem".
+        sp: Suggested params; only the network and fee fields are part of the
+            template, the validity window is given to `GroupTemplate.sign`.
+        app_id: Application ID.
+        asset_id: Walgo asset ID.
+        opt_in: Whether a mint group starts with the sender's opt-in to the asset.
+    """
+    if method not in ("mint", "redeem") or (opt_in and method != "mint"):
+        raise Exception(f"no template for {method}{' with opt-in' if opt_in else ''}")
+    kind = method + ("+opt_in" if opt_in else "")
+    return _template(kind, app_id, asset_id, sp.gen, sp.gh, sp.fee, bool(sp.flat_fee))
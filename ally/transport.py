@@ -0,0 +1,208 @@
+import http.client
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib import parse
+
+from algosdk import constants, error
+from algosdk.v2client.algod import AlgodClient
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_IDLE_TIMEOUT = 60.0
+
+# errors that mean a kept-alive connection was closed by the server while idle
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected, http.client.BadStatusLine, BrokenPipeError,
+    ConnectionResetError, ConnectionAbortedError,
+)
+# methods safe to resend when the server may already have acted on the request
+_IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class PooledConnection:
+    """A persistent HTTP connection and its reuse stats."""
+
+    def __init__(self, conn: http.client.HTTPConnection, id: int) -> None:
+        self.conn = conn
+        self.id = id
+        self.requests = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "requests": self.requests,
+            "reused": max(self.requests - 1, 0),
+            "age": time.monotonic() - self.created_at,
+        }
+
+
+class ConnectionPool:
+    """Thread safe pool of keep-alive HTTP(S) connections to one host.
+
+    At most ``size`` connections are open at a time; callers beyond that wait
+    for one to be released. Connections idle for more than ``idle_timeout``
+    seconds are closed instead of reused. A request that fails because the
+    server closed a kept-alive connection is retried once on a new one if it
+    can't have reached the server (sending it failed) or its method is
+    idempotent; otherwise, e.g. for ``POST /v2/transactions``, the error is
+    raised, as the server may have acted on it.
+    """
+
+    def __init__(self, url: str, size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> None:
+        u = parse.urlsplit(url)
+        if u.scheme not in ("http", "https"):
+            raise Exception(f"Unsupported scheme: {url}")
+        self.scheme = u.scheme
+        self.host = u.hostname
+        self.port = u.port
+        self.base_path = u.path.rstrip("/")
+        self.size = size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.opened = 0
+        self.requests = 0
+        self._idle: List[PooledConnection] = []
+        self._active = 0
+        self._retired: List[Dict[str, Any]] = []
+        self._in_use: Dict[int, PooledConnection] = {}
+        self._cond = threading.Condition()
+
+    def _connect(self) -> PooledConnection:
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self.opened += 1
+        return PooledConnection(cls(self.host, self.port, timeout=self.timeout), self.opened)
+
+    def _acquire(self) -> PooledConnection:
+        with self._cond:
+            while True:
+                while self._idle:
+                    pc = self._idle.pop()
+                    if time.monotonic() - pc.last_used <= self.idle_timeout:
+                        self._in_use[pc.id] = pc
+                        return pc
+                    self._retire(pc)
+                if self._active < self.size:
+                    self._active += 1
+                    pc = self._connect()
+                    self._in_use[pc.id] = pc
+                    return pc
+                self._cond.wait()
+
+    def _release(self, pc: PooledConnection, reusable: bool) -> None:
+        with self._cond:
+            self._in_use.pop(pc.id, None)
+            pc.last_used = time.monotonic()
+            if reusable:
+                self._idle.append(pc)
+            else:
+                self._retire(pc)
+            self._cond.notify()
+
+    def _retire(self, pc: PooledConnection) -> None:
+        # caller holds the lock
+        pc.conn.close()
+        self._active -= 1
+        self._retired.append(pc.stats())
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        """Send a request, returning the status code and response body."""
+        for attempt in range(2):
+            pc = self._acquire()
+            reused = pc.requests > 0
+            sent = False
+            try:
+                pc.conn.request(method, self.base_path + path, body=body, headers=headers or {})
+                sent = True
+                resp = pc.conn.getresponse()
+                data = resp.read()
+            except _STALE_CONNECTION_ERRORS:
+                self._release(pc, False)
+                if reused and attempt == 0 and (not sent or method in _IDEMPOTENT_METHODS):
+                    continue
+                raise
+            except BaseException:
+                self._release(pc, False)
+                raise
+            pc.requests += 1
+            with self._cond:
+                self.requests += 1
+            self._release(pc, not resp.will_close)
+            return resp.status, data
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            live = [pc.stats() for pc in self._idle + list(self._in_use.values())]
+            return {
+                "size": self.size,
+                "opened": self.opened,
+                "requests": self.requests,
+                "reused": self.requests - self.opened if self.requests else 0,
+                "connections": sorted(live + self._retired, key=lambda c: c["id"]),
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            for pc in self._idle:
+                self._retire(pc)
+            self._idle = []
+
+
+class PooledAlgodClient(AlgodClient):
+    """`AlgodClient` whose requests go over a pool of keep-alive connections.
+
+    Behaves like the SDK client (same headers, errors and response handling)
+    but reuses TCP/TLS connections between calls instead of opening one per
+    request. `pool_stats` reports how often each connection was reused.
+    """
+
+    def __init__(self, algod_token: str, algod_address: str, headers: Optional[Dict[str, str]] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> None:
+        super().__init__(algod_token, algod_address, headers)
+        self.pool = ConnectionPool(algod_address, pool_size, timeout, idle_timeout)
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format="json"):
+        header = {"User-Agent": "py-algorand-sdk", "Connection": "keep-alive"}
+
+        if self.headers:
+            header.update(self.headers)
+
+        if headers:
+            header.update(headers)
+
+        if requrl not in constants.no_auth:
+            header.update({constants.algod_auth_header: self.algod_token})
+
+        if requrl not in constants.unversioned_paths:
+            requrl = "/v2" + requrl
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+
+        status, body = self.pool.request(method, requrl, body=data, headers=header)
+        if status >= 400:
+            message = body.decode("utf-8")
+            try:
+                message = json.loads(message)["message"]
+            finally:
+                raise error.AlgodHTTPError(message, status)
+
+        if response_format == "json":
+            try:
+                return json.loads(body) if body else None
+            except Exception as e:
+                raise error.AlgodResponseError(
+                    "Failed to parse JSON response from algod"
+                ) from e
+        return body
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self.pool.stats()
+
+    def close(self) -> None:
+        self.pool.close()
@@ -1,22 +1,67 @@
+import logging
+import os
 from base64 import b64decode
-from typing import Dict, Union, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, Union, List, Any, Optional
 
 from algosdk import encoding
 from algosdk.v2client.algod import AlgodClient
 from algosdk.kmd import KMDClient
-from pyteal import compileTeal, Expr, Mode
 
 from .account import Account
+from .cassette import ReplayAlgodClient, ReplayKMDClient, get_cassette, record
+from .metrics import get_metrics, instrument
+from .state import get_state_cache
+from .transport import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, PooledAlgodClient
 
+if TYPE_CHECKING:
+    from pyteal import Expr
+
+# "local" assembles in process, "algod" uses /v2/teal/compile, and "verify"
+# assembles locally and checks the result against algod
+COMPILE_BACKENDS = ("local", "algod", "verify")
+
+logger = logging.getLogger(__name__)
+
+
+def _cassette_mode() -> Optional[str]:
+    # $ALLY_CASSETTE names a cassette file, $ALLY_CASSETTE_MODE is "record" or "replay"
+    if not os.environ.get("ALLY_CASSETTE"):
+        return None
+    return os.environ.get("ALLY_CASSETTE_MODE", "record")
+
+
+def _instrumented(client):
+    # $ALLY_METRICS turns on request metrics, see `ally.metrics`
+    metrics = get_metrics()
+    return client if metrics is None else instrument(client, metrics)
+
+
+def get_algod_client(url, token, pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT,
+                     keep_alive: bool = True) -> AlgodClient:
+    mode = _cassette_mode()
+    if mode == "replay":
+        client = ReplayAlgodClient(get_cassette(os.environ["ALLY_CASSETTE"], mode))
+        return _instrumented(client)
 
-def get_algod_client(url, token) -> AlgodClient:
     headers = {
         'X-API-Key': token
     }
-    return AlgodClient(token, url, headers)
+    if not keep_alive:
+        client = AlgodClient(token, url, headers)
+    else:
+        client = PooledAlgodClient(token, url, headers, pool_size=pool_size, timeout=timeout)
+    if mode is not None:
+        record(client, get_cassette(os.environ["ALLY_CASSETTE"], mode))
+    return _instrumented(client)
 
 def get_kmd_client(url, token) -> KMDClient:
-    return KMDClient(token, url)
+    mode = _cassette_mode()
+    if mode == "replay":
+        return _instrumented(ReplayKMDClient(get_cassette(os.environ["ALLY_CASSETTE"], mode)))
+    client = KMDClient(token, url)
+    if mode is not None:
+        record(client, get_cassette(os.environ["ALLY_CASSETTE"], mode))
+    return _instrumented(client)
 
 class PendingTxnResponse:
     def __init__(self, response: Dict[str, Any]) -> None:
@@ -42,28 +87,62 @@ class PendingTxnResponse:
 
 
 def wait_for_transaction(
-        client: AlgodClient, tx_id: str
+        client: AlgodClient, tx_id: str, last_valid: Optional[int] = None
 ) -> PendingTxnResponse:
-    last_status = client.status()
-    last_round = last_status.get("last-round")
-    pending_txn = client.pending_transaction_info(tx_id)
-    while not (pending_txn.get("confirmed-round") and pending_txn.get("confirmed-round") > 0):
-        print("Waiting for confirmation...")
-        last_round += 1
-        client.status_after_block(last_round)
-        pending_txn = client.pending_transaction_info(tx_id)
-    print(
-        "Transaction {} confirmed in round {}.".format(
-            tx_id, pending_txn.get("confirmed-round")
-        )
-    )
-    return PendingTxnResponse(pending_txn)
-
-
-def fully_compile_contract(client: AlgodClient, contract: Expr) -> bytes:
+    """Block until ``tx_id`` is confirmed.
+
+    Waiting goes through the client's shared `ConfirmationTracker`, so any
+    number of threads waiting at once cost a single block-wait loop.
+
+    Args:
+        client: An algod client.
+        tx_id: Transaction ID.
+        last_valid: Last valid round of the transaction, to fail as soon as it expires.
+    Returns:
+        The confirmed transaction's pending info.
+    """
+    from .confirmation import get_tracker
+
+    pending_txn = get_tracker(client).track(tx_id, last_valid).result()
+    logger.info("Transaction %s confirmed in round %s.", tx_id, pending_txn.confirmed_round)
+    return pending_txn
+
+
+def compile_program(client: Optional[AlgodClient], teal: str, backend: Optional[str] = None) -> bytes:
+    """Assemble TEAL source into program bytecode.
+
+    Args:
+        client: An algod client, only needed for the "algod" and "verify" backends.
+        teal: TEAL source.
+        backend: One of COMPILE_BACKENDS, defaults to $ALLY_COMPILE_BACKEND or "local".
+    Returns:
+        The program bytecode.
+    """
+    backend = backend or os.environ.get("ALLY_COMPILE_BACKEND", "local")
+    if backend not in COMPILE_BACKENDS:
+        raise Exception(f"Unknown compile backend: {backend}")
+
+    if backend == "algod":
+        return b64decode(client.compile(teal)["result"])
+
+    # the assembler (and the AVM `ally.teal` brings with it) only load when compiling
+    from .teal import assemble
+
+    program = assemble(teal)
+    if backend == "verify":
+        expected = b64decode(client.compile(teal)["result"])
+        if program != expected:
+            raise Exception(
+                "Local assembler output differs from algod: {} != {}".format(
+                    program.hex(), expected.hex()))
+    return program
+
+
+def fully_compile_contract(client: AlgodClient, contract: "Expr") -> bytes:
+    from pyteal import Mode, compileTeal
+
     teal = compileTeal(contract, mode=Mode.Application, version=5)
-    response = client.compile(teal)
-    return b64decode(response["result"])
+    return compile_program(client, teal)
 
 
 def decode_state(state_array: List[Any]) -> Dict[bytes, Union[int, bytes]]:
@@ -89,17 +168,42 @@ def decode_state(state_array: List[Any]) -> Dict[bytes, Union[int, bytes]]:
     return state
 
 
+def decode_state_delta(delta: List[Any]) -> Dict[bytes, Optional[Union[int, bytes]]]:
+    """Decode a global/local state delta; deleted keys map to None."""
+    changes: Dict[bytes, Optional[Union[int, bytes]]] = dict()
+
+    for pair in delta:
+        key = b64decode(pair["key"])
+
+        value = pair["value"]
+        action = value["action"]
+
+        if action == 1:
+            # set byte array
+            changes[key] = b64decode(value.get("bytes", ""))
+        elif action == 2:
+            # set uint64
+            changes[key] = value.get("uint", 0)
+        elif action == 3:
+            # delete
+            changes[key] = None
+        else:
+            raise Exception(f"Unexpected state delta action: {action}")
+
+    return changes
+
+
 def get_app_global_state(
         client: AlgodClient, app_id: int
 ) -> Dict[bytes, Union[int, bytes]]:
-    app_info = client.application_info(app_id)
+    app_info = get_state_cache(client).application_info(app_id)
     return decode_state(app_info["params"]["global-state"])
 
 
 def get_app_local_state(
         client: AlgodClient, app_id: int, sender: Account
 ) -> Dict[bytes, Union[int, bytes]]:
-    account_info = client.account_info(sender.get_address())
+    account_info = get_state_cache(client).account_info(sender.get_address())
     for local_state in account_info["apps-local-state"]:
         if local_state["id"] == app_id:
             if "key-value" not in local_state:
@@ -117,7 +221,7 @@ def get_app_address(app_id: int) -> str:
 def get_balances(client: AlgodClient, account: str) -> Dict[int, int]:
     balances: Dict[int, int] = dict()
 
-    account_info = client.account_info(account)
+    account_info = get_state_cache(client).account_info(account)
 
     # set key 0 to Algo balance
     balances[0] = account_info["amount"]
@@ -159,7 +263,7 @@ def get_genesis_accounts(kmd: KMDClient) -> List[Account]:
 
 
 def is_opted_in_asset(client: AlgodClient, asset_id: int, addr: str):
-    account_info = client.account_info(addr)  
+    account_info = get_state_cache(client).account_info(addr)  
     for a in account_info.get('assets', []):
         if a['asset-id'] == asset_id:
             return True
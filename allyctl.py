@@ -0,0 +1,9 @@
+import sys
+
+from ally import configure_logging
+from ally.cli import main
+
+
+if __name__ == '__main__':
+    configure_logging()
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,287 @@
+"""Timings of the client side hot paths, checked against a baseline.
+
+    python -m benchmarks.hotpaths            # print the current timings
+    python -m benchmarks.hotpaths --check    # fail on regressions
+    python -m benchmarks.hotpaths --update   # rewrite the baseline
+    python -m benchmarks.hotpaths -k mint    # only benchmarks whose name contains "mint"
+
+Each benchmark is run in batches of enough calls to take at least
+``BATCH_TIME``, alternating with batches of a fixed pure Python and hashing
+workload (`calibration`). Its time per call is the best of ``REPEATS``
+batches, the figure least disturbed by whatever else the machine is doing,
+and what ``--check`` compares is that time relative to the calibration's, so
+a baseline written on one machine stays meaningful on another. A regression is
+a ratio more than ``--threshold`` (default 25%) above the baseline.
+Benchmarks that cannot run here (`ally.contracts.pool` needs pytealutils and a
+TEAL v6 capable PyTeal) are reported as skipped.
+"""
+import argparse
+import base64
+import gc
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from algosdk import encoding
+from algosdk.future import transaction
+from pyteal import Mode, compileTeal
+
+from ally import operations as ops
+from ally.contracts.pool_oop import AllyPool
+from ally.teal import assemble_program
+from ally.utils import PendingTxnResponse, decode_state, get_app_address
+from testing.resources import GENESIS_HASH, accounts, params
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "hotpaths.json")
+DEFAULT_THRESHOLD = 0.25
+BATCH_TIME = 0.02
+REPEATS = 15
+
+APP_ID = 1000
+ASSET_ID = 1001
+# a full global state, the most algod returns for an app
+STATE_ENTRIES = 64
+
+Benchmark = Callable[[], Any]
+
+
+def _batch(fn: Benchmark, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - start
+
+
+def _batch_size(fn: Benchmark, batch_time: float) -> int:
+    number = 1
+    while True:
+        elapsed = _batch(fn, number)
+        if elapsed >= batch_time:
+            return number
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(batch_time / elapsed) + 1))
+
+
+def measure(fn: Benchmark, repeats: int = REPEATS, batch_time: float = BATCH_TIME) -> Tuple[float, float]:
+    """Best time per call of ``fn`` and of `calibration`, in seconds.
+
+    Batches of the two alternate, so a slow spell of the machine slows both
+    and their ratio holds. The garbage collector is off while timing, as with
+    `timeit`.
+    """
+    number, reference = _batch_size(fn, batch_time), _batch_size(calibration, batch_time)
+    best, base = float("inf"), float("inf")
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            base = min(base, _batch(calibration, reference) / reference)
+            best = min(best, _batch(fn, number) / number)
+    finally:
+        if enabled:
+            gc.enable()
+    return best, base
+
+
+def calibration() -> None:
+    """The reference workload: interpreter dispatch, small allocations and sha512/256."""
+    state = {}
+    for i in range(200):
+        state[f"k{i}"] = [i, str(i), (i, i)]
+    digest = b""
+    for value in state.values():
+        digest = hashlib.new("sha512_256", digest + value[1].encode()).digest()
+
+
+def _state_array(entries: int = STATE_ENTRIES) -> List[Dict[str, Any]]:
+    array = []
+    for i in range(entries):
+        key = base64.b64encode(f"key{i}".encode()).decode()
+        if i % 2:
+            array.append({"key": key, "value": {"type": 2, "uint": i * 1_000_003, "bytes": ""}})
+        else:
+            value = base64.b64encode(bytes(range(32))).decode()
+            array.append({"key": key, "value": {"type": 1, "bytes": value, "uint": 0}})
+    return array
+
+
+def _pending_info(minter: str) -> Dict[str, Any]:
+    # an algod response for a confirmed mint app call
+    return {
+        "pool-error": "",
+        "confirmed-round": 1234,
+        "txn": {
+            "sig": base64.b64encode(bytes(64)).decode(),
+            "txn": {"type": "appl", "snd": minter, "apid": APP_ID, "fee": 2000, "fv": 1, "lv": 1001,
+                    "gh": GENESIS_HASH, "apaa": [base64.b64encode(b"mint").decode()], "apas": [ASSET_ID]},
+        },
+        "global-state-delta": [{"key": base64.b64encode(b"minted").decode(), "value": {"action": 2, "uint": 10}}],
+        "inner-txns": [{
+            "pool-error": "",
+            "txn": {"txn": {"type": "axfer", "snd": get_app_address(APP_ID), "arcv": minter, "xaid": ASSET_ID,
+                            "aamt": 1_000_000, "fv": 1, "lv": 1001}},
+        }],
+        "logs": [base64.b64encode(b"minted 1000000").decode()],
+    }
+
+
+def _pool_approval() -> str:
+    from ally.contracts import pool
+    return pool.get_approval_src(lock_start=1, lock_stop=10)
+
+
+def benchmarks() -> Dict[str, Benchmark]:
+    """Every benchmark by name, sharing one set of accounts and params."""
+    sp = params()
+    governors = accounts(3)
+    user = governors[0]
+    requests = [(sender, 1_000_000 + i) for i, sender in enumerate(accounts(ops.MAX_BATCH_PAIRS))]
+    approval = assemble_program(compileTeal(AllyPool().approval_program(), mode=Mode.Application,
+                                            version=ops.TEAL_VERSION)).bytecode
+    clear = assemble_program(compileTeal(AllyPool().clear_program(), mode=Mode.Application,
+                                         version=ops.TEAL_VERSION)).bytecode
+    call = transaction.ApplicationCallTxn(
+        ops.governors_multisig(governors, 2).address(), sp, APP_ID, transaction.OnComplete.NoOpOC,
+        app_args=[b"toggle_redeem"],
+    )
+    pay = transaction.PaymentTxn(user.get_address(), sp, governors[1].get_address(), 1_000_000)
+    mint_group = ops.mint_walgo_txns(sp, user, APP_ID, ASSET_ID, 1_000_000, opt_in=True)
+    batch_group = ops.mint_walgo_batch_txns(sp, requests, APP_ID, ASSET_ID)
+    state = _state_array()
+    pending = _pending_info(user.get_address())
+
+    return {
+        "codegen.pool_oop.approval": lambda: compileTeal(
+            AllyPool().approval_program(), mode=Mode.Application, version=ops.TEAL_VERSION),
+        "codegen.pool.approval": _pool_approval,
+        "txn.create_pool": lambda: ops.create_pool_txn(sp, governors, 2, approval, clear),
+        "txn.bootstrap_pool": lambda: ops.bootstrap_pool_txn(sp, governors, 2, APP_ID),
+        "txn.set_governor": lambda: ops.set_governor_txn(sp, user, APP_ID, governors, 1, 2),
+        "txn.destroy_pool": lambda: ops.destroy_pool_txn(sp, governors, 2, APP_ID),
+        "txn.update_pool": lambda: ops.update_pool_txn(sp, governors, 2, APP_ID, approval, clear),
+        "txn.opt_in": lambda: ops.opt_in_txn(sp, user, ASSET_ID),
+        "txn.mint_walgo": lambda: ops.mint_walgo_txns(sp, user, APP_ID, ASSET_ID, 1_000_000),
+        "txn.mint_walgo_opt_in": lambda: ops.mint_walgo_txns(sp, user, APP_ID, ASSET_ID, 1_000_000, opt_in=True),
+        "txn.redeem_walgo": lambda: ops.redeem_walgo_txns(sp, user, APP_ID, ASSET_ID, 1_000_000),
+        "template.mint_walgo": lambda: ops.mint_walgo_group(sp, user, APP_ID, ASSET_ID, 1_000_000),
+        "template.redeem_walgo": lambda: ops.redeem_walgo_group(sp, user, APP_ID, ASSET_ID, 1_000_000),
+        "txn.mint_walgo_batch": lambda: ops.mint_walgo_batch_txns(sp, requests, APP_ID, ASSET_ID),
+        "txn.redeem_walgo_batch": lambda: ops.redeem_walgo_batch_txns(sp, requests, APP_ID, ASSET_ID),
+        "txn.toggle_redeem": lambda: ops.toggle_redeem_txn(sp, governors, APP_ID, 2),
+        "txn.set_mint_price": lambda: ops.set_mint_price_txn(sp, 1_000_000, governors, APP_ID, 2),
+        "sign.multisig": lambda: ops.sign_multisig(call, governors, 2),
+        "sign.payment": lambda: user.get_signer().sign(pay),
+        # the same through the SDK, decoding the key on every call
+        "sign.payment.sdk": lambda: pay.sign(user.get_private_key()),
+        "msgpack.mint_group": lambda: b"".join(encoding.msgpack_encode(t).encode() for t in mint_group),
+        "msgpack.mint_batch_group": lambda: b"".join(encoding.msgpack_encode(t).encode() for t in batch_group),
+        f"decode_state.{STATE_ENTRIES}": lambda: decode_state(state),
+        "pending_txn_response": lambda: PendingTxnResponse(pending),
+        "get_app_address": lambda: get_app_address(APP_ID),
+    }
+
+
+def collect(only: str = "") -> Dict[str, Any]:
+    """Time every benchmark whose name contains ``only``, with the calibration workload."""
+    report: Dict[str, Any] = {"calibration_us": None, "benchmarks": {}}
+    fastest = float("inf")
+    for name, fn in benchmarks().items():
+        if only not in name:
+            continue
+        try:
+            fn()
+        except Exception as e:
+            report["benchmarks"][name] = {"skipped": f"{type(e).__name__}: {e}"}
+            continue
+        seconds, base = measure(fn)
+        fastest = min(fastest, base)
+        report["benchmarks"][name] = {"us": round(seconds * 1e6, 3), "relative": round(seconds / base, 4)}
+    if fastest < float("inf"):
+        report["calibration_us"] = round(fastest * 1e6, 3)
+    return report
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Regressions of ``current`` against ``baseline``, as readable lines."""
+    regressions = []
+    for name, figures in current["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None or "skipped" in base or "skipped" in figures:
+            continue
+        old, new = base["relative"], figures["relative"]
+        if new > old * (1 + threshold):
+            regressions.append(f"{name}: {old} -> {new} x calibration (+{(new - old) / old:.1%}, "
+                               f"{base['us']}us -> {figures['us']}us)")
+    return regressions
+
+
+def _table(report: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    rows = []
+    for name, figures in report["benchmarks"].items():
+        if "skipped" in figures:
+            rows.append((name, "skipped", figures["skipped"]))
+        else:
+            rows.append((name, f"{figures['us']:.3f}", f"{figures['relative']:.4f}"))
+    return rows
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="compare against the baseline")
+    parser.add_argument("--update", action="store_true", help="write the current timings as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("-k", dest="only", default="", help="only benchmarks whose name contains this")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    current = collect(args.only)
+
+    if args.update:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        if args.only and os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            baseline["benchmarks"].update(current["benchmarks"])
+            current = baseline
+        current["benchmarks"] = {
+            name: figures for name, figures in sorted(current["benchmarks"].items()) if "skipped" not in figures
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+        print(f"wrote {args.baseline}")
+        return 0
+
+    if args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for name, figures in current["benchmarks"].items():
+            if "skipped" in figures:
+                print(f"skipped {name}: {figures['skipped']}")
+        regressions = compare(baseline, current, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if not regressions:
+            print("no regressions")
+        return 1 if regressions else 0
+
+    if args.json:
+        print(json.dumps(current, indent=2))
+        return 0
+
+    print(f"calibration: {current['calibration_us']}us")
+    print(f"{'benchmark':<32}{'us/call':>14}{'x calibration':>16}")
+    for name, us, relative in _table(current):
+        if us == "skipped":
+            print(f"{name:<32}{'skipped':>14}  {relative}")
+        else:
+            print(f"{name:<32}{us:>14}{relative:>16}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,150 @@
+"""Import time of the operational scripts and the modules they load, checked against a baseline.
+
+    python -m benchmarks.import_time            # print the current timings
+    python -m benchmarks.import_time --check    # fail on regressions
+    python -m benchmarks.import_time --update   # rewrite the baseline
+
+Each target is imported in a fresh interpreter ``--runs`` times (default 7),
+its time being the fastest run. Times are also given relative to importing
+the algosdk modules every script needs, timed in between the target's runs,
+and those ratios are what ``--check`` compares. A regression is a ratio more than
+``--threshold`` (default 25%) above the baseline, or a target that now
+imports PyTeal: only contract codegen needs it, and scripts load the
+prebuilt programs instead (see `ally.operations.get_contracts`).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "import_time.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_RUNS = 7
+
+# the floor: what any script talking to algod imports anyway
+REFERENCE = "algosdk.v2client.algod, algosdk.kmd, algosdk.future.transaction"
+TARGETS = [
+    "ally.utils",
+    "ally.operations",
+    "ally.cli",
+    "mint_walgo",
+    "redeem_walgo",
+    "toggle_redeem",
+    "mint_price",
+    "set_governor",
+    "deploy",
+    "update_pool",
+]
+
+_PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import {modules}\n"
+    "print(time.perf_counter() - start, 'pyteal' in sys.modules)\n"
+)
+
+
+def import_once(modules: str) -> Tuple[float, bool]:
+    """Seconds to import ``modules`` in a new interpreter, and whether that imported PyTeal."""
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(modules=modules)],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return float(out[0]), out[1] == "True"
+
+
+def measure(modules: str, runs: int = DEFAULT_RUNS) -> Tuple[float, float, bool]:
+    """Fastest of ``runs`` imports of ``modules`` and of the reference, run alternately.
+
+    Alternating keeps both minimums from the same stretch of machine load, so
+    their ratio holds up on a busy machine where either time alone doesn't.
+    """
+    times, reference, pyteal = [], [], False
+    for _ in range(runs):
+        reference.append(import_once(REFERENCE)[0])
+        seconds, imported = import_once(modules)
+        times.append(seconds)
+        pyteal = pyteal or imported
+    return min(times), min(reference), pyteal
+
+
+def collect(runs: int = DEFAULT_RUNS) -> Dict[str, Any]:
+    # byte-compile first, so no run pays for it
+    import_once(", ".join([REFERENCE] + TARGETS))
+    report: Dict[str, Any] = {"reference_ms": None, "targets": {}}
+    references = []
+    for target in TARGETS:
+        seconds, reference, pyteal = measure(target, runs)
+        references.append(reference)
+        report["targets"][target] = {
+            "ms": round(seconds * 1000, 2),
+            "relative": round(seconds / reference, 3),
+            "imports_pyteal": pyteal,
+        }
+    report["reference_ms"] = round(min(references) * 1000, 2)
+    return report
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Regressions of ``current`` against ``baseline``, as readable lines."""
+    regressions = []
+    for target, figures in current["targets"].items():
+        if figures["imports_pyteal"]:
+            regressions.append(f"{target} imports pyteal")
+        base = baseline["targets"].get(target)
+        if base is None:
+            continue
+        old, new = base["relative"], figures["relative"]
+        if new > old * (1 + threshold):
+            regressions.append(f"{target}: {old} -> {new} x reference (+{(new - old) / old:.1%}, "
+                               f"{base['ms']}ms -> {figures['ms']}ms)")
+    return regressions
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="compare against the baseline")
+    parser.add_argument("--update", action="store_true", help="write the current timings as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    current = collect(args.runs)
+
+    if args.update:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+        print(f"wrote {args.baseline}")
+        return 0
+
+    if args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if not regressions:
+            print("no regressions")
+        return 1 if regressions else 0
+
+    if args.json:
+        print(json.dumps(current, indent=2))
+        return 0
+
+    print(f"reference ({REFERENCE}): {current['reference_ms']}ms")
+    print(f"{'target':<20}{'ms':>10}{'x reference':>14}  pyteal")
+    for target, figures in current["targets"].items():
+        print(f"{target:<20}{figures['ms']:>10}{figures['relative']:>14}  {'yes' if figures['imports_pyteal'] else 'no'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,314 @@
+"""Mint/redeem load against a node: throughput, latency and rejections.
+
+    python -m benchmarks.loadtest --fake                      # against an in-process FakeAlgod
+    python -m benchmarks.loadtest --users 16 --ops 20         # against the node and pool in .env
+    python -m benchmarks.loadtest --fake --mint-ratio 0.7 --amount 100000:5000000 --json
+
+Every simulated user is a thread with its own account from
+`testing.resources.get_temporary_account`, running ``--ops`` operations
+through `ally.operations.mint_walgo` and `redeem_walgo` on one shared
+client, as a service handling many users would. Each operation is a mint
+with probability ``--mint-ratio``, else a redeem of at most what the user
+holds, of a random amount in the ``--amount`` range (microalgos).
+
+The report has confirmed transactions and operations per round, latency
+from submitting a group to its confirmation (p50/p95/p99), how long a whole
+operation takes including its params and opt-in lookups, rejections grouped
+by cause, and the algod requests made per confirmed operation, polling for
+confirmations included.
+
+Against a real node (sandbox), ``APP_ID`` and ``WALGO_ID`` name the pool
+and KMD's genesis wallet funds the users. With ``--fake`` a pool is deployed
+on a `testing.fake_algod.FakeAlgod` first, and ``--block-time`` makes it
+produce blocks on a timer instead of one per group.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import dotenv
+import msgpack
+from algosdk.error import AlgodHTTPError
+from algosdk.future import transaction
+from algosdk.kmd import KMDClient
+from algosdk.logic import get_application_address
+from algosdk.v2client.algod import AlgodClient
+
+from ally import operations as ops
+from ally.account import Account
+from ally.confirmation import TransactionExpiredError, TransactionRejectedError
+from ally.metrics import endpoint
+from ally.params import suggested_params
+from ally.state import AppStateMirror
+from ally.utils import PendingTxnResponse, get_algod_client, get_kmd_client, wait_for_transaction
+from testing.resources import get_temporary_account
+
+DEFAULT_USERS = 8
+DEFAULT_OPS = 10
+DEFAULT_MINT_RATIO = 0.5
+DEFAULT_AMOUNT = (100_000, 2_000_000)
+PERCENTILES = (50, 95, 99)
+
+_TXID = re.compile(r"\b[A-Z2-7]{52}\b")
+_ADDRESS = re.compile(r"\b[A-Z2-7]{58}\b")
+
+
+class RequestProbe:
+    """Counts a client's algod requests and notes when each thread last sent a group.
+
+    Wraps the client's request method in place, like `ally.cassette.record`,
+    so requests made by its `ConfirmationTracker` are counted too.
+    """
+
+    def __init__(self, client: AlgodClient) -> None:
+        self.requests: Counter = Counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        send = client.algod_request
+
+        def algod_request(method, requrl, params=None, data=None, headers=None, response_format="json"):
+            with self._lock:
+                self.requests[f"{method} {endpoint(requrl)}"] += 1
+            if method == "POST" and requrl == "/transactions":
+                self._local.sent_at = time.monotonic()
+                self._local.group_size = sum(1 for _ in msgpack.Unpacker(io.BytesIO(data), strict_map_key=False))
+            return send(method, requrl, params, data, headers, response_format)
+
+        client.algod_request = algod_request
+
+    def last_send(self) -> Tuple[float, int]:
+        """When the calling thread last sent a group and how many transactions it had."""
+        return self._local.sent_at, self._local.group_size
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests.clear()
+
+
+def rejection_cause(e: Exception) -> str:
+    """A failed operation's error with txids, addresses and algod's boilerplate removed."""
+    if isinstance(e, TransactionExpiredError):
+        return "expired before confirmation"
+    if isinstance(e, TransactionRejectedError):
+        message = f"dropped from pool: {e.pool_error}"
+    elif isinstance(e, AlgodHTTPError):
+        message = str(e)
+    else:
+        message = f"{type(e).__name__}: {e}"
+    message = message.replace("TransactionPool.Remember: ", "").split(". Details:")[0]
+    message = re.sub(r"transaction [A-Z2-7]{52}: ", "", message)
+    return _ADDRESS.sub("<address>", _TXID.sub("<txid>", message)).strip()
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values``."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def deploy_pool(client: AlgodClient, kmd: KMDClient) -> Tuple[int, int]:
+    """Create and bootstrap a pool funded from KMD's genesis wallet, returning (app id, walgo id)."""
+    governors = [get_temporary_account(client, kmd) for _ in range(3)]
+
+    def pay(receiver: str, amount: int) -> None:
+        txn = transaction.PaymentTxn(governors[0].get_address(), suggested_params(client), receiver, amount)
+        client.send_transaction(governors[0].get_signer().sign(txn))
+        wait_for_transaction(client, txn.get_txid())
+
+    # the app's min balance plus the create and bootstrap fees
+    pay(ops.governors_multisig(governors, 2).address(), ops.MULTISIG_FUNDING)
+    app_id = ops.create_pool(client, governors, 2)
+    pay(get_application_address(app_id), ops.APP_FUNDING)
+    mirror = AppStateMirror(client, app_id)
+    mirror.apply(ops.bootstrap_pool(client, governors, 2, app_id))
+    return app_id, mirror.state[b"p"]
+
+
+class _User:
+    def __init__(self, account: Account, rng: random.Random) -> None:
+        self.account = account
+        self.rng = rng
+        self.held = 0
+
+
+def minted(result: PendingTxnResponse) -> int:
+    """wALGO a confirmed mint app call sent back, from its inner asset transfers."""
+    return sum(inner["txn"]["txn"].get("aamt", 0) for inner in result.inner_txns)
+
+
+def run(client: AlgodClient, kmd: KMDClient, app_id: int, asset_id: int, users: int = DEFAULT_USERS,
+        ops_per_user: int = DEFAULT_OPS, mint_ratio: float = DEFAULT_MINT_RATIO,
+        amount: Tuple[int, int] = DEFAULT_AMOUNT, seed: int = 0) -> Dict[str, Any]:
+    """Run ``users`` concurrent users doing ``ops_per_user`` mints or redeems each.
+
+    Args:
+        client: An algod client, shared by every user.
+        kmd: A KMD client with the genesis wallet that funds the users.
+        app_id: Application ID.
+        asset_id: Walgo asset ID.
+        users: Number of concurrent users.
+        ops_per_user: Operations each user runs, one after the other.
+        mint_ratio: Chance that an operation is a mint.
+        amount: Inclusive (low, high) range of operation amounts.
+        seed: Seed of the users' random choices.
+    Returns:
+        The load report.
+    """
+    accounts = [get_temporary_account(client, kmd) for _ in range(users)]
+    probe = RequestProbe(client)
+
+    lock = threading.Lock()
+    latencies: List[float] = []
+    durations: Dict[str, List[float]] = {"mint": [], "redeem": []}
+    txns_by_round: Counter = Counter()
+    ops_by_round: Counter = Counter()
+    rejections: Counter = Counter()
+
+    def simulate(user: _User) -> None:
+        for _ in range(ops_per_user):
+            value = user.rng.randint(*amount)
+            kind = "mint" if user.held == 0 or user.rng.random() < mint_ratio else "redeem"
+            if kind == "redeem":
+                value = min(value, user.held)
+
+            start = time.monotonic()
+            try:
+                if kind == "mint":
+                    result = ops.mint_walgo(client, user.account, app_id, asset_id, value)
+                else:
+                    result = ops.redeem_walgo(client, user.account, app_id, asset_id, value)
+            except Exception as e:
+                with lock:
+                    rejections[f"{kind}: {rejection_cause(e)}"] += 1
+                continue
+            end = time.monotonic()
+
+            # the pool mints at its mint price, which needn't be 1:1; a redeem
+            # takes exactly the wALGO sent
+            user.held += minted(result) if kind == "mint" else -value
+            sent_at, group_size = probe.last_send()
+            with lock:
+                latencies.append(end - sent_at)
+                durations[kind].append(end - start)
+                txns_by_round[result.confirmed_round] += group_size
+                ops_by_round[result.confirmed_round] += 1
+
+    probe.reset()
+    start = time.monotonic()
+    with ThreadPoolExecutor(users) as executor:
+        list(executor.map(simulate, [_User(a, random.Random(seed * 1_000_003 + i)) for i, a in enumerate(accounts)]))
+    elapsed = time.monotonic() - start
+
+    confirmed = sum(ops_by_round.values())
+    # rounds without a confirmation between the first and the last count as empty
+    rounds = range(min(ops_by_round), max(ops_by_round) + 1) if ops_by_round else range(0)
+
+    def per_round(counts: Counter) -> Dict[str, Any]:
+        return {
+            "mean": round(sum(counts.values()) / len(rounds), 2) if rounds else None,
+            "max": max(counts.values(), default=0),
+        }
+
+    def ms(values: List[float]) -> Dict[str, Optional[float]]:
+        figures = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+        figures["max"] = max(values, default=None)
+        return {k: None if v is None else round(v * 1000, 2) for k, v in figures.items()}
+
+    return {
+        "users": users,
+        "operations": users * ops_per_user,
+        "confirmed": {kind: len(values) for kind, values in durations.items()},
+        "rejected": dict(rejections.most_common()),
+        "elapsed_s": round(elapsed, 3),
+        "operations_per_s": round(confirmed / elapsed, 2) if elapsed else None,
+        "rounds": {
+            "first": rounds.start if rounds else None,
+            "last": rounds.stop - 1 if rounds else None,
+            "txns_per_round": per_round(txns_by_round),
+            "operations_per_round": per_round(ops_by_round),
+        },
+        "submit_to_confirm_ms": ms(latencies),
+        "operation_ms": {kind: ms(values) for kind, values in durations.items()},
+        "algod_requests": {
+            "total": sum(probe.requests.values()),
+            "per_confirmed_operation": round(sum(probe.requests.values()) / confirmed, 2) if confirmed else None,
+            "by_endpoint": dict(probe.requests.most_common()),
+        },
+    }
+
+
+def _amount(value: str) -> Tuple[int, int]:
+    low, _, high = value.partition(":")
+    return int(low), int(high or low)
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    rounds = report["rounds"]
+    requests = report["algod_requests"]
+    print(f"{report['users']} users, {report['operations']} operations in {report['elapsed_s']}s "
+          f"({report['operations_per_s']} confirmed/s)")
+    print(f"confirmed: {report['confirmed']['mint']} mints, {report['confirmed']['redeem']} redeems "
+          f"in rounds {rounds['first']}..{rounds['last']}")
+    print(f"per round: {rounds['txns_per_round']['mean']} txns (max {rounds['txns_per_round']['max']}), "
+          f"{rounds['operations_per_round']['mean']} operations (max {rounds['operations_per_round']['max']})")
+    print("submit to confirm ms: " + ", ".join(f"{k} {v}" for k, v in report["submit_to_confirm_ms"].items()))
+    for kind, figures in report["operation_ms"].items():
+        print(f"{kind} ms: " + ", ".join(f"{k} {v}" for k, v in figures.items()))
+    print(f"algod requests: {requests['total']} ({requests['per_confirmed_operation']} per confirmed operation)")
+    for path, count in requests["by_endpoint"].items():
+        print(f"  {count:>8}  {path}")
+    for cause, count in report["rejected"].items():
+        print(f"rejected {count}x: {cause}")
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS, help="operations per user")
+    parser.add_argument("--mint-ratio", type=float, default=DEFAULT_MINT_RATIO)
+    parser.add_argument("--amount", type=_amount, default=DEFAULT_AMOUNT, help="LOW:HIGH microalgos")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fake", action="store_true", help="run against an in-process FakeAlgod")
+    parser.add_argument("--block-time", type=float, help="seconds between FakeAlgod blocks")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    options = dict(users=args.users, ops_per_user=args.ops, mint_ratio=args.mint_ratio, amount=args.amount,
+                   seed=args.seed)
+
+    if args.fake:
+        from testing.fake_algod import FakeAlgod
+
+        with FakeAlgod(dev_mode=args.block_time is None, block_time=args.block_time) as node:
+            client = get_algod_client(node.algod_url, node.token, pool_size=args.users + 2)
+            kmd = get_kmd_client(node.kmd_url, node.token)
+            app_id, asset_id = deploy_pool(client, kmd)
+            report = run(client, kmd, app_id, asset_id, **options)
+    else:
+        dotenv.load_dotenv(".env")
+        client = get_algod_client(os.environ.get("ALGOD_URL"), os.environ.get("ALGOD_API_KEY"),
+                                  pool_size=args.users + 2)
+        kmd = get_kmd_client(os.environ.get("KMD_ADDRESS"), os.environ.get("KMD_TOKEN"))
+        report = run(client, kmd, int(os.environ.get("APP_ID")), int(os.environ.get("WALGO_ID")), **options)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
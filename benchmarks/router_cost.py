@@ -0,0 +1,127 @@
+"""Opcode cost of routing each AllyPool method call.
+
+Every handler is replaced with `Approve()`, so what is left is the cost of
+the dispatch alone: the on completion and method name comparisons a call
+runs through before reaching its handler. The router as it was before user
+methods were moved first is kept here as the baseline. Costs are the ones
+`ally.teal.Ledger.dryrun` reports for a call to each method.
+
+    python -m benchmarks.router_cost [--json]
+"""
+import json
+import sys
+from typing import Dict, List, Tuple
+
+from algosdk.future import transaction
+from pyteal import *
+
+from ally.contracts.pool_oop import AllyPool
+from ally.teal import Ledger, assemble
+
+METHODS = [
+    "mint", "redeem",
+    "bootstrap", "set_governor", "set_mint_price", "set_redeem_price",
+    "toggle_redeem", "join", "vote",
+]
+
+
+class RouterOnly(AllyPool):
+    """AllyPool with every handler stubbed out."""
+
+    def on_create(self):
+        return Approve()
+
+    def on_bootstrap(self):
+        return Approve()
+
+    def on_set_governor(self):
+        return Approve()
+
+    def on_set_mint_price(self):
+        return Approve()
+
+    def on_set_redeem_price(self):
+        return Approve()
+
+    def on_toggle_redeem(self):
+        return Approve()
+
+    def on_join(self):
+        return Approve()
+
+    def on_vote(self):
+        return Approve()
+
+    def on_mint(self):
+        return Approve()
+
+    def on_redeem(self):
+        return Approve()
+
+
+class BaselineRouter(RouterOnly):
+    """The original dispatch: admin methods and completions first."""
+
+    def on_call(self):
+        on_call_method = Txn.application_args[0]
+        return Cond(
+            [on_call_method == Bytes("bootstrap"), self.on_bootstrap()],
+            [on_call_method == Bytes("set_governor"), self.on_set_governor()],
+            [on_call_method == Bytes("set_mint_price"), self.on_set_mint_price()],
+            [on_call_method == Bytes("set_redeem_price"), self.on_set_redeem_price()],
+            [on_call_method == Bytes("toggle_redeem"), self.on_toggle_redeem()],
+            [on_call_method == Bytes("join"), self.on_join()],
+            [on_call_method == Bytes("vote"), self.on_vote()],
+            [on_call_method == Bytes("mint"), self.on_mint()],
+            [on_call_method == Bytes("redeem"), self.on_redeem()],
+        )
+
+    def approval_program(self):
+        governor = App.globalGet(self.Vars.gov_key)
+        return Cond(
+            [Txn.application_id() == Int(0), self.on_create()],
+            [Txn.on_completion() == OnComplete.DeleteApplication, Return(Txn.sender() == governor)],
+            [Txn.on_completion() == OnComplete.UpdateApplication, Return(Txn.sender() == governor)],
+            [Txn.on_completion() == OnComplete.CloseOut, Approve()],
+            [Txn.on_completion() == OnComplete.OptIn, Reject()],
+            [Txn.on_completion() == OnComplete.NoOp, self.on_call()],
+        )
+
+
+def method_costs(pool: AllyPool) -> Dict[str, int]:
+    """Opcode cost of calling each method, as `Ledger.dryrun` reports it."""
+    teal = compileTeal(pool.approval_program(), mode=Mode.Application, version=5)
+    clear = compileTeal(pool.clear_program(), mode=Mode.Application, version=5)
+    ledger = Ledger()
+    creator = ledger.create_account()
+    sp = transaction.SuggestedParams(1000, 1, 1000, "", flat_fee=True)
+    create = transaction.ApplicationCreateTxn(
+        creator.get_address(), sp, transaction.OnComplete.NoOpOC, assemble(teal), assemble(clear),
+        transaction.StateSchema(0, 0), transaction.StateSchema(0, 0),
+    )
+    app_id = ledger.execute([create.sign(creator.get_private_key())])[0].created_app
+
+    costs = {}
+    for method in METHODS:
+        call = transaction.ApplicationNoOpTxn(creator.get_address(), sp, app_id, [method.encode()])
+        report = ledger.dryrun([call])
+        if report["error"]:
+            raise Exception(f"{method}: {report['error']}")
+        costs[method] = report["txns"][0]["cost"]
+    return costs
+
+
+def compare() -> List[Tuple[str, int, int]]:
+    before = method_costs(BaselineRouter())
+    after = method_costs(RouterOnly())
+    return [(method, before[method], after[method]) for method in METHODS]
+
+
+if __name__ == "__main__":
+    rows = compare()
+    if "--json" in sys.argv[1:]:
+        print(json.dumps({method: {"before": b, "after": a} for method, b, a in rows}, indent=2))
+    else:
+        print(f"{'method':<18}{'before':>8}{'after':>8}")
+        for method, b, a in rows:
+            print(f"{method:<18}{b:>8}{a:>8}")
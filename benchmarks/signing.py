@@ -0,0 +1,97 @@
+"""Signatures per second of `ally.signing.sign_parallel` by worker count.
+
+    python -m benchmarks.signing                       # 1, 2, 4, ... up to the CPU count
+    python -m benchmarks.signing --workers 1,2,8 --txns 20000 --senders 500
+    python -m benchmarks.signing --json
+
+Signs ``--txns`` payments from ``--senders`` accounts, grouped by 16. Each
+worker count is timed ``--repeats`` times on a warm pool (the best run is
+kept); ``sdk`` is `Transaction.sign` in a loop and ``1`` the in-process
+`Signer` path. Speedups are relative to ``1``.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+from algosdk.future import transaction
+
+from ally.signing import shutdown_signing_pool, sign_parallel
+from testing import resources
+
+
+def default_worker_counts() -> List[int]:
+    counts, n = [], 1
+    while n < (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    return counts + [os.cpu_count() or 1]
+
+
+def batch(txns: int, senders: int):
+    sp = resources.params()
+    accounts = resources.accounts(senders)
+    payments = [
+        transaction.PaymentTxn(accounts[i % senders].get_address(), sp, accounts[0].get_address(), 1_000 + i)
+        for i in range(txns)
+    ]
+    for start in range(0, txns, 16):
+        transaction.assign_group_id(payments[start:start + 16])
+    return payments, [accounts[i % senders] for i in range(txns)]
+
+
+def run(worker_counts: List[int], txns: int, senders: int, repeats: int) -> Dict[str, Any]:
+    payments, accounts = batch(txns, senders)
+    report: Dict[str, Any] = {"cpus": os.cpu_count(), "txns": txns, "senders": senders, "signatures_per_s": {}}
+
+    def best(sign) -> float:
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            sign()
+            times.append(time.perf_counter() - start)
+        return txns / min(times)
+
+    report["signatures_per_s"]["sdk"] = round(best(
+        lambda: [txn.sign(a.get_private_key()) for txn, a in zip(payments, accounts)]))
+    signers = [a.get_signer() for a in accounts]
+    try:
+        for workers in worker_counts:
+            # warm the pool, and each worker's decoded signers
+            sign_parallel(payments, signers, workers)
+            report["signatures_per_s"][str(workers)] = round(best(lambda: sign_parallel(payments, signers, workers)))
+    finally:
+        shutdown_signing_pool()
+
+    base = report["signatures_per_s"].get("1")
+    if base:
+        report["speedup"] = {k: round(v / base, 2) for k, v in report["signatures_per_s"].items()}
+    return report
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", help="comma separated worker counts, defaults to powers of two up to the CPUs")
+    parser.add_argument("--txns", type=int, default=8192)
+    parser.add_argument("--senders", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    counts = [int(n) for n in args.workers.split(",")] if args.workers else default_worker_counts()
+    report = run(counts, args.txns, args.senders, args.repeats)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"{report['txns']} transactions from {report['senders']} senders, {report['cpus']} CPUs")
+    print(f"{'workers':<10}{'signatures/s':>14}{'speedup':>10}")
+    for workers, rate in report["signatures_per_s"].items():
+        print(f"{workers:<10}{rate:>14}{report.get('speedup', {}).get(workers, ''):>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,129 @@
+"""Static size and cost of the pool programs, checked against a baseline.
+
+    python -m benchmarks.teal_cost            # print the current figures
+    python -m benchmarks.teal_cost --check    # fail on regressions
+    python -m benchmarks.teal_cost --update   # rewrite the baseline
+
+A regression is a size or cost more than ``--threshold`` (default 5%) above
+the baseline, or a scratch slot that is now stored but never loaded.
+Programs that cannot be built here (`ally.contracts.pool` needs
+pytealutils and a TEAL v6 capable PyTeal) are reported as skipped.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Callable, Dict, List
+
+from pyteal import Mode, compileTeal
+
+from ally.contracts.pool_oop import AllyPool
+from ally.teal.analyzer import analyze
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "teal_cost.json")
+DEFAULT_THRESHOLD = 0.05
+
+
+def _pool_approval() -> str:
+    from ally.contracts import pool
+    return pool.get_approval_src(lock_start=1, lock_stop=10)
+
+
+def _pool_clear() -> str:
+    from ally.contracts import pool
+    return pool.get_clear_src()
+
+
+PROGRAMS: Dict[str, Callable[[], str]] = {
+    "pool_oop.approval": lambda: compileTeal(AllyPool().approval_program(), mode=Mode.Application, version=5),
+    "pool_oop.clear": lambda: compileTeal(AllyPool().clear_program(), mode=Mode.Application, version=5),
+    "pool.approval": _pool_approval,
+    "pool.clear": _pool_clear,
+}
+
+
+def collect() -> Dict[str, Dict[str, object]]:
+    report: Dict[str, Dict[str, object]] = {}
+    for name, build in PROGRAMS.items():
+        try:
+            teal = build()
+        except Exception as e:
+            report[name] = {"skipped": f"{type(e).__name__}: {e}"}
+            continue
+        report[name] = analyze(teal)
+    return report
+
+
+def _metrics(analysis: Dict[str, object]) -> Dict[str, object]:
+    metrics = {
+        "bytes": analysis["bytes"],
+        "worst_case_cost": analysis["worst_case_cost"],
+    }
+    for route, branch in analysis["branches"].items():
+        metrics[f"branches.{route}.cost"] = branch["cost"]
+    for name, sub in analysis["subroutines"].items():
+        metrics[f"subroutines.{name}.cost"] = sub["cost"]
+    return metrics
+
+
+def compare(baseline: Dict[str, Dict[str, object]], current: Dict[str, Dict[str, object]],
+            threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Regressions of ``current`` against ``baseline``, as readable lines."""
+    regressions = []
+    for name, analysis in current.items():
+        base = baseline.get(name)
+        if base is None or "skipped" in base or "skipped" in analysis:
+            continue
+        before, after = _metrics(base), _metrics(analysis)
+        for metric, value in after.items():
+            old = before.get(metric)
+            if old is None and metric in before and value is not None:
+                continue
+            if value is None and old is not None:
+                regressions.append(f"{name} {metric}: {old} -> unbounded")
+            elif value is not None and old is not None and value > old * (1 + threshold):
+                regressions.append(f"{name} {metric}: {old} -> {value} (+{(value - old) / old:.1%})")
+        new_dead = sorted(set(analysis["dead_stores"]) - set(base["dead_stores"]))
+        if new_dead:
+            regressions.append(f"{name} scratch slots stored but never loaded: {new_dead}")
+    return regressions
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="compare against the baseline")
+    parser.add_argument("--update", action="store_true", help="write the current figures as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--baseline", default=BASELINE)
+    args = parser.parse_args(argv)
+
+    current = collect()
+
+    if args.update:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        built = {name: analysis for name, analysis in current.items() if "skipped" not in analysis}
+        with open(args.baseline, "w") as f:
+            json.dump(built, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"wrote {args.baseline}")
+        return 0
+
+    if args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for name, analysis in current.items():
+            if "skipped" in analysis:
+                print(f"skipped {name}: {analysis['skipped']}")
+        regressions = compare(baseline, current, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if not regressions:
+            print("no regressions")
+        return 1 if regressions else 0
+
+    print(json.dumps(current, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
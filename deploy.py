@@ -4,13 +4,17 @@ import dotenv
 from algosdk.logic import get_application_address
 from algosdk.future import transaction
 
-from ally.operations import bootstrap_pool, create_pool
-from ally.utils import get_algod_client, get_app_global_state, get_balances, wait_for_transaction
+from ally import configure_logging
+from ally.operations import APP_FUNDING, MULTISIG_FUNDING, bootstrap_pool, create_pool
+from ally.params import suggested_params
+from ally.state import AppStateMirror
+from ally.utils import get_algod_client, get_balances, wait_for_transaction
 from ally.account import Account
 
 
 if __name__ == '__main__':
     dotenv.load_dotenv(".env")
+    configure_logging()
 
     client = get_algod_client(os.environ.get("ALGOD_URL"), os.environ.get("ALGOD_API_KEY"))
 
@@ -24,12 +28,12 @@ if __name__ == '__main__':
     
     msig = transaction.Multisig(1, threshold, [governor.get_address() for governor in governors])
     
-    if get_balances(client, msig.address())[0] < 2_713_000:
+    if get_balances(client, msig.address())[0] < MULTISIG_FUNDING:
         pay_txn = transaction.PaymentTxn(
             sender=funder.get_address(),
-            sp=client.suggested_params(),
+            sp=suggested_params(client),
             receiver=msig.address(),
-            amt=2_713_000
+            amt=MULTISIG_FUNDING
         )
         signed_pay_txn = pay_txn.sign(funder.get_private_key())
         client.send_transaction(signed_pay_txn)
@@ -40,19 +44,19 @@ if __name__ == '__main__':
     print(f"App ID: {app_id}")
     print(f"App address: {get_application_address(app_id)}")
     
-    if get_balances(client, get_application_address(app_id))[0] < 202_000:
+    if get_balances(client, get_application_address(app_id))[0] < APP_FUNDING:
         pay_txn = transaction.PaymentTxn(
             sender=funder.get_address(),
-            sp=client.suggested_params(),
+            sp=suggested_params(client),
             receiver=get_application_address(app_id),
-            amt=202_000
+            amt=APP_FUNDING
         )
         signed_pay_txn = pay_txn.sign(funder.get_private_key())
         client.send_transaction(signed_pay_txn)
         wait_for_transaction(client, pay_txn.get_txid())
     
-    bootstrap_pool(client, governors, threshold, app_id)
-    
-    state = get_app_global_state(client, app_id)
+    mirror = AppStateMirror(client, app_id)
+
+    mirror.apply(bootstrap_pool(client, governors, threshold, app_id))
     
-    print("Global state: ", state)
+    print("Global state: ", mirror.state)
@@ -2,6 +2,7 @@ import os
 
 import dotenv
 
+from ally import configure_logging
 from ally.account import Account
 from ally.operations import destroy_pool
 from ally.utils import get_algod_client
@@ -9,6 +10,7 @@ from ally.utils import get_algod_client
 
 if __name__ == '__main__':
     dotenv.load_dotenv(".env")
+    configure_logging()
 
     client = get_algod_client(os.environ.get(
         "ALGOD_URL"), os.environ.get("ALGOD_API_KEY"))
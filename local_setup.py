@@ -1,11 +1,13 @@
 import os
 import dotenv
 
+from ally import configure_logging
 from ally.utils import get_algod_client, get_kmd_client, get_balances
 from testing.resources import get_temporary_account
 
 if __name__ == '__main__':
     dotenv.load_dotenv(".env")
+    configure_logging()
 
     client = get_algod_client(os.environ.get("ALGOD_URL"), os.environ.get("ALGOD_API_KEY"))    
     kmd = get_kmd_client(os.environ.get("KMD_ADDRESS"), os.environ.get("KMD_TOKEN"))
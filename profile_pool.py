@@ -0,0 +1,24 @@
+import json
+import os
+import sys
+
+import dotenv
+
+from ally import configure_logging
+from ally.profiling import algod_backend, local_backend, profile
+from ally.utils import get_algod_client
+
+
+if __name__ == '__main__':
+    dotenv.load_dotenv(".env")
+    configure_logging()
+
+    routes = [arg for arg in sys.argv[1:] if arg != "--local"]
+    if "--local" in sys.argv[1:]:
+        backend = local_backend()
+    else:
+        client = get_algod_client(os.environ.get("ALGOD_URL"), os.environ.get("ALGOD_API_KEY"))
+        backend = algod_backend(client)
+    report = profile(backend, routes or None)
+
+    print(json.dumps(report, indent=2))
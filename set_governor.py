@@ -3,6 +3,7 @@ from typing import List
 
 import dotenv
 
+from ally import configure_logging
 from ally.account import Account
 from ally.operations import set_governor
 from ally.utils import get_algod_client
@@ -10,6 +11,7 @@ from ally.utils import get_algod_client
 
 if __name__ == '__main__':
     dotenv.load_dotenv('.env')
+    configure_logging()
 
     client = get_algod_client(
         os.environ.get("ALGOD_URL"), 
@@ -0,0 +1,42 @@
+import pickle
+
+import pytest
+from algosdk import encoding, error
+from algosdk.future import transaction
+
+from ally.account import sign_transactions
+from testing.resources import accounts, params
+
+SP = params()
+
+
+def test_signatures_match_the_sdk():
+    alice, bob = accounts(2)
+    own = transaction.PaymentTxn(alice.get_address(), SP, bob.get_address(), 1)
+    # bob signing for alice's account, as after a rekey
+    rekeyed = transaction.PaymentTxn(alice.get_address(), SP, bob.get_address(), 2)
+
+    signed = sign_transactions([own, rekeyed], [alice.get_signer(), bob.get_signer()])
+    expected = [own.sign(alice.get_private_key()), rekeyed.sign(bob.get_private_key())]
+    assert [encoding.msgpack_encode(s) for s in signed] == [encoding.msgpack_encode(s) for s in expected]
+    assert signed[1].authorizing_address == bob.get_address()
+
+    assert alice.get_signer() is alice.get_signer()
+    assert alice.get_signer().address == alice.get_address()
+    assert not hasattr(alice.get_signer(), "__dict__")
+
+
+def test_multisig_and_pickling():
+    governors = accounts(3)
+    msig = transaction.Multisig(1, 2, [g.get_address() for g in governors])
+    txn = transaction.PaymentTxn(msig.address(), SP, governors[0].get_address(), 1)
+
+    ours = transaction.MultisigTransaction(txn, msig.get_multisig_account())
+    sdk = transaction.MultisigTransaction(txn, msig.get_multisig_account())
+    for governor in governors[:2]:
+        pickle.loads(pickle.dumps(governor.get_signer())).sign_multisig(ours)
+        sdk.sign(governor.get_private_key())
+    assert encoding.msgpack_encode(ours) == encoding.msgpack_encode(sdk)
+
+    with pytest.raises(error.InvalidSecretKeyError):
+        accounts(1)[0].get_signer().sign_multisig(ours)
@@ -0,0 +1,124 @@
+import asyncio
+import base64
+import gc
+import weakref
+
+from aiohttp import web
+from algosdk.future import transaction
+
+from ally.aio import operations as aio_ops
+from ally.aio.client import AsyncAlgodClient
+from ally.aio.utils import AsyncConfirmationTracker, get_balances, get_tracker, suggested_params
+from ally.compile_cache import CompileCache
+from ally.teal import assemble
+
+
+class AsyncChainClient:
+    def __init__(self, confirm_at):
+        self.round = 7
+        self.confirm_at = confirm_at
+        self.block_waits = 0
+
+    async def status(self):
+        return {"last-round": self.round}
+
+    async def status_after_block(self, round):
+        self.block_waits += 1
+        self.round = round + 1
+        return {"last-round": self.round}
+
+    async def pending_transaction_info(self, tx_id):
+        if self.confirm_at[tx_id] <= self.round:
+            return {"pool-error": "", "txn": {}, "confirmed-round": self.confirm_at[tx_id]}
+        return {"pool-error": "", "txn": {}}
+
+
+def test_async_tracker_multiplexes():
+    async def run():
+        client = AsyncChainClient({f"tx{i}": 8 + i % 2 for i in range(20)})
+        tracker = AsyncConfirmationTracker(client, batch_size=4)
+        results = await asyncio.gather(*(tracker.track(f"tx{i}") for i in range(20)))
+        return client, results
+
+    client, results = asyncio.run(run())
+    assert [r.confirmed_round for r in results] == [8 + i % 2 for i in range(20)]
+    assert client.block_waits == 2
+
+
+def test_async_client_against_http_server():
+    seen_headers = []
+
+    async def params(request):
+        seen_headers.append(request.headers.get("X-API-Key"))
+        return web.json_response({
+            "fee": 0, "last-round": 5, "genesis-hash": "gh", "genesis-id": "sandnet-v1",
+            "consensus-version": "future", "min-fee": 1000,
+        })
+
+    async def account(request):
+        return web.json_response({
+            "amount": 10, "assets": [{"asset-id": 3, "amount": 4}],
+        })
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/v2/transactions/params", params)
+        app.router.add_get("/v2/accounts/{address}", account)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        async with AsyncAlgodClient("token", f"http://127.0.0.1:{port}", {"X-API-Key": "token"}) as client:
+            sp = await suggested_params(client)
+            again = await suggested_params(client)
+            balances = await get_balances(client, "ADDR")
+        await runner.cleanup()
+        return sp, again, balances
+
+    sp, again, balances = asyncio.run(run())
+    assert sp.first == again.first == 5
+    assert balances == {0: 10, 3: 4}
+    assert seen_headers == ["token"]
+
+
+def test_dropped_async_client_is_collected():
+    class ParamsChainClient(AsyncChainClient):
+        async def suggested_params(self):
+            return transaction.SuggestedParams(1000, self.round, self.round + 1000, "gh", flat_fee=True)
+
+    async def run():
+        client = ParamsChainClient({"tx": 8})
+        await suggested_params(client)
+        await get_tracker(client).track("tx")
+        return weakref.ref(client)
+
+    ref = asyncio.run(run())
+    gc.collect()
+    assert ref() is None
+
+
+class AsyncCompiler:
+    def __init__(self):
+        self.calls = 0
+
+    async def compile(self, teal):
+        self.calls += 1
+        return {"result": base64.b64encode(assemble(teal)).decode()}
+
+
+def test_async_contracts_compile_through_the_client(tmp_path, monkeypatch):
+    cache = CompileCache(str(tmp_path))
+    client = AsyncCompiler()
+
+    monkeypatch.setenv("ALLY_COMPILE_BACKEND", "algod")
+    approval, clear = asyncio.run(aio_ops.get_contracts(client, cache))
+    assert approval[0] == clear[0] == 5
+    assert asyncio.run(aio_ops.get_contracts(client, cache)) == (approval, clear)
+    assert client.calls == 2
+
+    # verify compiles with both, and never from the cache
+    monkeypatch.setenv("ALLY_COMPILE_BACKEND", "verify")
+    asyncio.run(aio_ops.get_contracts(client, cache))
+    assert client.calls == 4
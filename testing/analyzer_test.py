@@ -0,0 +1,74 @@
+import copy
+
+from benchmarks.teal_cost import collect, compare
+from pyteal import Mode, compileTeal
+
+from ally.contracts.pool_oop import AllyPool
+from ally.teal.analyzer import analyze, dispatch_routes
+
+ROUTER = """#pragma version 5
+txna ApplicationArgs 0
+byte "cheap"
+==
+bnz cheap
+txna ApplicationArgs 0
+byte "hashing"
+==
+bnz hashing
+err
+cheap:
+int 1
+return
+hashing:
+byte "x"
+callsub digest
+len
+return
+digest:
+sha256
+retsub
+"""
+
+
+def test_branch_and_worst_case_costs():
+    analysis = analyze(ROUTER)
+    assert dispatch_routes(ROUTER) == {"cheap": "cheap", "hashing": "hashing"}
+    assert analysis["branches"]["cheap"]["cost"] == 6
+    # 8 dispatch ops, byte, callsub, sha256 (35), retsub, len, return
+    assert analysis["branches"]["hashing"]["cost"] == 8 + 1 + 1 + 35 + 1 + 1 + 1
+    assert analysis["worst_case_cost"] == analysis["branches"]["hashing"]["cost"]
+    assert analysis["branches"]["hashing"]["callsubs"] == {"digest": 1}
+    assert analysis["subroutines"] == {"digest": {"call_sites": 1, "cost": 36}}
+
+
+def test_loops_have_no_static_bound():
+    analysis = analyze("#pragma version 5\nint 1\nloop:\nint 1\nbnz loop\nint 1\nreturn")
+    assert analysis["worst_case_cost"] is None
+
+
+def test_dead_stores():
+    analysis = analyze("#pragma version 5\nint 1\nstore 0\nint 2\nstore 1\nload 1\nreturn")
+    assert analysis["dead_stores"] == [0]
+
+
+def test_pool_routes_load_nothing_they_do_not_use():
+    analysis = analyze(compileTeal(AllyPool().approval_program(), mode=Mode.Application, version=5))
+    # only the value half of the pool token MaybeValue in bootstrap
+    assert len(analysis["dead_stores"]) == 1
+
+
+def test_regressions_beyond_threshold_are_reported():
+    current = {name: a for name, a in collect().items() if "skipped" not in a}
+    assert compare(current, current) == []
+
+    worse = copy.deepcopy(current)
+    approval = worse["pool_oop.approval"]
+    approval["branches"]["mint"]["cost"] += 50
+    approval["dead_stores"] = approval["dead_stores"] + [99]
+    regressions = compare(current, worse)
+    assert any("branches.mint.cost" in r for r in regressions)
+    assert any("[99]" in r for r in regressions)
+
+    slightly = copy.deepcopy(current)
+    slightly["pool_oop.approval"]["bytes"] += 1
+    assert compare(current, slightly, threshold=0.05) == []
@@ -0,0 +1,75 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from ally.artifacts import MANIFEST, PREBUILT_DIR, load_prebuilt
+from ally.operations import CONTRACT_SOURCES, TEAL_VERSION, build_prebuilt, get_contracts
+from ally.utils import compile_program
+from benchmarks.import_time import compare
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_shipped_artifacts_match_the_contract():
+    # fails when the contract changed without `python warm_cache.py --prebuilt`;
+    # PyTeal numbers some scratch slots per process, so generate in a fresh one
+    probe = "import json\nfrom ally.operations import contract_teal\nprint(json.dumps(contract_teal()))\n"
+    teal = json.loads(subprocess.run(
+        [sys.executable, "-c", probe], cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout)
+    for name in ("approval", "clear"):
+        assert load_prebuilt(name, CONTRACT_SOURCES, TEAL_VERSION) == compile_program(None, teal[name], "local")
+        with open(os.path.join(PREBUILT_DIR, f"{name}.teal")) as f:
+            assert f.read() == teal[name]
+
+
+def test_stale_artifacts_are_ignored(tmp_path):
+    build_prebuilt(str(tmp_path))
+    assert load_prebuilt("approval", CONTRACT_SOURCES, TEAL_VERSION, str(tmp_path)) is not None
+    assert load_prebuilt("approval", CONTRACT_SOURCES, TEAL_VERSION + 1, str(tmp_path)) is None
+
+    edited = tmp_path / "pool_oop.py"
+    shutil.copy(CONTRACT_SOURCES[0], edited)
+    with open(edited, "a") as f:
+        f.write("\n# changed\n")
+    assert load_prebuilt("approval", [str(edited)] + CONTRACT_SOURCES[1:], TEAL_VERSION, str(tmp_path)) is None
+
+    manifest = json.loads((tmp_path / MANIFEST).read_text())
+    (tmp_path / manifest["clear"]["program"]).write_bytes(b"\x05\x81\x00")
+    assert load_prebuilt("clear", CONTRACT_SOURCES, TEAL_VERSION, str(tmp_path)) is None
+
+
+def test_prebuilt_contracts_load_without_pyteal(monkeypatch):
+    monkeypatch.delenv("ALLY_COMPILE_BACKEND", raising=False)
+    probe = (
+        "import sys\n"
+        "from ally.operations import get_contracts\n"
+        "approval, clear = get_contracts(None)\n"
+        "print(approval.hex(), clear.hex(), 'pyteal' in sys.modules)\n"
+    )
+    approval, clear, pyteal = subprocess.run(
+        [sys.executable, "-c", probe], cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout.split()
+
+    assert pyteal == "False"
+    assert (bytes.fromhex(approval), bytes.fromhex(clear)) == get_contracts(None)
+
+
+def test_import_time_flags_pyteal_and_slower_imports():
+    baseline = {"reference_ms": 100.0, "targets": {
+        "mint_walgo": {"ms": 120.0, "relative": 1.2, "imports_pyteal": False},
+        "deploy": {"ms": 125.0, "relative": 1.25, "imports_pyteal": False},
+    }}
+    current = {"reference_ms": 200.0, "targets": {
+        "mint_walgo": {"ms": 250.0, "relative": 1.25, "imports_pyteal": False},
+        "deploy": {"ms": 260.0, "relative": 1.3, "imports_pyteal": True},
+        "update_pool": {"ms": 400.0, "relative": 2.0, "imports_pyteal": False},
+    }}
+    assert compare(baseline, current) == ["deploy imports pyteal"]
+    assert compare(baseline, current, threshold=0.02) == [
+        "mint_walgo: 1.2 -> 1.25 x reference (+4.2%, 120.0ms -> 250.0ms)",
+        "deploy imports pyteal",
+        "deploy: 1.25 -> 1.3 x reference (+4.0%, 125.0ms -> 260.0ms)",
+    ]
@@ -0,0 +1,93 @@
+import base64
+
+import pytest
+from pyteal import compileTeal, Mode
+
+from ally.contracts.pool_oop import AllyPool
+from ally.teal import AssemblerError, assemble, assemble_program
+from ally.utils import compile_program
+
+
+def b64(teal):
+    return base64.b64encode(assemble(teal)).decode("ascii")
+
+
+def test_known_programs():
+    # reference outputs of algod's /v2/teal/compile
+    assert b64("#pragma version 2\nint 1") == "AiABASI="
+    assert b64("#pragma version 6\nint 1") == "BoEB"
+
+
+def test_repeated_constants_go_in_blocks():
+    program = assemble(
+        "#pragma version 5\n"
+        "int 1\n"
+        "bnz l\n"
+        "err\n"
+        "l:\n"
+        "int 1\n"
+        "return"
+    )
+    assert program.hex() == "0520010122400001002243"
+
+
+def test_constant_blocks_sorted_by_use():
+    program = assemble(
+        "#pragma version 5\n"
+        'byte "a"\n'
+        'byte "b"\n'
+        'byte "b"\n'
+        'byte "a"\n'
+        'byte "b"\n'
+        'byte "c"\n'
+        "concat\nconcat\nconcat\nconcat\nconcat\nlen"
+    )
+    # "b" is used three times so it comes first, "c" once so it is pushed inline
+    assert program.hex() == "05260201620161" "2928282928" "800163" "5050505050" "15"
+
+
+def test_string_escapes_and_comments():
+    program = assemble('#pragma version 5\nbyte "a\\x41//b" // comment\npop')
+    assert program == bytes.fromhex("05800561412f2f6248")
+
+
+def test_array_field_shorthand():
+    assert assemble("#pragma version 5\ntxn Accounts 1") == assemble("#pragma version 5\ntxna Accounts 1")
+
+
+def test_errors_report_line():
+    with pytest.raises(AssemblerError) as e:
+        assemble("#pragma version 5\nint 1\nnot_an_op")
+    assert e.value.line == 3
+
+    with pytest.raises(AssemblerError):
+        assemble("#pragma version 5\nb missing")
+
+    with pytest.raises(AssemblerError):
+        assemble("#pragma version 2\nint 1\ncallsub f")
+
+
+def test_pool_program_maps_pcs_to_lines():
+    teal = compileTeal(AllyPool().approval_program(), mode=Mode.Application, version=5)
+    program = assemble_program(teal)
+    assert program.version == 5
+    assert program.bytecode[0] == 5
+    lines = teal.splitlines()
+    for pc, line in program.pc_to_line.items():
+        assert lines[line - 1].strip()
+
+
+class RecordingCompiler:
+    def __init__(self, result):
+        self.result = result
+
+    def compile(self, teal):
+        return {"result": base64.b64encode(self.result).decode("ascii")}
+
+
+def test_verify_backend():
+    teal = "#pragma version 6\nint 1"
+    assert compile_program(RecordingCompiler(b"\x06\x81\x01"), teal, "verify") == b"\x06\x81\x01"
+    with pytest.raises(Exception):
+        compile_program(RecordingCompiler(b"\x06\x81\x02"), teal, "verify")
+    assert compile_program(None, teal) == b"\x06\x81\x01"
@@ -0,0 +1,138 @@
+import pytest
+from algosdk import encoding
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+
+from ally import operations as ops
+from ally.profiling import local_backend, profile
+from ally.teal import Ledger, LedgerError, LogicError, assemble
+from ally.teal.avm import Budget, Evaluator
+from testing.resources import new_pool, params
+
+
+def test_bootstrap_creates_the_pool_token():
+    ledger, governors, app_id, asset_id = new_pool()
+    app_address = get_application_address(app_id)
+
+    msig = ops.governors_multisig(governors, 2).address()
+    assert ledger.global_state(app_id)[b"gov"] == encoding.decode_address(msig)
+    assert ledger.assets[asset_id].name == b"wALGO"
+    assert ledger.balance(app_address, asset_id) == ledger.assets[asset_id].total
+
+    # the pool token is only ever created once
+    with pytest.raises(LogicError):
+        ledger.execute([ops.bootstrap_pool_txn(params(), governors, 2, app_id)])
+
+
+def test_mint_and_redeem():
+    ledger, _, app_id, asset_id = new_pool()
+    user = ledger.create_account(100_000_000)
+    address = user.get_address()
+
+    results = ledger.execute(ops.mint_walgo_txns(params(), user, app_id, asset_id, 5_000_000, opt_in=True))
+    assert ledger.balance(address, asset_id) == 5_000_000
+    assert results[1].inner[0].fields["AssetAmount"] == 5_000_000
+    assert 0 < results[1].cost <= 700
+
+    ledger.execute(ops.redeem_walgo_txns(params(), user, app_id, asset_id, 1_000_000))
+    assert ledger.balance(address, asset_id) == 4_000_000
+    # 5 fees, the minted algos plus the mint fee, and the redeemed algos
+    assert ledger.balance(address) == 100_000_000 - 5_000 - 5_001_000 + 1_000_000
+
+
+def test_mint_pair_anywhere_in_a_group():
+    ledger, _, app_id, asset_id = new_pool()
+    user, other = ledger.create_account(), ledger.create_account()
+    sp = params()
+
+    txns = [
+        transaction.AssetOptInTxn(user.get_address(), sp, asset_id),
+        transaction.PaymentTxn(other.get_address(), sp, user.get_address(), 1_000),
+    ] + ops.mint_walgo_pair(sp, user, app_id, asset_id, 2_000_000)
+    transaction.assign_group_id(txns)
+    signers = [user, other, user, user]
+    ledger.execute([txn.sign(s.get_private_key()) for txn, s in zip(txns, signers)])
+
+    assert ledger.balance(user.get_address(), asset_id) == 2_000_000
+
+
+def test_rejected_groups_roll_back():
+    ledger, governors, app_id, asset_id = new_pool()
+    user = ledger.create_account(100_000_000)
+    ledger.execute(ops.mint_walgo_txns(params(), user, app_id, asset_id, 5_000_000, opt_in=True))
+    ledger.execute([ops.toggle_redeem_txn(params(), governors, app_id, 2)])
+    assert ledger.global_state(app_id)[b"ar"] == 0
+
+    before = (ledger.balance(user.get_address()), ledger.balance(user.get_address(), asset_id))
+    with pytest.raises(LogicError):
+        ledger.execute(ops.redeem_walgo_txns(params(), user, app_id, asset_id, 1_000_000))
+    assert (ledger.balance(user.get_address()), ledger.balance(user.get_address(), asset_id)) == before
+
+    # only the governor can hand the pool over
+    with pytest.raises(LogicError):
+        ledger.execute([ops.set_governor_txn(params(), user, app_id, [user], 1, 1)])
+    ledger.execute([ops.set_mint_price_txn(params(), 990_000_000, governors, app_id, 2)])
+    assert ledger.global_state(app_id)[b"mp"] == 990_000_000
+
+    with pytest.raises(LedgerError, match="overspend"):
+        ledger.execute(ops.mint_walgo_txns(params(), user, app_id, asset_id, 500_000_000))
+    assert ledger.balance(user.get_address(), asset_id) == before[1]
+
+
+def test_signatures_are_verified():
+    ledger, governors, app_id, _ = new_pool()
+    user, other = ledger.create_account(), ledger.create_account()
+    payment = transaction.PaymentTxn(user.get_address(), params(), other.get_address(), 1_000)
+
+    with pytest.raises(LedgerError, match="not signed"):
+        ledger.execute([payment])
+    forged = transaction.SignedTransaction(payment, payment.sign(other.get_private_key()).signature)
+    with pytest.raises(LedgerError, match="signature didn't pass verification"):
+        ledger.execute([forged])
+    # a valid signature by an account the sender was never rekeyed to
+    with pytest.raises(LedgerError, match="should have been authorized by"):
+        ledger.execute([other.get_signer().sign(payment)])
+
+    # governors sign with a random quorum of 2
+    toggle = ops.toggle_redeem_txn(params(), governors, app_id, 2)
+    next(s for s in toggle.multisig.subsigs if s.signature).signature = None
+    with pytest.raises(LedgerError, match="multisig signature"):
+        ledger.execute([toggle])
+    toggle = ops.toggle_redeem_txn(params(), governors, app_id, 2)
+    next(s for s in toggle.multisig.subsigs if s.signature).signature = bytes(64)
+    with pytest.raises(LedgerError, match="multisig signature"):
+        ledger.execute([toggle])
+    assert ledger.global_state(app_id)[b"ar"] == 1
+
+    ledger.execute([ops.toggle_redeem_txn(params(), governors, app_id, 2)])
+    assert ledger.global_state(app_id)[b"ar"] == 0
+
+
+def test_wide_math_and_budget():
+    ledger = Ledger()
+    program = assemble(
+        "#pragma version 5\n"
+        "int 18446744073709551615\n"
+        "int 18446744073709551615\n"
+        "mulw\n"
+        "int 0\n"
+        "int 18446744073709551615\n"
+        "divmodw\n"
+        "pop\n"
+        "pop\n"
+        "swap\n"
+        "pop\n"
+        "int 18446744073709551615\n"
+        "==\n"
+    )
+    group = [{"Sender": bytes(32), "Accounts": [], "Assets": [], "Applications": []}]
+    assert Evaluator(ledger, group, 0, 0, Budget(700)).run(program)
+
+    with pytest.raises(LogicError, match="budget"):
+        Evaluator(ledger, group, 0, 0, Budget(5)).run(program)
+
+
+def test_local_profile_backend():
+    report = profile(local_backend(), ["mint", "bootstrap"])
+    assert all(route["passed"] for route in report["routes"].values())
+    assert report["routes"]["mint"]["cost"] > 0
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+from algosdk.error import AlgodHTTPError
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+
+from ally import operations as ops
+from ally.cassette import Cassette, CassetteError, ReplayAlgodClient, ReplayKMDClient, record
+from ally.params import suggested_params
+from ally.utils import (
+    get_algod_client, get_app_global_state, get_balances, get_genesis_accounts, get_kmd_client, wait_for_transaction,
+)
+from testing.fake_algod import FakeAlgod
+
+
+def pay(client, sender, receiver, amount):
+    txn = transaction.PaymentTxn(sender.get_address(), suggested_params(client), receiver, amount)
+    client.send_transaction(txn.sign(sender.get_private_key()))
+    wait_for_transaction(client, txn.get_txid())
+
+
+def mint_flow(client, kmd):
+    governors = get_genesis_accounts(kmd)
+    pay(client, governors[0], ops.governors_multisig(governors, 2).address(), ops.MULTISIG_FUNDING)
+    app_id = ops.create_pool(client, governors, 2)
+    pay(client, governors[0], get_application_address(app_id), ops.APP_FUNDING)
+    ops.bootstrap_pool(client, governors, 2, app_id)
+    asset_id = get_app_global_state(client, app_id)[b"p"]
+    minted = ops.mint_walgo(client, governors[1], app_id, asset_id, 3_000_000)
+    return app_id, minted.confirmed_round, get_balances(client, governors[1].get_address())[asset_id]
+
+
+def test_record_then_replay_offline(tmp_path):
+    cassette = Cassette()
+    with FakeAlgod() as node:
+        client = record(get_algod_client(node.algod_url, node.token), cassette)
+        kmd = record(get_kmd_client(node.kmd_url, node.token), cassette)
+        recorded = mint_flow(client, kmd)
+
+    path = os.path.join(tmp_path, "mint.jsonl.gz")
+    cassette.save(path)
+    replayed = Cassette.load(path)
+    assert len(replayed.interactions) == len(cassette.interactions)
+
+    # the node is gone, every answer comes from the cassette
+    assert mint_flow(ReplayAlgodClient(replayed), ReplayKMDClient(replayed)) == recorded
+
+
+def test_replays_errors_and_rejects_unknown_requests():
+    cassette = Cassette()
+    with FakeAlgod() as node:
+        client = record(get_algod_client(node.algod_url, node.token), cassette)
+        with pytest.raises(AlgodHTTPError):
+            client.application_info(12345)
+
+    replay = ReplayAlgodClient(cassette)
+    with pytest.raises(AlgodHTTPError) as e:
+        replay.application_info(12345)
+    assert e.value.code == 404
+    with pytest.raises(CassetteError):
+        replay.application_info(1)
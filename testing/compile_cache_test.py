@@ -0,0 +1,92 @@
+import base64
+
+import pytest
+
+from ally import operations
+from ally.compile_cache import CompileCache, program_key
+from ally.operations import get_contracts
+from ally.teal import assemble
+
+
+class CountingCompiler:
+    def __init__(self):
+        self.calls = 0
+
+    def compile(self, teal):
+        self.calls += 1
+        return {"result": base64.b64encode(teal.encode("utf-8")).decode("ascii")}
+
+
+class AssemblingCompiler(CountingCompiler):
+    def compile(self, teal):
+        self.calls += 1
+        return {"result": base64.b64encode(assemble(teal)).decode("ascii")}
+
+
+def test_program_key_depends_on_version():
+    assert program_key("int 1", 5) != program_key("int 1", 6)
+    assert program_key("int 1", 5) != program_key("int 1", 5, "algod")
+    assert program_key("int 1", 5) == program_key("int 1", 5)
+
+
+def test_get_contracts_hits_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALLY_COMPILE_BACKEND", "algod")
+    cache = CompileCache(str(tmp_path))
+    client = CountingCompiler()
+
+    first = get_contracts(client, cache)
+    assert client.calls == 2
+
+    second = get_contracts(client, cache)
+    assert client.calls == 2
+    assert first == second
+
+
+def test_explicit_none_bypasses_the_cache(monkeypatch):
+    monkeypatch.setenv("ALLY_COMPILE_BACKEND", "algod")
+    monkeypatch.setattr(operations, "get_default_cache", lambda: pytest.fail("used the default cache"))
+    client = CountingCompiler()
+
+    get_contracts(client, None)
+    get_contracts(client, None)
+    assert client.calls == 4
+
+
+def test_cache_entries_are_per_backend(tmp_path, monkeypatch):
+    cache = CompileCache(str(tmp_path))
+    client = AssemblingCompiler()
+
+    monkeypatch.setenv("ALLY_COMPILE_BACKEND", "local")
+    local = get_contracts(client, cache, prebuilt=False)
+    monkeypatch.setenv("ALLY_COMPILE_BACKEND", "algod")
+    assert get_contracts(client, cache, prebuilt=False) == local
+    assert client.calls == 2
+
+    monkeypatch.setenv("ALLY_COMPILE_BACKEND", "verify")
+    get_contracts(client, cache, prebuilt=False)
+    get_contracts(client, cache, prebuilt=False)
+    assert client.calls == 6
+
+
+def test_invalidate_forces_recompile(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALLY_COMPILE_BACKEND", "algod")
+    cache = CompileCache(str(tmp_path))
+    client = CountingCompiler()
+    get_contracts(client, cache)
+
+    for key in cache.keys():
+        assert cache.invalidate(key)
+
+    get_contracts(client, cache)
+    assert client.calls == 4
+
+
+def test_eviction_keeps_most_recent(tmp_path):
+    cache = CompileCache(str(tmp_path), max_entries=2)
+    for i in range(4):
+        cache.put(program_key(f"int {i}", 5), bytes([i]))
+
+    keys = cache.keys()
+    assert len(keys) == 2
+    assert cache.get(program_key("int 3", 5)) == b"\x03"
+    assert cache.get(program_key("int 0", 5)) is None
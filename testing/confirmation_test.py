@@ -0,0 +1,80 @@
+import gc
+import threading
+import weakref
+
+import pytest
+
+from ally.confirmation import ConfirmationTracker, TransactionExpiredError, TransactionRejectedError, get_tracker
+
+
+class ChainClient:
+    """Confirms each txid at a scheduled round, one round per block wait."""
+
+    def __init__(self, confirm_at, rejected=()):
+        self.round = 100
+        self.confirm_at = confirm_at
+        self.rejected = set(rejected)
+        self.block_waits = 0
+        self.lock = threading.Lock()
+
+    def status(self):
+        return {"last-round": self.round}
+
+    def status_after_block(self, round):
+        with self.lock:
+            self.block_waits += 1
+            self.round = round + 1
+        return {"last-round": self.round}
+
+    def pending_transaction_info(self, tx_id):
+        info = {"pool-error": "", "txn": {}}
+        if tx_id in self.rejected:
+            info["pool-error"] = "overspend"
+        elif self.confirm_at.get(tx_id, 1 << 62) <= self.round:
+            info["confirmed-round"] = self.confirm_at[tx_id]
+        return info
+
+
+def test_many_txns_share_one_block_loop():
+    confirm_at = {f"tx{i}": 101 + i % 3 for i in range(40)}
+    client = ChainClient(confirm_at)
+    tracker = ConfirmationTracker(client, batch_size=8)
+
+    futures = {tx_id: tracker.track(tx_id) for tx_id in confirm_at}
+    for tx_id, future in futures.items():
+        assert future.result(timeout=5).confirmed_round == confirm_at[tx_id]
+
+    assert client.block_waits == 3
+    assert tracker.pending() == []
+
+
+def test_rejected_and_expired_fail_early():
+    client = ChainClient({"ok": 102}, rejected={"bad"})
+    tracker = ConfirmationTracker(client)
+    done = []
+
+    ok = tracker.track("ok", callback=done.append)
+    bad = tracker.track("bad")
+    lost = tracker.track("lost", last_valid=101)
+
+    assert ok.result(timeout=5).confirmed_round == 102
+    with pytest.raises(TransactionRejectedError):
+        bad.result(timeout=5)
+    with pytest.raises(TransactionExpiredError):
+        lost.result(timeout=5)
+    assert done == [ok]
+
+
+def test_idle_tracker_releases_client_and_threads():
+    client = ChainClient({"tx": 101})
+    tracker = get_tracker(client)
+    future = tracker.track("tx")
+    thread = tracker._thread
+    future.result(timeout=5)
+    thread.join(timeout=5)
+    assert not [t for t in threading.enumerate() if t.name.startswith("ally-pending")]
+
+    ref = weakref.ref(client)
+    del client, tracker
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,103 @@
+import os
+import socket
+import threading
+
+import pytest
+
+from ally import cli
+from ally import operations as ops
+from ally.account import Account
+from ally.daemon import Daemon, Session, _fund, _remove_stale
+from ally.utils import get_kmd_client
+from testing import resources
+from testing.fake_algod import FakeAlgod
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    monkeypatch.setattr(resources, "accountList", [])
+
+    with FakeAlgod() as node:
+        session = Session({"ALGOD_URL": node.algod_url, "ALGOD_API_KEY": node.token})
+        kmd = get_kmd_client(node.kmd_url, node.token)
+        env = {"ALGOD_URL": node.algod_url, "ALGOD_API_KEY": node.token, "MULTISIG_THRESHOLD": "2"}
+        for name in ("FUNDER", "GOVERNOR1", "GOVERNOR2", "GOVERNOR3", "MINTER"):
+            env[f"{name}_MNEMONIC"] = resources.get_temporary_account(session.client, kmd).get_mnemonic()
+
+        path = str(tmp_path / "ally.sock")
+        server = Daemon(path, lambda: Session(env))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server, path
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_operations_through_the_daemon(daemon, monkeypatch):
+    server, path = daemon
+    decoded = []
+    from_mnemonic = Account.from_mnemonic.__func__
+    monkeypatch.setattr(Account, "from_mnemonic", classmethod(lambda cls, m: decoded.append(m) or from_mnemonic(cls, m)))
+
+    deployed = cli.call("deploy", path)
+    assert deployed["app_id"] == server.session.app_id
+    assert deployed["global_state"]["p"] == deployed["walgo_id"]
+    # deploy leaves the multisig nothing for the fees of later admin calls
+    session = server.session
+    _fund(session, ops.governors_multisig(session.governors(), 2).address(), 3_000_000)
+
+    minted = cli.call("mint", path, amount=2_000_000)
+    assert minted["balances"][str(deployed["walgo_id"])] == 2_000_000
+    redeemed = cli.call("redeem", path, amount=500_000)
+    assert redeemed["balances"][str(deployed["walgo_id"])] == 1_500_000
+    assert redeemed["confirmed_round"] > minted["confirmed_round"]
+
+    price = cli.call("mint_price", path)["mint_price"]
+    with pytest.raises(Exception, match="should not be greater than 2.5%"):
+        cli.call("mint_price", path, value=price * 2)
+    assert cli.call("mint_price", path, value=price + 1) == {
+        "confirmed_round": server.session.mirror().round, "mint_price": price + 1, "changed": True,
+    }
+    assert cli.call("state", path)["global_state"]["mp"] == price + 1
+
+    # each key is decoded once, for the whole session
+    assert len(decoded) == len(set(decoded)) == 5
+
+    stats = cli.call("stats", path)
+    assert stats["mint_price"] == {"calls": 3, "errors": 1, "mean_ms": stats["mint_price"]["mean_ms"]}
+
+
+def test_errors_and_cli(daemon, capsys):
+    _, path = daemon
+
+    with pytest.raises(Exception, match="APP_ID is not set"):
+        cli.call("mint", path)
+    with pytest.raises(Exception, match="unknown command 'mint_walgo'"):
+        cli.call("mint_walgo", path)
+
+    assert cli.main(["--socket", path, "--json", "ping"]) == 0
+    assert str(os.getpid()) in capsys.readouterr().out
+    assert cli.main(["--socket", path, "redeem", "10"]) == 1
+    assert "APP_ID is not set" in capsys.readouterr().err
+    assert cli.main(["--socket", path + ".missing", "ping"]) == 2
+
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    with pytest.raises(Exception, match="already listening"):
+        Daemon(path, lambda: None)
+
+
+def test_remove_stale_only_removes_dead_sockets(tmp_path):
+    env = tmp_path / ".env"
+    env.write_text("FUNDER_MNEMONIC=...\n")
+    with pytest.raises(Exception, match="is not a socket"):
+        _remove_stale(str(env))
+    assert env.exists()
+
+    dead = str(tmp_path / "dead.sock")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(dead)
+    sock.close()
+    _remove_stale(dead)
+    assert not os.path.exists(dead)
+    _remove_stale(dead)
@@ -0,0 +1,393 @@
+"""An in-memory stand-in for algod and KMD, for integration tests.
+
+`FakeAlgod` serves the algod and KMD endpoints `ally` uses on localhost,
+backed by a `ally.teal.Ledger`, so the SDK clients (and `ally`'s pooled and
+async ones) talk to it over real HTTP:
+
+    with FakeAlgod() as node:
+        client = get_algod_client(node.algod_url, node.token)
+        kmd = get_kmd_client(node.kmd_url, node.token)
+
+Groups are applied to the ledger when they are sent, so a group that algod
+would reject fails the send with the same 400 error, and confirmed when a
+block is made. Account and app info include groups that are accepted but not
+confirmed yet. By default a block is made as soon as a group is accepted
+(algod's dev mode); with ``dev_mode=False`` blocks come every ``block_time``
+seconds, or only when `produce_block` is called if ``block_time`` is None.
+"""
+import base64
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import msgpack
+from algosdk import encoding
+
+from ally.account import Account
+from ally.teal import Ledger, LedgerError
+from ally.teal.ledger import TxnResult
+from ally.utils import compile_program
+from testing.resources import GENESIS_HASH, GENESIS_ID
+
+GENESIS_BALANCE = 4_000_000_000_000
+DEFAULT_TOKEN = "a" * 64
+WALLET_ID = "1"
+WALLET_NAME = "unencrypted-default-wallet"
+# how long status/wait-for-block-after holds a request, algod's one minute,
+# but short in dev mode: a waiter that asks just after the block that
+# confirmed its transaction would otherwise wait for a block nobody sends
+WAIT_FOR_BLOCK_TIMEOUT = 60.0
+DEV_MODE_WAIT_TIMEOUT = 0.05
+
+
+class HTTPError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class FakeAlgod:
+    """A ledger served over HTTP as an algod and a KMD node.
+
+    Args:
+        ledger: State to serve, defaults to a new `Ledger`.
+        genesis_accounts: Number of funded accounts in the KMD wallet.
+        dev_mode: Make a block for every accepted group.
+        block_time: Seconds between blocks when not in dev mode, None to
+            only make blocks on `produce_block`.
+        token: API token both servers expect.
+    """
+
+    def __init__(self, ledger: Optional[Ledger] = None, genesis_accounts: int = 3, dev_mode: bool = True,
+                 block_time: Optional[float] = None, token: str = DEFAULT_TOKEN) -> None:
+        self.ledger = ledger or Ledger()
+        self.dev_mode = dev_mode
+        self.block_time = block_time
+        self.token = token
+        self.wait_timeout = DEV_MODE_WAIT_TIMEOUT if dev_mode else WAIT_FOR_BLOCK_TIMEOUT
+        self.genesis = [self.ledger.create_account(GENESIS_BALANCE) for _ in range(genesis_accounts)]
+
+        # results of groups accepted but not in a block yet, and pending info by txid
+        self._pool: List[List[TxnResult]] = []
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._confirmed: Dict[str, Dict[str, Any]] = {}
+        self._handles: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._new_block = threading.Condition(self._lock)
+        self._servers: List[ThreadingHTTPServer] = []
+        self._threads: List[threading.Thread] = []
+        self._stopped = threading.Event()
+
+    # lifecycle
+
+    def start(self) -> "FakeAlgod":
+        self._stopped.clear()
+        for handler in (_AlgodHandler, _KMDHandler):
+            server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+            server.daemon_threads = True
+            server.node = self
+            self._servers.append(server)
+            self._spawn(lambda server=server: server.serve_forever(poll_interval=0.05))
+        if not self.dev_mode and self.block_time is not None:
+            self._spawn(self._block_loop)
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._new_block:
+            self._new_block.notify_all()
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._servers, self._threads = [], []
+
+    def __enter__(self) -> "FakeAlgod":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _spawn(self, target) -> None:
+        thread = threading.Thread(target=target, name="fake-algod", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    @property
+    def algod_url(self) -> str:
+        return "http://127.0.0.1:{}".format(self._servers[0].server_address[1])
+
+    @property
+    def kmd_url(self) -> str:
+        return "http://127.0.0.1:{}".format(self._servers[1].server_address[1])
+
+    # blocks
+
+    @property
+    def round(self) -> int:
+        return self.ledger.round
+
+    def produce_block(self) -> int:
+        """Confirm every accepted group in a new block, returning its round."""
+        with self._new_block:
+            round = self.ledger.round + 1
+            for results in self._pool:
+                for result in results:
+                    self._confirmed[result.tx_id] = result.pending_info(round)
+                    self._pending.pop(result.tx_id, None)
+            self._pool = []
+            self.ledger.next_round()
+            self._new_block.notify_all()
+            return round
+
+    def _block_loop(self) -> None:
+        while not self._stopped.wait(self.block_time):
+            self.produce_block()
+
+    def wait_for_block_after(self, round: int) -> None:
+        deadline = time.monotonic() + self.wait_timeout
+        with self._new_block:
+            while self.ledger.round <= round and not self._stopped.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._new_block.wait(remaining)
+
+    # transactions
+
+    def submit(self, raw: bytes) -> str:
+        """Accept a msgpack encoded group, returning its first txid."""
+        unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+        unpacker.feed(raw)
+        try:
+            group = [encoding.future_msgpack_decode(d) for d in unpacker]
+        except Exception as e:
+            raise HTTPError(400, f"could not decode transactions: {e}")
+        if not group:
+            raise HTTPError(400, "no transactions")
+
+        with self._lock:
+            for stxn in group:
+                tx_id = stxn.get_txid()
+                if tx_id in self._confirmed or tx_id in self._pending:
+                    raise HTTPError(400, f"TransactionPool.Remember: transaction already in ledger: {tx_id}")
+            try:
+                results = self.ledger.execute(group)
+            except LedgerError as e:
+                raise HTTPError(400, f"TransactionPool.Remember: {e}")
+
+            self._pool.append(results)
+            for result in results:
+                self._pending[result.tx_id] = result.pending_info()
+            if self.dev_mode:
+                self.produce_block()
+        return group[0].get_txid()
+
+    def pending_info(self, tx_id: str) -> Dict[str, Any]:
+        with self._lock:
+            info = self._confirmed.get(tx_id) or self._pending.get(tx_id)
+        if info is None:
+            raise HTTPError(404, "txn does not exist")
+        return info
+
+    # responses
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "last-round": self.ledger.round,
+            "last-version": "future",
+            "next-version": "future",
+            "next-version-round": self.ledger.round + 1,
+            "next-version-supported": True,
+            "time-since-last-round": 0,
+            "catchup-time": 0,
+            "stopped-at-unsupported-round": False,
+        }
+
+    def params(self) -> Dict[str, Any]:
+        return {
+            "consensus-version": "future",
+            "fee": 0,
+            "genesis-hash": GENESIS_HASH,
+            "genesis-id": GENESIS_ID,
+            "last-round": self.ledger.round,
+            "min-fee": self.ledger.min_fee,
+        }
+
+    def kmd_wallet(self, handle: Optional[str]) -> List[Account]:
+        if handle not in self._handles:
+            raise HTTPError(400, "invalid wallet handle")
+        return self.genesis
+
+
+_JSON = "application/json"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # one write per response, or keep-alive clients wait on delayed ACKs
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    auth_header = ""
+    routes: List[Tuple[str, str, str]] = []
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _send(self, code: int, body: Any) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", _JSON)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self, method: str) -> None:
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        node: FakeAlgod = self.server.node
+        try:
+            for route_method, pattern, name in self.routes:
+                match = re.fullmatch(pattern, url.path)
+                if route_method == method and match:
+                    if pattern not in _NO_AUTH and self.headers.get(self.auth_header) != node.token:
+                        raise HTTPError(401, "Invalid API Token")
+                    self._send(200, getattr(self, name)(node, body, *match.groups()))
+                    return
+            raise HTTPError(404, f"no route for {method} {url.path}")
+        except HTTPError as e:
+            self._send(e.code, {"message": e.message})
+        except LedgerError as e:
+            self._send(400, {"message": str(e)})
+        except Exception as e:
+            self._send(500, {"message": f"{type(e).__name__}: {e}"})
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+
+_NO_AUTH = {r"/health", r"/versions"}
+
+
+class _AlgodHandler(_Handler):
+    auth_header = "X-Algo-API-Token"
+    routes = [
+        ("GET", r"/health", "health"),
+        ("GET", r"/versions", "versions"),
+        ("GET", r"/v2/status", "status"),
+        ("GET", r"/v2/status/wait-for-block-after/(\d+)", "status_after_block"),
+        ("GET", r"/v2/transactions/params", "params"),
+        ("POST", r"/v2/transactions", "send"),
+        ("GET", r"/v2/transactions/pending/(\w+)", "pending"),
+        ("GET", r"/v2/accounts/(\w+)", "account"),
+        ("GET", r"/v2/applications/(\d+)", "application"),
+        ("GET", r"/v2/assets/(\d+)", "asset"),
+        ("POST", r"/v2/teal/compile", "compile"),
+    ]
+
+    def health(self, node: FakeAlgod, body: bytes) -> None:
+        return None
+
+    def versions(self, node: FakeAlgod, body: bytes) -> Dict[str, Any]:
+        return {"versions": ["v2"], "genesis_id": GENESIS_ID, "genesis_hash_b64": GENESIS_HASH,
+                "build": {"major": 3, "minor": 0, "build_number": 0, "commit_hash": "", "branch": "fake",
+                          "channel": "dev"}}
+
+    def status(self, node: FakeAlgod, body: bytes) -> Dict[str, Any]:
+        return node.status()
+
+    def status_after_block(self, node: FakeAlgod, body: bytes, round: str) -> Dict[str, Any]:
+        node.wait_for_block_after(int(round))
+        return node.status()
+
+    def params(self, node: FakeAlgod, body: bytes) -> Dict[str, Any]:
+        return node.params()
+
+    def send(self, node: FakeAlgod, body: bytes) -> Dict[str, Any]:
+        return {"txId": node.submit(body)}
+
+    def pending(self, node: FakeAlgod, body: bytes, tx_id: str) -> Dict[str, Any]:
+        return node.pending_info(tx_id)
+
+    def account(self, node: FakeAlgod, body: bytes, address: str) -> Dict[str, Any]:
+        with node._lock:
+            return node.ledger.account_info(address)
+
+    def application(self, node: FakeAlgod, body: bytes, app_id: str) -> Dict[str, Any]:
+        with node._lock:
+            if node.ledger.find_app(int(app_id)) is None:
+                raise HTTPError(404, "application does not exist")
+            return node.ledger.application_info(int(app_id))
+
+    def asset(self, node: FakeAlgod, body: bytes, asset_id: str) -> Dict[str, Any]:
+        with node._lock:
+            if node.ledger.find_asset(int(asset_id)) is None:
+                raise HTTPError(404, "asset does not exist")
+            return node.ledger.asset_info(int(asset_id))
+
+    def compile(self, node: FakeAlgod, body: bytes) -> Dict[str, Any]:
+        try:
+            program = compile_program(None, body.decode(), "local")
+        except Exception as e:
+            raise HTTPError(400, str(e))
+        return {
+            "hash": encoding.encode_address(encoding.checksum(b"Program" + program)),
+            "result": base64.b64encode(program).decode(),
+        }
+
+
+class _KMDHandler(_Handler):
+    auth_header = "X-KMD-API-Token"
+    routes = [
+        ("GET", r"/versions", "versions"),
+        ("GET", r"/v1/wallets", "wallets"),
+        ("POST", r"/v1/wallet/init", "init"),
+        ("POST", r"/v1/wallet/release", "release"),
+        ("POST", r"/v1/key/list", "list_keys"),
+        ("POST", r"/v1/key/export", "export_key"),
+    ]
+
+    def versions(self, node: FakeAlgod, body: bytes) -> Dict[str, Any]:
+        return {"versions": ["v1"]}
+
+    def wallets(self, node: FakeAlgod, body: bytes) -> Dict[str, Any]:
+        return {"wallets": [{"id": WALLET_ID, "name": WALLET_NAME, "driver_name": "sqlite",
+                             "driver_version": 1, "mnemonic_ux": False, "supported_txs": ["pay", "keyreg"]}]}
+
+    def init(self, node: FakeAlgod, body: bytes) -> Dict[str, Any]:
+        request = json.loads(body or b"{}")
+        if request.get("wallet_id") != WALLET_ID:
+            raise HTTPError(404, "wallet not found")
+        with node._lock:
+            handle = "handle-{}".format(len(node._handles) + 1)
+            node._handles[handle] = WALLET_ID
+        return {"wallet_handle_token": handle, "expires_seconds": 60}
+
+    def release(self, node: FakeAlgod, body: bytes) -> Dict[str, Any]:
+        with node._lock:
+            node._handles.pop(json.loads(body or b"{}").get("wallet_handle_token"), None)
+        return {}
+
+    def list_keys(self, node: FakeAlgod, body: bytes) -> Dict[str, Any]:
+        accounts = node.kmd_wallet(json.loads(body or b"{}").get("wallet_handle_token"))
+        return {"addresses": [a.get_address() for a in accounts]}
+
+    def export_key(self, node: FakeAlgod, body: bytes) -> Dict[str, Any]:
+        request = json.loads(body or b"{}")
+        for a in node.kmd_wallet(request.get("wallet_handle_token")):
+            if a.get_address() == request.get("address"):
+                return {"private_key": a.get_private_key()}
+        raise HTTPError(404, "key does not exist in this wallet")
@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from algosdk.error import AlgodHTTPError
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+
+from ally import operations as ops
+from ally.params import suggested_params
+from ally.state import AppStateMirror
+from ally.utils import get_algod_client, get_balances, get_kmd_client, wait_for_transaction
+from testing.fake_algod import FakeAlgod
+from testing.resources import get_temporary_account
+
+
+@pytest.fixture(scope="module")
+def node():
+    with FakeAlgod() as node:
+        yield node
+
+
+@pytest.fixture(scope="module")
+def client(node):
+    return get_algod_client(node.algod_url, node.token)
+
+
+@pytest.fixture(scope="module")
+def kmd(node):
+    return get_kmd_client(node.kmd_url, node.token)
+
+
+def pay(client, sender, receiver, amount):
+    txn = transaction.PaymentTxn(sender.get_address(), suggested_params(client), receiver, amount)
+    client.send_transaction(txn.sign(sender.get_private_key()))
+    return wait_for_transaction(client, txn.get_txid())
+
+
+@pytest.fixture(scope="module")
+def pool(client, kmd):
+    governors = [get_temporary_account(client, kmd) for _ in range(3)]
+    # the app's min balance plus the create and bootstrap fees
+    pay(client, governors[0], ops.governors_multisig(governors, 2).address(), ops.MULTISIG_FUNDING)
+
+    app_id = ops.create_pool(client, governors, 2)
+    pay(client, governors[0], get_application_address(app_id), ops.APP_FUNDING)
+    mirror = AppStateMirror(client, app_id)
+    mirror.apply(ops.bootstrap_pool(client, governors, 2, app_id))
+    return governors, app_id, mirror.state[b"p"]
+
+
+def test_mint_and_redeem_end_to_end(client, kmd, pool):
+    _, app_id, asset_id = pool
+    user = get_temporary_account(client, kmd)
+
+    minted = ops.mint_walgo(client, user, app_id, asset_id, 5_000_000)
+    assert minted.inner_txns[0]["txn"]["txn"]["aamt"] == 5_000_000
+    assert get_balances(client, user.get_address())[asset_id] == 5_000_000
+
+    redeemed = ops.redeem_walgo(client, user, app_id, asset_id, 1_000_000)
+    assert redeemed.confirmed_round > minted.confirmed_round
+    assert get_balances(client, user.get_address())[asset_id] == 4_000_000
+
+
+def test_rejected_groups_fail_to_send(client, kmd, pool):
+    _, app_id, asset_id = pool
+    user = get_temporary_account(client, kmd)
+
+    with pytest.raises(AlgodHTTPError) as e:
+        ops.redeem_walgo(client, user, app_id, asset_id, 1_000_000)
+    assert e.value.code == 400
+
+
+def test_bad_signatures_fail_to_send(client, kmd):
+    user, other = get_temporary_account(client, kmd), get_temporary_account(client, kmd)
+    txn = transaction.PaymentTxn(user.get_address(), suggested_params(client), other.get_address(), 1_000)
+
+    with pytest.raises(AlgodHTTPError, match="signature didn't pass verification") as e:
+        client.send_transaction(transaction.SignedTransaction(txn, txn.sign(other.get_private_key()).signature))
+    assert e.value.code == 400
+
+
+def test_parallel_mints(client, kmd, pool):
+    _, app_id, asset_id = pool
+    users = [get_temporary_account(client, kmd) for _ in range(4)]
+
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda u: ops.mint_walgo(client, u, app_id, asset_id, 1_000_000), users))
+    assert all(get_balances(client, u.get_address())[asset_id] == 1_000_000 for u in users)
+
+
+def test_blocks_on_demand():
+    with FakeAlgod(dev_mode=False) as node:
+        client = get_algod_client(node.algod_url, node.token)
+        genesis = node.genesis[0]
+        txn = transaction.PaymentTxn(genesis.get_address(), client.suggested_params(), genesis.get_address(), 0)
+        tx_id = client.send_transaction(txn.sign(genesis.get_private_key()))
+
+        assert "confirmed-round" not in client.pending_transaction_info(tx_id)
+        round = node.produce_block()
+        assert client.pending_transaction_info(tx_id)["confirmed-round"] == round
+        assert client.status_after_block(round - 1)["last-round"] == round
@@ -0,0 +1,39 @@
+import json
+
+from benchmarks.hotpaths import BASELINE, benchmarks, compare, measure
+
+
+def test_every_benchmark_runs_and_has_a_baseline():
+    with open(BASELINE) as f:
+        baseline = json.load(f)
+
+    for name, fn in benchmarks().items():
+        if name == "codegen.pool.approval":
+            # needs pytealutils and a TEAL v6 capable PyTeal
+            continue
+        fn()
+        assert name in baseline["benchmarks"]
+
+
+def test_measure_relative_to_calibration():
+    seconds, base = measure(lambda: sum(range(100)), repeats=2, batch_time=0.001)
+    assert 0 < seconds < base
+
+
+def test_regressions_beyond_threshold_are_reported():
+    baseline = {"calibration_us": 300.0, "benchmarks": {
+        "txn.mint_walgo": {"us": 450.0, "relative": 1.5},
+        "get_app_address": {"us": 30.0, "relative": 0.1},
+    }}
+    current = {"calibration_us": 600.0, "benchmarks": {
+        # twice the time on a machine half as fast
+        "txn.mint_walgo": {"us": 900.0, "relative": 1.5},
+        "get_app_address": {"us": 84.0, "relative": 0.14},
+        "decode_state.64": {"us": 40.0, "relative": 0.13},
+        "codegen.pool.approval": {"skipped": "ModuleNotFoundError"},
+    }}
+
+    regressions = compare(baseline, current)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("get_app_address: 0.1 -> 0.14")
+    assert compare(baseline, current, threshold=0.5) == []
@@ -0,0 +1,62 @@
+from algosdk.error import AlgodHTTPError
+
+from ally import operations as ops
+from ally.confirmation import TransactionExpiredError, TransactionRejectedError
+from ally.utils import PendingTxnResponse, get_algod_client, get_kmd_client
+from benchmarks.loadtest import deploy_pool, minted, percentile, rejection_cause, run
+from testing import resources
+from testing.fake_algod import FakeAlgod
+
+TXID = "A" * 52
+ADDRESS = "B" * 58
+
+
+def test_load_against_fake_algod(monkeypatch):
+    # temporary accounts left over by other modules were funded on their own node
+    monkeypatch.setattr(resources, "accountList", [])
+
+    with FakeAlgod() as node:
+        client = get_algod_client(node.algod_url, node.token)
+        kmd = get_kmd_client(node.kmd_url, node.token)
+        app_id, asset_id = deploy_pool(client, kmd)
+
+        report = run(client, kmd, app_id, asset_id, users=4, ops_per_user=3, mint_ratio=0.5, seed=1)
+
+    assert report["confirmed"]["mint"] + report["confirmed"]["redeem"] == 12
+    assert report["confirmed"]["mint"] >= 4
+    assert report["rejected"] == {}
+    # dev mode: a block per group
+    assert report["rounds"]["operations_per_round"]["max"] == 1
+    assert report["rounds"]["last"] - report["rounds"]["first"] + 1 == 12
+    assert report["submit_to_confirm_ms"]["p50"] <= report["submit_to_confirm_ms"]["p99"]
+    assert report["algod_requests"]["by_endpoint"]["POST /transactions"] == 12
+    assert report["algod_requests"]["per_confirmed_operation"] >= 2
+
+
+def test_holdings_follow_the_mint_price():
+    ledger, governors, app_id, asset_id = resources.new_pool()
+    ledger.execute([ops.set_mint_price_txn(resources.params(), 990_000_000, governors, app_id, 2)])
+    user = ledger.create_account()
+
+    results = ledger.execute(ops.mint_walgo_txns(resources.params(), user, app_id, asset_id, 5_000_000, opt_in=True))
+    held = minted(PendingTxnResponse(results[1].pending_info(ledger.round)))
+    assert held == ledger.balance(user.get_address(), asset_id) != 5_000_000
+
+
+def test_rejection_causes_group_alike_errors():
+    logic = AlgodHTTPError(
+        f"TransactionPool.Remember: transaction {TXID}: logic eval error: assert failed pc=212. Details: pc=212", 400)
+    overspend = AlgodHTTPError(f"TransactionPool.Remember: underflow on subtracting 5 from sender {ADDRESS}", 400)
+
+    assert rejection_cause(logic) == "logic eval error: assert failed pc=212"
+    assert rejection_cause(overspend) == "underflow on subtracting 5 from sender <address>"
+    assert rejection_cause(TransactionExpiredError(TXID, 10, 11)) == "expired before confirmation"
+    assert rejection_cause(TransactionRejectedError(TXID, "overspend")) == "dropped from pool: overspend"
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) is None
@@ -0,0 +1,36 @@
+import logging
+
+import pytest
+
+import ally
+
+
+@pytest.fixture
+def ally_logger():
+    logger = logging.getLogger("ally")
+    saved = logger.handlers[:], logger.level, logger.propagate
+    yield logger
+    logger.handlers[:], logger.level, logger.propagate = saved
+
+
+def test_importing_ally_configures_nothing(ally_logger):
+    assert [type(h) for h in ally_logger.handlers] == [logging.NullHandler]
+    assert ally_logger.propagate
+
+
+def test_configure_logging_prints_to_stdout(ally_logger, monkeypatch, capsys):
+    monkeypatch.setenv("ALLY_LOG_LEVEL", "info")
+    ally.configure_logging()
+    ally.configure_logging()
+    logging.getLogger("ally.operations").info("confirmed")
+    logging.getLogger("ally.operations").debug("hidden")
+    assert capsys.readouterr().out == "confirmed\n"
+
+
+def test_configure_logging_can_leave_handlers_to_the_application(ally_logger, monkeypatch):
+    monkeypatch.setenv("ALLY_LOG_STDOUT", "0")
+    monkeypatch.setenv("ALLY_LOG_LEVEL", "WARNING")
+    ally.configure_logging()
+    assert [type(h) for h in ally_logger.handlers] == [logging.NullHandler]
+    assert ally_logger.level == logging.WARNING
+    assert ally_logger.propagate
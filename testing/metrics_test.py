@@ -0,0 +1,81 @@
+import logging
+
+import pytest
+from algosdk.error import AlgodHTTPError
+
+from ally import metrics as metrics_module
+from ally import operations as ops
+from ally.metrics import Histogram, Metrics, disable_metrics, enable_metrics, endpoint
+from ally.utils import get_algod_client, get_kmd_client
+from benchmarks.loadtest import deploy_pool
+from testing import resources
+from testing.fake_algod import FakeAlgod
+
+
+@pytest.fixture
+def metrics():
+    registry = enable_metrics()
+    registry.reset()
+    yield registry
+    disable_metrics()
+
+
+def test_endpoints_collapse_ids():
+    assert endpoint("/v2/transactions/pending/" + "A" * 52) == "/v2/transactions/pending/{id}"
+    assert endpoint("/accounts/" + "B" * 58 + "?format=json") == "/accounts/{id}"
+    assert endpoint("/status/wait-for-block-after/12") == "/status/wait-for-block-after/{id}"
+
+
+def test_histogram_buckets():
+    h = Histogram((0.01, 0.1, 1.0))
+    for value in (0.005, 0.01, 0.05, 2.0):
+        h.observe(value)
+    assert h.cumulative() == [("0.01", 2), ("0.1", 3), ("1", 3), ("+Inf", 4)]
+    assert h.count == 4
+
+
+def test_operations_and_requests_are_recorded(metrics, monkeypatch, caplog):
+    monkeypatch.setattr(resources, "accountList", [])
+
+    with FakeAlgod() as node:
+        client = get_algod_client(node.algod_url, node.token)
+        kmd = get_kmd_client(node.kmd_url, node.token)
+        app_id, asset_id = deploy_pool(client, kmd)
+        user = resources.get_temporary_account(client, kmd)
+
+        ops.mint_walgo(client, user, app_id, asset_id, 1_000_000)
+        with pytest.raises(AlgodHTTPError):
+            ops.redeem_walgo(client, user, app_id, asset_id, 2_000_000)
+        with caplog.at_level(logging.DEBUG, logger="ally.metrics"):
+            ops.redeem_walgo(client, user, app_id, asset_id, 1_000_000)
+
+    summary = metrics.summary()
+    mint = summary["operations"]["operations.mint_walgo"]
+    assert mint["calls"] == 1 and mint["errors"] == 0
+    assert mint["mean_rounds_waited"] == 1
+    assert summary["operations"]["operations.redeem_walgo"] == {
+        "calls": 2, "errors": 1, "mean_ms": summary["operations"]["operations.redeem_walgo"]["mean_ms"],
+        "mean_rounds_waited": 1.0,
+    }
+
+    sends = summary["requests"]["algod POST /transactions"]
+    assert sends["errors"] == 1
+    assert sends["bytes_sent"] > 0 and sends["bytes_received"] > 0
+    assert summary["requests"]["kmd POST /wallet/init"]["calls"] >= 1
+
+    text = metrics.prometheus()
+    assert '# TYPE ally_node_request_duration_seconds histogram' in text
+    assert 'ally_node_request_errors_total{client="algod",method="POST",endpoint="/transactions",code="400"} 1' in text
+    assert 'ally_operation_errors_total{operation="operations.redeem_walgo",error="AlgodHTTPError"} 1' in text
+    assert 'ally_operation_rounds_waited_count{operation="operations.mint_walgo"} 1' in text
+
+    events = [r.getMessage() for r in caplog.records if r.name == "ally.metrics"]
+    assert any('"event": "operation"' in e and "redeem_walgo" in e for e in events)
+    assert any('"event": "request"' in e for e in events)
+
+
+def test_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("ALLY_METRICS", raising=False)
+    monkeypatch.setattr(metrics_module, "_metrics_checked", False)
+    assert metrics_module.get_metrics() is None
+    assert isinstance(Metrics().summary(), dict)
@@ -0,0 +1,150 @@
+import pytest
+from algosdk.future import transaction
+from pyteal import Mode, compileTeal
+
+from ally.contracts.pool_oop import AllyPool
+from ally.operations import (
+    MAX_BATCH_PAIRS, mint_walgo_batch_txns, mint_walgo_pair, mint_walgo_txns, pack_requests,
+    redeem_walgo_batch_txns, redeem_walgo_pair,
+)
+from ally.teal import LogicError
+from testing.resources import accounts, new_pool, params
+
+
+def test_pack_requests_caps_groups_and_splits_senders():
+    users = accounts(10)
+    requests = [(user, 1_000_000) for user in users] + [(users[0], 5)]
+    groups = pack_requests(requests)
+
+    assert [len(g) for g in groups] == [MAX_BATCH_PAIRS, 3]
+    for group in groups:
+        addresses = [sender.get_address() for sender, _ in group]
+        assert len(addresses) == len(set(addresses))
+
+
+def test_batch_groups_alternate_call_and_transfer():
+    users = accounts(3)
+    requests = [(user, 1_000 * (i + 1)) for i, user in enumerate(users)]
+
+    mint = mint_walgo_batch_txns(params(), requests, 12, 34)
+    assert [t.transaction.type for t in mint] == ["appl", "pay"] * 3
+    assert len({t.transaction.group for t in mint}) == 1
+    assert [t.transaction.amt for t in mint[1::2]] == [2_000, 3_000, 4_000]
+    assert all(t.transaction.app_args == [b"mint"] for t in mint[::2])
+
+    redeem = redeem_walgo_batch_txns(params(), requests, 12, 34)
+    assert [t.transaction.type for t in redeem] == ["appl", "axfer"] * 3
+    assert [t.transaction.sender for t in redeem[::2]] == [u.get_address() for u in users]
+
+
+def test_first_mint_includes_opt_in():
+    user = accounts(1)[0]
+
+    plain = mint_walgo_txns(params(), user, 12, 34, 5_000)
+    assert [t.transaction.type for t in plain] == ["appl", "pay"]
+
+    first = mint_walgo_txns(params(), user, 12, 34, 5_000, opt_in=True)
+    assert [t.transaction.type for t in first] == ["axfer", "appl", "pay"]
+    opt_in = first[0].transaction
+    assert opt_in.receiver == user.get_address() and opt_in.amount == 0 and opt_in.index == 34
+    assert len({t.transaction.group for t in first}) == 1
+
+
+def test_pairs_compose_into_larger_groups():
+    trader, other = accounts(2)
+    swap = transaction.PaymentTxn(other.get_address(), params(), trader.get_address(), 5_000)
+    txns = [swap] + mint_walgo_pair(params(), trader, 12, 34, 5_000) \
+        + redeem_walgo_pair(params(), trader, 12, 34, 4_000)
+    transaction.assign_group_id(txns)
+
+    assert [t.type for t in txns] == ["pay", "appl", "pay", "appl", "axfer"]
+    assert len({t.group for t in txns}) == 1
+    # each transfer directly follows its app call, as the contract expects
+    assert txns[1].app_args == [b"mint"] and txns[2].amt == 6_000
+    assert txns[3].app_args == [b"redeem"] and txns[4].amount == 4_000
+
+
+def test_mint_and_redeem_checks_are_relative():
+    teal = compileTeal(AllyPool().approval_program(), mode=Mode.Application, version=5)
+    lines = [line.strip() for line in teal.splitlines()]
+    assert not [line for line in lines if line.startswith("gtxn ")]
+    assert "gtxns Amount" in lines and "gtxns AssetAmount" in lines
+
+
+def execute(ledger, txns, senders):
+    transaction.assign_group_id(txns)
+    return ledger.execute([sender.get_signer().sign(txn) for txn, sender in zip(txns, senders)])
+
+
+def pool_with_users():
+    # a pool, a user opted in to its token and another funded account
+    ledger, _, app_id, asset_id = new_pool()
+    user, other = ledger.create_account(), ledger.create_account()
+    execute(ledger, [transaction.AssetOptInTxn(user.get_address(), params(), asset_id)], [user])
+    return ledger, app_id, asset_id, user, other
+
+
+def test_mint_pair_after_a_foreign_transaction():
+    ledger, app_id, asset_id, user, other = pool_with_users()
+
+    swap = transaction.PaymentTxn(other.get_address(), params(), user.get_address(), 7_000)
+    execute(ledger, [swap] + mint_walgo_pair(params(), user, app_id, asset_id, 2_000_000), [other, user, user])
+
+    assert ledger.balance(user.get_address(), asset_id) == 2_000_000
+    assert ledger.balance(other.get_address()) == 100_000_000 - 7_000 - 1_000
+
+
+def test_redeem_pair_closes_a_full_group():
+    ledger, _, app_id, asset_id = new_pool()
+    user, other = ledger.create_account(), ledger.create_account()
+    ledger.execute(mint_walgo_txns(params(), user, app_id, asset_id, 5_000_000, opt_in=True))
+
+    swaps = [transaction.PaymentTxn(other.get_address(), params(), user.get_address(), i) for i in range(14)]
+    txns = swaps + redeem_walgo_pair(params(), user, app_id, asset_id, 1_000_000)
+    assert len(txns) == 16
+    results = execute(ledger, txns, [other] * 14 + [user, user])
+
+    assert ledger.balance(user.get_address(), asset_id) == 4_000_000
+    assert results[14].inner[0].fields["Amount"] == 1_000_000
+
+
+def test_full_batches_are_plain_packed_pairs():
+    ledger, _, app_id, asset_id = new_pool()
+    users = [ledger.create_account() for _ in range(MAX_BATCH_PAIRS)]
+    for user in users:
+        execute(ledger, [transaction.AssetOptInTxn(user.get_address(), params(), asset_id)], [user])
+
+    ledger.execute(mint_walgo_batch_txns(params(), [(user, 2_000_000) for user in users], app_id, asset_id))
+    ledger.execute(redeem_walgo_batch_txns(params(), [(user, 500_000) for user in users], app_id, asset_id))
+    assert [ledger.balance(user.get_address(), asset_id) for user in users] == [1_500_000] * MAX_BATCH_PAIRS
+
+
+def test_mint_transfer_must_follow_the_call():
+    ledger, app_id, asset_id, user, other = pool_with_users()
+
+    call, payment = mint_walgo_pair(params(), user, app_id, asset_id, 2_000_000)
+    swap = transaction.PaymentTxn(other.get_address(), params(), user.get_address(), 7_000)
+    with pytest.raises(LogicError, match="assert failed"):
+        execute(ledger, [call, swap, payment], [user, other, user])
+    assert ledger.balance(user.get_address(), asset_id) == 0
+
+
+def test_mint_transfer_must_come_from_the_caller():
+    ledger, app_id, asset_id, user, other = pool_with_users()
+
+    call, _ = mint_walgo_pair(params(), user, app_id, asset_id, 2_000_000)
+    _, payment = mint_walgo_pair(params(), other, app_id, asset_id, 2_000_000)
+    with pytest.raises(LogicError, match="assert failed"):
+        execute(ledger, [call, payment], [user, other])
+    assert ledger.balance(user.get_address(), asset_id) == 0
+
+
+def test_app_call_cannot_end_the_group():
+    ledger, app_id, asset_id, user, other = pool_with_users()
+
+    payment, call = reversed(mint_walgo_pair(params(), user, app_id, asset_id, 2_000_000))
+    swap = transaction.PaymentTxn(other.get_address(), params(), user.get_address(), 7_000)
+    # the bounds check fails, and so does the lookup past the end of the group
+    with pytest.raises(LogicError):
+        execute(ledger, [swap, payment, call], [other, user, user])
+    assert ledger.balance(user.get_address(), asset_id) == 0
@@ -0,0 +1,60 @@
+import gc
+import weakref
+
+from algosdk.future import transaction
+
+from ally.params import SuggestedParamsProvider, get_params_provider, suggested_params
+from ally.rounds import observe_round
+
+
+class ParamsClient:
+    def __init__(self):
+        self.calls = 0
+        self.round = 10
+
+    def suggested_params(self):
+        self.calls += 1
+        return transaction.SuggestedParams(
+            1000, self.round, self.round + 1000, "gh", "sandnet-v1", False, "future", 1000)
+
+
+def test_params_cached_within_round():
+    client = ParamsClient()
+    for _ in range(5):
+        sp = suggested_params(client)
+    assert client.calls == 1
+    assert sp.first == 10
+
+
+def test_new_round_refreshes():
+    client = ParamsClient()
+    provider = get_params_provider(client)
+    provider.get()
+
+    observe_round(client, 10)
+    provider.get()
+    assert client.calls == 1
+
+    client.round = 11
+    observe_round(client, 11)
+    assert provider.get().first == 11
+    assert client.calls == 2
+
+
+def test_ttl_expiry_and_copies():
+    client = ParamsClient()
+    provider = SuggestedParamsProvider(client, ttl=0)
+    sp = provider.get()
+    sp.fee = 5000
+    assert provider.get().fee == 1000
+    assert client.calls == 2
+
+
+def test_dropped_client_is_collected():
+    client = ParamsClient()
+    suggested_params(client)
+    observe_round(client, 11)
+    ref = weakref.ref(client)
+    del client
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,55 @@
+import base64
+
+from pyteal import Mode, compileTeal
+
+from ally.contracts.pool_oop import AllyPool
+from ally.profiling import APP_CALL_BUDGET, ProgramMap, dryrun_request, profile, route_report
+
+
+def pool_map():
+    return ProgramMap(compileTeal(AllyPool().approval_program(), mode=Mode.Application, version=5))
+
+
+def test_dispatch_labels_map_to_routes():
+    program = pool_map()
+    routes = set(program.routes.values())
+    assert {"create", "NoOp", "mint", "redeem", "bootstrap", "join"} <= routes
+
+
+def test_route_report_maps_trace_to_lines():
+    program = pool_map()
+    label = next(label for label, route in program.routes.items() if route == "mint")
+    pcs = sorted(pc for pc, line in program.program.pc_to_line.items() if program.block[line] == label)
+    trace = [{"pc": pc, "stack": [{}] * (i % 3)} for i, pc in enumerate(pcs * 2)]
+    response = {"txns": [
+        {"app-call-trace": trace, "app-call-messages": ["ApprovalProgram", "PASS"], "cost": len(trace)},
+        {},
+    ]}
+
+    report = route_report(program, response, app_calls=1, hot_lines=3)
+    assert report["passed"]
+    assert report["cost"] == len(trace)
+    assert report["budget_headroom"] == APP_CALL_BUDGET - len(trace)
+    assert report["max_stack_depth"] == 2
+    assert len(report["hot_lines"]) == 3
+    assert all(h["route"] == "mint" and h["hits"] == 2 for h in report["hot_lines"])
+
+
+def test_profile_sends_a_group_per_route():
+    requests = []
+
+    def run(drr):
+        requests.append(drr)
+        return {"txns": [{"app-call-trace": [], "app-call-messages": ["REJECT"]}], "error": ""}
+
+    report = profile(run, ["mint", "set_mint_price"])
+    assert [len(drr.txns) for drr in requests] == [2, 1]
+    assert report["program"]["approval_bytes"] > 0
+    assert not report["routes"]["mint"]["passed"]
+
+
+def test_bootstrap_runs_before_the_pool_token_exists():
+    keys = {kv.key for kv in dryrun_request("bootstrap", b"\x05", b"\x05").apps[0].params.global_state}
+    assert base64.b64encode(b"p").decode() not in keys
+    keys = {kv.key for kv in dryrun_request("mint", b"\x05", b"\x05").apps[0].params.global_state}
+    assert base64.b64encode(b"p").decode() in keys
@@ -1,18 +1,61 @@
-from typing import List
+from typing import List, Tuple
 from random import choice, randint
 
 from algosdk.v2client.algod import AlgodClient
 from algosdk.kmd import KMDClient
 from algosdk.future import transaction
 from algosdk import account
+from algosdk.logic import get_application_address
 
-from ally.account import Account
+from ally import operations as ops
+from ally.account import Account, sign_transactions
+from ally.teal import Ledger, assemble_program
 from ally.utils import PendingTxnResponse, wait_for_transaction, get_genesis_accounts
 
 accountList: List[Account] = []
 
 FUNDING_AMOUNT = 100_000_000
 
+# the network of the fake node, and of transactions built without one
+GENESIS_ID = "fake-v1"
+GENESIS_HASH = "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI="
+
+
+def params(first: int = 1, fee: int = 1000, flat_fee: bool = True) -> transaction.SuggestedParams:
+    """Suggested params for building transactions offline, valid for 1000 rounds from ``first``."""
+    return transaction.SuggestedParams(fee, first, first + 1000, GENESIS_HASH, GENESIS_ID, flat_fee)
+
+
+def accounts(n: int) -> List[Account]:
+    """``n`` new accounts, funded nowhere."""
+    return [Account(account.generate_account()[0]) for _ in range(n)]
+
+
+def new_pool() -> Tuple[Ledger, List[Account], int, int]:
+    """A bootstrapped pool on an in-memory `Ledger`.
+
+    Returns:
+        The ledger, the governors (a 2 of 3 multisig), the app ID and the wALGO ID.
+    """
+    from pyteal import Mode, compileTeal
+
+    from ally.contracts.pool_oop import AllyPool
+
+    pool = AllyPool()
+    approval = compileTeal(pool.approval_program(), mode=Mode.Application, version=ops.TEAL_VERSION)
+    clear = compileTeal(pool.clear_program(), mode=Mode.Application, version=ops.TEAL_VERSION)
+
+    ledger = Ledger()
+    governors = [ledger.create_account() for _ in range(3)]
+    ledger.fund(ops.governors_multisig(governors, 2).address(), 10_000_000)
+    app_id = ledger.execute([ops.create_pool_txn(
+        params(), governors, 2, assemble_program(approval).bytecode, assemble_program(clear).bytecode,
+    )])[0].created_app
+    ledger.fund(get_application_address(app_id), 1_000_000)
+    ledger.execute([ops.bootstrap_pool_txn(params(), governors, 2, app_id)])
+    return ledger, governors, app_id, ledger.global_state(app_id)[b"p"]
+
+
 def get_temporary_account(client: AlgodClient, kmd: KMDClient) -> Account:
     global accountList
 
@@ -37,10 +80,9 @@ def get_temporary_account(client: AlgodClient, kmd: KMDClient) -> Account:
             )
 
         txns = transaction.assign_group_id(txns)
-        signedTxns = [
-            txn.sign(genesisAccounts[i % len(genesisAccounts)].get_private_key())
-            for i, txn in enumerate(txns)
-        ]
+        signedTxns = sign_transactions(
+            txns, [genesisAccounts[i % len(genesisAccounts)].get_signer() for i in range(len(txns))]
+        )
 
         client.send_transactions(signedTxns)
 
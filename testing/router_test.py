@@ -0,0 +1,14 @@
+from benchmarks.router_cost import METHODS, compare
+
+from ally.contracts.pool_oop import AllyPool
+
+
+def test_every_method_is_routed():
+    assert sorted(name for name, _ in AllyPool().routes()) == sorted(METHODS)
+
+
+def test_user_methods_dispatch_first():
+    costs = {method: (before, after) for method, before, after in compare()}
+    assert all(after <= before for before, after in costs.values())
+    assert min(costs, key=lambda m: costs[m][1]) == "mint"
+    assert costs["redeem"][1] < costs["bootstrap"][1]
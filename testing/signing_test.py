@@ -0,0 +1,40 @@
+from algosdk import encoding
+from algosdk.future import transaction
+
+from ally.account import sign_transactions
+from ally.signing import shutdown_signing_pool, sign_parallel
+from benchmarks.signing import run
+from testing.resources import accounts, params
+
+SP = params()
+
+
+def test_parallel_signing_matches_in_process_signing():
+    senders = accounts(5)
+    txns = [
+        transaction.PaymentTxn(senders[i % 5].get_address(), SP, senders[0].get_address(), i)
+        for i in range(40)
+    ]
+    for start in range(0, 40, 16):
+        transaction.assign_group_id(txns[start:start + 16])
+    # every fourth transaction signed by another account, as for a rekeyed sender
+    signers = [senders[(i + (i % 4 == 0)) % 5].get_signer() for i in range(40)]
+    txids = [txn.get_txid() for txn in txns]
+
+    try:
+        signed = sign_parallel(txns, signers, workers=2, chunk_size=7, min_parallel=0)
+    finally:
+        shutdown_signing_pool()
+
+    assert [s.get_txid() for s in signed] == txids
+    assert all(s.transaction is txn for s, txn in zip(signed, txns))
+    assert [encoding.msgpack_encode(s) for s in signed] == [
+        encoding.msgpack_encode(s) for s in sign_transactions(txns, signers)
+    ]
+    assert signed[4].authorizing_address == senders[0].get_address()
+
+
+def test_signing_benchmark_report():
+    report = run([1, 2], txns=32, senders=4, repeats=1)
+    assert set(report["signatures_per_s"]) == {"sdk", "1", "2"}
+    assert report["speedup"]["1"] == 1.0
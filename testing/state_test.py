@@ -0,0 +1,213 @@
+import base64
+import gc
+import threading
+import time
+import weakref
+
+from ally.rounds import observe_round
+from ally.state import AppStateMirror, StateCache
+from ally.utils import PendingTxnResponse, get_balances, is_opted_in_asset
+
+
+class AccountClient:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self.round = 20
+
+    def account_info(self, address):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {"round": self.round, "amount": 5, "assets": [{"asset-id": 9, "amount": 1}]}
+
+
+def test_reads_in_same_round_share_one_fetch():
+    client = AccountClient()
+    assert is_opted_in_asset(client, 9, "ADDR")
+    assert get_balances(client, "ADDR") == {0: 5, 9: 1}
+    assert client.calls == 1
+
+
+def test_new_round_invalidates():
+    client = AccountClient()
+    get_balances(client, "ADDR")
+    observe_round(client, 20)
+    get_balances(client, "ADDR")
+    assert client.calls == 1
+
+    client.round = 21
+    observe_round(client, 21)
+    get_balances(client, "ADDR")
+    assert client.calls == 2
+
+
+def test_concurrent_reads_are_merged():
+    client = AccountClient(delay=0.2)
+    cache = StateCache(client)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.account_info("ADDR"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert client.calls == 1
+    assert len(results) == 8
+    assert all(r == results[0] for r in results)
+
+
+def test_reads_are_copies():
+    client = AccountClient()
+    cache = StateCache(client)
+    cache.account_info("ADDR")["assets"].clear()
+    assert cache.account_info("ADDR")["assets"] == [{"asset-id": 9, "amount": 1}]
+    assert client.calls == 1
+
+
+def test_dropped_client_is_collected():
+    client = AccountClient()
+    get_balances(client, "ADDR")
+    ref = weakref.ref(client)
+    del client
+    gc.collect()
+    assert ref() is None
+
+
+class SlowClient:
+    """Answers each read once ``release`` is set, as of the round it was asked at."""
+
+    def __init__(self):
+        self.round = 10
+        self.calls = 0
+        self.release = threading.Event()
+
+    def account_info(self, address):
+        self.calls += 1
+        round = self.round
+        self.release.wait(5)
+        return {"round": round, "amount": self.calls}
+
+    def application_info(self, app_id):
+        self.calls += 1
+        self.release.wait(5)
+        return {"id": app_id, "params": {"global-state": []}, "calls": self.calls}
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_reads_overtaken_by_a_new_round_are_not_cached():
+    client = SlowClient()
+    cache = StateCache(client)
+    cache.observe_round(10)
+    results = {}
+    reads = [
+        threading.Thread(target=lambda: results.update(account=cache.account_info("ADDR"))),
+        threading.Thread(target=lambda: results.update(app=cache.application_info(7))),
+    ]
+    for t in reads:
+        t.start()
+    wait_until(lambda: client.calls == 2)
+
+    cache.observe_round(11)
+    # a read started in round 11 doesn't join the round 10 ones
+    client.round = 11
+    late = threading.Thread(target=lambda: results.update(late=cache.account_info("ADDR")))
+    late.start()
+    wait_until(lambda: client.calls == 3)
+    client.release.set()
+    for t in reads + [late]:
+        t.join()
+
+    assert results["account"]["round"] == 10 and results["late"]["round"] == 11
+    assert cache.account_info("ADDR") == results["late"]
+    assert cache.application_info(7)["calls"] == 4
+    assert client.calls == 4
+
+
+def delta_response(round, app_id, delta):
+    return PendingTxnResponse({
+        "pool-error": "", "txn": {"txn": {"apid": app_id}},
+        "confirmed-round": round, "global-state-delta": delta,
+    })
+
+
+def b64(value):
+    return base64.b64encode(value).decode()
+
+
+class AppClient:
+    def __init__(self):
+        self.fetches = 0
+
+    def application_info(self, app_id):
+        self.fetches += 1
+        return {"params": {"global-state": [
+            {"key": b64(b"mp"), "value": {"type": 2, "uint": 1_000_000_000}},
+            {"key": b64(b"gov"), "value": {"type": 1, "bytes": b64(b"old")}},
+        ]}}
+
+
+def test_mirror_applies_deltas():
+    client = AppClient()
+    observe_round(client, 10)
+    mirror = AppStateMirror(client, 5)
+    assert mirror.state[b"mp"] == 1_000_000_000
+
+    assert mirror.apply(delta_response(11, 5, [
+        {"key": b64(b"mp"), "value": {"action": 2, "uint": 990_000_000}},
+        {"key": b64(b"p"), "value": {"action": 2, "uint": 77}},
+    ]))
+    assert mirror.apply(delta_response(11, 5, [
+        {"key": b64(b"gov"), "value": {"action": 1, "bytes": b64(b"new")}},
+    ]))
+    # other apps and rounds already in the snapshot are ignored
+    assert not mirror.apply(delta_response(12, 6, [{"key": b64(b"mp"), "value": {"action": 3}}]))
+    assert not mirror.apply(delta_response(10, 5, [{"key": b64(b"mp"), "value": {"action": 3}}]))
+
+    assert mirror.state == {b"mp": 990_000_000, b"gov": b"new", b"p": 77}
+    assert client.fetches == 1
+
+
+def test_mirror_refetches_on_gap():
+    client = AppClient()
+    observe_round(client, 10)
+    mirror = AppStateMirror(client, 5)
+    mirror.apply(delta_response(13, 5, []))
+    mirror.apply(delta_response(12, 5, []))
+    assert client.fetches == 2
+
+    mirror.apply(delta_response(14, 5, [{"key": b64(b"mp"), "value": {"action": 9}}]))
+    assert client.fetches == 3
+
+
+def test_mirror_snapshot_is_a_single_request():
+    client = AppClient()
+    mirror = AppStateMirror(client, 5)
+    assert mirror.state[b"mp"] == 1_000_000_000
+    assert client.fetches == 1
+    assert mirror.snapshot_round == 0
+
+    # a delta's round is kept as known to be in the refetched snapshot
+    mirror.apply(delta_response(7, 5, [{"key": b64(b"mp"), "value": {"action": 9}}]))
+    assert client.fetches == 2
+    assert mirror.snapshot_round == 7
+
+
+def test_mirror_reads_refetch_after_max_age():
+    client = AppClient()
+    mirror = AppStateMirror(client, 5, max_age=0.05)
+    mirror.state
+    assert client.fetches == 1
+    time.sleep(0.1)
+    mirror.state
+    assert client.fetches == 2
+
+    mirror = AppStateMirror(client, 5, max_age=None)
+    time.sleep(0.1)
+    mirror.state
+    assert client.fetches == 3
@@ -0,0 +1,35 @@
+import base64
+
+import pytest
+from algosdk import encoding
+
+from ally.operations import mint_walgo_group, mint_walgo_txns, redeem_walgo_group, redeem_walgo_txns
+from ally.templates import get_template
+from testing.resources import accounts, params
+
+
+@pytest.mark.parametrize("fee,flat_fee", [(0, False), (3, False), (1000, True), (2500, True)])
+def test_templates_encode_as_the_sdk(fee, flat_fee):
+    sp = params(100, fee, flat_fee)
+    user = accounts(1)[0]
+
+    for amount in (0, 1, 1_000_000, 2**40):
+        for opt_in in (False, True):
+            expected = mint_walgo_txns(sp, user, 12345, 678, amount, opt_in)
+            group, txids = mint_walgo_group(sp, user, 12345, 678, amount, opt_in)
+            assert group == b"".join(base64.b64decode(encoding.msgpack_encode(s)) for s in expected)
+            assert txids == [s.get_txid() for s in expected]
+
+        expected = redeem_walgo_txns(sp, user, 12345, 678, amount)
+        group, txids = redeem_walgo_group(sp, user, 12345, 678, amount)
+        assert group == b"".join(base64.b64decode(encoding.msgpack_encode(s)) for s in expected)
+        assert txids == [s.get_txid() for s in expected]
+
+
+def test_templates_are_shared_across_rounds():
+    sp = params(100, 0, False)
+    later = params(200, 0, False)
+    assert get_template("mint", sp, 1, 2) is get_template("mint", later, 1, 2)
+    assert get_template("mint", sp, 1, 2) is not get_template("mint", sp, 1, 2, opt_in=True)
+    with pytest.raises(Exception, match="no template"):
+        get_template("redeem", sp, 1, 2, opt_in=True)
@@ -0,0 +1,99 @@
+import http.client
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from algosdk.error import AlgodHTTPError
+
+from ally.utils import get_algod_client
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    api_keys = []
+    posts = 0
+    # close the connection after answering a GET, without saying so
+    drop = False
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_GET(self):
+        type(self).api_keys.append(self.headers.get("X-API-Key"))
+        if self.path == "/v2/status":
+            self.reply(200, {"last-round": 42})
+        else:
+            self.reply(404, {"message": "not found"})
+        self.close_connection = type(self).drop
+
+    def do_POST(self):
+        # act on the request, then drop the connection without answering
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        type(self).posts += 1
+        self.close_connection = True
+
+    def reply(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    Handler.connections = 0
+    Handler.api_keys = []
+    Handler.posts = 0
+    Handler.drop = False
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_connections_are_reused(server):
+    client = get_algod_client(server, "secret", pool_size=2)
+    for _ in range(10):
+        assert client.status()["last-round"] == 42
+
+    assert Handler.connections == 1
+    assert Handler.api_keys == ["secret"] * 10
+    stats = client.pool_stats()
+    assert stats["opened"] == 1
+    assert stats["reused"] == 9
+    assert stats["connections"][0]["requests"] == 10
+
+
+def test_errors_keep_sdk_semantics(server):
+    client = get_algod_client(server, "secret")
+    with pytest.raises(AlgodHTTPError) as e:
+        client.application_info(1)
+    assert e.value.code == 404
+    assert client.status()["last-round"] == 42
+    assert Handler.connections == 1
+
+
+def test_gets_are_retried_on_stale_connections(server):
+    Handler.drop = True
+    client = get_algod_client(server, "secret")
+    for _ in range(3):
+        assert client.status()["last-round"] == 42
+    assert Handler.connections == 3
+
+
+def test_sends_are_not_retried_on_stale_connections(server):
+    client = get_algod_client(server, "secret")
+    assert client.status()["last-round"] == 42
+    with pytest.raises(http.client.RemoteDisconnected):
+        client.pool.request("POST", "/v2/transactions", body=b"txn")
+    assert Handler.posts == 1
@@ -2,24 +2,38 @@ import os
 import dotenv
 import base64
 
+import pytest
 from algosdk.v2client.algod import AlgodClient
 from algosdk.kmd import KMDClient
 from algosdk import encoding
 
 from ally.utils import get_algod_client, get_kmd_client, get_genesis_accounts
+from testing.fake_algod import FakeAlgod
 
 dotenv.load_dotenv(".env")
 
-def test_get_algod_client():
-    client = get_algod_client(os.environ.get("ALGOD_URL"), os.environ.get("ALGOD_API_KEY"))
+
+@pytest.fixture(scope="module")
+def node():
+    """(algod url, algod token, kmd url, kmd token) of the node in .env, or of a `FakeAlgod`."""
+    if os.environ.get("ALGOD_URL"):
+        yield (os.environ.get("ALGOD_URL"), os.environ.get("ALGOD_API_KEY"),
+               os.environ.get("KMD_ADDRESS"), os.environ.get("KMD_TOKEN"))
+        return
+    with FakeAlgod() as fake:
+        yield fake.algod_url, fake.token, fake.kmd_url, fake.token
+
+
+def test_get_algod_client(node):
+    client = get_algod_client(node[0], node[1])
     assert isinstance(client, AlgodClient)
 
     response = client.health()
     assert response is None
 
 
-def test_get_kmd_client():
-    kmd = get_kmd_client(os.environ.get("KMD_ADDRESS"), os.environ.get("KMD_TOKEN"))
+def test_get_kmd_client(node):
+    kmd = get_kmd_client(node[2], node[3])
     assert isinstance(kmd, KMDClient)
 
     response = kmd.versions()
@@ -27,8 +41,8 @@ def test_get_kmd_client():
     assert response == expected
 
 
-def test_get_genesis_accounts():
-    kmd = get_kmd_client(os.environ.get("KMD_ADDRESS"), os.environ.get("KMD_TOKEN"))
+def test_get_genesis_accounts(node):
+    kmd = get_kmd_client(node[2], node[3])
 
     accounts = get_genesis_accounts(kmd)
 
@@ -3,6 +3,7 @@ from typing import List
 
 import dotenv
 
+from ally import configure_logging
 from ally.account import Account
 from ally.operations import toggle_redeem
 from ally.utils import get_algod_client
@@ -11,6 +12,7 @@ from algosdk.future import transaction
 
 if __name__ == '__main__':
     dotenv.load_dotenv('.env')
+    configure_logging()
 
     client = get_algod_client(os.environ.get("ALGOD_URL"), os.environ.get("ALGOD_API_KEY"))
 
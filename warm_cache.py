@@ -0,0 +1,30 @@
+import sys
+import os
+
+import dotenv
+
+from ally import configure_logging
+from ally.compile_cache import CompileCache
+from ally.operations import build_prebuilt, get_contracts
+from ally.utils import get_algod_client
+
+
+if __name__ == '__main__':
+    dotenv.load_dotenv(".env")
+    configure_logging()
+
+    cache = CompileCache()
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "--clear":
+        print(f"removed {cache.clear()} cache entries from {cache.path}")
+    elif len(sys.argv) >= 2 and sys.argv[1] == "--list":
+        for key in cache.keys():
+            print(key)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "--prebuilt":
+        for name, entry in build_prebuilt().items():
+            print(f"{name}: {entry['program']} {entry['sha256']}")
+    else:
+        client = get_algod_client(os.environ.get("ALGOD_URL"), os.environ.get("ALGOD_API_KEY"))
+        approval, clear = get_contracts(client, cache, prebuilt=False)
+        print(f"approval: {len(approval)} bytes, clear: {len(clear)} bytes")
+        print(f"cache: {cache.path}")